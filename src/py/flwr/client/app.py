@@ -14,10 +14,12 @@
 # ==============================================================================
 """Flower client app."""
 
+import atexit
 import signal
 import subprocess
 import sys
 import time
+from collections import OrderedDict
 from contextlib import AbstractContextManager
 from dataclasses import dataclass
 from logging import ERROR, INFO, WARN
@@ -65,6 +67,9 @@ from .numpy_client import NumPyClient
 ISOLATION_MODE_SUBPROCESS = "subprocess"
 ISOLATION_MODE_PROCESS = "process"
 
+# Number of recently used FABs kept in memory by the SuperNode
+FAB_CACHE_SIZE = 2
+
 
 def _check_actionable_client(
     client: Optional[Client], client_fn: Optional[ClientFnExt]
@@ -264,7 +269,8 @@ def start_client_internal(
         `process`. Defaults to `None`, which runs the `ClientApp` in the same process
         as the SuperNode. If `subprocess`, the `ClientApp` runs in a subprocess started
         by the SueprNode and communicates using gRPC at the address
-        `supernode_address`. If `process`, the `ClientApp` runs in a separate isolated
+        `supernode_address`. The subprocess is kept alive and handles all messages
+        of a run. If `process`, the `ClientApp` runs in a separate isolated
         process and communicates using gRPC at the address `supernode_address`.
     supernode_address : Optional[str] (default: `CLIENTAPPIO_API_DEFAULT_ADDRESS`)
         The SuperNode gRPC server address.
@@ -358,6 +364,24 @@ def start_client_internal(
     node_state: Optional[NodeState] = None
 
     runs: dict[int, Run] = {}
+    # Recently used FABs, downloaded (and installed) once, together with their ID and
+    # version
+    fabs: OrderedDict[str, tuple[Fab, str, str]] = OrderedDict()
+    # The last loaded ClientApp, only reloaded if the FAB (or, without FAB, the run)
+    # changes, as loading it reloads all modules of the app
+    client_app_key: Optional[Union[str, int]] = None
+    client_app: Optional[ClientApp] = None
+    # The `flwr-clientapp` process started in `subprocess` isolation mode and the
+    # run it serves, it is kept alive to process all messages of that run
+    clientapp_process: Optional[subprocess.Popen[bytes]] = None
+    clientapp_process_run_id: Optional[int] = None
+
+    def _stop_current_clientapp_process() -> None:
+        _stop_clientapp_process(clientapp_process)
+
+    # Also stop the current process if the interpreter exits without reaching the
+    # end of this function (e.g., because of an exception)
+    atexit.register(_stop_current_clientapp_process)
 
     while not app_state_tracker.interrupt:
         sleep_duration: int = 0
@@ -402,9 +426,12 @@ def start_client_internal(
             while not app_state_tracker.interrupt:
                 try:
                     # Receive
+                    start_time = time.monotonic()
                     message = receive()
                     if message is None:
-                        time.sleep(3)  # Wait for 3s before asking again
+                        # Wait for up to 3s before asking again unless the server
+                        # already held the request (long-polling)
+                        time.sleep(max(0.0, 3 - (time.monotonic() - start_time)))
                         continue
 
                     log(INFO, "")
@@ -439,11 +466,18 @@ def start_client_internal(
 
                     run: Run = runs[run_id]
                     if get_fab is not None and run.fab_hash:
-                        fab = get_fab(run.fab_hash)
-                        if not isolation:
-                            # If `ClientApp` runs in the same process, install the FAB
-                            install_from_fab(fab.content, flwr_path, True)
-                        fab_id, fab_version = get_fab_metadata(fab.content)
+                        if run.fab_hash in fabs:
+                            fabs.move_to_end(run.fab_hash)
+                        else:
+                            fab = get_fab(run.fab_hash)
+                            if not isolation:
+                                # If `ClientApp` runs in the same process, install
+                                # the FAB
+                                install_from_fab(fab.content, flwr_path, True)
+                            fabs[run.fab_hash] = (fab, *get_fab_metadata(fab.content))
+                            if len(fabs) > FAB_CACHE_SIZE:
+                                fabs.popitem(last=False)
+                        fab, fab_id, fab_version = fabs[run.fab_hash]
                     else:
                         fab = None
                         fab_id, fab_version = run.fab_id, run.fab_version
@@ -479,8 +513,25 @@ def start_client_internal(
                             # Generate SuperNode token
                             token: int = generate_rand_int_from_bytes(RUN_ID_NUM_BYTES)
 
-                            # Mode 1: SuperNode starts ClientApp as subprocess
-                            start_subprocess = isolation == ISOLATION_MODE_SUBPROCESS
+                            # Mode 1: SuperNode starts ClientApp as subprocess, which
+                            # keeps pulling messages until the run changes
+                            if isolation == ISOLATION_MODE_SUBPROCESS and (
+                                clientapp_process is None
+                                or clientapp_process.poll() is not None
+                                or clientapp_process_run_id != run_id
+                            ):
+                                _stop_clientapp_process(clientapp_process)
+                                # pylint: disable-next=consider-using-with
+                                clientapp_process = subprocess.Popen(
+                                    [
+                                        "flwr-clientapp",
+                                        "--supernode",
+                                        supernode_address,
+                                    ],
+                                    stdout=None,
+                                    stderr=None,
+                                )
+                                clientapp_process_run_id = run_id
 
                             # Share Message and Context with servicer
                             clientappio_servicer.set_inputs(
@@ -491,36 +542,30 @@ def start_client_internal(
                                     fab=fab,
                                     token=token,
                                 ),
-                                token_returned=start_subprocess,
+                                token_returned=False,
                             )
 
-                            if start_subprocess:
-                                # Start ClientApp subprocess
-                                command = [
-                                    "flwr-clientapp",
-                                    "--supernode",
-                                    supernode_address,
-                                    "--token",
-                                    str(token),
-                                ]
-                                subprocess.run(
-                                    command,
-                                    stdout=None,
-                                    stderr=None,
-                                    check=True,
-                                )
-                            else:
-                                # Wait for output to become available
-                                while not clientappio_servicer.has_outputs():
-                                    time.sleep(0.1)
+                            # Wait for output to become available
+                            while not clientappio_servicer.wait_for_outputs(timeout=1):
+                                if (
+                                    clientapp_process is not None
+                                    and clientapp_process.poll() is not None
+                                ):
+                                    clientappio_servicer.clear()
+                                    raise RuntimeError(
+                                        "ClientApp process exited with code "
+                                        f"{clientapp_process.returncode}"
+                                    )
 
                             outputs = clientappio_servicer.get_outputs()
                             reply_message, context = outputs.message, outputs.context
                         else:
-                            # Load ClientApp instance
-                            client_app: ClientApp = load_client_app_fn(
-                                fab_id, fab_version
-                            )
+                            # Load ClientApp instance, unless already loaded
+                            if client_app is None or client_app_key != (
+                                run.fab_hash or run_id
+                            ):
+                                client_app = load_client_app_fn(fab_id, fab_version)
+                                client_app_key = run.fab_hash or run_id
 
                             # Execute ClientApp
                             reply_message = client_app(message=message, context=context)
@@ -588,6 +633,21 @@ def start_client_internal(
         )
         time.sleep(sleep_duration)
 
+    _stop_current_clientapp_process()
+    atexit.unregister(_stop_current_clientapp_process)
+
+
+def _stop_clientapp_process(process: Optional[subprocess.Popen[bytes]]) -> None:
+    """Terminate a `flwr-clientapp` process, if it is still running."""
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
 
 def start_numpy_client(
     *,
@@ -15,7 +15,10 @@
 """Flower Client app tests."""
 
 
+from unittest.mock import MagicMock, Mock, patch
+
 from flwr.common import (
+    DEFAULT_TTL,
     Config,
     EvaluateIns,
     EvaluateRes,
@@ -25,11 +28,16 @@ from flwr.common import (
     GetParametersRes,
     GetPropertiesIns,
     GetPropertiesRes,
+    Message,
+    MessageType,
+    Metadata,
     NDArrays,
+    RecordSet,
     Scalar,
 )
+from flwr.common.typing import Fab, Run
 
-from .app import start_client, start_numpy_client
+from .app import start_client, start_client_internal, start_numpy_client
 from .client import Client
 from .numpy_client import NumPyClient
 
@@ -124,3 +132,54 @@ def test_start_numpy_client_transport_invalid() -> None:
         raise AssertionError()  # Fail the test if no exception was raised
     except ValueError:
         pass
+
+
+@patch("flwr.client.node_state.get_fused_config_from_fab", Mock(return_value={}))
+@patch("flwr.client.app.get_fab_metadata", Mock(return_value=("flwr/app", "1.0.0")))
+@patch("flwr.client.app.install_from_fab")
+def test_start_client_internal_caches_fab_and_client_app(
+    install_from_fab: Mock,
+) -> None:
+    """Test that FABs and ClientApps are only loaded once per FAB hash."""
+    # Prepare: three messages of two runs using the same FAB
+    messages = [
+        Message(
+            Metadata(run_id, "", 0, 1, "", "", DEFAULT_TTL, MessageType.TRAIN),
+            RecordSet(),
+        )
+        for run_id in [1, 1, 2]
+    ]
+    runs = {run_id: Run(run_id, "", "", "fab-hash", {}) for run_id in [1, 2]}
+    replies: list[Message] = []
+    get_fab = Mock(return_value=Fab("fab-hash", b"fab-content"))
+    connection = MagicMock()
+    connection.return_value.__enter__.return_value = (
+        Mock(side_effect=[*messages, StopIteration()]),  # receive
+        replies.append,  # send
+        lambda: 1,  # create_node
+        None,  # delete_node
+        runs.__getitem__,  # get_run
+        get_fab,
+    )
+    client_app = Mock(
+        side_effect=lambda message, context: message.create_reply(RecordSet())
+    )
+    load_client_app_fn = Mock(return_value=client_app)
+
+    # Execute
+    with patch(
+        "flwr.client.app._init_connection", return_value=(connection, "", Exception)
+    ):
+        start_client_internal(
+            server_address="127.0.0.1:9092",
+            node_config={},
+            load_client_app_fn=load_client_app_fn,
+            transport="grpc-rere",
+        )
+
+    # Assert
+    assert len(replies) == 3
+    assert client_app.call_count == 3
+    get_fab.assert_called_once_with("fab-hash")
+    install_from_fab.assert_called_once()
+    load_client_app_fn.assert_called_once_with("flwr/app", "1.0.0")
@@ -25,7 +25,9 @@ from flwr.client.message_handler.message_handler import (
 from flwr.client.mod.utils import make_ffn
 from flwr.client.typing import ClientFnExt, Mod
 from flwr.common import Context, Message, MessageType
+from flwr.common.delta_sync import announce_model_version, receive_model_version
 from flwr.common.logger import warn_deprecated_feature, warn_preview_feature
+from flwr.common.record.codec import negotiate_array_codecs
 
 from .typing import ClientAppCallable
 
@@ -138,6 +140,17 @@ class ClientApp:
 
     def __call__(self, message: Message, context: Context) -> Message:
         """Execute `ClientApp`."""
+        # Restore the model if only the delta to the cached version was sent
+        if message.has_content():
+            receive_model_version(message.content, context.state)
+        reply = self._handle(message, context)
+        if message.has_content() and reply.has_content():
+            # Encode the reply with the Array codecs requested by the server
+            negotiate_array_codecs(message.content, reply.content)
+            announce_model_version(message.content, reply.content, context.state)
+        return reply
+
+    def _handle(self, message: Message, context: Context) -> Message:
         # Execute message using `client_fn`
         if self._call:
             return self._call(message, context)
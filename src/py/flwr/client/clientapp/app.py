@@ -24,7 +24,7 @@ import grpc
 from flwr.cli.install import install_from_fab
 from flwr.client.client_app import ClientApp, LoadClientAppError
 from flwr.common import Context, Message
-from flwr.common.constant import ErrorCode
+from flwr.common.constant import LONG_POLL_MAX_TIMEOUT, ErrorCode
 from flwr.common.grpc import create_channel
 from flwr.common.logger import log
 from flwr.common.message import Error
@@ -110,30 +110,45 @@ def run_clientapp(  # pylint: disable=R0914
         stub = ClientAppIoStub(channel)
 
         only_once = token is not None
+        load_client_app_fn = get_load_client_app_fn(
+            default_app_ref="",
+            app_path=None,
+            multi_app=True,
+            flwr_dir=None,
+        )
+        # FAB and ClientApp of the previous message, reused as long as the
+        # SuperNode keeps sending messages of the same run
+        fab_hash: Optional[str] = None
+        client_app: Optional[ClientApp] = None
+        client_app_key: Optional[tuple[str, str]] = None
         while True:
             # If token is not set, loop until token is received from SuperNode
             while token is None:
-                token = get_token(stub)
-                time.sleep(1)
+                # Wait for up to 1s before asking again unless the SuperNode
+                # already held the request (long-polling)
+                start_time = time.monotonic()
+                token = get_token(stub, timeout=LONG_POLL_MAX_TIMEOUT)
+                if token is None:
+                    time.sleep(max(0.0, 1 - (time.monotonic() - start_time)))
 
             # Pull Message, Context, Run and (optional) FAB from SuperNode
             message, context, run, fab = pull_message(stub=stub, token=token)
 
-            # Install FAB, if provided
-            if fab:
+            # Install FAB, if provided and not installed already
+            if fab and fab.hash_str != fab_hash:
                 log(DEBUG, "Flower ClientApp starts FAB installation.")
                 install_from_fab(fab.content, flwr_dir=None, skip_prompt=True)
-
-            load_client_app_fn = get_load_client_app_fn(
-                default_app_ref="",
-                app_path=None,
-                multi_app=True,
-                flwr_dir=None,
-            )
+                fab_hash = fab.hash_str
+                client_app = None
 
             try:
-                # Load ClientApp
-                client_app: ClientApp = load_client_app_fn(run.fab_id, run.fab_version)
+                # Load ClientApp, unless already loaded
+                if client_app is None or client_app_key != (
+                    run.fab_id,
+                    run.fab_version,
+                ):
+                    client_app = load_client_app_fn(run.fab_id, run.fab_version)
+                    client_app_key = (run.fab_id, run.fab_version)
 
                 # Execute ClientApp
                 reply_message = client_app(message=message, context=context)
@@ -179,11 +194,15 @@ def run_clientapp(  # pylint: disable=R0914
         channel.close()
 
 
-def get_token(stub: grpc.Channel) -> Optional[int]:
-    """Get a token from SuperNode."""
+def get_token(stub: grpc.Channel, timeout: float = 0.0) -> Optional[int]:
+    """Get a token from SuperNode.
+
+    If `timeout` is positive, the SuperNode holds the request for up to `timeout`
+    seconds until a token becomes available.
+    """
     log(DEBUG, "Flower ClientApp process requests token")
     try:
-        res: GetTokenResponse = stub.GetToken(GetTokenRequest())
+        res: GetTokenResponse = stub.GetToken(GetTokenRequest(timeout=timeout))
         log(DEBUG, "[GetToken] Received token: %s", res.token)
         return res.token
     except grpc.RpcError as e:
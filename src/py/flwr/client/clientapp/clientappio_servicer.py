@@ -15,6 +15,7 @@
 """ClientAppIo API servicer."""
 
 
+import threading
 from dataclasses import dataclass
 from logging import DEBUG, ERROR
 from typing import Optional, cast
@@ -22,6 +23,7 @@ from typing import Optional, cast
 import grpc
 
 from flwr.common import Context, Message, typing
+from flwr.common.constant import LONG_POLL_MAX_TIMEOUT
 from flwr.common.logger import log
 from flwr.common.serde import (
     clientappstatus_to_proto,
@@ -74,6 +76,9 @@ class ClientAppIoServicer(clientappio_pb2_grpc.ClientAppIoServicer):
         self.clientapp_output: Optional[ClientAppOutputs] = None
         self.token_returned: bool = False
         self.inputs_returned: bool = False
+        # Notified whenever inputs or outputs are set, so that neither the
+        # `flwr-clientapp` process nor the SuperNode need to poll
+        self.condition = threading.Condition()
 
     def GetToken(
         self, request: GetTokenRequest, context: grpc.ServicerContext
@@ -81,6 +86,16 @@ class ClientAppIoServicer(clientappio_pb2_grpc.ClientAppIoServicer):
         """Get token."""
         log(DEBUG, "ClientAppIo.GetToken")
 
+        # Wait for inputs with a token that hasn't been returned yet, if the
+        # ClientApp asked for it
+        if request.timeout > 0:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.clientapp_input is not None
+                    and not self.token_returned,
+                    timeout=min(request.timeout, LONG_POLL_MAX_TIMEOUT),
+                )
+
         # Fail if no ClientAppInputs are available
         if self.clientapp_input is None:
             context.abort(
@@ -100,7 +115,8 @@ class ClientAppIoServicer(clientappio_pb2_grpc.ClientAppIoServicer):
         # - ClientAppInputs is set, and
         # - token hasn't been returned before,
         # return token
-        self.token_returned = True
+        with self.condition:
+            self.token_returned = True
         return GetTokenResponse(token=clientapp_input.token)
 
     def PullClientAppInputs(
@@ -181,10 +197,13 @@ class ClientAppIoServicer(clientappio_pb2_grpc.ClientAppIoServicer):
         # Preconditions met
         try:
             # Update Message and Context
-            self.clientapp_output = ClientAppOutputs(
+            clientapp_output = ClientAppOutputs(
                 message=message_from_proto(request.message),
                 context=context_from_proto(request.context),
             )
+            with self.condition:
+                self.clientapp_output = clientapp_output
+                self.condition.notify_all()
 
             # Set status
             code = typing.ClientAppOutputCode.SUCCESS
@@ -222,13 +241,31 @@ class ClientAppIoServicer(clientappio_pb2_grpc.ClientAppIoServicer):
                 "calling `set_inputs`."
             )
         log(DEBUG, "ClientAppInputs set (token: %s)", clientapp_input.token)
-        self.clientapp_input = clientapp_input
-        self.token_returned = token_returned
+        with self.condition:
+            self.clientapp_input = clientapp_input
+            self.token_returned = token_returned
+            self.condition.notify_all()
 
     def has_outputs(self) -> bool:
         """Check if ClientAppOutputs are available."""
         return self.clientapp_output is not None
 
+    def wait_for_outputs(self, timeout: Optional[float] = None) -> bool:
+        """Block until ClientAppOutputs are available.
+
+        Parameters
+        ----------
+        timeout : Optional[float] (default: None)
+            Maximum time (in seconds) to wait. Waits indefinitely if `None`.
+
+        Returns
+        -------
+        bool
+            `True` if ClientAppOutputs are available, `False` on timeout.
+        """
+        with self.condition:
+            return self.condition.wait_for(self.has_outputs, timeout=timeout)
+
     def get_outputs(self) -> ClientAppOutputs:
         """Get ClientApp outputs."""
         if self.clientapp_output is None:
@@ -236,9 +273,14 @@ class ClientAppIoServicer(clientappio_pb2_grpc.ClientAppIoServicer):
 
         # Set outputs to a local variable and clear state
         output: ClientAppOutputs = self.clientapp_output
-        self.clientapp_input = None
-        self.clientapp_output = None
-        self.token_returned = False
-        self.inputs_returned = False
+        self.clear()
 
         return output
+
+    def clear(self) -> None:
+        """Clear ClientApp inputs and outputs."""
+        with self.condition:
+            self.clientapp_input = None
+            self.clientapp_output = None
+            self.token_returned = False
+            self.inputs_returned = False
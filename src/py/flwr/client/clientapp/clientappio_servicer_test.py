@@ -14,6 +14,7 @@
 # ==============================================================================
 """Test the ClientAppIo API servicer."""
 
+import threading
 import unittest
 from unittest.mock import Mock, patch
 
@@ -30,6 +31,7 @@ from flwr.common.serde_test import RecordMaker
 
 # pylint:disable=E0611
 from flwr.proto.clientappio_pb2 import (
+    GetTokenRequest,
     GetTokenResponse,
     PullClientAppInputsResponse,
     PushClientAppOutputsResponse,
@@ -221,3 +223,59 @@ class TestClientAppIoServicer(unittest.TestCase):
         # Assert
         self.mock_stub.GetToken.assert_called_once()
         self.assertEqual(res, token)
+
+    def test_get_token_waits_for_inputs(self) -> None:
+        """Test that GetToken holds the request until inputs are set."""
+        # Prepare
+        message = Message(
+            metadata=self.maker.metadata(),
+            content=self.maker.recordset(1, 1, 1),
+        )
+        context = Context(
+            node_id=1,
+            node_config={},
+            state=self.maker.recordset(1, 1, 1),
+            run_config={},
+        )
+        run = typing.Run(1, "lorem", "ipsum", "", {})
+        client_input = ClientAppInputs(message, context, run, None, 123)
+        timer = threading.Timer(
+            0.1, self.servicer.set_inputs, (client_input,), {"token_returned": False}
+        )
+
+        # Execute
+        timer.start()
+        res = self.servicer.GetToken(GetTokenRequest(timeout=10), Mock())
+        timer.join()
+
+        # Assert
+        self.assertEqual(res.token, 123)
+        self.assertTrue(self.servicer.token_returned)
+
+    def test_wait_for_outputs(self) -> None:
+        """Test waiting for ClientApp outputs."""
+        # Prepare
+        message = Message(
+            metadata=self.maker.metadata(),
+            content=self.maker.recordset(1, 1, 1),
+        )
+        context = Context(
+            node_id=1,
+            node_config={},
+            state=self.maker.recordset(1, 1, 1),
+            run_config={},
+        )
+
+        def set_outputs() -> None:
+            with self.servicer.condition:
+                self.servicer.clientapp_output = ClientAppOutputs(message, context)
+                self.servicer.condition.notify_all()
+
+        # Execute and assert - no outputs
+        self.assertFalse(self.servicer.wait_for_outputs(timeout=0.01))
+
+        # Execute and assert - outputs set by another thread
+        timer = threading.Timer(0.1, set_outputs)
+        timer.start()
+        self.assertTrue(self.servicer.wait_for_outputs(timeout=10))
+        timer.join()
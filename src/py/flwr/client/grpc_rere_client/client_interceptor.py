@@ -17,6 +17,7 @@
 
 import base64
 import collections
+import hashlib
 from collections.abc import Sequence
 from logging import WARNING
 from typing import Any, Callable, Optional, Union
@@ -42,6 +43,8 @@ from flwr.proto.run_pb2 import GetRunRequest  # pylint: disable=E0611
 
 _PUBLIC_KEY_HEADER = "public-key"
 _AUTH_TOKEN_HEADER = "auth-token"
+_AUTH_TOKEN_VERSION_HEADER = "auth-token-version"
+_AUTH_TOKEN_DIGEST_VERSION = "2"
 
 Request = Union[
     CreateNodeRequest,
@@ -88,6 +91,8 @@ class AuthenticateClientInterceptor(grpc.UnaryUnaryClientInterceptor):  # type:
         self.public_key = public_key
         self.shared_secret: Optional[bytes] = None
         self.server_public_key: Optional[ec.EllipticCurvePublicKey] = None
+        # Whether the SuperLink accepts auth tokens over the request digest
+        self.use_digest = False
         self.encoded_public_key = base64.urlsafe_b64encode(
             public_key_to_bytes(self.public_key)
         )
@@ -131,13 +136,20 @@ class AuthenticateClientInterceptor(grpc.UnaryUnaryClientInterceptor):  # type:
             if self.shared_secret is None:
                 raise RuntimeError("Failure to compute hmac")
 
-            message_bytes = request.SerializeToString(deterministic=True)
+            if self.use_digest:
+                # Authenticate the SHA-256 digest of the request as serialized by
+                # the channel, so the SuperLink can verify it from the received
+                # bytes instead of serializing the request again
+                message = hashlib.sha256(request.SerializeToString()).digest()
+                metadata.append(
+                    (_AUTH_TOKEN_VERSION_HEADER, _AUTH_TOKEN_DIGEST_VERSION)
+                )
+            else:
+                message = request.SerializeToString(deterministic=True)
             metadata.append(
                 (
                     _AUTH_TOKEN_HEADER,
-                    base64.urlsafe_b64encode(
-                        compute_hmac(self.shared_secret, message_bytes)
-                    ),
+                    base64.urlsafe_b64encode(compute_hmac(self.shared_secret, message)),
                 )
             )
 
@@ -150,8 +162,14 @@ class AuthenticateClientInterceptor(grpc.UnaryUnaryClientInterceptor):  # type:
 
         response = continuation(client_call_details, request)
         if postprocess:
+            initial_metadata = response.initial_metadata()
             server_public_key_bytes = base64.urlsafe_b64decode(
-                _get_value_from_tuples(_PUBLIC_KEY_HEADER, response.initial_metadata())
+                _get_value_from_tuples(_PUBLIC_KEY_HEADER, initial_metadata)
+            )
+            # Older SuperLinks don't announce the auth token version
+            self.use_digest = (
+                _get_value_from_tuples(_AUTH_TOKEN_VERSION_HEADER, initial_metadata)
+                == _AUTH_TOKEN_DIGEST_VERSION.encode()
             )
 
             if server_public_key_bytes != b"":
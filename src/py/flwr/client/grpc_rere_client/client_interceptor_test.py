@@ -16,6 +16,7 @@
 
 
 import base64
+import hashlib
 import threading
 import unittest
 from collections.abc import Sequence
@@ -51,7 +52,13 @@ from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
 from flwr.proto.run_pb2 import GetRunRequest, GetRunResponse  # pylint: disable=E0611
 from flwr.proto.task_pb2 import Task, TaskIns  # pylint: disable=E0611
 
-from .client_interceptor import _AUTH_TOKEN_HEADER, _PUBLIC_KEY_HEADER, Request
+from .client_interceptor import (
+    _AUTH_TOKEN_DIGEST_VERSION,
+    _AUTH_TOKEN_HEADER,
+    _AUTH_TOKEN_VERSION_HEADER,
+    _PUBLIC_KEY_HEADER,
+    Request,
+)
 
 
 class _MockServicer:
@@ -64,7 +71,10 @@ class _MockServicer:
             Sequence[tuple[str, Union[str, bytes]]]
         ] = None
         self.server_private_key, self.server_public_key = generate_key_pairs()
+        self._received_message_digest: bytes = b""
         self._received_message_bytes: bytes = b""
+        # Older SuperLinks don't announce the auth token version
+        self.announce_auth_token_version = True
 
     def unary_unary(
         self, request: Request, context: grpc.ServicerContext
@@ -74,19 +84,25 @@ class _MockServicer:
         """Handle unary call."""
         with self._lock:
             self._received_client_metadata = context.invocation_metadata()
+            self._received_message_digest = hashlib.sha256(
+                request.SerializeToString()
+            ).digest()
             self._received_message_bytes = request.SerializeToString(deterministic=True)
 
             if isinstance(request, CreateNodeRequest):
-                context.send_initial_metadata(
+                initial_metadata: list[tuple[str, Union[str, bytes]]] = [
                     (
-                        (
-                            _PUBLIC_KEY_HEADER,
-                            base64.urlsafe_b64encode(
-                                public_key_to_bytes(self.server_public_key)
-                            ),
+                        _PUBLIC_KEY_HEADER,
+                        base64.urlsafe_b64encode(
+                            public_key_to_bytes(self.server_public_key)
                         ),
                     )
-                )
+                ]
+                if self.announce_auth_token_version:
+                    initial_metadata.append(
+                        (_AUTH_TOKEN_VERSION_HEADER, _AUTH_TOKEN_DIGEST_VERSION)
+                    )
+                context.send_initial_metadata(initial_metadata)
                 return CreateNodeResponse(node=Node(node_id=123))
             if isinstance(request, DeleteNodeRequest):
                 return DeleteNodeResponse()
@@ -111,6 +127,11 @@ class _MockServicer:
         with self._lock:
             return self._received_client_metadata
 
+    def received_message_digest(self) -> bytes:
+        """Return digest of received message."""
+        with self._lock:
+            return self._received_message_digest
+
     def received_message_bytes(self) -> bytes:
         """Return received message bytes."""
         with self._lock:
@@ -276,7 +297,7 @@ class TestAuthenticateClientInterceptor(unittest.TestCase):
                 self._servicer.server_private_key, self._client_public_key
             )
             expected_hmac = base64.urlsafe_b64encode(
-                compute_hmac(shared_secret, self._servicer.received_message_bytes())
+                compute_hmac(shared_secret, self._servicer.received_message_digest())
             )
             actual_public_key = _get_value_from_tuples(
                 _PUBLIC_KEY_HEADER, received_metadata
@@ -290,6 +311,45 @@ class TestAuthenticateClientInterceptor(unittest.TestCase):
             assert actual_public_key == expected_public_key
             assert actual_hmac == expected_hmac
 
+    def test_client_auth_legacy_superlink(self) -> None:
+        """Test client authentication with a SuperLink not announcing digests."""
+        # Prepare
+        retry_invoker = _init_retry_invoker()
+        self._servicer.announce_auth_token_version = False
+
+        # Execute
+        with self._connection(
+            self._address,
+            True,
+            retry_invoker,
+            GRPC_MAX_MESSAGE_LENGTH,
+            None,
+            (self._client_private_key, self._client_public_key),
+        ) as conn:
+            _, _, create_node, delete_node, _, _ = conn
+            assert create_node is not None
+            create_node()
+            assert delete_node is not None
+            delete_node()
+
+            received_metadata = self._servicer.received_client_metadata()
+            assert received_metadata is not None
+
+            shared_secret = generate_shared_key(
+                self._servicer.server_private_key, self._client_public_key
+            )
+            expected_hmac = base64.urlsafe_b64encode(
+                compute_hmac(shared_secret, self._servicer.received_message_bytes())
+            )
+            actual_hmac = _get_value_from_tuples(_AUTH_TOKEN_HEADER, received_metadata)
+            actual_version = _get_value_from_tuples(
+                _AUTH_TOKEN_VERSION_HEADER, received_metadata
+            )
+
+            # Assert
+            assert actual_hmac == expected_hmac
+            assert actual_version == b""
+
     def test_client_auth_receive(self) -> None:
         """Test client authentication during receive node."""
         # Prepare
@@ -317,7 +377,7 @@ class TestAuthenticateClientInterceptor(unittest.TestCase):
                 self._servicer.server_private_key, self._client_public_key
             )
             expected_hmac = base64.urlsafe_b64encode(
-                compute_hmac(shared_secret, self._servicer.received_message_bytes())
+                compute_hmac(shared_secret, self._servicer.received_message_digest())
             )
             actual_public_key = _get_value_from_tuples(
                 _PUBLIC_KEY_HEADER, received_metadata
@@ -361,7 +421,7 @@ class TestAuthenticateClientInterceptor(unittest.TestCase):
                 self._servicer.server_private_key, self._client_public_key
             )
             expected_hmac = base64.urlsafe_b64encode(
-                compute_hmac(shared_secret, self._servicer.received_message_bytes())
+                compute_hmac(shared_secret, self._servicer.received_message_digest())
             )
             actual_public_key = _get_value_from_tuples(
                 _PUBLIC_KEY_HEADER, received_metadata
@@ -402,7 +462,7 @@ class TestAuthenticateClientInterceptor(unittest.TestCase):
                 self._servicer.server_private_key, self._client_public_key
             )
             expected_hmac = base64.urlsafe_b64encode(
-                compute_hmac(shared_secret, self._servicer.received_message_bytes())
+                compute_hmac(shared_secret, self._servicer.received_message_digest())
             )
             actual_public_key = _get_value_from_tuples(
                 _PUBLIC_KEY_HEADER, received_metadata
@@ -31,7 +31,14 @@ from flwr.client.heartbeat import start_ping_loop
 from flwr.client.message_handler.message_handler import validate_out_message
 from flwr.client.message_handler.task_handler import get_task_ins, validate_task_ins
 from flwr.common import GRPC_MAX_MESSAGE_LENGTH
+from flwr.common.chunk import (
+    Chunks,
+    merge_pull_task_ins_chunks,
+    merge_push_task_res_chunks,
+    split_message_to_push_task_res,
+)
 from flwr.common.constant import (
+    LONG_POLL_MAX_TIMEOUT,
     PING_BASE_MULTIPLIER,
     PING_CALL_TIMEOUT,
     PING_DEFAULT_INTERVAL,
@@ -54,7 +61,10 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     PingRequest,
     PingResponse,
     PullTaskInsRequest,
+    PullTaskInsResponse,
+    PushTaskResChunk,
     PushTaskResRequest,
+    PushTaskResResponse,
 )
 from flwr.proto.fleet_pb2_grpc import FleetStub  # pylint: disable=E0611
 from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
@@ -155,6 +165,9 @@ def grpc_request_response(  # pylint: disable=R0913, R0914, R0915
     node: Optional[Node] = None
     ping_thread: Optional[threading.Thread] = None
     ping_stop_event = threading.Event()
+    # Stream TaskIns/TaskRes in chunks, unless node authentication (which only
+    # covers unary calls) is enabled or the adapter doesn't support streaming
+    use_streaming = authentication_keys is None and isinstance(stub, FleetStub)
 
     ###########################################################################
     # ping/create_node/delete_node/receive/send/get_run functions
@@ -224,8 +237,8 @@ def grpc_request_response(  # pylint: disable=R0913, R0914, R0915
             return None
 
         # Request instructions (task) from server
-        request = PullTaskInsRequest(node=node)
-        response = retry_invoker.invoke(stub.PullTaskIns, request=request)
+        request = PullTaskInsRequest(node=node, timeout=LONG_POLL_MAX_TIMEOUT)
+        response = retry_invoker.invoke(pull_task_ins, request=request)
 
         # Get the current TaskIns
         task_ins: Optional[TaskIns] = get_task_ins(response)
@@ -265,16 +278,51 @@ def grpc_request_response(  # pylint: disable=R0913, R0914, R0915
             log(ERROR, "Invalid out message")
             return
 
-        # Construct TaskRes
-        task_res = message_to_taskres(message)
+        if use_streaming:
+            # Stream the data of the Arrays straight from the message, the chunks
+            # are created anew on each attempt
+            chunks = split_message_to_push_task_res(message)
+            _ = retry_invoker.invoke(push_task_res_chunks, chunks)
+        else:
+            # Construct TaskRes
+            task_res = message_to_taskres(message)
 
-        # Serialize ProtoBuf to bytes
-        request = PushTaskResRequest(task_res_list=[task_res])
-        _ = retry_invoker.invoke(stub.PushTaskRes, request)
+            # Serialize ProtoBuf to bytes
+            request = PushTaskResRequest(task_res_list=[task_res])
+            _ = retry_invoker.invoke(stub.PushTaskRes, request)
 
         # Cleanup
         metadata = None
 
+    def pull_task_ins(request: PullTaskInsRequest) -> PullTaskInsResponse:
+        nonlocal use_streaming
+        if use_streaming:
+            try:
+                return merge_pull_task_ins_chunks(
+                    stub.PullTaskInsStream(request), max_message_length
+                )
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:  # pylint: disable=E1101
+                    raise
+                # The SuperLink doesn't support streaming, use unary calls
+                use_streaming = False
+        response: PullTaskInsResponse = stub.PullTaskIns(request)
+        return response
+
+    def push_task_res_chunks(chunks: Chunks[PushTaskResChunk]) -> PushTaskResResponse:
+        nonlocal use_streaming
+        if use_streaming:
+            try:
+                response: PushTaskResResponse = stub.PushTaskResStream(iter(chunks))
+                return response
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:  # pylint: disable=E1101
+                    raise
+                # The SuperLink doesn't support streaming, use unary calls
+                use_streaming = False
+        response = stub.PushTaskRes(merge_push_task_res_chunks(chunks))
+        return response
+
     def get_run(run_id: int) -> Run:
         # Call FleetAPI
         get_run_request = GetRunRequest(run_id=run_id)
@@ -16,6 +16,7 @@
 
 
 import sys
+from collections.abc import Iterator
 from logging import DEBUG
 from typing import Any, TypeVar, cast
 
@@ -23,6 +24,7 @@ import grpc
 from google.protobuf.message import Message as GrpcMessage
 
 from flwr.common import log
+from flwr.common.chunk import merge_push_task_res_chunks, split_pull_task_ins_response
 from flwr.common.constant import (
     GRPC_ADAPTER_METADATA_FLOWER_VERSION_KEY,
     GRPC_ADAPTER_METADATA_SHOULD_EXIT_KEY,
@@ -36,8 +38,10 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     DeleteNodeResponse,
     PingRequest,
     PingResponse,
+    PullTaskInsChunk,
     PullTaskInsRequest,
     PullTaskInsResponse,
+    PushTaskResChunk,
     PushTaskResRequest,
     PushTaskResResponse,
 )
@@ -127,6 +131,18 @@ class GrpcAdapter:
         """."""
         return self._send_and_receive(request, PushTaskResResponse, **kwargs)
 
+    def PullTaskInsStream(  # pylint: disable=C0103
+        self, request: PullTaskInsRequest, **kwargs: Any
+    ) -> Iterator[PullTaskInsChunk]:
+        """Pull TaskIns in one message, as the adapter doesn't support streaming."""
+        return iter(split_pull_task_ins_response(self.PullTaskIns(request, **kwargs)))
+
+    def PushTaskResStream(  # pylint: disable=C0103
+        self, request_iterator: Iterator[PushTaskResChunk], **kwargs: Any
+    ) -> PushTaskResResponse:
+        """Push TaskRes in one message, as the adapter doesn't support streaming."""
+        return self.PushTaskRes(merge_push_task_res_chunks(request_iterator), **kwargs)
+
     def GetRun(  # pylint: disable=C0103
         self, request: GetRunRequest, **kwargs: Any
     ) -> GetRunResponse:
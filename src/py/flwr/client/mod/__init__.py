@@ -17,6 +17,7 @@
 
 from .centraldp_mods import adaptiveclipping_mod, fixedclipping_mod
 from .comms_mods import message_size_mod, parameters_size_mod
+from .compression_mods import quantize_mod, topk_sparsify_mod
 from .localdp_mod import LocalDpMod
 from .secure_aggregation import secagg_mod, secaggplus_mod
 from .utils import make_ffn
@@ -28,6 +29,8 @@ __all__ = [
     "make_ffn",
     "message_size_mod",
     "parameters_size_mod",
+    "quantize_mod",
     "secagg_mod",
     "secaggplus_mod",
+    "topk_sparsify_mod",
 ]
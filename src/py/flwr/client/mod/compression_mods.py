@@ -0,0 +1,173 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Modifiers compressing model updates with error feedback."""
+
+
+from collections import OrderedDict
+from logging import INFO, WARNING
+from typing import Callable
+
+from flwr.client.typing import ClientAppCallable
+from flwr.common import (
+    NDArrays,
+    Parameters,
+    ParametersRecord,
+    array_from_numpy,
+    parameters_to_ndarrays,
+)
+from flwr.common import recordset_compat as compat
+from flwr.common.constant import MessageType
+from flwr.common.context import Context
+from flwr.common.logger import log
+from flwr.common.message import Message
+from flwr.common.update_compression import (
+    DEFAULT_QUANTIZE_BITS,
+    DEFAULT_TOPK_FRACTION,
+    KEY_QUANTIZE_BITS,
+    KEY_TOPK_FRACTION,
+    compute_update,
+    is_update,
+    quantize,
+    topk_sparsify,
+)
+
+
+def topk_sparsify_mod(
+    msg: Message, ctxt: Context, call_next: ClientAppCallable
+) -> Message:
+    """Client-side top-k sparsification modifier.
+
+    This mod replaces the parameters returned by the client with the update to
+    the received parameters, keeping only the entries with the largest magnitude
+    in each layer. The fraction of kept entries is read from the `topk_fraction`
+    value of the fit config (default: 0.01).
+
+    The dropped entries are kept in `Context.state` and added to the update of
+    the next round (error feedback).
+
+    It operates on messages of type `MessageType.TRAIN`. The sparse updates are
+    decoded by the `aggregate_fit` of `FedAvg` and the strategies based on it.
+
+    Notes
+    -----
+    Consider the order of mods when using multiple.
+
+    Typically, topk_sparsify_mod should be the first mod, so that it operates
+    on the parameters after all other mods.
+    """
+    return _compress_update(
+        msg,
+        ctxt,
+        call_next,
+        name="topk_sparsify_mod",
+        compress=lambda update, value: topk_sparsify(update, float(value)),
+        config_key=KEY_TOPK_FRACTION,
+        default=DEFAULT_TOPK_FRACTION,
+    )
+
+
+def quantize_mod(msg: Message, ctxt: Context, call_next: ClientAppCallable) -> Message:
+    """Client-side quantization modifier.
+
+    This mod replaces the parameters returned by the client with the update to
+    the received parameters, uniformly quantized to a few bits per entry. The
+    number of bits (1 to 8) is read from the `quantize_bits` value of the fit
+    config (default: 8).
+
+    The quantization error is kept in `Context.state` and added to the update of
+    the next round (error feedback).
+
+    It operates on messages of type `MessageType.TRAIN`. The quantized updates
+    are decoded by the `aggregate_fit` of `FedAvg` and the strategies based on it.
+
+    Notes
+    -----
+    Consider the order of mods when using multiple.
+
+    Typically, quantize_mod should be the first mod, so that it operates on the
+    parameters after all other mods.
+    """
+    return _compress_update(
+        msg,
+        ctxt,
+        call_next,
+        name="quantize_mod",
+        compress=lambda update, value: quantize(update, int(value)),
+        config_key=KEY_QUANTIZE_BITS,
+        default=DEFAULT_QUANTIZE_BITS,
+    )
+
+
+# pylint: disable-next=too-many-arguments
+def _compress_update(
+    msg: Message,
+    ctxt: Context,
+    call_next: ClientAppCallable,
+    *,
+    name: str,
+    compress: Callable[[NDArrays, float], tuple[Parameters, NDArrays]],
+    config_key: str,
+    default: float,
+) -> Message:
+    """Replace the returned parameters by the compressed update."""
+    if msg.metadata.message_type != MessageType.TRAIN:
+        return call_next(msg, ctxt)
+
+    fit_ins = compat.recordset_to_fitins(msg.content, keep_input=True)
+    config_value = fit_ins.config.get(config_key, default)
+    if not isinstance(config_value, (int, float)):
+        raise ValueError(f"{config_key} should be a numeric value.")
+    server_to_client_params = parameters_to_ndarrays(fit_ins.parameters)
+
+    # Call inner app
+    out_msg = call_next(msg, ctxt)
+
+    # Check if the msg has error
+    if out_msg.has_error():
+        return out_msg
+
+    fit_res = compat.recordset_to_fitres(out_msg.content, keep_input=True)
+    if is_update(fit_res.parameters):
+        log(WARNING, "%s: parameters are already compressed, skipping.", name)
+        return out_msg
+
+    update = compute_update(
+        parameters_to_ndarrays(fit_res.parameters), server_to_client_params
+    )
+
+    # Add the residual of the previous round (error feedback)
+    residual_key = f"{name}.residual"
+    if residual_key in ctxt.state.parameters_records:
+        _add_residual(update, ctxt.state.parameters_records[residual_key])
+
+    fit_res.parameters, residual = compress(update, config_value)
+    ctxt.state.parameters_records[residual_key] = ParametersRecord(
+        OrderedDict(
+            (str(idx), array_from_numpy(layer)) for idx, layer in enumerate(residual)
+        )
+    )
+
+    log(INFO, "%s: parameters are compressed (%s=%s).", name, config_key, config_value)
+
+    out_msg.content = compat.fitres_to_recordset(fit_res, keep_input=True)
+    return out_msg
+
+
+def _add_residual(update: NDArrays, record: ParametersRecord) -> None:
+    """Add the residual to the update if the layers match."""
+    residual = [array.numpy() for array in record.values()]
+    if [layer.shape for layer in residual] == [layer.shape for layer in update]:
+        for layer, layer_residual in zip(update, residual):
+            layer += layer_residual
@@ -0,0 +1,121 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the update compression mods."""
+
+
+import numpy as np
+
+from flwr.client.typing import ClientAppCallable
+from flwr.common import (
+    DEFAULT_TTL,
+    Code,
+    Context,
+    FitIns,
+    FitRes,
+    Message,
+    Metadata,
+    NDArrays,
+    RecordSet,
+    Scalar,
+    Status,
+    ndarrays_to_parameters,
+    parameters_to_ndarrays,
+)
+from flwr.common import recordset_compat as compat
+from flwr.common.constant import MessageType, SType
+from flwr.common.update_compression import decode_update
+
+from .compression_mods import quantize_mod, topk_sparsify_mod
+
+
+def _make_fit_message(parameters: NDArrays, config: dict[str, Scalar]) -> Message:
+    fit_ins = FitIns(ndarrays_to_parameters(parameters), config)
+    return Message(
+        metadata=Metadata(
+            run_id=0,
+            message_id="",
+            src_node_id=0,
+            dst_node_id=123,
+            reply_to_message="",
+            group_id="",
+            ttl=DEFAULT_TTL,
+            message_type=MessageType.TRAIN,
+        ),
+        content=compat.fitins_to_recordset(fit_ins, keep_input=True),
+    )
+
+
+def _make_app(update: NDArrays) -> ClientAppCallable:
+    """Return an app adding `update` to the received parameters."""
+
+    def app(message: Message, _: Context) -> Message:
+        fit_ins = compat.recordset_to_fitins(message.content, keep_input=True)
+        received = parameters_to_ndarrays(fit_ins.parameters)
+        fit_res = FitRes(
+            status=Status(code=Code.OK, message="Success"),
+            parameters=ndarrays_to_parameters(
+                [x + y for x, y in zip(received, update)]
+            ),
+            num_examples=1,
+            metrics={},
+        )
+        return message.create_reply(compat.fitres_to_recordset(fit_res, False))
+
+    return app
+
+
+def _get_parameters(message: Message) -> FitRes:
+    return compat.recordset_to_fitres(message.content, keep_input=True)
+
+
+def test_topk_sparsify_mod_error_feedback() -> None:
+    """Test that entries dropped in one round are sent in the next one."""
+    # Prepare
+    received = [np.zeros(4, dtype=np.float32)]
+    update = [np.array([4.0, 3.0, 2.0, 1.0], dtype=np.float32)]
+    context = Context(node_id=123, node_config={}, state=RecordSet(), run_config={})
+    app = _make_app(update)
+
+    # Execute
+    sent = []
+    for _ in range(2):
+        message = _make_fit_message(received, {"topk_fraction": 0.5})
+        fit_res = _get_parameters(topk_sparsify_mod(message, context, app))
+        sent.append(decode_update(fit_res.parameters, received))
+
+    # Assert
+    assert fit_res.parameters.tensor_type == SType.NUMPY_TOPK
+    np.testing.assert_array_equal(sent[0][0], [4.0, 3.0, 0.0, 0.0])
+    # The residual [0, 0, 2, 1] is added to the update of the second round
+    np.testing.assert_array_equal(sent[1][0], [4.0, 0.0, 4.0, 0.0])
+
+
+def test_quantize_mod() -> None:
+    """Test that quantize_mod sends a quantized update."""
+    # Prepare
+    received = [np.ones((10, 10), dtype=np.float32)]
+    update = [np.random.default_rng(0).normal(size=(10, 10)).astype(np.float32)]
+    context = Context(node_id=123, node_config={}, state=RecordSet(), run_config={})
+    message = _make_fit_message(received, {"quantize_bits": 4})
+
+    # Execute
+    fit_res = _get_parameters(quantize_mod(message, context, _make_app(update)))
+    decoded = decode_update(fit_res.parameters, received)
+
+    # Assert
+    assert fit_res.parameters.tensor_type == SType.NUMPY_QUANTIZED
+    step = (update[0].max() - update[0].min()) / 15
+    assert np.all(np.abs(decoded[0] - received[0] - update[0]) <= step / 2 + 1e-6)
+    assert "quantize_mod.residual" in context.state.parameters_records
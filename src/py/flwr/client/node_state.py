@@ -28,6 +28,29 @@ from flwr.common.config import (
 from flwr.common.typing import Fab, Run, UserConfig
 
 
+def load_run_config(
+    run: Optional[Run] = None,
+    flwr_path: Optional[Path] = None,
+    app_dir: Optional[str] = None,
+    fab: Optional[Fab] = None,
+) -> UserConfig:
+    """Load the run config from the app directory, the FAB or the installed FAB."""
+    if app_dir:
+        # Load from app directory
+        app_path = Path(app_dir)
+        if app_path.is_dir():
+            override_config = run.override_config if run else {}
+            return get_fused_config_from_dir(app_path, override_config)
+        raise ValueError("The specified `app_dir` must be a directory.")
+    if run:
+        if fab:
+            # Load pyproject.toml from FAB file and fuse
+            return get_fused_config_from_fab(fab.content, run)
+        # Load pyproject.toml from installed FAB and fuse
+        return get_fused_config(run, flwr_path)
+    return {}
+
+
 @dataclass()
 class RunInfo:
     """Contains the Context and initial run_config of a Run."""
@@ -56,37 +79,26 @@ class NodeState:
         flwr_path: Optional[Path] = None,
         app_dir: Optional[str] = None,
         fab: Optional[Fab] = None,
+        run_config: Optional[UserConfig] = None,
     ) -> None:
-        """Register new run context for this node."""
+        """Register new run context for this node.
+
+        If `run_config` is given, it is used instead of loading the run config, and
+        the Context holds it without copying it.
+        """
         if run_id not in self.run_infos:
-            initial_run_config = {}
-            if app_dir:
-                # Load from app directory
-                app_path = Path(app_dir)
-                if app_path.is_dir():
-                    override_config = run.override_config if run else {}
-                    initial_run_config = get_fused_config_from_dir(
-                        app_path, override_config
-                    )
-                else:
-                    raise ValueError("The specified `app_dir` must be a directory.")
+            if run_config is not None:
+                initial_run_config = run_config
             else:
-                if run:
-                    if fab:
-                        # Load pyproject.toml from FAB file and fuse
-                        initial_run_config = get_fused_config_from_fab(fab.content, run)
-                    else:
-                        # Load pyproject.toml from installed FAB and fuse
-                        initial_run_config = get_fused_config(run, flwr_path)
-                else:
-                    initial_run_config = {}
+                initial_run_config = load_run_config(run, flwr_path, app_dir, fab)
+                run_config = initial_run_config.copy()
             self.run_infos[run_id] = RunInfo(
                 initial_run_config=initial_run_config,
                 context=Context(
                     node_id=self.node_id,
                     node_config=self.node_config,
                     state=RecordSet(),
-                    run_config=initial_run_config.copy(),
+                    run_config=run_config,
                 ),
             )
 
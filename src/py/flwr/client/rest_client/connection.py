@@ -32,6 +32,7 @@ from flwr.client.message_handler.message_handler import validate_out_message
 from flwr.client.message_handler.task_handler import get_task_ins, validate_task_ins
 from flwr.common import GRPC_MAX_MESSAGE_LENGTH
 from flwr.common.constant import (
+    LONG_POLL_MAX_TIMEOUT,
     MISSING_EXTRA_REST,
     PING_BASE_MULTIPLIER,
     PING_CALL_TIMEOUT,
@@ -291,7 +292,7 @@ def http_request_response(  # pylint: disable=,R0913, R0914, R0915
             return None
 
         # Request instructions (task) from server
-        req = PullTaskInsRequest(node=node)
+        req = PullTaskInsRequest(node=node, timeout=LONG_POLL_MAX_TIMEOUT)
 
         # Send the request
         res = _request(req, PullTaskInsResponse, PATH_PULL_TASK_INS)
@@ -0,0 +1,298 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Split Fleet API messages into chunks of bounded size and merge them again.
+
+The sender moves the data of all Arrays out of the message, which is sent as the header
+of the first chunk, and streams the data straight from the Arrays it was taken from.
+
+Chunking only avoids building a single large gRPC message. The receiver still merges
+the chunks into the whole message, whose data is limited to `max_length` bytes (by
+default, the gRPC max message length). Messages are therefore still subject to the
+2GB size limit of Protobuf.
+"""
+
+
+from collections.abc import Iterable, Iterator, Mapping
+from copy import copy
+from typing import Generic, Optional, TypeVar, Union
+
+from flwr.common.constant import GRPC_STREAM_CHUNK_SIZE
+from flwr.common.grpc import GRPC_MAX_MESSAGE_LENGTH
+from flwr.common.message import Message
+from flwr.common.record import Array, ParametersRecord, RecordSet
+from flwr.common.record.codec import encode_array, get_array_codecs
+from flwr.common.serde import message_to_taskres
+
+# pylint: disable=E0611
+from flwr.proto.fleet_pb2 import (
+    PullTaskInsChunk,
+    PullTaskInsResponse,
+    PushTaskResChunk,
+    PushTaskResRequest,
+)
+from flwr.proto.recordset_pb2 import Array as ProtoArray
+from flwr.proto.recordset_pb2 import ParametersRecord as ProtoParametersRecord
+from flwr.proto.task_pb2 import Task
+
+# pylint: enable=E0611
+
+Chunk = TypeVar("Chunk", PullTaskInsChunk, PushTaskResChunk)
+
+# Where the data of an Array is streamed from
+DataSource = Union[bytes, ProtoArray, Array]
+
+
+class Chunks(Generic[Chunk]):
+    """The chunks of a Fleet API message.
+
+    Chunks are created one at a time while iterating, which can be repeated (e.g., to
+    retry a failed call) as the data is only read from its sources.
+    """
+
+    def __init__(
+        self,
+        first: Chunk,
+        sources: list[DataSource],
+        chunk_cls: type[Chunk],
+        chunk_size: int,
+    ) -> None:
+        self.first: Chunk = first
+        self.sources = sources
+        self.chunk_cls: type[Chunk] = chunk_cls
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[Chunk]:
+        """Yield the header chunk, then pack all data into chunks of `chunk_size`."""
+        first = self.chunk_cls()
+        first.CopyFrom(self.first)
+        chunk = first
+        buffer = bytearray()
+        for source in self.sources:
+            view = memoryview(source if isinstance(source, bytes) else source.data)
+            while len(view) > 0:
+                size = min(self.chunk_size - len(buffer), len(view))
+                buffer += view[:size]
+                view = view[size:]
+                if len(buffer) == self.chunk_size:
+                    chunk.data = bytes(buffer)
+                    yield chunk
+                    chunk = self.chunk_cls()
+                    buffer.clear()
+        if len(buffer) > 0 or chunk is first:
+            chunk.data = bytes(buffer)
+            yield chunk
+
+
+def split_pull_task_ins_response(
+    response: PullTaskInsResponse,
+    parameters: Optional[Mapping[str, ProtoParametersRecord]] = None,
+    chunk_size: int = GRPC_STREAM_CHUNK_SIZE,
+) -> Chunks[PullTaskInsChunk]:
+    """Split a PullTaskInsResponse into chunks.
+
+    References to shared ParametersRecords (see `Task.parameters_refs`) are resolved
+    from `parameters`, whose data is streamed without being copied into the response.
+    The data of all other Arrays is moved out of `response`, which must not be used
+    afterwards.
+    """
+    tasks = [task_ins.task for task_ins in response.task_ins_list]
+    sources = _pop_data(tasks, parameters or {})
+    first = PullTaskInsChunk(
+        header=response, data_lengths=[_get_length(source) for source in sources]
+    )
+    return Chunks(first, sources, PullTaskInsChunk, chunk_size)
+
+
+def merge_pull_task_ins_chunks(
+    chunks: Iterable[PullTaskInsChunk], max_length: int = GRPC_MAX_MESSAGE_LENGTH
+) -> PullTaskInsResponse:
+    """Merge chunks created by `split_pull_task_ins_response`.
+
+    Raises a ValueError if the chunks announce more than `max_length` bytes of data.
+    """
+    chunk_iterator = iter(chunks)
+    first = next(chunk_iterator, PullTaskInsChunk())
+    response = first.header
+    tasks = [task_ins.task for task_ins in response.task_ins_list]
+    _fill_data(tasks, first, chunk_iterator, max_length)
+    return response
+
+
+def split_push_task_res_request(
+    request: PushTaskResRequest, chunk_size: int = GRPC_STREAM_CHUNK_SIZE
+) -> Chunks[PushTaskResChunk]:
+    """Split a PushTaskResRequest into chunks.
+
+    The data of all Arrays is moved out of `request`, which must not be used
+    afterwards.
+    """
+    sources = _pop_data([task_res.task for task_res in request.task_res_list], {})
+    first = PushTaskResChunk(
+        header=request, data_lengths=[_get_length(source) for source in sources]
+    )
+    return Chunks(first, sources, PushTaskResChunk, chunk_size)
+
+
+def split_message_to_push_task_res(
+    message: Message, chunk_size: int = GRPC_STREAM_CHUNK_SIZE
+) -> Chunks[PushTaskResChunk]:
+    """Split the PushTaskResRequest holding the TaskRes of a Message into chunks.
+
+    The request is built without the data of any Array, which is streamed from the
+    Arrays of `message` (encoded with the requested Array codecs, if any).
+    """
+    sources: list[DataSource] = []
+    header_message = message
+    if message.has_content():
+        content = message.content
+        codecs = get_array_codecs(content)
+        header_content = RecordSet(
+            metrics_records=dict(content.metrics_records),
+            configs_records=dict(content.configs_records),
+        )
+        # Arrays are streamed in the order in which `_get_arrays` returns them
+        for name in sorted(content.parameters_records):
+            header_record = ParametersRecord()
+            for key, array in content.parameters_records[name].items():
+                encoded = encode_array(array, codecs)
+                header_record[key] = Array(
+                    dtype=encoded.dtype,
+                    shape=encoded.shape,
+                    stype=encoded.stype,
+                    data=b"",
+                )
+                sources.append(encoded)
+            header_content.parameters_records[name] = header_record
+        # Copy the Message to replace its content, without changing its metadata
+        header_message = copy(message)
+        header_message.content = header_content
+    request = PushTaskResRequest(task_res_list=[message_to_taskres(header_message)])
+    first = PushTaskResChunk(
+        header=request, data_lengths=[_get_length(source) for source in sources]
+    )
+    return Chunks(first, sources, PushTaskResChunk, chunk_size)
+
+
+def merge_push_task_res_chunks(
+    chunks: Iterable[PushTaskResChunk], max_length: int = GRPC_MAX_MESSAGE_LENGTH
+) -> PushTaskResRequest:
+    """Merge chunks created by `split_push_task_res_request`.
+
+    Raises a ValueError if the chunks announce more than `max_length` bytes of data.
+    """
+    chunk_iterator = iter(chunks)
+    first = next(chunk_iterator, PushTaskResChunk())
+    request = first.header
+    tasks = [task_res.task for task_res in request.task_res_list]
+    _fill_data(tasks, first, chunk_iterator, max_length)
+    return request
+
+
+def _get_arrays(tasks: list[Task]) -> list[ProtoArray]:
+    """Return all Arrays of the tasks in a deterministic order."""
+    arrays: list[ProtoArray] = []
+    for task in tasks:
+        records = task.recordset.parameters
+        # Map order isn't preserved across serialization, sort by key
+        for key in sorted(records):
+            arrays.extend(records[key].data_values)
+    return arrays
+
+
+def _pop_data(
+    tasks: list[Task], parameters: Mapping[str, ProtoParametersRecord]
+) -> list[DataSource]:
+    """Move the data out of all Arrays of the tasks, resolving references to
+    ParametersRecords without their data."""
+    sources: list[DataSource] = []
+    for task in tasks:
+        resolved: dict[str, ProtoParametersRecord] = {}
+        for name, ref in task.parameters_refs.items():
+            record = parameters[ref]
+            header_record = task.recordset.parameters[name]
+            header_record.Clear()
+            header_record.data_keys.extend(record.data_keys)
+            for array in record.data_values:
+                header_record.data_values.add(
+                    dtype=array.dtype, shape=array.shape, stype=array.stype
+                )
+            resolved[name] = record
+        task.ClearField("parameters_refs")
+
+        records = task.recordset.parameters
+        for key in sorted(records):
+            if key in resolved:
+                sources.extend(resolved[key].data_values)
+                continue
+            for array in records[key].data_values:
+                sources.append(array.data)
+                array.ClearField("data")
+    return sources
+
+
+def _get_length(source: DataSource) -> int:
+    return len(source if isinstance(source, bytes) else source.data)
+
+
+def _fill_data(
+    tasks: list[Task],
+    first: Union[PullTaskInsChunk, PushTaskResChunk],
+    chunks: Iterator[Union[PullTaskInsChunk, PushTaskResChunk]],
+    max_length: int,
+) -> None:
+    """Fill the data of all Arrays of the tasks from the received chunks."""
+    if not first.HasField("header"):
+        raise ValueError("The first chunk must contain the header")
+    arrays = _get_arrays(tasks)
+    if len(arrays) != len(first.data_lengths):
+        raise ValueError("The number of Arrays and data lengths don't match")
+    total_length = sum(first.data_lengths)
+    if total_length > max_length:
+        raise ValueError(
+            f"The announced data ({total_length} bytes) exceeds the maximum "
+            f"length ({max_length} bytes)"
+        )
+
+    # Fill one Array after the other, in the order their data was sent. The parts
+    # of an Array are views of the received chunks, which are only joined (copied)
+    # once all of them have been received.
+    pending = zip(arrays, first.data_lengths)
+    array, missing = ProtoArray(), 0
+    parts: list[memoryview] = []
+    for data in _iter_data(first, chunks):
+        view = memoryview(data)
+        while len(view) > 0:
+            while missing == 0:
+                array, missing = next(pending, (ProtoArray(), -1))
+                if missing < 0:
+                    raise ValueError("Received more data than announced")
+            size = min(missing, len(view))
+            parts.append(view[:size])
+            view = view[size:]
+            missing -= size
+            if missing == 0:
+                array.data = b"".join(parts)
+                parts.clear()
+    if missing > 0 or any(length > 0 for _, length in pending):
+        raise ValueError("Received less data than announced")
+
+
+def _iter_data(
+    first: Union[PullTaskInsChunk, PushTaskResChunk],
+    chunks: Iterator[Union[PullTaskInsChunk, PushTaskResChunk]],
+) -> Iterator[bytes]:
+    yield first.data
+    for chunk in chunks:
+        yield chunk.data
@@ -0,0 +1,190 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for splitting Fleet API messages into chunks."""
+
+
+import pytest
+
+# pylint: disable=E0611
+from flwr.proto.fleet_pb2 import (
+    PullTaskInsResponse,
+    PushTaskResChunk,
+    PushTaskResRequest,
+)
+from flwr.proto.recordset_pb2 import Array, ParametersRecord, RecordSet
+from flwr.proto.task_pb2 import Task, TaskIns, TaskRes
+
+# pylint: enable=E0611
+from .chunk import (
+    merge_pull_task_ins_chunks,
+    merge_push_task_res_chunks,
+    split_message_to_push_task_res,
+    split_pull_task_ins_response,
+    split_push_task_res_request,
+)
+from .message import Message
+from .serde import message_to_taskres, recordset_to_proto
+from .serde_test import RecordMaker
+
+
+def _make_task(seed: int) -> Task:
+    maker = RecordMaker(state=seed)
+    task = Task(recordset=recordset_to_proto(maker.recordset(3, 1, 1)))
+    # Include an empty Array
+    task.recordset.parameters["empty"].CopyFrom(
+        ParametersRecord(data_keys=["a"], data_values=[Array(dtype="float")])
+    )
+    return task
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1 << 20])
+def test_split_merge_pull_task_ins_response(chunk_size: int) -> None:
+    """Test that merging the chunks of a PullTaskInsResponse restores it."""
+    # Prepare
+    response = PullTaskInsResponse(
+        task_ins_list=[TaskIns(task_id=str(i), task=_make_task(i)) for i in range(2)]
+    )
+    expected = PullTaskInsResponse()
+    expected.CopyFrom(response)
+
+    # Execute
+    chunks = list(split_pull_task_ins_response(response, chunk_size=chunk_size))
+    merged = merge_pull_task_ins_chunks(chunks)
+
+    # Assert
+    assert merged == expected
+    assert chunks[0].HasField("header")
+    assert all(not chunk.HasField("header") for chunk in chunks[1:])
+    assert all(len(chunk.data) <= chunk_size for chunk in chunks)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1 << 20])
+def test_split_merge_push_task_res_request(chunk_size: int) -> None:
+    """Test that merging the chunks of a PushTaskResRequest restores it."""
+    # Prepare
+    request = PushTaskResRequest(
+        task_res_list=[TaskRes(task_id="", task=_make_task(0))]
+    )
+    expected = PushTaskResRequest()
+    expected.CopyFrom(request)
+
+    # Execute
+    chunks = list(split_push_task_res_request(request, chunk_size=chunk_size))
+    merged = merge_push_task_res_chunks(chunks)
+
+    # Assert
+    assert merged == expected
+
+
+def test_split_pull_task_ins_response_with_parameters_refs() -> None:
+    """Test that references to shared ParametersRecords are resolved."""
+    # Prepare
+    shared = ParametersRecord(
+        data_keys=["a", "b"],
+        data_values=[
+            Array(dtype="float", shape=[3], stype="numpy", data=b"shared data"),
+            Array(dtype="float", shape=[0], stype="numpy"),
+        ],
+    )
+    response = PullTaskInsResponse(
+        task_ins_list=[TaskIns(task_id="1", task=_make_task(0))]
+    )
+    response.task_ins_list[0].task.parameters_refs["shared"] = "ref"
+    expected = PullTaskInsResponse()
+    expected.CopyFrom(response)
+    expected.task_ins_list[0].task.ClearField("parameters_refs")
+    expected.task_ins_list[0].task.recordset.parameters["shared"].CopyFrom(shared)
+
+    # Execute
+    chunks = split_pull_task_ins_response(response, {"ref": shared}, chunk_size=4)
+    merged = merge_pull_task_ins_chunks(chunks)
+
+    # Assert
+    assert merged == expected
+    assert shared.data_values[0].data == b"shared data"
+
+
+def test_split_message_to_push_task_res() -> None:
+    """Test that a Message is split into the chunks of its TaskRes, repeatedly."""
+    # Prepare
+    message = Message(
+        metadata=RecordMaker(state=0).metadata(),
+        content=RecordMaker(state=1).recordset(3, 1, 1),
+    )
+    expected = PushTaskResRequest(task_res_list=[message_to_taskres(message)])
+
+    # Execute
+    chunks = split_message_to_push_task_res(message, chunk_size=100)
+    merged_1 = merge_push_task_res_chunks(chunks)
+    merged_2 = merge_push_task_res_chunks(chunks)
+
+    # Assert
+    assert merged_1 == expected
+    assert merged_2 == expected
+
+
+def test_split_without_arrays() -> None:
+    """Test that a message without Arrays results in a single chunk."""
+    # Prepare
+    response = PullTaskInsResponse(task_ins_list=[TaskIns(task_id="1")])
+
+    # Execute
+    chunks = list(split_pull_task_ins_response(response))
+
+    # Assert
+    assert len(chunks) == 1
+    assert merge_pull_task_ins_chunks(chunks) == response
+
+
+def test_merge_missing_header() -> None:
+    """Test that merging fails if the first chunk has no header."""
+    with pytest.raises(ValueError):
+        merge_push_task_res_chunks([PushTaskResChunk(data=b"123")])
+
+
+def test_merge_missing_data() -> None:
+    """Test that merging fails if chunks are missing."""
+    # Prepare
+    request = PushTaskResRequest(task_res_list=[TaskRes(task=_make_task(0))])
+    chunks = list(split_push_task_res_request(request, chunk_size=10))
+
+    # Execute & Assert
+    with pytest.raises(ValueError):
+        merge_push_task_res_chunks(chunks[:-1])
+
+
+def test_merge_announced_data_too_large() -> None:
+    """Test that merging fails before receiving data beyond the maximum length."""
+    # Prepare
+    request = PushTaskResRequest(
+        task_res_list=[
+            TaskRes(
+                task=Task(
+                    recordset=RecordSet(
+                        parameters={
+                            "p": ParametersRecord(
+                                data_keys=["a"], data_values=[Array(dtype="float")]
+                            )
+                        }
+                    )
+                )
+            )
+        ]
+    )
+    first = PushTaskResChunk(header=request, data_lengths=[1 << 60], data=b"1")
+
+    # Execute & Assert
+    with pytest.raises(ValueError, match="exceeds the maximum length"):
+        merge_push_task_res_chunks([first], max_length=1 << 20)
@@ -57,6 +57,15 @@ PING_BASE_MULTIPLIER = 0.8
 PING_RANDOM_RANGE = (-0.1, 0.1)
 PING_MAX_INTERVAL = 1e300
 
+# Constants for long-polling
+LONG_POLL_MAX_TIMEOUT = 30  # Max. time (in seconds) a pull request may be held
+LONG_POLL_RECHECK_INTERVAL = 3  # Max. time (in seconds) between two state lookups
+LONG_POLL_MAX_PARKED_REQUESTS = 500  # Max. number of Fleet API requests held at once
+
+# Max. size (in bytes) of the Array data in one chunk of a streamed Fleet API
+# message, small enough to stay below the default gRPC max. message length
+GRPC_STREAM_CHUNK_SIZE = 2 * 1024 * 1024
+
 # IDs
 RUN_ID_NUM_BYTES = 8
 NODE_ID_NUM_BYTES = 8
@@ -103,6 +112,12 @@ class SType:
     """Serialisation type."""
 
     NUMPY = "numpy.ndarray"
+    # Raw little-endian buffer, dtype and shape are those of the `Array`
+    NUMPY_RAW = "numpy.ndarray.raw"
+    # Model updates relative to the parameters sent to the client, either with
+    # only the top-k entries of each layer or quantized to a few bits per entry
+    NUMPY_TOPK = "numpy.ndarray.topk"
+    NUMPY_QUANTIZED = "numpy.ndarray.quantized"
 
     def __new__(cls) -> SType:
         """Prevent instantiation."""
@@ -116,6 +131,7 @@ class ErrorCode:
     LOAD_CLIENT_APP_EXCEPTION = 1
     CLIENT_APP_RAISED_EXCEPTION = 2
     NODE_UNAVAILABLE = 3
+    MESSAGE_UNAVAILABLE = 4
 
     def __new__(cls) -> ErrorCode:
         """Prevent instantiation."""
@@ -0,0 +1,118 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Send model versions as deltas to the version cached by a node.
+
+The server announces the version of the model it sends via a `ConfigsRecord`
+named `DELTA_SYNC_CONFIGS_KEY` in the content of a message, with the entries:
+
+- `"record"`: the name of the ParametersRecord holding the model
+- `"version"`: the version of the model
+- `"base"`: if present, the ParametersRecord only holds the delta to this version
+
+Nodes cache the last model version they received in `Context.state` and announce
+it in their replies. Deltas are the bitwise XOR of both versions, which is exact
+and compresses well with the lossless Array codecs where parameters didn't
+change.
+"""
+
+
+from collections import OrderedDict
+from typing import Optional, cast
+
+import numpy as np
+
+from .constant import SType
+from .record import ConfigsRecord, ParametersRecord, RecordSet
+from .record.conversion_utils import array_from_numpy
+from .recordset_compat import EMPTY_TENSOR_KEY
+from .typing import NDArray
+
+DELTA_SYNC_CONFIGS_KEY = "delta-sync"
+
+
+def _to_bytes(ndarray: NDArray) -> NDArray:
+    """Return the data of a NumPy array as a flat uint8 NumPy array."""
+    return np.ascontiguousarray(ndarray).reshape(-1).view(np.uint8)
+
+
+def encode_delta(
+    record: ParametersRecord, base: ParametersRecord
+) -> Optional[ParametersRecord]:
+    """Return the delta from `base` to `record`, or None if they don't match."""
+    if list(record.keys()) != list(base.keys()) or EMPTY_TENSOR_KEY in record:
+        return None
+    delta = ParametersRecord()
+    for key, array in record.items():
+        ndarray, base_ndarray = array.numpy(), base[key].numpy()
+        if ndarray.shape != base_ndarray.shape or ndarray.dtype != base_ndarray.dtype:
+            return None
+        delta[key] = array_from_numpy(
+            np.bitwise_xor(_to_bytes(ndarray), _to_bytes(base_ndarray)),
+            SType.NUMPY_RAW,
+        )
+    return delta
+
+
+def decode_delta(delta: ParametersRecord, base: ParametersRecord) -> ParametersRecord:
+    """Return the model version the delta was computed for."""
+    if list(delta.keys()) != list(base.keys()):
+        raise ValueError("The delta doesn't match the cached model version")
+    record = ParametersRecord()
+    for key, array in delta.items():
+        base_ndarray = base[key].numpy()
+        data = np.bitwise_xor(array.numpy(), _to_bytes(base_ndarray))
+        record[key] = array_from_numpy(
+            data.view(base_ndarray.dtype).reshape(base_ndarray.shape),
+            SType.NUMPY_RAW,
+        )
+    return record
+
+
+def receive_model_version(content: RecordSet, state: RecordSet) -> None:
+    """Restore the model of a message from a delta and cache it in `state`."""
+    sync = content.configs_records.get(DELTA_SYNC_CONFIGS_KEY)
+    if sync is None:
+        return
+    name = cast(str, sync["record"])
+    if "base" in sync:
+        base = cast(int, sync["base"])
+        cached = state.configs_records.get(DELTA_SYNC_CONFIGS_KEY)
+        if cached is None or cached.get("version") != base:
+            raise ValueError(
+                f"Received a delta to model version {base}, which isn't "
+                "cached on this node"
+            )
+        content.parameters_records[name] = decode_delta(
+            content.parameters_records[name],
+            state.parameters_records[DELTA_SYNC_CONFIGS_KEY],
+        )
+    # Cache a shallow copy, the ClientApp may remove Arrays from the record
+    state.parameters_records[DELTA_SYNC_CONFIGS_KEY] = ParametersRecord(
+        OrderedDict(content.parameters_records[name].items())
+    )
+    state.configs_records[DELTA_SYNC_CONFIGS_KEY] = ConfigsRecord(
+        {"version": sync["version"]}
+    )
+
+
+def announce_model_version(
+    request: RecordSet, reply: RecordSet, state: RecordSet
+) -> None:
+    """Announce the cached model version in the reply to a message using delta sync."""
+    if DELTA_SYNC_CONFIGS_KEY not in request.configs_records:
+        return
+    cached = state.configs_records.get(DELTA_SYNC_CONFIGS_KEY)
+    if cached is not None:
+        reply.configs_records[DELTA_SYNC_CONFIGS_KEY] = ConfigsRecord(dict(cached))
@@ -0,0 +1,137 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the delta-encoded model downloads."""
+
+
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from .constant import SType
+from .delta_sync import (
+    DELTA_SYNC_CONFIGS_KEY,
+    announce_model_version,
+    decode_delta,
+    encode_delta,
+    receive_model_version,
+)
+from .parameter import ndarray_to_bytes
+from .record import Array, ConfigsRecord, ParametersRecord, RecordSet
+from .record.conversion_utils import array_from_numpy
+
+
+def _make_record(seed: int) -> ParametersRecord:
+    rng = np.random.default_rng(seed)
+    return ParametersRecord(
+        OrderedDict(
+            [
+                ("0", array_from_numpy(rng.normal(size=(4, 3)).astype(np.float32))),
+                ("1", array_from_numpy(rng.integers(0, 9, size=5))),
+            ]
+        )
+    )
+
+
+def _assert_records_equal(actual: ParametersRecord, expected: ParametersRecord) -> None:
+    assert list(actual.keys()) == list(expected.keys())
+    for key, array in expected.items():
+        assert actual[key].numpy().dtype == array.numpy().dtype
+        np.testing.assert_array_equal(actual[key].numpy(), array.numpy())
+
+
+def test_encode_decode_delta() -> None:
+    """Test that decoding a delta restores the exact model."""
+    # Prepare
+    base, record = _make_record(0), _make_record(1)
+    # Arrays serialized by older versions are stored in the .npy format
+    ndarray = np.arange(6.0).reshape(2, 3)
+    record["2"] = Array(
+        dtype=str(ndarray.dtype),
+        shape=list(ndarray.shape),
+        stype=SType.NUMPY,
+        data=ndarray_to_bytes(ndarray),
+    )
+    base["2"] = array_from_numpy(np.zeros((2, 3)))
+
+    # Execute
+    delta = encode_delta(record, base)
+    unchanged = encode_delta(record, record)
+
+    # Assert
+    assert delta is not None and unchanged is not None
+    _assert_records_equal(decode_delta(delta, base), record)
+    np.testing.assert_array_equal(unchanged["0"].numpy(), np.zeros(48, np.uint8))
+
+
+def test_encode_delta_mismatch() -> None:
+    """Test that no delta is computed between records that don't match."""
+    # Prepare
+    base, record = _make_record(0), _make_record(1)
+    record["0"] = array_from_numpy(np.zeros((3, 4), dtype=np.float32))
+
+    # Execute & Assert
+    assert encode_delta(record, base) is None
+    assert encode_delta(_make_record(1), ParametersRecord()) is None
+
+
+def test_receive_model_version() -> None:
+    """Test that nodes restore the model and announce the cached version."""
+    # Prepare
+    state = RecordSet()
+    model_1, model_2 = _make_record(0), _make_record(1)
+    content_1 = RecordSet(
+        parameters_records={"model": model_1},
+        configs_records={
+            DELTA_SYNC_CONFIGS_KEY: ConfigsRecord({"record": "model", "version": 1})
+        },
+    )
+    delta = encode_delta(model_2, model_1)
+    assert delta is not None
+    content_2 = RecordSet(
+        parameters_records={"model": delta},
+        configs_records={
+            DELTA_SYNC_CONFIGS_KEY: ConfigsRecord(
+                {"record": "model", "version": 2, "base": 1}
+            )
+        },
+    )
+    reply = RecordSet()
+
+    # Execute
+    receive_model_version(content_1, state)
+    receive_model_version(content_2, state)
+    announce_model_version(content_2, reply, state)
+
+    # Assert
+    _assert_records_equal(content_2.parameters_records["model"], model_2)
+    assert reply.configs_records[DELTA_SYNC_CONFIGS_KEY]["version"] == 2
+    with pytest.raises(ValueError):
+        receive_model_version(content_2, state)
+
+
+def test_announce_model_version_without_delta_sync() -> None:
+    """Test that replies only announce a version if the request uses delta sync."""
+    # Prepare
+    state = RecordSet(
+        configs_records={DELTA_SYNC_CONFIGS_KEY: ConfigsRecord({"version": 1})}
+    )
+    reply = RecordSet()
+
+    # Execute
+    announce_model_version(RecordSet(), reply, state)
+
+    # Assert
+    assert DELTA_SYNC_CONFIGS_KEY not in reply.configs_records
@@ -13,13 +13,15 @@
 # limitations under the License.
 # ==============================================================================
 """Parameter conversion."""
+# mypy: disallow_untyped_calls=False
 
 
 from io import BytesIO
-from typing import cast
+from typing import Any, cast
 
 import numpy as np
 
+from .constant import SType
 from .typing import NDArray, NDArrays, Parameters
 
 
@@ -31,6 +33,13 @@ def ndarrays_to_parameters(ndarrays: NDArrays) -> Parameters:
 
 def parameters_to_ndarrays(parameters: Parameters) -> NDArrays:
     """Convert parameters object to NumPy ndarrays."""
+    if parameters.tensor_type in (SType.NUMPY_TOPK, SType.NUMPY_QUANTIZED):
+        raise ValueError(
+            f"Parameters of type `{parameters.tensor_type}` hold a compressed model "
+            "update relative to the parameters sent to the client, which can only be "
+            "aggregated by strategies decoding it (e.g., FedAvg). Use "
+            "`flwr.common.update_compression.decode_update` to convert it."
+        )
     return [bytes_to_ndarray(tensor) for tensor in parameters.tensors]
 
 
@@ -52,3 +61,16 @@ def bytes_to_ndarray(tensor: bytes) -> NDArray:
     # Source: https://numpy.org/doc/stable/reference/generated/numpy.load.html
     ndarray_deserialized = np.load(bytes_io, allow_pickle=False)
     return cast(NDArray, ndarray_deserialized)
+
+
+def read_ndarray_header(bytes_io: BytesIO) -> tuple[tuple[int, ...], np.dtype[Any]]:
+    """Read the shape and dtype of a serialized NumPy ndarray.
+
+    The position of `bytes_io` is left at the start of the data of the ndarray.
+    """
+    version = np.lib.format.read_magic(bytes_io)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(bytes_io)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(bytes_io)
+    return tuple(shape), dtype
@@ -0,0 +1,293 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Codecs compressing the data of Arrays.
+
+Codecs are applied to Arrays holding a raw buffer (`SType.NUMPY_RAW`) when they
+are serialized and recorded in `Array.stype`, e.g., `numpy.ndarray.raw+fp16+zlib`.
+Lossy codecs cast floating point arrays to a smaller type, lossless codecs
+compress the resulting bytes.
+
+Which codecs are used is negotiated via a `ConfigsRecord` named
+`ARRAY_CODECS_CONFIGS_KEY` in the content of a message, with the entries:
+
+- `"encode"`: codecs applied to the ParametersRecords of this message
+- `"request"`: codecs the receiver should apply to its reply
+- `"supported"`: codecs the sender of the message is able to decode
+
+Nodes which don't know this `ConfigsRecord` ignore it and reply uncompressed.
+"""
+
+
+import importlib
+import importlib.util
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, cast
+
+import numpy as np
+
+from ..constant import SType
+from .configsrecord import ConfigsRecord
+from .conversion_utils import array_from_numpy
+from .parametersrecord import Array
+from .recordset import RecordSet
+
+ARRAY_CODECS_CONFIGS_KEY = "array-codecs"
+
+
+@dataclass
+class _Codec:
+    """Encode and decode the raw data of an Array with the given dtype.
+
+    `decode` is passed the maximum length of the decoded data, which lossless codecs
+    must not exceed. Lossy codecs are given the length of their encoded data as a
+    function of the number of elements of the Array instead.
+    """
+
+    encode: Callable[[bytes, np.dtype[Any]], bytes]
+    decode: Callable[[bytes, np.dtype[Any], int], bytes]
+    encoded_length: Optional[Callable[[int], int]] = None
+    module: Optional[str] = None
+
+    @property
+    def lossy(self) -> bool:
+        """Return True if the codec doesn't restore the exact data."""
+        return self.encoded_length is not None
+
+
+def _cast_codec(target: str) -> _Codec:
+    """Cast floating point arrays to `target`."""
+    itemsize = np.dtype(target).itemsize
+    return _Codec(
+        encode=lambda data, dtype: np.frombuffer(data, dtype).astype(target).tobytes(),
+        decode=lambda data, dtype, _: (
+            np.frombuffer(data, target).astype(dtype).tobytes()
+        ),
+        encoded_length=lambda size: size * itemsize,
+    )
+
+
+def _bf16_encode(data: bytes, dtype: np.dtype[Any]) -> bytes:
+    """Keep the upper 16 bits of float32, rounding to nearest even."""
+    bits = np.frombuffer(data, dtype).astype("<f4").view("<u4")
+    rounding = np.uint32(0x7FFF) + ((bits >> np.uint32(16)) & np.uint32(1))
+    return cast(bytes, ((bits + rounding) >> np.uint32(16)).astype("<u2").tobytes())
+
+
+def _bf16_decode(data: bytes, dtype: np.dtype[Any], _: int) -> bytes:
+    bits = np.frombuffer(data, "<u2").astype("<u4") << np.uint32(16)
+    return bits.view("<f4").astype(dtype).tobytes()
+
+
+def _int8_encode(data: bytes, dtype: np.dtype[Any]) -> bytes:
+    """Quantize symmetrically to int8, prefixed by the float32 scale."""
+    values = np.frombuffer(data, dtype)
+    max_abs = float(np.max(np.abs(values))) if values.size > 0 else 0.0
+    scale = np.float32(max_abs / 127 if max_abs > 0 else 1.0)
+    quantized = np.clip(np.rint(values / scale), -127, 127).astype("i1")
+    return cast(bytes, scale.astype("<f4").tobytes() + quantized.tobytes())
+
+
+def _int8_decode(data: bytes, dtype: np.dtype[Any], _: int) -> bytes:
+    scale = np.frombuffer(data, "<f4", count=1)[0]
+    quantized = np.frombuffer(data, "i1", offset=4)
+    return cast(bytes, (quantized.astype("<f4") * scale).astype(dtype).tobytes())
+
+
+def _zstd_encode(data: bytes, _: np.dtype[Any]) -> bytes:
+    zstandard = importlib.import_module("zstandard")
+    return cast(bytes, zstandard.ZstdCompressor().compress(data))
+
+
+def _zstd_decode(data: bytes, _: np.dtype[Any], max_length: int) -> bytes:
+    zstandard = importlib.import_module("zstandard")
+    with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+        decoded = cast(bytes, reader.read(max_length + 1))
+    if len(decoded) > max_length:
+        raise ValueError(f"zstd data decompresses to more than {max_length} bytes")
+    return decoded
+
+
+def _lz4_encode(data: bytes, _: np.dtype[Any]) -> bytes:
+    lz4_frame = importlib.import_module("lz4.frame")
+    return cast(bytes, lz4_frame.compress(data))
+
+
+def _lz4_decode(data: bytes, _: np.dtype[Any], max_length: int) -> bytes:
+    lz4_frame = importlib.import_module("lz4.frame")
+    decompressor = lz4_frame.LZ4FrameDecompressor()
+    decoded = cast(bytes, decompressor.decompress(data, max_length=max_length))
+    if not decompressor.eof:
+        raise ValueError(f"lz4 data is truncated or exceeds {max_length} bytes")
+    return decoded
+
+
+def _zlib_decode(data: bytes, _: np.dtype[Any], max_length: int) -> bytes:
+    decompressor = zlib.decompressobj()
+    decoded = decompressor.decompress(data, max_length)
+    if not decompressor.eof:
+        raise ValueError(f"zlib data is truncated or exceeds {max_length} bytes")
+    return decoded
+
+
+def _compress_bound(length: int) -> int:
+    """Return an upper bound of the length of `length` bytes losslessly compressed."""
+    return length + length // 128 + 1024
+
+
+_CODECS: dict[str, _Codec] = {
+    # Lossy
+    "fp16": _cast_codec("<f2"),
+    "bf16": _Codec(
+        encode=_bf16_encode, decode=_bf16_decode, encoded_length=lambda size: 2 * size
+    ),
+    "int8": _Codec(
+        encode=_int8_encode, decode=_int8_decode, encoded_length=lambda size: 4 + size
+    ),
+    # Lossless
+    "zlib": _Codec(encode=lambda data, _: zlib.compress(data, 1), decode=_zlib_decode),
+    "zstd": _Codec(encode=_zstd_encode, decode=_zstd_decode, module="zstandard"),
+    "lz4": _Codec(encode=_lz4_encode, decode=_lz4_decode, module="lz4"),
+}
+
+
+def get_available_codecs() -> list[str]:
+    """Return the names of all codecs whose dependencies are installed."""
+    return [
+        name
+        for name, codec in _CODECS.items()
+        if codec.module is None or importlib.util.find_spec(codec.module) is not None
+    ]
+
+
+def _get_codec(name: str) -> _Codec:
+    if name not in _CODECS:
+        raise ValueError(f"Unknown Array codec: '{name}'")
+    codec = _CODECS[name]
+    if codec.module is not None and importlib.util.find_spec(codec.module) is None:
+        raise ImportError(
+            f"The Array codec '{name}' requires the `{codec.module}` package, "
+            "install `flwr[compression]` to use it."
+        )
+    return codec
+
+
+def is_lossy_codec(name: str) -> bool:
+    """Return True if the codec doesn't restore the exact data."""
+    return name in _CODECS and _CODECS[name].lossy
+
+
+def encode_array(array: Array, codecs: Sequence[str]) -> Array:
+    """Encode the data of an Array with a sequence of codecs.
+
+    Lossy codecs only apply to floating point arrays and must come first. Empty Arrays
+    and those which aren't NumPy arrays of a numeric type are returned unchanged.
+    """
+    if (
+        not codecs
+        or not array.data
+        or array.stype not in (SType.NUMPY, SType.NUMPY_RAW)
+    ):
+        return array
+    if array.stype == SType.NUMPY:
+        array = array_from_numpy(array.numpy(), SType.NUMPY_RAW)
+        if array.stype != SType.NUMPY_RAW:
+            return array
+
+    dtype = np.dtype(array.dtype).newbyteorder("<")
+    data = array.data
+    applied: list[str] = []
+    for name in codecs:
+        codec = _get_codec(name)
+        if codec.lossy:
+            if applied:
+                raise ValueError(
+                    f"The lossy Array codec '{name}' must precede all other codecs"
+                )
+            if dtype.kind != "f":
+                continue
+        data = codec.encode(data, dtype)
+        applied.append(name)
+
+    return Array(
+        dtype=array.dtype,
+        shape=array.shape,
+        stype="+".join([SType.NUMPY_RAW, *applied]),
+        data=data,
+    )
+
+
+def decode_array(array: Array) -> Array:
+    """Decode an Array encoded by `encode_array`.
+
+    The data is never decompressed beyond the length expected from the dtype and shape
+    of the Array, and a ValueError is raised if its length doesn't match.
+    """
+    stype, *names = array.stype.split("+")
+    if not names or stype != SType.NUMPY_RAW:
+        return array
+
+    dtype = np.dtype(array.dtype).newbyteorder("<")
+    size = int(np.prod(array.shape))
+    codecs = [_get_codec(name) for name in names]
+    # The length of the data before each codec was applied. It is only bounded for
+    # the compressed output of a lossless codec followed by another lossless one.
+    lengths: list[tuple[int, bool]] = [(size * dtype.itemsize, True)]
+    for codec in codecs[:-1]:
+        if codec.encoded_length is not None:
+            lengths.append((codec.encoded_length(size), True))
+        else:
+            lengths.append((_compress_bound(lengths[-1][0]), False))
+
+    data = array.data
+    for name, codec, (length, exact) in zip(
+        reversed(names), reversed(codecs), reversed(lengths)
+    ):
+        if codec.encoded_length is not None and len(data) != codec.encoded_length(size):
+            raise ValueError(f"Invalid length of the '{name}' encoded Array data")
+        data = codec.decode(data, dtype, length)
+        if len(data) > length or (exact and len(data) != length):
+            raise ValueError(
+                f"The '{name}' decoded Array data has {len(data)} bytes, but "
+                f"{length} were expected"
+            )
+    return Array(dtype=array.dtype, shape=array.shape, stype=stype, data=data)
+
+
+def get_array_codecs(recordset: RecordSet, entry: str = "encode") -> list[str]:
+    """Return the codecs in an entry of the `ARRAY_CODECS_CONFIGS_KEY` record."""
+    record = recordset.configs_records.get(ARRAY_CODECS_CONFIGS_KEY)
+    if record is None:
+        return []
+    return list(cast(list[str], record.get(entry, [])))
+
+
+def negotiate_array_codecs(request: RecordSet, reply: RecordSet) -> None:
+    """Encode the reply with the requested codecs that are available.
+
+    The reply also announces all codecs available on this side, so that the sender of
+    the request may encode its following messages with them.
+    """
+    if ARRAY_CODECS_CONFIGS_KEY not in request.configs_records:
+        return
+    requested = get_array_codecs(request, "request")
+    available = get_available_codecs()
+    reply.configs_records[ARRAY_CODECS_CONFIGS_KEY] = ConfigsRecord(
+        {
+            "encode": [name for name in requested if name in available],
+            "supported": available,
+        }
+    )
@@ -0,0 +1,168 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmark Array codecs on typical model state dicts.
+
+Serializes the ParametersRecord of a CNN-like and a transformer-like state dict
+with each combination of codecs and reports the bytes on the wire as well as the
+encode and decode throughput.
+
+Usage::
+
+    python -m flwr.common.record.codec_benchmark
+    python -m flwr.common.record.codec_benchmark --codecs fp16+zstd int8+lz4
+"""
+
+
+import argparse
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from flwr.common.constant import SType
+from flwr.common.serde import parameters_record_from_proto, parameters_record_to_proto
+from flwr.common.typing import NDArray
+
+from .codec import get_available_codecs
+from .conversion_utils import array_from_numpy
+from .parametersrecord import ParametersRecord
+
+
+def _cnn_state_dict(rng: np.random.Generator) -> dict[str, NDArray]:
+    """Create a ResNet-like state dict (~11M parameters)."""
+    state_dict: dict[str, NDArray] = {
+        "conv1.weight": rng.normal(0, 0.05, (64, 3, 7, 7)),
+    }
+    in_channels = 64
+    for stage, channels in enumerate((64, 128, 256, 512)):
+        for block in range(2):
+            for conv in range(2):
+                prefix = f"layer{stage}.{block}.conv{conv}"
+                shape = (channels, in_channels if conv == 0 else channels, 3, 3)
+                state_dict[f"{prefix}.weight"] = rng.normal(0, 0.05, shape)
+                state_dict[f"{prefix}.bn.weight"] = np.ones(channels)
+                state_dict[f"{prefix}.bn.bias"] = np.zeros(channels)
+                state_dict[f"{prefix}.bn.running_mean"] = rng.normal(0, 1, channels)
+                state_dict[f"{prefix}.bn.running_var"] = rng.uniform(0, 1, channels)
+                state_dict[f"{prefix}.bn.num_batches_tracked"] = np.array(1000)
+            in_channels = channels
+    state_dict["fc.weight"] = rng.normal(0, 0.05, (1000, 512))
+    state_dict["fc.bias"] = np.zeros(1000)
+    return state_dict
+
+
+def _transformer_state_dict(rng: np.random.Generator) -> dict[str, NDArray]:
+    """Create a BERT-like state dict (~30M parameters)."""
+    dim, hidden = 512, 2048
+    state_dict: dict[str, NDArray] = {
+        "embeddings.word": rng.normal(0, 0.02, (30522, dim)),
+        "embeddings.position": rng.normal(0, 0.02, (512, dim)),
+    }
+    for layer in range(4):
+        prefix = f"encoder.{layer}"
+        for name in ("query", "key", "value", "output"):
+            state_dict[f"{prefix}.attention.{name}.weight"] = rng.normal(
+                0, 0.02, (dim, dim)
+            )
+            state_dict[f"{prefix}.attention.{name}.bias"] = np.zeros(dim)
+        state_dict[f"{prefix}.ffn.in.weight"] = rng.normal(0, 0.02, (hidden, dim))
+        state_dict[f"{prefix}.ffn.out.weight"] = rng.normal(0, 0.02, (dim, hidden))
+        state_dict[f"{prefix}.norm.weight"] = np.ones(dim)
+        state_dict[f"{prefix}.norm.bias"] = np.zeros(dim)
+    return state_dict
+
+
+_MODELS: dict[str, Callable[[np.random.Generator], dict[str, NDArray]]] = {
+    "cnn": _cnn_state_dict,
+    "transformer": _transformer_state_dict,
+}
+
+
+def run_benchmark(
+    state_dict: dict[str, NDArray], codecs: list[str], repeat: int = 3
+) -> tuple[int, float, float]:
+    """Return the serialized size (in bytes) and the encode and decode throughput (in
+    MB/s of raw data) of a state dict encoded with `codecs`."""
+    record = ParametersRecord(
+        OrderedDict(
+            (
+                name,
+                array_from_numpy(
+                    value.astype("float32") if value.dtype.kind == "f" else value,
+                    SType.NUMPY_RAW,
+                ),
+            )
+            for name, value in state_dict.items()
+        )
+    )
+    raw_size = sum(len(array.data) for array in record.values())
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        content = parameters_record_to_proto(record, codecs).SerializeToString()
+    encode_time = (time.perf_counter() - start) / repeat
+
+    proto = parameters_record_to_proto(record, codecs)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parameters_record_from_proto(proto)
+    decode_time = (time.perf_counter() - start) / repeat
+
+    return len(content), raw_size / encode_time / 1e6, raw_size / decode_time / 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--codecs",
+        nargs="*",
+        help="Combinations of codecs joined by '+' (default: each available "
+        "codec on its own and each lossy codec followed by each lossless codec)",
+    )
+    parser.add_argument("--models", nargs="*", default=list(_MODELS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    available = get_available_codecs()
+    if args.codecs is None:
+        lossy = [name for name in ("fp16", "bf16", "int8") if name in available]
+        lossless = [name for name in available if name not in lossy]
+        combinations: list[list[str]] = [[]] + [[name] for name in available]
+        combinations += [[first, second] for first in lossy for second in lossless]
+    else:
+        combinations = [value.split("+") for value in args.codecs]
+
+    rng = np.random.default_rng(0)
+    for model in args.models:
+        state_dict = _MODELS[model](rng)
+        baseline = 0
+        print(f"{model}: {sum(v.size for v in state_dict.values()):,} parameters")
+        print(
+            f"  {'codecs':<12}{'bytes':>14}{'ratio':>8}{'enc MB/s':>10}{'dec MB/s':>10}"
+        )
+        for codecs in combinations:
+            size, encode, decode = run_benchmark(state_dict, codecs, args.repeat)
+            baseline = baseline or size
+            name = "+".join(codecs) or "none"
+            print(
+                f"  {name:<12}{size:>14,}{baseline / size:>8.2f}"
+                f"{encode:>10.0f}{decode:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for Array codecs."""
+
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from ..constant import SType
+from .codec import (
+    ARRAY_CODECS_CONFIGS_KEY,
+    decode_array,
+    encode_array,
+    get_array_codecs,
+    get_available_codecs,
+    negotiate_array_codecs,
+)
+from .configsrecord import ConfigsRecord
+from .conversion_utils import array_from_numpy
+from .parametersrecord import Array
+from .recordset import RecordSet
+
+LOSSLESS = [name for name in ("zlib", "zstd", "lz4") if name in get_available_codecs()]
+
+
+@pytest.mark.parametrize("codec", LOSSLESS)
+@pytest.mark.parametrize("dtype", ["float32", "float64", "int64", "uint8"])
+def test_lossless_roundtrip(codec: str, dtype: str) -> None:
+    """Test that lossless codecs restore the exact data."""
+    # Prepare
+    ndarray = np.arange(1000).reshape(10, 100).astype(dtype)
+    array = array_from_numpy(ndarray, SType.NUMPY_RAW)
+
+    # Execute
+    encoded = encode_array(array, [codec])
+    decoded = decode_array(encoded)
+
+    # Assert
+    assert encoded.stype == f"{SType.NUMPY_RAW}+{codec}"
+    assert len(encoded.data) < len(array.data)
+    assert decoded == array
+    np.testing.assert_array_equal(decoded.numpy(), ndarray)
+
+
+@pytest.mark.parametrize(
+    "codec, rtol, ratio", [("fp16", 1e-3, 2), ("bf16", 1e-2, 2), ("int8", 1e-2, 4)]
+)
+def test_lossy_roundtrip(codec: str, rtol: float, ratio: int) -> None:
+    """Test that lossy codecs shrink float32 arrays within an error bound."""
+    # Prepare
+    ndarray = np.random.default_rng(0).normal(size=(64, 32)).astype("float32")
+    array = array_from_numpy(ndarray)
+
+    # Execute
+    encoded = encode_array(array, [codec])
+    decoded = decode_array(encoded).numpy()
+
+    # Assert
+    assert len(encoded.data) <= len(array.data) // ratio + 4
+    assert decoded.dtype == ndarray.dtype
+    assert decoded.shape == ndarray.shape
+    np.testing.assert_allclose(decoded, ndarray, atol=rtol * np.abs(ndarray).max())
+
+
+@pytest.mark.parametrize("codec", LOSSLESS)
+def test_decode_rejects_unexpected_length(codec: str) -> None:
+    """Test that data decoding to more or less than its shape implies is rejected."""
+    # Prepare
+    array = array_from_numpy(np.zeros(1000, dtype="float32"), SType.NUMPY_RAW)
+    encoded = encode_array(array, [codec])
+    invalid_arrays = [
+        Array(dtype="float32", shape=[10], stype=encoded.stype, data=encoded.data),
+        Array(dtype="float32", shape=[2000], stype=encoded.stype, data=encoded.data),
+    ]
+
+    # Execute & Assert
+    for invalid_array in invalid_arrays:
+        with pytest.raises(ValueError):
+            decode_array(invalid_array)
+
+
+def test_decode_lossy_rejects_unexpected_length() -> None:
+    """Test that lossy encoded data not matching the shape is rejected."""
+    # Prepare
+    array = array_from_numpy(np.zeros(1000, dtype="float32"), SType.NUMPY_RAW)
+    encoded = encode_array(array, ["fp16"])
+    invalid_array = Array(
+        dtype="float32", shape=[2000], stype=encoded.stype, data=encoded.data
+    )
+
+    # Execute & Assert
+    with pytest.raises(ValueError):
+        decode_array(invalid_array)
+
+
+def test_lossy_codec_skips_integers() -> None:
+    """Test that lossy codecs leave non-float arrays untouched."""
+    # Prepare
+    ndarray = np.arange(100, dtype="int32")
+
+    # Execute
+    encoded = encode_array(array_from_numpy(ndarray), ["fp16", "zlib"])
+
+    # Assert
+    assert encoded.stype == f"{SType.NUMPY_RAW}+zlib"
+    np.testing.assert_array_equal(decode_array(encoded).numpy(), ndarray)
+
+
+def test_encode_numpy_stype() -> None:
+    """Test that Arrays with the `numpy.ndarray` stype are encoded as raw."""
+    # Prepare
+    ndarray = np.ones((3, 4), dtype="float32")
+    bytes_io = BytesIO()
+    np.save(bytes_io, ndarray, allow_pickle=False)
+    array = Array(
+        dtype="float32", shape=[3, 4], stype=SType.NUMPY, data=bytes_io.getvalue()
+    )
+
+    # Execute
+    decoded = decode_array(encode_array(array, ["fp16"]))
+
+    # Assert
+    assert decoded.stype == SType.NUMPY_RAW
+    np.testing.assert_array_equal(decoded.numpy(), ndarray)
+
+
+def test_encode_empty_array() -> None:
+    """Test that empty Arrays are left unchanged."""
+    # Prepare
+    array = Array(dtype="", shape=[], stype=SType.NUMPY, data=b"")
+
+    # Execute
+    encoded = encode_array(array, ["fp16", "zlib"])
+
+    # Assert
+    assert encoded == array
+
+
+def test_lossy_codec_after_lossless() -> None:
+    """Test that a lossy codec must come first."""
+    with pytest.raises(ValueError):
+        encode_array(array_from_numpy(np.ones(3)), ["zlib", "fp16"])
+
+
+def test_unknown_codec() -> None:
+    """Test that unknown codecs are rejected."""
+    with pytest.raises(ValueError):
+        encode_array(array_from_numpy(np.ones(3)), ["unknown"])
+
+
+def test_negotiate_array_codecs() -> None:
+    """Test that the reply is encoded with the requested available codecs."""
+    # Prepare
+    request = RecordSet()
+    request.configs_records[ARRAY_CODECS_CONFIGS_KEY] = ConfigsRecord(
+        {"request": ["fp16", "unknown", "zlib"], "encode": []}
+    )
+    reply = RecordSet()
+
+    # Execute
+    negotiate_array_codecs(request, reply)
+
+    # Assert
+    assert get_array_codecs(reply) == ["fp16", "zlib"]
+    assert get_array_codecs(reply, "supported") == get_available_codecs()
+
+
+def test_negotiate_array_codecs_not_requested() -> None:
+    """Test that nothing is negotiated if the request has no codecs record."""
+    # Prepare
+    reply = RecordSet()
+
+    # Execute
+    negotiate_array_codecs(RecordSet(), reply)
+
+    # Assert
+    assert not reply.configs_records
+    assert not get_array_codecs(reply)
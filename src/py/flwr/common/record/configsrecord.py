@@ -107,6 +107,8 @@ class ConfigsRecord(TypedDict[str, ConfigsRecordValues]):
     :code:`ConfigsRecord`)
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         configs_dict: Optional[dict[str, ConfigsRecordValues]] = None,
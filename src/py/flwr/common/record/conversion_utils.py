@@ -24,8 +24,36 @@ from ..typing import NDArray
 from .parametersrecord import Array
 
 
-def array_from_numpy(ndarray: NDArray) -> Array:
-    """Create Array from NumPy ndarray."""
+def array_from_numpy(ndarray: NDArray, stype: str = SType.NUMPY) -> Array:
+    """Create Array from NumPy ndarray.
+
+    Parameters
+    ----------
+    ndarray : NDArray
+        The NumPy ndarray to convert.
+    stype : str (default: SType.NUMPY)
+        The serialization type of the Array. With `SType.NUMPY_RAW`, arrays of
+        plain numeric dtypes are stored as their raw little-endian buffer, without
+        the overhead of the .npy format. Arrays of other dtypes always use the .npy
+        format.
+
+    Returns
+    -------
+    Array
+        The Array holding the serialized ndarray.
+    """
+    if stype not in (SType.NUMPY, SType.NUMPY_RAW):
+        raise ValueError(f"Unsupported serialization type: '{stype}'")
+
+    if stype == SType.NUMPY_RAW and ndarray.dtype.kind in "biufc":
+        dtype = ndarray.dtype.newbyteorder("<")
+        return Array(
+            dtype=str(dtype),
+            shape=list(ndarray.shape),
+            stype=SType.NUMPY_RAW,
+            data=ndarray.astype(dtype, copy=False).tobytes(),
+        )
+
     buffer = BytesIO()
     # WARNING: NEVER set allow_pickle to true.
     # Reason: loading pickled data can execute arbitrary code
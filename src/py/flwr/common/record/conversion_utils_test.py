@@ -42,3 +42,48 @@ class TestArrayFromNumpy(unittest.TestCase):
         self.assertEqual(array_instance.shape, list(original_array.shape))
         self.assertEqual(array_instance.stype, SType.NUMPY)
         np.testing.assert_array_equal(deserialized_array, original_array)
+
+    def test_array_from_numpy_raw(self) -> None:
+        """Test that raw buffers are returned as writable arrays."""
+        # Prepare
+        original_array = np.array([1, 2, 3], dtype=np.float32)
+
+        # Execute
+        array_instance = array_from_numpy(original_array, SType.NUMPY_RAW)
+        deserialized_array = array_instance.numpy()
+        deserialized_array[0] = 4
+
+        # Assert
+        self.assertEqual(array_instance.dtype, str(original_array.dtype))
+        self.assertEqual(array_instance.shape, list(original_array.shape))
+        self.assertEqual(array_instance.stype, SType.NUMPY_RAW)
+        self.assertEqual(array_instance.data, original_array.tobytes())
+        np.testing.assert_array_equal(deserialized_array, [4, 2, 3])
+
+    def test_array_from_numpy_big_endian_non_contiguous(self) -> None:
+        """Test that raw buffers are little-endian and in C order."""
+        # Prepare
+        original_array = np.arange(12, dtype=">i4").reshape(3, 4).T
+
+        # Execute
+        array_instance = array_from_numpy(original_array, SType.NUMPY_RAW)
+
+        # Assert
+        self.assertEqual(array_instance.stype, SType.NUMPY_RAW)
+        self.assertEqual(array_instance.shape, [4, 3])
+        self.assertEqual(array_instance.data, original_array.astype("<i4").tobytes())
+        np.testing.assert_array_equal(array_instance.numpy(), original_array)
+
+    def test_array_from_numpy_non_numeric(self) -> None:
+        """Test that arrays of other dtypes are stored in the .npy format."""
+        # Prepare
+        original_array = np.array(["a", "bc"])
+
+        # Execute
+        array_instance = array_from_numpy(original_array, SType.NUMPY_RAW)
+        buffer = BytesIO(array_instance.data)
+        deserialized_array = np.load(buffer, allow_pickle=False)
+
+        # Assert
+        self.assertEqual(array_instance.stype, SType.NUMPY)
+        np.testing.assert_array_equal(deserialized_array, original_array)
@@ -113,6 +113,8 @@ class MetricsRecord(TypedDict[str, MetricsRecordValues]):
     :code:`ParametersRecord`.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         metrics_dict: Optional[dict[str, MetricsRecordValues]] = None,
@@ -57,7 +57,13 @@ class Array:
     data: bytes
 
     def numpy(self) -> NDArray:
-        """Return the array as a NumPy array."""
+        """Return the array as a NumPy array.
+
+        The returned array is writable and does not share memory with `data`.
+        """
+        if self.stype == SType.NUMPY_RAW:
+            dtype = np.dtype(self.dtype).newbyteorder("<")
+            return np.frombuffer(self.data, dtype=dtype).reshape(self.shape).copy()
         if self.stype != SType.NUMPY:
             raise TypeError(
                 f"Unsupported serialization type for numpy conversion: '{self.stype}'"
@@ -173,6 +179,8 @@ class ParametersRecord(TypedDict[str, Array]):
     therefore allowing to use the same or similar steps as in the example above.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         array_dict: Optional[OrderedDict[str, Array]] = None,
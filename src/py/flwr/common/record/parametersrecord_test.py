@@ -57,6 +57,24 @@ class TestArray(unittest.TestCase):
         # Assert
         np.testing.assert_array_equal(converted_array, original_array)
 
+    def test_numpy_conversion_raw(self) -> None:
+        """Test that raw buffers are converted to writable arrays."""
+        # Prepare
+        original_array = np.arange(6, dtype=np.float64).reshape(2, 3)
+        array_instance = Array(
+            dtype="float64",
+            shape=[2, 3],
+            stype=SType.NUMPY_RAW,
+            data=original_array.tobytes(),
+        )
+
+        # Execute
+        converted_array = array_instance.numpy()
+
+        # Assert
+        np.testing.assert_array_equal(converted_array, original_array)
+        self.assertTrue(converted_array.flags.writeable)
+
     def test_numpy_conversion_invalid(self) -> None:
         """Test the numpy method with invalid Array instance."""
         # Prepare
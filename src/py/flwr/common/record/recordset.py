@@ -18,7 +18,6 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import cast
 
 from .configsrecord import ConfigsRecord
 from .metricsrecord import MetricsRecord
@@ -30,6 +29,8 @@ from .typeddict import TypedDict
 class RecordSetData:
     """Inner data container for the RecordSet class."""
 
+    __slots__ = ("parameters_records", "metrics_records", "configs_records")
+
     parameters_records: TypedDict[str, ParametersRecord]
     metrics_records: TypedDict[str, MetricsRecord]
     configs_records: TypedDict[str, ConfigsRecord]
@@ -56,28 +57,32 @@ class RecordSetData:
         if configs_records is not None:
             self.configs_records.update(configs_records)
 
-    def _check_fn_str(self, key: str) -> None:
+    @staticmethod
+    def _check_fn_str(key: str) -> None:
         if not isinstance(key, str):
             raise TypeError(
                 f"Expected `{str.__name__}`, but "
                 f"received `{type(key).__name__}` for the key."
             )
 
-    def _check_fn_params(self, record: ParametersRecord) -> None:
+    @staticmethod
+    def _check_fn_params(record: ParametersRecord) -> None:
         if not isinstance(record, ParametersRecord):
             raise TypeError(
                 f"Expected `{ParametersRecord.__name__}`, but "
                 f"received `{type(record).__name__}` for the value."
             )
 
-    def _check_fn_metrics(self, record: MetricsRecord) -> None:
+    @staticmethod
+    def _check_fn_metrics(record: MetricsRecord) -> None:
         if not isinstance(record, MetricsRecord):
             raise TypeError(
                 f"Expected `{MetricsRecord.__name__}`, but "
                 f"received `{type(record).__name__}` for the value."
             )
 
-    def _check_fn_configs(self, record: ConfigsRecord) -> None:
+    @staticmethod
+    def _check_fn_configs(record: ConfigsRecord) -> None:
         if not isinstance(record, ConfigsRecord):
             raise TypeError(
                 f"Expected `{ConfigsRecord.__name__}`, but "
@@ -158,6 +163,8 @@ class RecordSet:
     :code:`MetricsRecord` and :code:`ParametersRecord`.
     """
 
+    __slots__ = ("_data",)
+
     def __init__(
         self,
         parameters_records: dict[str, ParametersRecord] | None = None,
@@ -169,25 +176,22 @@ class RecordSet:
             metrics_records=metrics_records,
             configs_records=configs_records,
         )
-        self.__dict__["_data"] = data
+        self._data = data
 
     @property
     def parameters_records(self) -> TypedDict[str, ParametersRecord]:
         """Dictionary holding ParametersRecord instances."""
-        data = cast(RecordSetData, self.__dict__["_data"])
-        return data.parameters_records
+        return self._data.parameters_records
 
     @property
     def metrics_records(self) -> TypedDict[str, MetricsRecord]:
         """Dictionary holding MetricsRecord instances."""
-        data = cast(RecordSetData, self.__dict__["_data"])
-        return data.metrics_records
+        return self._data.metrics_records
 
     @property
     def configs_records(self) -> TypedDict[str, ConfigsRecord]:
         """Dictionary holding ConfigsRecord instances."""
-        data = cast(RecordSetData, self.__dict__["_data"])
-        return data.configs_records
+        return self._data.configs_records
 
     def __repr__(self) -> str:
         """Return a string representation of this instance."""
@@ -199,4 +203,4 @@ class RecordSet:
         """Compare two instances of the class."""
         if not isinstance(other, self.__class__):
             raise NotImplementedError
-        return self.__dict__ == other.__dict__
+        return self._data == other._data
@@ -22,6 +22,7 @@ from typing import Callable, Union
 import numpy as np
 import pytest
 
+from flwr.common.constant import SType
 from flwr.common.parameter import ndarrays_to_parameters, parameters_to_ndarrays
 from flwr.common.recordset_compat import (
     parameters_to_parametersrecord,
@@ -36,6 +37,7 @@ from flwr.common.typing import (
 )
 
 from . import Array, ConfigsRecord, MetricsRecord, ParametersRecord, RecordSet
+from .conversion_utils import array_from_numpy
 
 
 def get_ndarrays() -> NDArrays:
@@ -122,6 +124,26 @@ def test_parameters_to_parametersrecord_and_back(
     assert validate_freed_fn(parameters, parameters_copy, parameters_)
 
 
+def test_raw_parametersrecord_to_parameters() -> None:
+    """Test that raw buffers are converted to the legacy .npy format."""
+    ndarrays = get_ndarrays()
+    params_record = ParametersRecord(
+        OrderedDict(
+            {
+                str(idx): array_from_numpy(ndarray)
+                for idx, ndarray in enumerate(ndarrays)
+            }
+        )
+    )
+
+    parameters = parametersrecord_to_parameters(params_record, keep_input=True)
+    ndarrays_ = parameters_to_ndarrays(parameters=parameters)
+
+    assert parameters.tensor_type == SType.NUMPY
+    for arr, arr_ in zip(ndarrays, ndarrays_):
+        assert np.array_equal(arr, arr_)
+
+
 def test_set_parameters_while_keeping_intputs() -> None:
     """Tests keep_input functionality in ParametersRecord."""
     # Adding parameters to a record that doesn't erase entries in the input `array_dict`
@@ -16,7 +16,7 @@
 
 
 from collections.abc import ItemsView, Iterator, KeysView, MutableMapping, ValuesView
-from typing import Callable, Generic, TypeVar, cast
+from typing import Callable, Generic, TypeVar
 
 K = TypeVar("K")  # Key type
 V = TypeVar("V")  # Value type
@@ -25,64 +25,65 @@ V = TypeVar("V")  # Value type
 class TypedDict(MutableMapping[K, V], Generic[K, V]):
     """Typed dictionary."""
 
+    # Records are created for every message and node, keep them compact
+    __slots__ = ("_check_key_fn", "_check_value_fn", "_data")
+
     def __init__(
         self, check_key_fn: Callable[[K], None], check_value_fn: Callable[[V], None]
     ):
-        self.__dict__["_check_key_fn"] = check_key_fn
-        self.__dict__["_check_value_fn"] = check_value_fn
-        self.__dict__["_data"] = {}
+        self._check_key_fn = check_key_fn
+        self._check_value_fn = check_value_fn
+        self._data: dict[K, V] = {}
 
     def __setitem__(self, key: K, value: V) -> None:
         """Set the given key to the given value after type checking."""
         # Check the types of key and value
-        cast(Callable[[K], None], self.__dict__["_check_key_fn"])(key)
-        cast(Callable[[V], None], self.__dict__["_check_value_fn"])(value)
+        self._check_key_fn(key)
+        self._check_value_fn(value)
 
         # Set key-value pair
-        cast(dict[K, V], self.__dict__["_data"])[key] = value
+        self._data[key] = value
 
     def __delitem__(self, key: K) -> None:
         """Remove the item with the specified key."""
-        del cast(dict[K, V], self.__dict__["_data"])[key]
+        del self._data[key]
 
     def __getitem__(self, item: K) -> V:
         """Return the value for the specified key."""
-        return cast(dict[K, V], self.__dict__["_data"])[item]
+        return self._data[item]
 
     def __iter__(self) -> Iterator[K]:
         """Yield an iterator over the keys of the dictionary."""
-        return iter(cast(dict[K, V], self.__dict__["_data"]))
+        return iter(self._data)
 
     def __repr__(self) -> str:
         """Return a string representation of the dictionary."""
-        return cast(dict[K, V], self.__dict__["_data"]).__repr__()
+        return self._data.__repr__()
 
     def __len__(self) -> int:
         """Return the number of items in the dictionary."""
-        return len(cast(dict[K, V], self.__dict__["_data"]))
+        return len(self._data)
 
     def __contains__(self, key: object) -> bool:
         """Check if the dictionary contains the specified key."""
-        return key in cast(dict[K, V], self.__dict__["_data"])
+        return key in self._data
 
     def __eq__(self, other: object) -> bool:
         """Compare this instance to another dictionary or TypedDict."""
-        data = cast(dict[K, V], self.__dict__["_data"])
         if isinstance(other, TypedDict):
-            other_data = cast(dict[K, V], other.__dict__["_data"])
-            return data == other_data
+            return self._data == other._data
         if isinstance(other, dict):
-            return data == other
+            return self._data == other
         return NotImplemented
 
     def keys(self) -> KeysView[K]:
         """D.keys() -> a set-like object providing a view on D's keys."""
-        return cast(dict[K, V], self.__dict__["_data"]).keys()
+        return self._data.keys()
 
     def values(self) -> ValuesView[V]:
         """D.values() -> an object providing a view on D's values."""
-        return cast(dict[K, V], self.__dict__["_data"]).values()
+        return self._data.values()
 
     def items(self) -> ItemsView[K, V]:
         """D.items() -> a set-like object providing a view on D's items."""
-        return cast(dict[K, V], self.__dict__["_data"]).items()
+        return self._data.items()
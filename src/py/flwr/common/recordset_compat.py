@@ -20,6 +20,8 @@ from collections.abc import Mapping
 from typing import Union, cast, get_args
 
 from . import Array, ConfigsRecord, MetricsRecord, ParametersRecord, RecordSet
+from .constant import SType
+from .parameter import ndarray_to_bytes
 from .typing import (
     Code,
     ConfigsRecordValues,
@@ -63,13 +65,20 @@ def parametersrecord_to_parameters(
     parameters = Parameters(tensors=[], tensor_type="")
 
     for key in list(record.keys()):
-        if key != EMPTY_TENSOR_KEY:
-            parameters.tensors.append(record[key].data)
+        array = record[key]
+        stype = array.stype
+        if stype == SType.NUMPY_RAW:
+            # Parameters carry no dtype or shape, hence raw buffers are converted
+            stype = SType.NUMPY
+            if key != EMPTY_TENSOR_KEY:
+                parameters.tensors.append(ndarray_to_bytes(array.numpy()))
+        elif key != EMPTY_TENSOR_KEY:
+            parameters.tensors.append(array.data)
 
         if not parameters.tensor_type:
             # Setting from first array in record. Recall the warning in the docstrings
             # of this function.
-            parameters.tensor_type = record[key].stype
+            parameters.tensor_type = stype
 
         if not keep_input:
             del record[key]
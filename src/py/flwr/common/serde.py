@@ -16,7 +16,7 @@
 
 
 from collections import OrderedDict
-from collections.abc import MutableMapping
+from collections.abc import MutableMapping, Sequence
 from typing import Any, TypeVar, cast
 
 from google.protobuf.message import Message as GrpcMessage
@@ -62,6 +62,7 @@ from . import (
     typing,
 )
 from .message import Error, Message, Metadata
+from .record.codec import decode_array, encode_array, get_array_codecs
 from .record.typeddict import TypedDict
 
 #  === Parameters message ===
@@ -454,26 +455,30 @@ def _record_value_dict_from_proto(
     return {k: _record_value_from_proto(v) for k, v in value_dict_proto.items()}
 
 
-def array_to_proto(array: Array) -> ProtoArray:
-    """Serialize Array to ProtoBuf."""
-    return ProtoArray(**vars(array))
+def array_to_proto(array: Array, codecs: Sequence[str] = ()) -> ProtoArray:
+    """Serialize Array to ProtoBuf, encoding its data with the given codecs."""
+    return ProtoArray(**vars(encode_array(array, codecs)))
 
 
 def array_from_proto(array_proto: ProtoArray) -> Array:
-    """Deserialize Array from ProtoBuf."""
-    return Array(
-        dtype=array_proto.dtype,
-        shape=list(array_proto.shape),
-        stype=array_proto.stype,
-        data=array_proto.data,
+    """Deserialize Array from ProtoBuf, decoding its data if it was encoded."""
+    return decode_array(
+        Array(
+            dtype=array_proto.dtype,
+            shape=list(array_proto.shape),
+            stype=array_proto.stype,
+            data=array_proto.data,
+        )
     )
 
 
-def parameters_record_to_proto(record: ParametersRecord) -> ProtoParametersRecord:
+def parameters_record_to_proto(
+    record: ParametersRecord, codecs: Sequence[str] = ()
+) -> ProtoParametersRecord:
     """Serialize ParametersRecord to ProtoBuf."""
     return ProtoParametersRecord(
         data_keys=record.keys(),
-        data_values=map(array_to_proto, record.values()),
+        data_values=[array_to_proto(array, codecs) for array in record.values()],
     )
 
 
@@ -547,11 +552,13 @@ def error_from_proto(error_proto: ProtoError) -> Error:
 # === RecordSet message ===
 
 
-def recordset_to_proto(recordset: RecordSet) -> ProtoRecordSet:
-    """Serialize RecordSet to ProtoBuf."""
+def recordset_to_proto(
+    recordset: RecordSet, codecs: Sequence[str] = ()
+) -> ProtoRecordSet:
+    """Serialize RecordSet to ProtoBuf, encoding Arrays with the given codecs."""
     return ProtoRecordSet(
         parameters={
-            k: parameters_record_to_proto(v)
+            k: parameters_record_to_proto(v, codecs)
             for k, v in recordset.parameters_records.items()
         },
         metrics={
@@ -596,7 +603,9 @@ def message_to_taskins(message: Message) -> TaskIns:
             ancestry=[md.reply_to_message] if md.reply_to_message != "" else [],
             task_type=md.message_type,
             recordset=(
-                recordset_to_proto(message.content) if message.has_content() else None
+                recordset_to_proto(message.content, get_array_codecs(message.content))
+                if message.has_content()
+                else None
             ),
             error=error_to_proto(message.error) if message.has_error() else None,
         ),
@@ -650,7 +659,9 @@ def message_to_taskres(message: Message) -> TaskRes:
             ancestry=[md.reply_to_message] if md.reply_to_message != "" else [],
             task_type=md.message_type,
             recordset=(
-                recordset_to_proto(message.content) if message.has_content() else None
+                recordset_to_proto(message.content, get_array_codecs(message.content))
+                if message.has_content()
+                else None
             ),
             error=error_to_proto(message.error) if message.has_error() else None,
         ),
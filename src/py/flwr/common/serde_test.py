@@ -19,6 +19,7 @@ import string
 from collections import OrderedDict
 from typing import Any, Callable, Optional, TypeVar, Union, cast
 
+import numpy as np
 import pytest
 
 # pylint: disable=E0611
@@ -44,7 +45,10 @@ from . import (
     RecordSet,
     typing,
 )
+from .constant import SType
 from .message import Error, Message, Metadata
+from .record.codec import ARRAY_CODECS_CONFIGS_KEY
+from .record.conversion_utils import array_from_numpy
 from .serde import (
     array_from_proto,
     array_to_proto,
@@ -446,6 +450,33 @@ def test_message_to_and_from_taskres(
     assert metadata == deserialized.metadata
 
 
+def test_message_to_taskres_with_array_codecs() -> None:
+    """Test that Arrays are encoded with the codecs listed in the content."""
+    # Prepare
+    ndarray = np.arange(1000, dtype="float32")
+    content = RecordSet(
+        parameters_records={
+            "params": ParametersRecord(OrderedDict({"a": array_from_numpy(ndarray)}))
+        },
+        configs_records={
+            ARRAY_CODECS_CONFIGS_KEY: ConfigsRecord({"encode": ["fp16", "zlib"]})
+        },
+    )
+    original = Message(metadata=RecordMaker().metadata(), content=content)
+
+    # Execute
+    taskres = message_to_taskres(original)
+    deserialized = message_from_taskres(taskres)
+
+    # Assert
+    proto_array = taskres.task.recordset.parameters["params"].data_values[0]
+    assert proto_array.stype == f"{SType.NUMPY_RAW}+fp16+zlib"
+    assert len(proto_array.data) < ndarray.nbytes // 2
+    array = deserialized.content.parameters_records["params"]["a"]
+    assert array.stype == SType.NUMPY_RAW
+    np.testing.assert_array_equal(array.numpy(), ndarray)
+
+
 @pytest.mark.parametrize(
     "content_fn, error_fn",
     [
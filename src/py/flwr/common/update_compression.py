@@ -0,0 +1,209 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Utility functions for compressing model updates.
+
+A model update is the difference between the parameters returned by a client and
+the parameters it received. Compressed updates are sent as `Parameters` with
+`tensor_type` `SType.NUMPY_TOPK` or `SType.NUMPY_QUANTIZED`, each tensor holding
+a sequence of NumPy arrays: the shape of the layer, followed by
+
+- `SType.NUMPY_TOPK`: the flat indices and the values of the kept entries
+- `SType.NUMPY_QUANTIZED`: the minimum, the step size and the number of bits,
+  followed by the packed quantization levels
+"""
+
+
+from collections.abc import Iterator
+from io import BytesIO
+from typing import Any
+
+import numpy as np
+
+from .constant import SType
+from .parameter import parameters_to_ndarrays, read_ndarray_header
+from .typing import NDArray, NDArrays, Parameters
+
+KEY_TOPK_FRACTION = "topk_fraction"
+KEY_QUANTIZE_BITS = "quantize_bits"
+DEFAULT_TOPK_FRACTION = 0.01
+DEFAULT_QUANTIZE_BITS = 8
+
+UPDATE_TENSOR_TYPES = (SType.NUMPY_TOPK, SType.NUMPY_QUANTIZED)
+
+
+def _update_dtype(layer: NDArray) -> np.dtype[Any]:
+    """Return the dtype in which the update of a layer is computed."""
+    return np.result_type(layer.dtype, np.float32)
+
+
+def compute_update(local: NDArrays, received: NDArrays) -> NDArrays:
+    """Compute the update from the received to the local parameters."""
+    return [np.subtract(x, y, dtype=_update_dtype(x)) for x, y in zip(local, received)]
+
+
+def _save(*arrays: NDArray) -> bytes:
+    bytes_io = BytesIO()
+    for array in arrays:
+        # WARNING: NEVER set allow_pickle to true.
+        np.save(bytes_io, array, allow_pickle=False)
+    return bytes_io.getvalue()
+
+
+def _load(tensor: bytes, count: int) -> list[NDArray]:
+    bytes_io = BytesIO(tensor)
+    return [np.load(bytes_io, allow_pickle=False) for _ in range(count)]
+
+
+def topk_sparsify(update: NDArrays, fraction: float) -> tuple[Parameters, NDArrays]:
+    """Keep the `fraction` of entries with the largest magnitude in each layer.
+
+    Returns the sparse update and the residual, i.e., the dropped entries.
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"The top-k fraction must be in (0, 1], got {fraction}.")
+    tensors: list[bytes] = []
+    residual: NDArrays = []
+    for layer in update:
+        flat = layer.reshape(-1)
+        num_kept = min(flat.size, int(np.ceil(fraction * flat.size)))
+        indices = np.argpartition(np.abs(flat), flat.size - num_kept)[
+            flat.size - num_kept :
+        ]
+        indices.sort()
+        index_dtype = np.uint32 if flat.size <= np.iinfo(np.uint32).max else np.uint64
+        tensors.append(
+            _save(np.array(layer.shape), indices.astype(index_dtype), flat[indices])
+        )
+        rest = flat.copy()
+        rest[indices] = 0
+        residual.append(rest.reshape(layer.shape))
+    return Parameters(tensors=tensors, tensor_type=SType.NUMPY_TOPK), residual
+
+
+def iter_sparse_layers(
+    parameters: Parameters,
+) -> Iterator[tuple[tuple[int, ...], NDArray, NDArray]]:
+    """Yield the shape, flat indices and values of each layer of a sparse update."""
+    for tensor in parameters.tensors:
+        shape, indices, values = _load(tensor, 3)
+        yield tuple(int(dim) for dim in shape), indices, values
+
+
+def quantize(update: NDArrays, bits: int) -> tuple[Parameters, NDArrays]:
+    """Quantize each layer uniformly to `bits` bits per entry.
+
+    Returns the quantized update and the residual, i.e., the quantization error.
+    """
+    if not 1 <= bits <= 8:
+        raise ValueError(f"The number of bits must be in [1, 8], got {bits}.")
+    num_levels = (1 << bits) - 1
+    tensors: list[bytes] = []
+    residual: NDArrays = []
+    for layer in update:
+        flat = layer.reshape(-1)
+        minimum = float(flat.min()) if flat.size > 0 else 0.0
+        maximum = float(flat.max()) if flat.size > 0 else 0.0
+        step = (maximum - minimum) / num_levels if maximum > minimum else 1.0
+        levels = np.rint((flat - minimum) / step).astype(np.uint8)
+        if bits < 8:
+            # Keep the lowest `bits` bits of each level
+            levels_bits = np.unpackbits(levels.reshape(-1, 1), axis=1)[:, 8 - bits :]
+            packed = np.packbits(levels_bits)
+        else:
+            packed = levels
+        tensors.append(
+            _save(
+                np.array(layer.shape),
+                np.array([minimum, step, bits], dtype=np.float64),
+                packed,
+            )
+        )
+        dequantized = (levels * step + minimum).astype(flat.dtype)
+        residual.append((flat - dequantized).reshape(layer.shape))
+    return Parameters(tensors=tensors, tensor_type=SType.NUMPY_QUANTIZED), residual
+
+
+def iter_dequantized_layers(parameters: Parameters) -> Iterator[NDArray]:
+    """Yield the dense layers of a quantized update."""
+    for tensor in parameters.tensors:
+        shape, (minimum, step, bits), packed = _load(tensor, 3)
+        size = int(np.prod(shape))
+        if int(bits) < 8:
+            # Restore the highest `8 - bits` bits of each level as zeros
+            levels_bits = np.unpackbits(packed)[: size * int(bits)]
+            levels_bits = levels_bits.reshape(size, int(bits))
+            levels_bits = np.pad(levels_bits, ((0, 0), (8 - int(bits), 0)))
+            levels = np.packbits(levels_bits, axis=1).reshape(-1)
+        else:
+            levels = packed
+        yield (levels * step + minimum).reshape(tuple(int(dim) for dim in shape))
+
+
+def read_quantized_layer_shape(tensor: bytes) -> tuple[int, ...]:
+    """Return the shape of a quantized layer without dequantizing it.
+
+    The encoding of the layer is validated, so that dequantizing it cannot fail. Raises
+    a ValueError if it is invalid.
+    """
+    bytes_io = BytesIO(tensor)
+    shape, params = (np.load(bytes_io, allow_pickle=False) for _ in range(2))
+    if (
+        shape.ndim != 1
+        or shape.dtype.kind not in "iu"
+        or (shape < 0).any()
+        or params.shape != (3,)
+        or not 1 <= params[2] <= 8
+    ):
+        raise ValueError("Invalid quantized layer header.")
+    size, bits = int(np.prod(shape)), int(params[2])
+    num_packed = size if bits == 8 else -(-size * bits // 8)
+    packed_shape, packed_dtype = read_ndarray_header(bytes_io)
+    if (
+        packed_dtype != np.uint8
+        or packed_shape != (num_packed,)
+        or len(tensor) - bytes_io.tell() != num_packed
+    ):
+        raise ValueError("Invalid quantized layer levels.")
+    return tuple(int(dim) for dim in shape)
+
+
+def is_update(parameters: Parameters) -> bool:
+    """Return True if the parameters hold a compressed model update."""
+    return parameters.tensor_type in UPDATE_TENSOR_TYPES
+
+
+def decode_update(parameters: Parameters, received: NDArrays) -> NDArrays:
+    """Return the dense parameters, applying compressed updates to `received`.
+
+    Parameters holding no compressed update are deserialized as they are.
+    """
+    if is_update(parameters) and len(parameters.tensors) != len(received):
+        raise ValueError(
+            f"The update has {len(parameters.tensors)} layers, but "
+            f"{len(received)} were received."
+        )
+    if parameters.tensor_type == SType.NUMPY_TOPK:
+        layers: NDArrays = []
+        for base, (_, indices, values) in zip(received, iter_sparse_layers(parameters)):
+            layer = base.astype(_update_dtype(base))
+            layer.reshape(-1)[indices] += values
+            layers.append(layer)
+        return layers
+    if parameters.tensor_type == SType.NUMPY_QUANTIZED:
+        return [
+            np.add(base, update, dtype=_update_dtype(base))
+            for base, update in zip(received, iter_dequantized_layers(parameters))
+        ]
+    return parameters_to_ndarrays(parameters)
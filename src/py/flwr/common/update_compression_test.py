@@ -0,0 +1,126 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the compression of model updates."""
+
+
+import numpy as np
+import pytest
+
+from .constant import SType
+from .parameter import ndarrays_to_parameters, parameters_to_ndarrays
+from .typing import NDArrays
+from .update_compression import (
+    compute_update,
+    decode_update,
+    is_update,
+    iter_dequantized_layers,
+    iter_sparse_layers,
+    quantize,
+    topk_sparsify,
+)
+
+
+def _make_update() -> NDArrays:
+    rng = np.random.default_rng(0)
+    return [
+        rng.normal(size=(20, 10)).astype(np.float32),
+        rng.normal(size=7),
+        np.zeros((0,), dtype=np.float32),
+    ]
+
+
+def test_topk_sparsify() -> None:
+    """Test that top-k keeps the largest entries and returns the rest."""
+    # Prepare
+    update = _make_update()
+
+    # Execute
+    parameters, residual = topk_sparsify(update, 0.1)
+    layers = list(iter_sparse_layers(parameters))
+
+    # Assert
+    assert parameters.tensor_type == SType.NUMPY_TOPK
+    assert [len(indices) for _, indices, _ in layers] == [20, 1, 0]
+    for layer, layer_residual, (shape, indices, values) in zip(
+        update, residual, layers
+    ):
+        assert shape == layer.shape
+        dense = np.zeros(layer.size, dtype=values.dtype)
+        dense[indices] = values
+        np.testing.assert_array_equal(dense.reshape(shape) + layer_residual, layer)
+        if indices.size > 0:
+            kept = np.abs(values).min()
+            assert np.all(np.abs(layer_residual) <= kept)
+
+
+@pytest.mark.parametrize("bits", [1, 2, 4, 7, 8])
+def test_quantize(bits: int) -> None:
+    """Test that dequantized updates and the residual restore the update."""
+    # Prepare
+    update = _make_update()
+
+    # Execute
+    parameters, residual = quantize(update, bits)
+    dequantized = list(iter_dequantized_layers(parameters))
+
+    # Assert
+    assert parameters.tensor_type == SType.NUMPY_QUANTIZED
+    assert len(parameters.tensors[0]) < update[0].nbytes * bits / 32 + 512
+    for layer, layer_residual, layer_dequantized in zip(update, residual, dequantized):
+        assert layer_dequantized.shape == layer.shape
+        step = (layer.max() - layer.min()) / ((1 << bits) - 1) if layer.size else 0
+        assert np.all(np.abs(layer - layer_dequantized) <= step / 2 + 1e-6)
+        np.testing.assert_allclose(layer_dequantized + layer_residual, layer, atol=1e-6)
+
+
+@pytest.mark.parametrize("bits", [0, 9])
+def test_quantize_invalid_bits(bits: int) -> None:
+    """Test that the number of bits must be in [1, 8]."""
+    with pytest.raises(ValueError):
+        quantize(_make_update(), bits)
+
+
+def test_decode_update() -> None:
+    """Test that decoding applies the update to the received parameters."""
+    # Prepare
+    received: NDArrays = [np.ones((20, 10), dtype=np.float32), np.ones(7), np.ones(0)]
+    local = [layer + update for layer, update in zip(received, _make_update())]
+    update = compute_update(local, received)
+    sparse, _ = topk_sparsify(update, 1.0)
+
+    # Execute
+    decoded = decode_update(sparse, received)
+
+    # Assert
+    assert is_update(sparse)
+    assert not is_update(ndarrays_to_parameters(local))
+    for expected, actual in zip(local, decoded):
+        np.testing.assert_allclose(actual, expected)
+    for expected, actual in zip(
+        local, decode_update(ndarrays_to_parameters(local), [])
+    ):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_parameters_to_ndarrays_rejects_updates() -> None:
+    """Test that compressed updates can't be deserialized as parameters."""
+    # Prepare
+    sparse, _ = topk_sparsify(_make_update(), 0.1)
+    quantized, _ = quantize(_make_update(), 8)
+
+    # Execute & Assert
+    for parameters in [sparse, quantized]:
+        with pytest.raises(ValueError):
+            parameters_to_ndarrays(parameters)
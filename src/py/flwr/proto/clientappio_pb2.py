@@ -17,29 +17,29 @@ from flwr.proto import run_pb2 as flwr_dot_proto_dot_run__pb2
 from flwr.proto import message_pb2 as flwr_dot_proto_dot_message__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1c\x66lwr/proto/clientappio.proto\x12\nflwr.proto\x1a\x14\x66lwr/proto/fab.proto\x1a\x14\x66lwr/proto/run.proto\x1a\x18\x66lwr/proto/message.proto\"W\n\x15\x43lientAppOutputStatus\x12-\n\x04\x63ode\x18\x01 \x01(\x0e\x32\x1f.flwr.proto.ClientAppOutputCode\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x11\n\x0fGetTokenRequest\"!\n\x10GetTokenResponse\x12\r\n\x05token\x18\x01 \x01(\x04\"+\n\x1aPullClientAppInputsRequest\x12\r\n\x05token\x18\x01 \x01(\x04\"\xa5\x01\n\x1bPullClientAppInputsResponse\x12$\n\x07message\x18\x01 \x01(\x0b\x32\x13.flwr.proto.Message\x12$\n\x07\x63ontext\x18\x02 \x01(\x0b\x32\x13.flwr.proto.Context\x12\x1c\n\x03run\x18\x03 \x01(\x0b\x32\x0f.flwr.proto.Run\x12\x1c\n\x03\x66\x61\x62\x18\x04 \x01(\x0b\x32\x0f.flwr.proto.Fab\"x\n\x1bPushClientAppOutputsRequest\x12\r\n\x05token\x18\x01 \x01(\x04\x12$\n\x07message\x18\x02 \x01(\x0b\x32\x13.flwr.proto.Message\x12$\n\x07\x63ontext\x18\x03 \x01(\x0b\x32\x13.flwr.proto.Context\"Q\n\x1cPushClientAppOutputsResponse\x12\x31\n\x06status\x18\x01 \x01(\x0b\x32!.flwr.proto.ClientAppOutputStatus*L\n\x13\x43lientAppOutputCode\x12\x0b\n\x07SUCCESS\x10\x00\x12\x15\n\x11\x44\x45\x41\x44LINE_EXCEEDED\x10\x01\x12\x11\n\rUNKNOWN_ERROR\x10\x02\x32\xad\x02\n\x0b\x43lientAppIo\x12G\n\x08GetToken\x12\x1b.flwr.proto.GetTokenRequest\x1a\x1c.flwr.proto.GetTokenResponse\"\x00\x12h\n\x13PullClientAppInputs\x12&.flwr.proto.PullClientAppInputsRequest\x1a\'.flwr.proto.PullClientAppInputsResponse\"\x00\x12k\n\x14PushClientAppOutputs\x12\'.flwr.proto.PushClientAppOutputsRequest\x1a(.flwr.proto.PushClientAppOutputsResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1c\x66lwr/proto/clientappio.proto\x12\nflwr.proto\x1a\x14\x66lwr/proto/fab.proto\x1a\x14\x66lwr/proto/run.proto\x1a\x18\x66lwr/proto/message.proto\"W\n\x15\x43lientAppOutputStatus\x12-\n\x04\x63ode\x18\x01 \x01(\x0e\x32\x1f.flwr.proto.ClientAppOutputCode\x12\x0f\n\x07message\x18\x02 \x01(\t\"\"\n\x0fGetTokenRequest\x12\x0f\n\x07timeout\x18\x01 \x01(\x01\"!\n\x10GetTokenResponse\x12\r\n\x05token\x18\x01 \x01(\x04\"+\n\x1aPullClientAppInputsRequest\x12\r\n\x05token\x18\x01 \x01(\x04\"\xa5\x01\n\x1bPullClientAppInputsResponse\x12$\n\x07message\x18\x01 \x01(\x0b\x32\x13.flwr.proto.Message\x12$\n\x07\x63ontext\x18\x02 \x01(\x0b\x32\x13.flwr.proto.Context\x12\x1c\n\x03run\x18\x03 \x01(\x0b\x32\x0f.flwr.proto.Run\x12\x1c\n\x03\x66\x61\x62\x18\x04 \x01(\x0b\x32\x0f.flwr.proto.Fab\"x\n\x1bPushClientAppOutputsRequest\x12\r\n\x05token\x18\x01 \x01(\x04\x12$\n\x07message\x18\x02 \x01(\x0b\x32\x13.flwr.proto.Message\x12$\n\x07\x63ontext\x18\x03 \x01(\x0b\x32\x13.flwr.proto.Context\"Q\n\x1cPushClientAppOutputsResponse\x12\x31\n\x06status\x18\x01 \x01(\x0b\x32!.flwr.proto.ClientAppOutputStatus*L\n\x13\x43lientAppOutputCode\x12\x0b\n\x07SUCCESS\x10\x00\x12\x15\n\x11\x44\x45\x41\x44LINE_EXCEEDED\x10\x01\x12\x11\n\rUNKNOWN_ERROR\x10\x02\x32\xad\x02\n\x0b\x43lientAppIo\x12G\n\x08GetToken\x12\x1b.flwr.proto.GetTokenRequest\x1a\x1c.flwr.proto.GetTokenResponse\"\x00\x12h\n\x13PullClientAppInputs\x12&.flwr.proto.PullClientAppInputsRequest\x1a\'.flwr.proto.PullClientAppInputsResponse\"\x00\x12k\n\x14PushClientAppOutputs\x12\'.flwr.proto.PushClientAppOutputsRequest\x1a(.flwr.proto.PushClientAppOutputsResponse\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'flwr.proto.clientappio_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
-  _globals['_CLIENTAPPOUTPUTCODE']._serialized_start=675
-  _globals['_CLIENTAPPOUTPUTCODE']._serialized_end=751
+  _globals['_CLIENTAPPOUTPUTCODE']._serialized_start=692
+  _globals['_CLIENTAPPOUTPUTCODE']._serialized_end=768
   _globals['_CLIENTAPPOUTPUTSTATUS']._serialized_start=114
   _globals['_CLIENTAPPOUTPUTSTATUS']._serialized_end=201
   _globals['_GETTOKENREQUEST']._serialized_start=203
-  _globals['_GETTOKENREQUEST']._serialized_end=220
-  _globals['_GETTOKENRESPONSE']._serialized_start=222
-  _globals['_GETTOKENRESPONSE']._serialized_end=255
-  _globals['_PULLCLIENTAPPINPUTSREQUEST']._serialized_start=257
-  _globals['_PULLCLIENTAPPINPUTSREQUEST']._serialized_end=300
-  _globals['_PULLCLIENTAPPINPUTSRESPONSE']._serialized_start=303
-  _globals['_PULLCLIENTAPPINPUTSRESPONSE']._serialized_end=468
-  _globals['_PUSHCLIENTAPPOUTPUTSREQUEST']._serialized_start=470
-  _globals['_PUSHCLIENTAPPOUTPUTSREQUEST']._serialized_end=590
-  _globals['_PUSHCLIENTAPPOUTPUTSRESPONSE']._serialized_start=592
-  _globals['_PUSHCLIENTAPPOUTPUTSRESPONSE']._serialized_end=673
-  _globals['_CLIENTAPPIO']._serialized_start=754
-  _globals['_CLIENTAPPIO']._serialized_end=1055
+  _globals['_GETTOKENREQUEST']._serialized_end=237
+  _globals['_GETTOKENRESPONSE']._serialized_start=239
+  _globals['_GETTOKENRESPONSE']._serialized_end=272
+  _globals['_PULLCLIENTAPPINPUTSREQUEST']._serialized_start=274
+  _globals['_PULLCLIENTAPPINPUTSREQUEST']._serialized_end=317
+  _globals['_PULLCLIENTAPPINPUTSRESPONSE']._serialized_start=320
+  _globals['_PULLCLIENTAPPINPUTSRESPONSE']._serialized_end=485
+  _globals['_PUSHCLIENTAPPOUTPUTSREQUEST']._serialized_start=487
+  _globals['_PUSHCLIENTAPPOUTPUTSREQUEST']._serialized_end=607
+  _globals['_PUSHCLIENTAPPOUTPUTSRESPONSE']._serialized_start=609
+  _globals['_PUSHCLIENTAPPOUTPUTSRESPONSE']._serialized_end=690
+  _globals['_CLIENTAPPIO']._serialized_start=771
+  _globals['_CLIENTAPPIO']._serialized_end=1072
 # @@protoc_insertion_point(module_scope)
@@ -47,8 +47,13 @@ global___ClientAppOutputStatus = ClientAppOutputStatus
 
 class GetTokenRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    TIMEOUT_FIELD_NUMBER: builtins.int
+    timeout: builtins.float
     def __init__(self,
+        *,
+        timeout: builtins.float = ...,
         ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["timeout",b"timeout"]) -> None: ...
 global___GetTokenRequest = GetTokenRequest
 
 class GetTokenResponse(google.protobuf.message.Message):
@@ -40,14 +40,35 @@ global___GetNodesResponse = GetNodesResponse
 class PushTaskInsRequest(google.protobuf.message.Message):
     """PushTaskIns messages"""
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    class ParametersRecordsEntry(google.protobuf.message.Message):
+        DESCRIPTOR: google.protobuf.descriptor.Descriptor
+        KEY_FIELD_NUMBER: builtins.int
+        VALUE_FIELD_NUMBER: builtins.int
+        key: typing.Text
+        value: builtins.bytes
+        def __init__(self,
+            *,
+            key: typing.Text = ...,
+            value: builtins.bytes = ...,
+            ) -> None: ...
+        def ClearField(self, field_name: typing_extensions.Literal["key",b"key","value",b"value"]) -> None: ...
+
     TASK_INS_LIST_FIELD_NUMBER: builtins.int
+    PARAMETERS_RECORDS_FIELD_NUMBER: builtins.int
     @property
     def task_ins_list(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[flwr.proto.task_pb2.TaskIns]: ...
+    @property
+    def parameters_records(self) -> google.protobuf.internal.containers.ScalarMap[typing.Text, builtins.bytes]:
+        """Serialized ParametersRecords referenced by several TaskIns, keyed by their
+        sha256 hash (see `Task.parameters_refs`)
+        """
+        pass
     def __init__(self,
         *,
         task_ins_list: typing.Optional[typing.Iterable[flwr.proto.task_pb2.TaskIns]] = ...,
+        parameters_records: typing.Optional[typing.Mapping[typing.Text, builtins.bytes]] = ...,
         ) -> None: ...
-    def ClearField(self, field_name: typing_extensions.Literal["task_ins_list",b"task_ins_list"]) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["parameters_records",b"parameters_records","task_ins_list",b"task_ins_list"]) -> None: ...
 global___PushTaskInsRequest = PushTaskInsRequest
 
 class PushTaskInsResponse(google.protobuf.message.Message):
@@ -67,17 +88,22 @@ class PullTaskResRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     NODE_FIELD_NUMBER: builtins.int
     TASK_IDS_FIELD_NUMBER: builtins.int
+    TIMEOUT_FIELD_NUMBER: builtins.int
     @property
     def node(self) -> flwr.proto.node_pb2.Node: ...
     @property
     def task_ids(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text]: ...
+    timeout: builtins.float
+    """Max. time (in seconds) to wait for results if none are available yet"""
+
     def __init__(self,
         *,
         node: typing.Optional[flwr.proto.node_pb2.Node] = ...,
         task_ids: typing.Optional[typing.Iterable[typing.Text]] = ...,
+        timeout: builtins.float = ...,
         ) -> None: ...
     def HasField(self, field_name: typing_extensions.Literal["node",b"node"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing_extensions.Literal["node",b"node","task_ids",b"task_ids"]) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["node",b"node","task_ids",b"task_ids","timeout",b"timeout"]) -> None: ...
 global___PullTaskResRequest = PullTaskResRequest
 
 class PullTaskResResponse(google.protobuf.message.Message):
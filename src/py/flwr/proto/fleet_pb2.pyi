@@ -91,17 +91,24 @@ class PullTaskInsRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     NODE_FIELD_NUMBER: builtins.int
     TASK_IDS_FIELD_NUMBER: builtins.int
+    TIMEOUT_FIELD_NUMBER: builtins.int
     @property
     def node(self) -> flwr.proto.node_pb2.Node: ...
     @property
     def task_ids(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text]: ...
+    timeout: builtins.float
+    """Max. time (in seconds) the server may hold the request until a TaskIns
+    for this node becomes available. If unset, the request returns immediately.
+    """
+
     def __init__(self,
         *,
         node: typing.Optional[flwr.proto.node_pb2.Node] = ...,
         task_ids: typing.Optional[typing.Iterable[typing.Text]] = ...,
+        timeout: builtins.float = ...,
         ) -> None: ...
     def HasField(self, field_name: typing_extensions.Literal["node",b"node"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing_extensions.Literal["node",b"node","task_ids",b"task_ids"]) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["node",b"node","task_ids",b"task_ids","timeout",b"timeout"]) -> None: ...
 global___PullTaskInsRequest = PullTaskInsRequest
 
 class PullTaskInsResponse(google.protobuf.message.Message):
@@ -164,6 +171,50 @@ class PushTaskResResponse(google.protobuf.message.Message):
     def ClearField(self, field_name: typing_extensions.Literal["reconnect",b"reconnect","results",b"results"]) -> None: ...
 global___PushTaskResResponse = PushTaskResResponse
 
+class PullTaskInsChunk(google.protobuf.message.Message):
+    """Chunked PullTaskIns/PushTaskRes messages: the first chunk holds the
+    response/request with the data of all its Arrays removed and the length
+    of each Array's data, all chunks hold consecutive parts of that data
+    """
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    HEADER_FIELD_NUMBER: builtins.int
+    DATA_LENGTHS_FIELD_NUMBER: builtins.int
+    DATA_FIELD_NUMBER: builtins.int
+    @property
+    def header(self) -> global___PullTaskInsResponse: ...
+    @property
+    def data_lengths(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]: ...
+    data: builtins.bytes
+    def __init__(self,
+        *,
+        header: typing.Optional[global___PullTaskInsResponse] = ...,
+        data_lengths: typing.Optional[typing.Iterable[builtins.int]] = ...,
+        data: builtins.bytes = ...,
+        ) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["header",b"header"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["data",b"data","data_lengths",b"data_lengths","header",b"header"]) -> None: ...
+global___PullTaskInsChunk = PullTaskInsChunk
+
+class PushTaskResChunk(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    HEADER_FIELD_NUMBER: builtins.int
+    DATA_LENGTHS_FIELD_NUMBER: builtins.int
+    DATA_FIELD_NUMBER: builtins.int
+    @property
+    def header(self) -> global___PushTaskResRequest: ...
+    @property
+    def data_lengths(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]: ...
+    data: builtins.bytes
+    def __init__(self,
+        *,
+        header: typing.Optional[global___PushTaskResRequest] = ...,
+        data_lengths: typing.Optional[typing.Iterable[builtins.int]] = ...,
+        data: builtins.bytes = ...,
+        ) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["header",b"header"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["data",b"data","data_lengths",b"data_lengths","header",b"header"]) -> None: ...
+global___PushTaskResChunk = PushTaskResChunk
+
 class Reconnect(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     RECONNECT_FIELD_NUMBER: builtins.int
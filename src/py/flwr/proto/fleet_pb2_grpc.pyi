@@ -7,6 +7,7 @@ import flwr.proto.fab_pb2
 import flwr.proto.fleet_pb2
 import flwr.proto.run_pb2
 import grpc
+import typing
 
 class FleetStub:
     def __init__(self, channel: grpc.Channel) -> None: ...
@@ -38,6 +39,16 @@ class FleetStub:
     HTTP API path: /api/v1/fleet/push-task-res
     """
 
+    PullTaskInsStream: grpc.UnaryStreamMultiCallable[
+        flwr.proto.fleet_pb2.PullTaskInsRequest,
+        flwr.proto.fleet_pb2.PullTaskInsChunk]
+    """Retrieve one or more tasks in chunks of bounded size"""
+
+    PushTaskResStream: grpc.StreamUnaryMultiCallable[
+        flwr.proto.fleet_pb2.PushTaskResChunk,
+        flwr.proto.fleet_pb2.PushTaskResResponse]
+    """Complete one or more tasks, sent in chunks of bounded size"""
+
     GetRun: grpc.UnaryUnaryMultiCallable[
         flwr.proto.run_pb2.GetRunRequest,
         flwr.proto.run_pb2.GetRunResponse]
@@ -89,6 +100,22 @@ class FleetServicer(metaclass=abc.ABCMeta):
         """
         pass
 
+    @abc.abstractmethod
+    def PullTaskInsStream(self,
+        request: flwr.proto.fleet_pb2.PullTaskInsRequest,
+        context: grpc.ServicerContext,
+    ) -> typing.Iterator[flwr.proto.fleet_pb2.PullTaskInsChunk]:
+        """Retrieve one or more tasks in chunks of bounded size"""
+        pass
+
+    @abc.abstractmethod
+    def PushTaskResStream(self,
+        request_iterator: typing.Iterator[flwr.proto.fleet_pb2.PushTaskResChunk],
+        context: grpc.ServicerContext,
+    ) -> flwr.proto.fleet_pb2.PushTaskResResponse:
+        """Complete one or more tasks, sent in chunks of bounded size"""
+        pass
+
     @abc.abstractmethod
     def GetRun(self,
         request: flwr.proto.run_pb2.GetRunRequest,
@@ -555,6 +555,9 @@ def _run_fleet_api_rest(
     try:
         import uvicorn
 
+        from flwr.server.superlink.fleet.message_handler.message_handler import (
+            PullTaskInsResources,
+        )
         from flwr.server.superlink.fleet.rest_rere.rest_api import app as fast_api_app
     except ModuleNotFoundError:
         sys.exit(MISSING_EXTRA_REST)
@@ -564,6 +567,7 @@ def _run_fleet_api_rest(
     # See: https://www.starlette.io/applications/#accessing-the-app-instance
     fast_api_app.state.STATE_FACTORY = state_factory
     fast_api_app.state.FFS_FACTORY = ffs_factory
+    fast_api_app.state.PULL_TASK_INS_RESOURCES = PullTaskInsResources()
 
     uvicorn.run(
         app="flwr.server.superlink.fleet.rest_rere.rest_api:app",
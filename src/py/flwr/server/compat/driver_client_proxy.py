@@ -15,18 +15,15 @@
 """Flower ClientProxy implementation for Driver API."""
 
 
-import time
 from typing import Optional
 
 from flwr import common
-from flwr.common import Message, MessageType, MessageTypeLegacy, RecordSet
+from flwr.common import MessageType, MessageTypeLegacy, RecordSet
 from flwr.common import recordset_compat as compat
 from flwr.server.client_proxy import ClientProxy
 
 from ..driver.driver import Driver
 
-SLEEP_TIME = 1
-
 
 class DriverClientProxy(ClientProxy):
     """Flower client proxy which delegates work using the Driver API."""
@@ -131,20 +128,13 @@ class DriverClientProxy(ClientProxy):
         if message_id == "":
             raise ValueError(f"Failed to send message to node {self.node_id}")
 
-        if timeout:
-            start_time = time.time()
-
-        while True:
-            messages = list(self.driver.pull_messages(message_ids))
-            if len(messages) == 1:
-                msg: Message = messages[0]
-                if msg.has_error():
-                    raise ValueError(
-                        f"Message contains an Error (reason: {msg.error.reason}). "
-                        "It originated during client-side execution of a message."
-                    )
-                return msg.content
-
-            if timeout is not None and time.time() > start_time + timeout:
-                raise RuntimeError("Timeout reached")
-            time.sleep(SLEEP_TIME)
+        # Wait for the reply
+        for msg in self.driver.iter_messages(message_ids, timeout=timeout):
+            if msg.has_error():
+                raise ValueError(
+                    f"Message contains an Error (reason: {msg.error.reason}). "
+                    "It originated during client-side execution of a message."
+                )
+            return msg.content
+
+        raise RuntimeError("Timeout reached")
@@ -234,7 +234,7 @@ class DriverClientProxyTestCase(unittest.TestCase):
         res: Union[GetParametersRes, GetPropertiesRes, FitRes, EvaluateRes, None],
         error_reply: bool = False,
     ) -> Callable[[Iterable[Message]], Iterable[str]]:
-        """Get the push_messages function that sets the return value of pull_messages
+        """Get the push_messages function that sets the return value of iter_messages
         when called."""
 
         def push_messages(messages: Iterable[Message]) -> Iterable[str]:
@@ -256,8 +256,8 @@ class DriverClientProxyTestCase(unittest.TestCase):
                 ret = msg.create_reply(recordset)
             ret.metadata.__dict__["_message_id"] = REPLY_MESSAGE_ID
 
-            # Set the return value of `pull_messages`
-            self.driver.pull_messages.return_value = [ret]
+            # Set the return value of `iter_messages`
+            self.driver.iter_messages.return_value = iter([ret])
             return [INSTRUCTION_MESSAGE_ID]
 
         return push_messages
@@ -282,11 +282,13 @@ class DriverClientProxyTestCase(unittest.TestCase):
         except AssertionError:
             self.driver.push_messages.assert_any_call(messages=[self.created_msg])
 
-        # Check if pull_messages is called once with expected args/kwargs.
-        self.driver.pull_messages.assert_called_once()
+        # Check if iter_messages is called once with expected args/kwargs.
+        self.driver.iter_messages.assert_called_once()
         try:
-            self.driver.pull_messages.assert_called_with([INSTRUCTION_MESSAGE_ID])
+            self.driver.iter_messages.assert_called_with(
+                [INSTRUCTION_MESSAGE_ID], timeout=None
+            )
         except AssertionError:
-            self.driver.pull_messages.assert_called_with(
-                message_ids=[INSTRUCTION_MESSAGE_ID]
+            self.driver.iter_messages.assert_called_with(
+                message_ids=[INSTRUCTION_MESSAGE_ID], timeout=None
             )
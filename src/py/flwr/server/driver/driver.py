@@ -15,8 +15,9 @@
 """Driver (abstract base class)."""
 
 
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from typing import Optional
 
 from flwr.common import Message, RecordSet
@@ -145,3 +146,44 @@ class Driver(ABC):
         replies for all sent messages. A message remains valid until its TTL,
         which is not affected by `timeout`.
         """
+
+    def iter_messages(
+        self,
+        message_ids: Iterable[str],
+        *,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Message]:
+        """Yield reply messages as soon as they are received.
+
+        This method waits for the replies to the given message IDs and yields each
+        reply as soon as it has been pulled, so that it can be processed while other
+        replies are still pending. It stops once all replies are received or the
+        specified timeout duration is exceeded.
+
+        Parameters
+        ----------
+        message_ids : Iterable[str]
+            An iterable of IDs of messages previously sent via `push_messages`.
+        timeout : Optional[float] (default: None)
+            The timeout duration in seconds. If specified, the method will wait for
+            replies for this duration. If `None`, there is no time limit and the method
+            will wait until replies for all messages are received.
+
+        Returns
+        -------
+        replies : Iterator[Message]
+            An iterator over the reply messages received from the SuperLink.
+
+        Notes
+        -----
+        The default implementation periodically calls `pull_messages`.
+        """
+        msg_ids = set(message_ids)
+        end_time = time.time() + (timeout if timeout is not None else 0.0)
+        while msg_ids and (timeout is None or time.time() < end_time):
+            for msg in self.pull_messages(msg_ids):
+                msg_ids.discard(msg.metadata.reply_to_message)
+                yield msg
+            if msg_ids:
+                # Sleep
+                time.sleep(3)
@@ -14,21 +14,25 @@
 # ==============================================================================
 """Flower gRPC Driver."""
 
+import hashlib
 import time
 import warnings
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Iterable, Iterator
 from logging import DEBUG, WARNING
 from typing import Optional, cast
 
 import grpc
 
 from flwr.common import DEFAULT_TTL, Message, Metadata, RecordSet
-from flwr.common.constant import DRIVER_API_DEFAULT_ADDRESS
+from flwr.common.constant import DRIVER_API_DEFAULT_ADDRESS, LONG_POLL_MAX_TIMEOUT
 from flwr.common.grpc import create_channel
 from flwr.common.logger import log
+from flwr.common.record.codec import get_array_codecs
 from flwr.common.serde import (
     message_from_taskres,
     message_to_taskins,
+    parameters_record_to_proto,
     user_config_from_proto,
 )
 from flwr.common.typing import Run
@@ -209,18 +213,24 @@ class GrpcDriver(Driver):
         to the node specified in `dst_node_id`.
         """
         self._init_run()
+        messages = list(messages)
+        # Serialize ParametersRecords shared by several messages (e.g., the global
+        # model) only once, the SuperLink resolves references to them
+        parameters_records, refs = _serialize_shared_parameters_records(messages)
         # Construct TaskIns
         task_ins_list: list[TaskIns] = []
         for msg in messages:
             # Check message
             self._check_message(msg)
             # Convert Message to TaskIns
-            taskins = message_to_taskins(msg)
+            taskins = _message_to_taskins(msg, refs)
             # Add to list
             task_ins_list.append(taskins)
         # Call GrpcDriverStub method
         res: PushTaskInsResponse = self._stub.PushTaskIns(
-            PushTaskInsRequest(task_ins_list=task_ins_list)
+            PushTaskInsRequest(
+                task_ins_list=task_ins_list, parameters_records=parameters_records
+            )
         )
         return list(res.task_ids)
 
@@ -239,6 +249,42 @@ class GrpcDriver(Driver):
         msgs = [message_from_taskres(taskres) for taskres in res.task_res_list]
         return msgs
 
+    def iter_messages(
+        self,
+        message_ids: Iterable[str],
+        *,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Message]:
+        """Yield reply messages as soon as they are received.
+
+        Instead of polling, each `PullTaskRes` request is held by the SuperLink until
+        at least one reply is available (or the request times out).
+        """
+        self._init_run()
+        msg_ids = set(message_ids)
+        end_time = time.time() + (timeout if timeout is not None else 0.0)
+        while msg_ids:
+            remaining = (
+                LONG_POLL_MAX_TIMEOUT if timeout is None else end_time - time.time()
+            )
+            if remaining <= 0:
+                break
+            pull_timeout = min(remaining, LONG_POLL_MAX_TIMEOUT)
+            pulled_at = time.time()
+            res: PullTaskResResponse = self._stub.PullTaskRes(
+                PullTaskResRequest(
+                    node=self.node, task_ids=msg_ids, timeout=pull_timeout
+                )
+            )
+            if len(res.task_res_list) == 0 and time.time() - pulled_at < pull_timeout:
+                # The SuperLink did not hold the request (e.g., it does not
+                # support long-polling), fall back to polling
+                time.sleep(3)
+            for taskres in res.task_res_list:
+                msg = message_from_taskres(taskres)
+                msg_ids.discard(msg.metadata.reply_to_message)
+                yield msg
+
     def send_and_receive(
         self,
         messages: Iterable[Message],
@@ -252,22 +298,10 @@ class GrpcDriver(Driver):
         received or the specified timeout duration is exceeded.
         """
         # Push messages
-        msg_ids = set(self.push_messages(messages))
+        msg_ids = self.push_messages(messages)
 
         # Pull messages
-        end_time = time.time() + (timeout if timeout is not None else 0.0)
-        ret: list[Message] = []
-        while timeout is None or time.time() < end_time:
-            res_msgs = self.pull_messages(msg_ids)
-            ret.extend(res_msgs)
-            msg_ids.difference_update(
-                {msg.metadata.reply_to_message for msg in res_msgs}
-            )
-            if len(msg_ids) == 0:
-                break
-            # Sleep
-            time.sleep(3)
-        return ret
+        return list(self.iter_messages(msg_ids, timeout=timeout))
 
     def close(self) -> None:
         """Disconnect from the SuperLink if connected."""
@@ -276,3 +310,76 @@ class GrpcDriver(Driver):
             return
         # Disconnect
         self._disconnect()
+
+
+_RecordKey = tuple[int, tuple[str, ...]]
+
+
+def _record_keys(message: Message) -> dict[str, _RecordKey]:
+    """Identify each ParametersRecord of a message together with its codecs."""
+    codecs = tuple(get_array_codecs(message.content))
+    return {
+        name: (id(record), codecs)
+        for name, record in message.content.parameters_records.items()
+    }
+
+
+def _serialize_shared_parameters_records(
+    messages: list[Message],
+) -> tuple[dict[str, bytes], dict[_RecordKey, str]]:
+    """Serialize the ParametersRecords found in more than one message.
+
+    Returns the serialized records keyed by their sha256 hash and a mapping from
+    the `id` of each shared record and the codecs encoding it to its hash.
+    """
+    keys = [_record_keys(msg) for msg in messages if msg.has_content()]
+    counts = Counter(key for msg_keys in keys for key in set(msg_keys.values()))
+    records = {
+        id(record): record
+        for msg in messages
+        if msg.has_content()
+        for record in msg.content.parameters_records.values()
+    }
+    parameters_records: dict[str, bytes] = {}
+    refs: dict[_RecordKey, str] = {}
+    for msg_keys in keys:
+        for key in msg_keys.values():
+            if counts[key] < 2 or key in refs:
+                continue
+            record_id, codecs = key
+            proto = parameters_record_to_proto(records[record_id], codecs)
+            content = proto.SerializeToString()
+            ref = hashlib.sha256(content).hexdigest()
+            parameters_records[ref] = content
+            refs[key] = ref
+    return parameters_records, refs
+
+
+def _message_to_taskins(message: Message, refs: dict[_RecordKey, str]) -> TaskIns:
+    """Convert a Message to TaskIns, replacing shared ParametersRecords by refs."""
+    if not message.has_content():
+        return message_to_taskins(message)
+
+    content = message.content
+    shared = {
+        name: refs[key] for name, key in _record_keys(message).items() if key in refs
+    }
+    if not shared:
+        return message_to_taskins(message)
+
+    # Serialize the message without the shared records
+    message.content = RecordSet(
+        parameters_records={
+            name: record
+            for name, record in content.parameters_records.items()
+            if name not in shared
+        },
+        metrics_records=dict(content.metrics_records),
+        configs_records=dict(content.configs_records),
+    )
+    try:
+        taskins = message_to_taskins(message)
+    finally:
+        message.content = content
+    taskins.task.parameters_refs.update(shared)
+    return taskins
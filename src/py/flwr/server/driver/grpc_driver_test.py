@@ -15,13 +15,27 @@
 """Tests for driver SDK."""
 
 
+import hashlib
 import time
 import unittest
+from collections import OrderedDict
 from unittest.mock import Mock, patch
 
-from flwr.common import DEFAULT_TTL, RecordSet
+import numpy as np
+
+from flwr.common import (
+    DEFAULT_TTL,
+    ConfigsRecord,
+    ParametersRecord,
+    RecordSet,
+    array_from_numpy,
+)
 from flwr.common.message import Error
-from flwr.common.serde import error_to_proto, recordset_to_proto
+from flwr.common.serde import (
+    error_to_proto,
+    parameters_record_to_proto,
+    recordset_to_proto,
+)
 from flwr.proto.driver_pb2 import (  # pylint: disable=E0611
     GetNodesRequest,
     PullTaskResRequest,
@@ -105,6 +119,42 @@ class TestGrpcDriver(unittest.TestCase):
         for task_ins in args[0].task_ins_list:
             self.assertEqual(task_ins.run_id, 61016)
 
+    def test_push_messages_shared_parameters_record(self) -> None:
+        """Test that a ParametersRecord shared by all messages is sent once."""
+        # Prepare
+        self.mock_stub.PushTaskIns.return_value = Mock(task_ids=["id1", "id2"])
+        shared = ParametersRecord(OrderedDict({"w": array_from_numpy(np.ones(3))}))
+        own = ParametersRecord(OrderedDict({"b": array_from_numpy(np.zeros(2))}))
+        msgs = [
+            self.driver.create_message(
+                RecordSet(
+                    parameters_records={"global": shared, "own": own},
+                    configs_records={"config": ConfigsRecord({"lr": 0.1})},
+                ),
+                "",
+                node_id,
+                "",
+                DEFAULT_TTL,
+            )
+            for node_id in [1, 2]
+        ]
+        msgs[1].content.parameters_records["own"] = ParametersRecord()
+        content = parameters_record_to_proto(shared).SerializeToString()
+        ref = hashlib.sha256(content).hexdigest()
+
+        # Execute
+        self.driver.push_messages(msgs)
+        request = self.mock_stub.PushTaskIns.call_args[0][0]
+
+        # Assert
+        self.assertEqual(dict(request.parameters_records), {ref: content})
+        for msg, task_ins in zip(msgs, request.task_ins_list):
+            self.assertEqual(dict(task_ins.task.parameters_refs), {"global": ref})
+            self.assertEqual(set(task_ins.task.recordset.parameters), {"own"})
+            self.assertEqual(set(task_ins.task.recordset.configs), {"config"})
+            # The messages themselves are left untouched
+            self.assertIs(msg.content.parameters_records["global"], shared)
+
     def test_push_messages_invalid(self) -> None:
         """Test pushing invalid messages."""
         # Prepare
@@ -189,6 +239,49 @@ class TestGrpcDriver(unittest.TestCase):
         self.assertLess(time.time() - start_time, 0.2)
         self.assertEqual(len(ret_msgs), 0)
 
+    def test_iter_messages_long_polling(self) -> None:
+        """Test that replies are pulled with long-polling requests."""
+        # Prepare
+        error_proto = error_to_proto(Error(code=0))
+        self.mock_stub.PullTaskRes.side_effect = [
+            Mock(task_res_list=[TaskRes(task=Task(ancestry=[id_], error=error_proto))])
+            for id_ in ["id1", "id2"]
+        ]
+
+        # Execute
+        with patch("time.sleep") as mock_sleep:
+            ret_msgs = list(self.driver.iter_messages(["id1", "id2"], timeout=10))
+
+        # Assert
+        mock_sleep.assert_not_called()
+        self.assertEqual(self.mock_stub.PullTaskRes.call_count, 2)
+        request = self.mock_stub.PullTaskRes.call_args[0][0]
+        self.assertGreater(request.timeout, 0)
+        self.assertLessEqual(request.timeout, 10)
+        self.assertEqual(list(request.task_ids), ["id2"])
+        self.assertEqual(
+            [msg.metadata.reply_to_message for msg in ret_msgs], ["id1", "id2"]
+        )
+
+    def test_iter_messages_fallback_to_polling(self) -> None:
+        """Test polling if the SuperLink does not hold the request."""
+        # Prepare
+        error_proto = error_to_proto(Error(code=0))
+        self.mock_stub.PullTaskRes.side_effect = [
+            Mock(task_res_list=[]),
+            Mock(
+                task_res_list=[TaskRes(task=Task(ancestry=["id1"], error=error_proto))]
+            ),
+        ]
+
+        # Execute
+        with patch("time.sleep") as mock_sleep:
+            ret_msgs = list(self.driver.iter_messages(["id1"], timeout=10))
+
+        # Assert
+        mock_sleep.assert_called_once()
+        self.assertEqual(len(ret_msgs), 1)
+
     def test_del_with_initialized_driver(self) -> None:
         """Test cleanup behavior when Driver is initialized."""
         # Execute
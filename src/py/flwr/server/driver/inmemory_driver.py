@@ -17,15 +17,16 @@
 
 import time
 import warnings
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from typing import Optional, cast
 from uuid import UUID
 
 from flwr.common import DEFAULT_TTL, Message, Metadata, RecordSet
+from flwr.common.constant import LONG_POLL_MAX_TIMEOUT
 from flwr.common.serde import message_from_taskres, message_to_taskins
 from flwr.common.typing import Run
 from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
-from flwr.server.superlink.state import StateFactory
+from flwr.server.superlink.state import InMemoryState, StateFactory
 
 from .driver import Driver
 
@@ -124,6 +125,15 @@ class InMemoryDriver(Driver):
         This method takes an iterable of messages and sends each message
         to the node specified in `dst_node_id`.
         """
+        if isinstance(self.state, InMemoryState):
+            messages = list(messages)
+            for msg in messages:
+                # Check message
+                self._check_message(msg)
+            # Store the Messages without serializing their content
+            stored_ids = self.state.store_message_ins_batch(messages)
+            return [str(task_id) for task_id in stored_ids if task_id]
+
         task_ids: list[str] = []
         for msg in messages:
             # Check message
@@ -146,13 +156,57 @@ class InMemoryDriver(Driver):
         """
         msg_ids = {UUID(msg_id) for msg_id in message_ids}
         # Pull TaskRes
-        task_res_list = self.state.get_task_res(task_ids=msg_ids, limit=len(msg_ids))
+        msgs = self._get_replies(msg_ids, None)
         # Delete tasks in state
         self.state.delete_tasks(msg_ids)
-        # Convert TaskRes to Message
-        msgs = [message_from_taskres(taskres) for taskres in task_res_list]
         return msgs
 
+    def iter_messages(
+        self,
+        message_ids: Iterable[str],
+        *,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Message]:
+        """Yield reply messages as soon as they are received.
+
+        Instead of polling, this method waits to be notified by the State whenever a
+        reply to one of the messages is stored.
+        """
+        msg_ids = {UUID(msg_id) for msg_id in message_ids}
+        end_time = time.time() + (timeout if timeout is not None else 0.0)
+        while msg_ids:
+            remaining = (
+                LONG_POLL_MAX_TIMEOUT if timeout is None else end_time - time.time()
+            )
+            if remaining <= 0:
+                break
+            msgs = self._get_replies(msg_ids, remaining)
+            # Delete tasks in state
+            self.state.delete_tasks(msg_ids)
+            for msg in msgs:
+                msg_ids.discard(UUID(msg.metadata.reply_to_message))
+                yield msg
+
+    def _get_replies(
+        self, msg_ids: set[UUID], timeout: Optional[float]
+    ) -> list[Message]:
+        """Get the replies to messages, waiting for them if `timeout` is set."""
+        if isinstance(self.state, InMemoryState):
+            # Replies are stored without serializing their content
+            if timeout is None:
+                return self.state.get_message_res(msg_ids, limit=len(msg_ids))
+            return self.state.wait_for_message_res(
+                msg_ids, limit=len(msg_ids), timeout=timeout
+            )
+        if timeout is None:
+            task_res_list = self.state.get_task_res(msg_ids, limit=len(msg_ids))
+        else:
+            task_res_list = self.state.wait_for_task_res(
+                msg_ids, limit=len(msg_ids), timeout=timeout
+            )
+        # Convert TaskRes to Message
+        return [message_from_taskres(taskres) for taskres in task_res_list]
+
     def send_and_receive(
         self,
         messages: Iterable[Message],
@@ -166,19 +220,7 @@ class InMemoryDriver(Driver):
         received or the specified timeout duration is exceeded.
         """
         # Push messages
-        msg_ids = set(self.push_messages(messages))
+        msg_ids = self.push_messages(messages)
 
         # Pull messages
-        end_time = time.time() + (timeout if timeout is not None else 0.0)
-        ret: list[Message] = []
-        while timeout is None or time.time() < end_time:
-            res_msgs = self.pull_messages(msg_ids)
-            ret.extend(res_msgs)
-            msg_ids.difference_update(
-                {msg.metadata.reply_to_message for msg in res_msgs}
-            )
-            if len(msg_ids) == 0:
-                break
-            # Sleep
-            time.sleep(3)
-        return ret
+        return list(self.iter_messages(msg_ids, timeout=timeout))
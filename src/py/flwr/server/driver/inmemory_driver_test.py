@@ -15,6 +15,7 @@
 """Tests for in-memory driver."""
 
 
+import threading
 import time
 import unittest
 from collections.abc import Iterable
@@ -187,7 +188,7 @@ class TestInMemoryDriver(unittest.TestCase):
             ),
         ]
         self.state.store_task_ins.side_effect = msg_ids
-        self.state.get_task_res.return_value = task_res_list
+        self.state.wait_for_task_res.return_value = task_res_list
 
         # Execute
         ret_msgs = list(self.driver.send_and_receive(msgs))
@@ -213,7 +214,7 @@ class TestInMemoryDriver(unittest.TestCase):
             ),
         ]
         self.state.store_task_ins.side_effect = msg_ids
-        self.state.get_task_res.return_value = task_res_list
+        self.state.wait_for_task_res.return_value = task_res_list
 
         # Execute
         with patch("time.sleep", side_effect=lambda t: time.sleep(t * 0.01)):
@@ -224,6 +225,74 @@ class TestInMemoryDriver(unittest.TestCase):
         self.assertLess(time.time() - start_time, 0.2)
         self.assertEqual(len(ret_msgs), 0)
 
+    def test_iter_messages(self) -> None:
+        """Test yielding replies as soon as the State provides them."""
+        # Prepare
+        msg_ids = [str(uuid4()) for _ in range(2)]
+        task_res_list = [
+            TaskRes(
+                task=Task(ancestry=[msg_id], recordset=recordset_to_proto(RecordSet()))
+            )
+            for msg_id in msg_ids
+        ]
+        self.state.wait_for_task_res.side_effect = [
+            task_res_list[:1],
+            task_res_list[1:],
+        ]
+
+        # Execute
+        replies = self.driver.iter_messages(msg_ids)
+        first = next(replies)
+        num_calls_after_first = self.state.wait_for_task_res.call_count
+        remaining = list(replies)
+
+        # Assert
+        self.assertEqual(first.metadata.reply_to_message, msg_ids[0])
+        self.assertEqual(num_calls_after_first, 1)
+        self.assertEqual(
+            [msg.metadata.reply_to_message for msg in remaining], msg_ids[1:]
+        )
+        self.assertEqual(self.state.wait_for_task_res.call_count, 2)
+
+    def test_iter_messages_notified_by_state(self) -> None:
+        """Test waiting for a reply stored by another thread."""
+        # Prepare
+        state = StateFactory(":flwr-in-memory-state:").state()
+        self.driver = InMemoryDriver(
+            run_id=state.create_run("", "", "", {}), state_factory=MagicMock()
+        )
+        self.driver.state = state
+        node_id = state.create_node(ping_interval=PING_MAX_INTERVAL)
+        msg_ids = list(
+            self.driver.push_messages(
+                [self.driver.create_message(RecordSet(), "query", node_id, "")]
+            )
+        )
+
+        def reply() -> None:
+            time.sleep(0.1)
+            for taskins in state.get_task_ins(node_id, limit=None):
+                task_res = message_to_taskres(
+                    message_from_taskins(taskins).create_reply(RecordSet())
+                )
+                task_res.task.pushed_at = time.time()
+                state.store_task_res(task_res)
+
+        # Execute
+        thread = threading.Thread(target=reply)
+        thread.start()
+        start_time = time.time()
+        ret_msgs = list(self.driver.iter_messages(msg_ids, timeout=10))
+        thread.join()
+
+        # Assert
+        self.assertLess(time.time() - start_time, 2)
+        self.assertEqual(
+            {msg.metadata.reply_to_message for msg in ret_msgs}, set(msg_ids)
+        )
+        self.assertEqual(state.num_task_ins(), 0)
+        self.assertEqual(state.num_task_res(), 0)
+
     def test_task_store_consistency_after_push_pull_sqlitestate(self) -> None:
         """Test tasks are deleted in sqlite state once messages are pulled."""
         # Prepare
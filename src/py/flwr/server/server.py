@@ -18,8 +18,9 @@
 import concurrent.futures
 import io
 import timeit
-from logging import INFO, WARN
-from typing import Optional, Union
+from functools import partial
+from logging import ERROR, INFO, WARN
+from typing import Callable, Optional, Union
 
 from flwr.common import (
     Code,
@@ -236,6 +237,7 @@ class Server:
             max_workers=self.max_workers,
             timeout=timeout,
             group_id=server_round,
+            on_result=partial(self.strategy.aggregate_fit_partial, server_round),
         )
         log(
             INFO,
@@ -338,30 +340,41 @@ def reconnect_client(
     return client, disconnect
 
 
-def fit_clients(
+def fit_clients(  # pylint: disable=too-many-arguments
     client_instructions: list[tuple[ClientProxy, FitIns]],
     max_workers: Optional[int],
     timeout: Optional[float],
     group_id: int,
+    on_result: Optional[Callable[[tuple[ClientProxy, FitRes]], None]] = None,
 ) -> FitResultsAndFailures:
-    """Refine parameters concurrently on all selected clients."""
+    """Refine parameters concurrently on all selected clients.
+
+    If `on_result` is provided, it is called with every successful result as soon as
+    it is received, while other clients may still be training.
+    """
+    results: list[tuple[ClientProxy, FitRes]] = []
+    failures: list[Union[tuple[ClientProxy, FitRes], BaseException]] = []
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         submitted_fs = {
             executor.submit(fit_client, client_proxy, ins, timeout, group_id)
             for client_proxy, ins in client_instructions
         }
-        finished_fs, _ = concurrent.futures.wait(
+        # Gather results as they arrive
+        for future in concurrent.futures.as_completed(
             fs=submitted_fs,
             timeout=None,  # Handled in the respective communication stack
-        )
-
-    # Gather results
-    results: list[tuple[ClientProxy, FitRes]] = []
-    failures: list[Union[tuple[ClientProxy, FitRes], BaseException]] = []
-    for future in finished_fs:
-        _handle_finished_future_after_fit(
-            future=future, results=results, failures=failures
-        )
+        ):
+            num_results = len(results)
+            _handle_finished_future_after_fit(
+                future=future, results=results, failures=failures
+            )
+            if on_result is not None and len(results) > num_results:
+                try:
+                    on_result(results[-1])
+                except Exception as ex:  # pylint: disable=broad-exception-caught
+                    # Count the rejected result as a failure, not aborting the round
+                    log(ERROR, "Failed to process the result of a client: %s", ex)
+                    failures.append(results.pop())
     return results, failures
 
 
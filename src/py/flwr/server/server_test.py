@@ -161,6 +161,56 @@ def test_fit_clients() -> None:
     assert results[0][1].num_examples == 1
 
 
+def test_fit_clients_on_result() -> None:
+    """Test fit_clients passing each successful result to `on_result`."""
+    # Prepare
+    clients: list[ClientProxy] = [
+        FailingClient("0"),
+        SuccessClient("1"),
+        SuccessClient("2"),
+    ]
+    arr = np.array([[1, 2], [3, 4], [5, 6]])
+    arr_serialized = ndarray_to_bytes(arr)
+    ins: FitIns = FitIns(Parameters(tensors=[arr_serialized], tensor_type=""), {})
+    client_instructions = [(c, ins) for c in clients]
+    received: list[tuple[ClientProxy, FitRes]] = []
+
+    # Execute
+    results, failures = fit_clients(
+        client_instructions, None, None, 0, on_result=received.append
+    )
+
+    # Assert
+    assert len(failures) == 1
+    assert received == results
+    assert len(received) == 2
+
+
+def test_fit_clients_on_result_raises() -> None:
+    """Test fit_clients counting results rejected by `on_result` as failures."""
+    # Prepare
+    clients: list[ClientProxy] = [SuccessClient("1"), SuccessClient("2")]
+    arr = np.array([[1, 2], [3, 4], [5, 6]])
+    arr_serialized = ndarray_to_bytes(arr)
+    ins: FitIns = FitIns(Parameters(tensors=[arr_serialized], tensor_type=""), {})
+    client_instructions = [(c, ins) for c in clients]
+    received: list[tuple[ClientProxy, FitRes]] = []
+
+    def on_result(result: tuple[ClientProxy, FitRes]) -> None:
+        if received:
+            raise ValueError("Malformed result")
+        received.append(result)
+
+    # Execute
+    results, failures = fit_clients(
+        client_instructions, None, None, 0, on_result=on_result
+    )
+
+    # Assert
+    assert results == received
+    assert len(failures) == 1
+
+
 def test_eval_clients() -> None:
     """Test eval_clients."""
     # Prepare
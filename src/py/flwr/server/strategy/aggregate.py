@@ -15,56 +15,262 @@
 """Aggregation functions for strategy implementations."""
 # mypy: disallow_untyped_calls=False
 
-from functools import reduce
-from typing import Any, Callable
+from collections.abc import Iterable
+from io import BytesIO
+from typing import Any, Callable, Optional
 
 import numpy as np
-
-from flwr.common import FitRes, NDArray, NDArrays, parameters_to_ndarrays
+import numpy.typing as npt
+
+from flwr.common import FitRes, NDArray, NDArrays, bytes_to_ndarray
+from flwr.common.constant import SType
+from flwr.common.parameter import read_ndarray_header
+from flwr.common.update_compression import (
+    iter_dequantized_layers,
+    iter_sparse_layers,
+    read_quantized_layer_shape,
+)
 from flwr.server.client_proxy import ClientProxy
 
+# Number of parameters per chunk when computing the distances between models
+DISTANCE_CHUNK_SIZE = 1 << 20
 
-def aggregate(results: list[tuple[NDArrays, int]]) -> NDArrays:
-    """Compute weighted average."""
-    # Calculate the total number of examples used during training
-    num_examples_total = sum(num_examples for (_, num_examples) in results)
+# Kinds of dtypes whose values can be folded into the accumulators
+_NUMERIC_KINDS = "biuf"
 
-    # Create a list of weights, each multiplied by the related number of examples
-    weighted_weights = [
-        [layer * num_examples for layer in weights] for weights, num_examples in results
-    ]
 
-    # Compute average weights of each layer
-    weights_prime: NDArrays = [
-        reduce(np.add, layer_updates) / num_examples_total
-        for layer_updates in zip(*weighted_weights)
-    ]
-    return weights_prime
+class WeightedAggregator:
+    """Incrementally compute the weighted average of model parameters.
 
+    Each result is folded into a set of preallocated accumulators as soon as it is
+    passed to `accumulate`, so the memory required for aggregation is in the order
+    of the size of a single model, regardless of the number of results.
 
-def aggregate_inplace(results: list[tuple[ClientProxy, FitRes]]) -> NDArrays:
-    """Compute in-place weighted average."""
-    # Count total examples
-    num_examples_total = sum(fit_res.num_examples for (_, fit_res) in results)
+    Results holding compressed model updates (see `flwr.common.update_compression`)
+    are folded in without densifying them, the parameters the updates are relative
+    to must then be passed to `finalize`.
 
-    # Compute scaling factors for each result
-    scaling_factors = [
-        fit_res.num_examples / num_examples_total for _, fit_res in results
-    ]
+    Parameters
+    ----------
+    accumulator_dtype : Optional[npt.DTypeLike] (default: None)
+        The dtype of the accumulators. If `None`, floating point layers are
+        accumulated in their own dtype (but at least `float32`) and all other
+        layers in `float64`. Use `np.float64` to trade memory for precision.
+    """
 
-    # Let's do in-place aggregation
-    # Get first result, then add up each other
-    params = [
-        scaling_factors[0] * x for x in parameters_to_ndarrays(results[0][1].parameters)
-    ]
-    for i, (_, fit_res) in enumerate(results[1:]):
-        res = (
-            scaling_factors[i + 1] * x
-            for x in parameters_to_ndarrays(fit_res.parameters)
-        )
-        params = [reduce(np.add, layer_updates) for layer_updates in zip(params, res)]
+    def __init__(self, accumulator_dtype: Optional[npt.DTypeLike] = None) -> None:
+        self.accumulator_dtype = accumulator_dtype
+        self._accumulators: Optional[NDArrays] = None
+        self._output_dtypes: list[np.dtype[Any]] = []
+        self._total_weight: float = 0
+        self._update_weight: float = 0
+        self._num_results = 0
+
+    @property
+    def num_results(self) -> int:
+        """Return the number of results accumulated so far."""
+        return self._num_results
+
+    @property
+    def total_weight(self) -> float:
+        """Return the sum of the weights accumulated so far."""
+        return self._total_weight
+
+    @property
+    def has_updates(self) -> bool:
+        """Return True if compressed model updates were accumulated."""
+        return self._update_weight > 0
+
+    def accumulate(self, fit_res: FitRes) -> None:
+        """Fold a `FitRes` into the weighted average.
+
+        The parameters are deserialized one layer at a time, so at most one layer of the
+        result is held in memory in addition to the accumulators. The encoding and the
+        shape of all layers are validated before any of them is folded in, so an invalid
+        result leaves the aggregator unchanged.
+        """
+        parameters = fit_res.parameters
+        if parameters.tensor_type == SType.NUMPY_TOPK:
+            self.accumulate_sparse_layers(
+                iter_sparse_layers(parameters), fit_res.num_examples
+            )
+            return
+        shapes = [
+            _read_tensor_shape(tensor, parameters.tensor_type)
+            for tensor in parameters.tensors
+        ]
+        if self._accumulators is not None:
+            self._check_shapes(shapes)
+        if parameters.tensor_type == SType.NUMPY_QUANTIZED:
+            self._fold_layers(iter_dequantized_layers(parameters), fit_res.num_examples)
+            self._update_weight += fit_res.num_examples
+        else:
+            self._fold_layers(
+                (bytes_to_ndarray(tensor) for tensor in parameters.tensors),
+                fit_res.num_examples,
+            )
+
+    def accumulate_sparse_layers(
+        self,
+        layers: Iterable[tuple[tuple[int, ...], NDArray, NDArray]],
+        weight: float,
+    ) -> None:
+        """Fold a sparse model update, given as the shape, flat indices and values of
+        each layer, into the weighted average.
+
+        All layers are validated before any of them is folded in, so an invalid update
+        leaves the aggregator unchanged.
+        """
+        layers = list(layers)
+        if self._accumulators is not None:
+            self._check_shapes([shape for shape, _, _ in layers])
+        for idx, (shape, indices, values) in enumerate(layers):
+            size = int(np.prod(shape))
+            if indices.shape != values.shape or (
+                indices.size > 0 and (indices.min() < 0 or indices.max() >= size)
+            ):
+                raise ValueError(f"Layer {idx} holds invalid sparse entries.")
+
+        if self._accumulators is None:
+            self._accumulators = []
+            for shape, indices, values in layers:
+                self._output_dtypes.append(values.dtype)
+                acc = np.zeros(shape, dtype=self._get_accumulator_dtype(values))
+                acc.reshape(-1)[indices] = np.multiply(values, weight, dtype=acc.dtype)
+                self._accumulators.append(acc)
+        else:
+            for acc, (_, indices, values) in zip(self._accumulators, layers):
+                acc.reshape(-1)[indices] += np.multiply(values, weight, dtype=acc.dtype)
+        self._total_weight += weight
+        self._update_weight += weight
+        self._num_results += 1
+
+    def accumulate_ndarrays(self, ndarrays: NDArrays, weight: float) -> None:
+        """Fold a list of NumPy ndarrays into the weighted average."""
+        self.accumulate_layers(ndarrays, weight)
+
+    def accumulate_layers(self, layers: Iterable[NDArray], weight: float) -> None:
+        """Fold the layers of a single model into the weighted average.
+
+        All layers are validated before any of them is folded in, so an invalid model
+        leaves the aggregator unchanged.
+        """
+        layers = list(layers)
+        for idx, layer in enumerate(layers):
+            if layer.dtype.kind not in _NUMERIC_KINDS:
+                raise ValueError(f"Layer {idx} has non-numeric dtype {layer.dtype}.")
+        if self._accumulators is not None:
+            self._check_shapes([layer.shape for layer in layers])
+        self._fold_layers(layers, weight)
+
+    def _fold_layers(self, layers: Iterable[NDArray], weight: float) -> None:
+        """Fold layers whose shapes have already been validated."""
+        if self._accumulators is None:
+            accumulators: NDArrays = []
+            output_dtypes: list[np.dtype[Any]] = []
+            for layer in layers:
+                output_dtypes.append(
+                    layer.dtype
+                    if np.issubdtype(layer.dtype, np.floating)
+                    else np.dtype(np.float64)
+                )
+                acc = np.empty(layer.shape, dtype=self._get_accumulator_dtype(layer))
+                np.multiply(layer, weight, out=acc, casting="unsafe")
+                accumulators.append(acc)
+            self._accumulators, self._output_dtypes = accumulators, output_dtypes
+        else:
+            for acc, layer in zip(self._accumulators, layers):
+                acc += np.multiply(layer, weight, dtype=acc.dtype)
+        self._total_weight += weight
+        self._num_results += 1
+
+    def finalize(self, base: Optional[NDArrays] = None) -> NDArrays:
+        """Return the weighted average of all accumulated results.
+
+        If compressed model updates were accumulated, `base` must hold the
+        parameters the updates are relative to.
+
+        The accumulators are released, so the aggregator can be reused afterwards.
+        """
+        if self._accumulators is None:
+            raise ValueError("Cannot finalize aggregation without any results.")
+        if self.has_updates and base is None:
+            raise ValueError("Cannot finalize aggregation of updates without a base.")
+        accumulators, self._accumulators = self._accumulators, None
+        output_dtypes, self._output_dtypes = self._output_dtypes, []
+        total_weight, self._total_weight = self._total_weight, 0
+        update_weight, self._update_weight = self._update_weight, 0
+        self._num_results = 0
+
+        weights_prime: NDArrays = []
+        for idx, (acc, dtype) in enumerate(zip(accumulators, output_dtypes)):
+            if update_weight > 0 and base is not None:
+                # Each update contributes `weight * (base + update)`
+                acc += np.multiply(base[idx], update_weight, dtype=acc.dtype)
+                if np.issubdtype(base[idx].dtype, np.floating):
+                    dtype = base[idx].dtype
+            acc /= total_weight
+            weights_prime.append(acc.astype(dtype, copy=False))
+        return weights_prime
+
+    def _check_shapes(self, shapes: list[tuple[int, ...]]) -> None:
+        """Raise a ValueError if the layer shapes don't match the accumulators."""
+        accumulators = self._accumulators or []
+        if len(shapes) != len(accumulators):
+            raise ValueError(
+                f"Received {len(shapes)} layers, but {len(accumulators)} were expected."
+            )
+        for idx, (acc, shape) in enumerate(zip(accumulators, shapes)):
+            if acc.shape != tuple(shape):
+                raise ValueError(
+                    f"Layer {idx} has shape {tuple(shape)}, but {acc.shape} was "
+                    "expected."
+                )
+
+    def _get_accumulator_dtype(self, layer: NDArray) -> np.dtype[Any]:
+        if self.accumulator_dtype is not None:
+            return np.dtype(self.accumulator_dtype)
+        if np.issubdtype(layer.dtype, np.floating):
+            return np.promote_types(layer.dtype, np.float32)
+        return np.dtype(np.float64)
+
+
+def _read_tensor_shape(tensor: bytes, tensor_type: str) -> tuple[int, ...]:
+    """Return the shape of a serialized layer without deserializing its values.
+
+    Raises a ValueError if the layer cannot be deserialized and folded in.
+    """
+    if tensor_type == SType.NUMPY_QUANTIZED:
+        return read_quantized_layer_shape(tensor)
+    bytes_io = BytesIO(tensor)
+    shape, dtype = read_ndarray_header(bytes_io)
+    if dtype.kind not in _NUMERIC_KINDS:
+        raise ValueError(f"Layers of dtype {dtype} cannot be aggregated.")
+    if len(tensor) - bytes_io.tell() != int(np.prod(shape)) * dtype.itemsize:
+        raise ValueError(f"The data of a layer doesn't match its shape {shape}.")
+    return shape
+
+
+def aggregate(results: list[tuple[NDArrays, int]]) -> NDArrays:
+    """Compute weighted average."""
+    aggregator = WeightedAggregator()
+    for weights, num_examples in results:
+        aggregator.accumulate_ndarrays(weights, num_examples)
+    return aggregator.finalize()
+
+
+def aggregate_inplace(
+    results: list[tuple[ClientProxy, FitRes]], base: Optional[NDArrays] = None
+) -> NDArrays:
+    """Compute in-place weighted average.
 
-    return params
+    Results are deserialized and folded into the average one at a time. Results
+    holding compressed model updates are applied to `base`.
+    """
+    aggregator = WeightedAggregator()
+    for _, fit_res in results:
+        aggregator.accumulate(fit_res)
+    return aggregator.finalize(base)
 
 
 def aggregate_median(results: list[tuple[NDArrays, int]]) -> NDArrays:
@@ -91,21 +297,7 @@ def aggregate_krum(
 
     # Compute distances between vectors
     distance_matrix = _compute_distances(weights)
-
-    # For each client, take the n-f-2 closest parameters vectors
-    num_closest = max(1, len(weights) - num_malicious - 2)
-    closest_indices = []
-    for distance in distance_matrix:
-        closest_indices.append(
-            np.argsort(distance)[1 : num_closest + 1].tolist()  # noqa: E203
-        )
-
-    # Compute the score for each client, that is the sum of the distances
-    # of the n-f-2 closest parameters vectors
-    scores = [
-        np.sum(distance_matrix[i, closest_indices[i]])
-        for i in range(len(distance_matrix))
-    ]
+    scores = _krum_scores(distance_matrix, num_malicious)
 
     if to_keep > 0:
         # Choose to_keep clients and return their average (MultiKrum)
@@ -155,48 +347,56 @@ def aggregate_bulyan(
             "It is needed to ensure that the method reduces the attacker's leeway to "
             "the one proved in the paper."
         )
-    selected_models_set: list[tuple[NDArrays, int]] = []
-
     theta = len(results) - 2 * num_malicious
     beta = theta - 2 * num_malicious
 
-    for _ in range(theta):
-        best_model = aggregation_rule(
-            results=results, num_malicious=num_malicious, **aggregation_rule_kwargs
-        )
-        list_of_weights = [weights for weights, num_samples in results]
-        # This group gives exact result
-        if aggregation_rule in byzantine_resilient_single_ret_model_aggregation:
-            best_idx = _find_reference_weights(best_model, list_of_weights)
-        # This group requires finding the closest model to the returned one
-        # (weights distance wise)
-        elif aggregation_rule in byzantine_resilient_many_return_models_aggregation:
-            # when different aggregation strategies available
-            # write a function to find the closest model
-            raise NotImplementedError(
-                "aggregate_bulyan currently does not support the aggregation rules that"
-                " return many models as results. "
-                "Such aggregation rules are currently not available in Flower."
-            )
-        else:
+    # This group gives exact result
+    if aggregation_rule in byzantine_resilient_single_ret_model_aggregation:
+        if aggregation_rule_kwargs.get("to_keep", 0) > 1:
             raise ValueError(
-                "The given aggregation rule is not added as Byzantine resilient. "
-                "Please choose from Byzantine resilient rules."
+                "The Bulyan aggregation requires the first aggregation rule to "
+                "select a single model, but MultiKrum averages `to_keep` models."
             )
+    # This group requires finding the closest model to the returned one
+    # (weights distance wise)
+    elif aggregation_rule in byzantine_resilient_many_return_models_aggregation:
+        # when different aggregation strategies available
+        # write a function to find the closest model
+        raise NotImplementedError(
+            "aggregate_bulyan currently does not support the aggregation rules that"
+            " return many models as results. "
+            "Such aggregation rules are currently not available in Flower."
+        )
+    else:
+        raise ValueError(
+            "The given aggregation rule is not added as Byzantine resilient. "
+            "Please choose from Byzantine resilient rules."
+        )
 
-        selected_models_set.append(results[best_idx])
-
-        # remove idx from tracker and weights_results
-        results.pop(best_idx)
-
-    # Compute median parameter vector across selected_models_set
-    median_vect = aggregate_median(selected_models_set)
-
-    # Take the averaged beta parameters of the closest distance to the median
-    # (coordinate-wise)
-    parameters_aggregated = _aggregate_n_closest_weights(
-        median_vect, selected_models_set, beta_closest=beta
-    )
+    # Compute the distances once, each Krum pass only needs the distances
+    # between the models that haven't been selected yet
+    weights = [weights for weights, _ in results]
+    distance_matrix = _compute_distances(weights)
+    remaining = np.arange(num_clients)
+    selected_indices: list[int] = []
+    for _ in range(theta):
+        scores = _krum_scores(
+            distance_matrix[np.ix_(remaining, remaining)], num_malicious
+        )
+        best_idx = int(np.argmin(scores))
+        selected_indices.append(int(remaining[best_idx]))
+        remaining = np.delete(remaining, best_idx)
+
+    parameters_aggregated: NDArrays = []
+    for layers in zip(*(weights[idx] for idx in selected_indices)):
+        selected_layers = np.asarray(layers)
+        # Compute median parameter vector across the selected models
+        median_layer = np.median(selected_layers, axis=0)
+        # Take the averaged beta parameters of the closest distance to the median
+        # (coordinate-wise)
+        parameters_aggregated.append(
+            _aggregate_n_closest_layer(median_layer, selected_layers, beta)
+        )
     return parameters_aggregated
 
 
@@ -225,19 +425,45 @@ def aggregate_qffl(
     return new_parameters
 
 
-def _compute_distances(weights: list[NDArrays]) -> NDArray:
+def _krum_scores(distance_matrix: NDArray, num_malicious: int) -> NDArray:
+    """Compute the Krum score of each vector.
+
+    The score is the sum of the squared distances to the n-f-2 closest vectors.
+    """
+    num_closest = max(1, len(distance_matrix) - num_malicious - 2)
+    # The closest vector is the vector itself, at distance 0
+    closest = np.sort(distance_matrix, axis=1)[:, 1 : num_closest + 1]  # noqa: E203
+    scores: NDArray = closest.sum(axis=1)
+    return scores
+
+
+def _compute_distances(
+    weights: list[NDArrays], chunk_size: int = DISTANCE_CHUNK_SIZE
+) -> NDArray:
     """Compute distances between vectors.
 
+    The squared distances are computed from the Gram matrix of the vectors as
+    ||a||^2 + ||b||^2 - 2 a.b, which only takes one matrix product per chunk of
+    `chunk_size` parameters. The chunks are centered first to reduce the rounding
+    errors of vectors that are close to each other.
+
     Input: weights - list of weights vectors
     Output: distances - matrix distance_matrix of squared distances between the vectors
     """
-    flat_w = np.array([np.concatenate(p, axis=None).ravel() for p in weights])
-    distance_matrix = np.zeros((len(weights), len(weights)))
-    for i, flat_w_i in enumerate(flat_w):
-        for j, flat_w_j in enumerate(flat_w):
-            delta = flat_w_i - flat_w_j
-            norm = np.linalg.norm(delta)
-            distance_matrix[i, j] = norm**2
+    gram = np.zeros((len(weights), len(weights)))
+    for layers in zip(*weights):
+        flat_layers = [np.asarray(layer).reshape(-1) for layer in layers]
+        for start in range(0, flat_layers[0].size, chunk_size):
+            end = start + chunk_size
+            chunk = np.stack([layer[start:end] for layer in flat_layers])
+            chunk = chunk.astype(np.float64, copy=False)
+            chunk -= chunk.mean(axis=0)
+            gram += chunk @ chunk.T
+    squared_norms = np.diag(gram)
+    distance_matrix: NDArray = squared_norms[:, None] + squared_norms[None, :]
+    distance_matrix -= 2 * gram
+    np.maximum(distance_matrix, 0, out=distance_matrix)
+    np.fill_diagonal(distance_matrix, 0)
     return distance_matrix
 
 
@@ -344,23 +570,25 @@ def _aggregate_n_closest_weights(
          reference weights
     """
     list_of_weights = [weights for weights, num_examples in results]
-    aggregated_weights = []
-
-    for layer_id, layer_weights in enumerate(reference_weights):
-        other_weights_layer_list = []
-        for other_w in list_of_weights:
-            other_weights_layer = other_w[layer_id]
-            other_weights_layer_list.append(other_weights_layer)
-        other_weights_layer_np = np.array(other_weights_layer_list)
-        diff_np = np.abs(layer_weights - other_weights_layer_np)
-        # Create indices of the smallest differences
-        # We do not need the exact order but just the beta closest weights
-        # therefore np.argpartition is used instead of np.argsort
-        indices = np.argpartition(diff_np, kth=beta_closest - 1, axis=0)
-        # Take the weights (coordinate-wise) corresponding to the beta of the
-        # closest distances
-        beta_closest_weights = np.take_along_axis(
-            other_weights_layer_np, indices=indices, axis=0
-        )[:beta_closest]
-        aggregated_weights.append(np.mean(beta_closest_weights, axis=0))
-    return aggregated_weights
+    return [
+        _aggregate_n_closest_layer(layer_weights, np.asarray(layers), beta_closest)
+        for layer_weights, *layers in zip(reference_weights, *list_of_weights)
+    ]
+
+
+def _aggregate_n_closest_layer(
+    reference_layer: NDArray, layers: NDArray, beta_closest: int
+) -> NDArray:
+    """Calculate element-wise mean of the `beta_closest` values of stacked layers."""
+    diff_np = np.abs(reference_layer - layers)
+    # Create indices of the smallest differences
+    # We do not need the exact order but just the beta closest weights
+    # therefore np.argpartition is used instead of np.argsort
+    indices = np.argpartition(diff_np, kth=beta_closest - 1, axis=0)
+    # Take the weights (coordinate-wise) corresponding to the beta of the
+    # closest distances
+    beta_closest_weights = np.take_along_axis(layers, indices=indices, axis=0)[
+        :beta_closest
+    ]
+    aggregated_layer: NDArray = np.mean(beta_closest_weights, axis=0)
+    return aggregated_layer
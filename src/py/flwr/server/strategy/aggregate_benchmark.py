@@ -0,0 +1,84 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmark the pairwise distances used by Krum, MultiKrum and Bulyan.
+
+Compares the Gram matrix based distance computation with the pairwise loop it
+replaced, on random models split into layers of equal size.
+
+Usage::
+
+    python -m flwr.server.strategy.aggregate_benchmark
+    python -m flwr.server.strategy.aggregate_benchmark --num-clients 100 --skip-reference
+"""
+
+
+import argparse
+import time
+
+import numpy as np
+
+from flwr.common.typing import NDArray, NDArrays
+
+from .aggregate import DISTANCE_CHUNK_SIZE, _compute_distances
+
+
+def _compute_distances_reference(weights: list[NDArrays]) -> NDArray:
+    """Compute the squared distances pair by pair."""
+    flat_w = np.array([np.concatenate(p, axis=None).ravel() for p in weights])
+    distance_matrix = np.zeros((len(weights), len(weights)))
+    for i, flat_w_i in enumerate(flat_w):
+        for j, flat_w_j in enumerate(flat_w):
+            distance_matrix[i, j] = np.linalg.norm(flat_w_i - flat_w_j) ** 2
+    return distance_matrix
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--num-clients", type=int, nargs="*", default=[10, 50, 100])
+    parser.add_argument("--num-parameters", type=int, default=1_000_000)
+    parser.add_argument("--num-layers", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=DISTANCE_CHUNK_SIZE)
+    parser.add_argument("--skip-reference", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    layer_size = args.num_parameters // args.num_layers
+    print(f"{args.num_layers} layers of {layer_size:,} float32 parameters")
+    print(f"  {'clients':>8}{'gram s':>10}{'loop s':>10}{'max rel err':>14}")
+    for num_clients in args.num_clients:
+        weights = [
+            [
+                rng.normal(size=layer_size).astype(np.float32)
+                for _ in range(args.num_layers)
+            ]
+            for _ in range(num_clients)
+        ]
+        start = time.perf_counter()
+        distance_matrix = _compute_distances(weights, chunk_size=args.chunk_size)
+        gram_time = time.perf_counter() - start
+        if args.skip_reference:
+            print(f"  {num_clients:>8}{gram_time:>10.3f}")
+            continue
+
+        start = time.perf_counter()
+        expected = _compute_distances_reference(weights)
+        loop_time = time.perf_counter() - start
+        error = np.max(np.abs(distance_matrix - expected) / np.maximum(expected, 1))
+        print(f"  {num_clients:>8}{gram_time:>10.3f}{loop_time:>10.3f}{error:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,20 @@
 
 
 import numpy as np
+import pytest
+
+from flwr.common import Code, FitRes, NDArrays, Status, ndarrays_to_parameters
+from flwr.common.update_compression import quantize, topk_sparsify
 
 from .aggregate import (
+    WeightedAggregator,
     _aggregate_n_closest_weights,
     _check_weights_equality,
+    _compute_distances,
     _find_reference_weights,
     aggregate,
+    aggregate_bulyan,
+    aggregate_krum,
     weighted_loss_avg,
 )
 
@@ -44,6 +52,220 @@ def test_aggregate() -> None:
     np.testing.assert_equal(expected, actual)
 
 
+def test_weighted_aggregator_fit_res() -> None:
+    """Test WeightedAggregator folding serialized results one by one."""
+    # Prepare
+    weights = [
+        [np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32), np.array([1, 2])],
+        [np.array([[3.0, 4.0], [5.0, 6.0]], dtype=np.float32), np.array([3, 4])],
+    ]
+    num_examples = [1, 3]
+    expected = aggregate(list(zip(weights, num_examples)))
+    aggregator = WeightedAggregator()
+
+    # Execute
+    for ndarrays, num in zip(weights, num_examples):
+        aggregator.accumulate(
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=ndarrays_to_parameters(ndarrays),
+                num_examples=num,
+                metrics={},
+            )
+        )
+    num_results = aggregator.num_results
+    actual = aggregator.finalize()
+
+    # Assert
+    assert num_results == 2
+    assert actual[0].dtype == np.float32
+    assert actual[1].dtype == np.float64
+    np.testing.assert_allclose(actual[0], [[2.5, 3.5], [4.5, 5.5]])
+    np.testing.assert_allclose(actual[1], [2.5, 3.5])
+    for exp, act in zip(expected, actual):
+        np.testing.assert_allclose(exp, act)
+    assert aggregator.num_results == 0
+
+
+def test_weighted_aggregator_float64_accumulator() -> None:
+    """Test WeightedAggregator with float64 accumulators and float32 layers."""
+    # Prepare
+    aggregator = WeightedAggregator(accumulator_dtype=np.float64)
+
+    # Execute
+    aggregator.accumulate_ndarrays([np.array([1.0], dtype=np.float32)], 1)
+    aggregator.accumulate_ndarrays([np.array([2.0], dtype=np.float32)], 1)
+    actual = aggregator.finalize()
+
+    # Assert
+    assert actual[0].dtype == np.float32
+    np.testing.assert_equal(actual[0], np.array([1.5], dtype=np.float32))
+
+
+def test_weighted_aggregator_mismatch() -> None:
+    """Test WeightedAggregator rejecting results of a different structure."""
+    # Prepare
+    aggregator = WeightedAggregator()
+    aggregator.accumulate_ndarrays([np.zeros(2), np.zeros(3)], 1)
+    invalid_models: list[NDArrays] = [
+        [np.ones(2), np.ones(4)],
+        [np.ones(2)],
+        [np.ones(2), np.ones(3), np.ones(1)],
+    ]
+
+    # Execute
+    for ndarrays in invalid_models:
+        with pytest.raises(ValueError):
+            aggregator.accumulate_ndarrays(ndarrays, 1)
+        with pytest.raises(ValueError):
+            aggregator.accumulate(
+                FitRes(
+                    status=Status(code=Code.OK, message="Success"),
+                    parameters=ndarrays_to_parameters(ndarrays),
+                    num_examples=1,
+                    metrics={},
+                )
+            )
+    num_results = aggregator.num_results
+    actual = aggregator.finalize()
+
+    # Assert
+    assert num_results == 1
+    np.testing.assert_equal(actual[0], np.zeros(2))
+    np.testing.assert_equal(actual[1], np.zeros(3))
+
+
+def test_weighted_aggregator_corrupt_layers() -> None:
+    """Test WeightedAggregator rejecting results with a corrupt layer unchanged."""
+    # Prepare
+    aggregator = WeightedAggregator()
+    aggregator.accumulate_ndarrays([np.zeros(2), np.zeros(3)], 1)
+    dense = ndarrays_to_parameters([np.ones(2), np.ones(3)])
+    quantized, _ = quantize([np.ones(2), np.ones(3)], bits=4)
+    invalid_parameters = []
+    for parameters in (dense, quantized):
+        # The first layer is valid, the second one is truncated
+        parameters.tensors[1] = parameters.tensors[1][:-1]
+        invalid_parameters.append(parameters)
+    invalid_parameters.append(
+        ndarrays_to_parameters([np.ones(2), np.array(["a", "b", "c"])])
+    )
+
+    # Execute
+    for parameters in invalid_parameters:
+        with pytest.raises(ValueError):
+            aggregator.accumulate(
+                FitRes(
+                    status=Status(code=Code.OK, message="Success"),
+                    parameters=parameters,
+                    num_examples=1,
+                    metrics={},
+                )
+            )
+    with pytest.raises(ValueError):
+        aggregator.accumulate_ndarrays([np.ones(2), np.array(["a", "b", "c"])], 1)
+    num_results = aggregator.num_results
+    actual = aggregator.finalize()
+
+    # Assert
+    assert num_results == 1
+    np.testing.assert_equal(actual[0], np.zeros(2))
+    np.testing.assert_equal(actual[1], np.zeros(3))
+
+
+def test_weighted_aggregator_updates() -> None:
+    """Test WeightedAggregator folding in compressed model updates."""
+    # Prepare
+    base: NDArrays = [np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32), np.ones(3)]
+    dense: NDArrays = [
+        np.array([[2.0, 2.0], [2.0, 2.0]], dtype=np.float32),
+        np.zeros(3),
+    ]
+    update: NDArrays = [
+        np.array([[4.0, 0.0], [0.0, 0.0]], dtype=np.float32),
+        np.eye(3)[0],
+    ]
+    sparse, _ = topk_sparsify(update, 0.5)
+    quantized, _ = quantize(update, 8)
+    expected = aggregate(
+        [
+            (dense, 1),
+            ([b + u for b, u in zip(base, update)], 2),
+            ([b + u for b, u in zip(base, update)], 3),
+        ]
+    )
+    aggregator = WeightedAggregator()
+
+    # Execute
+    for parameters, num in [
+        (ndarrays_to_parameters(dense), 1),
+        (sparse, 2),
+        (quantized, 3),
+    ]:
+        aggregator.accumulate(
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=parameters,
+                num_examples=num,
+                metrics={},
+            )
+        )
+    has_updates = aggregator.has_updates
+    actual = aggregator.finalize(base)
+
+    # Assert
+    assert has_updates
+    assert actual[0].dtype == np.float32
+    for exp, act in zip(expected, actual):
+        np.testing.assert_allclose(act, exp, rtol=1e-6)
+
+
+def test_weighted_aggregator_updates_without_base() -> None:
+    """Test WeightedAggregator raising if updates are finalized without a base."""
+    # Prepare
+    aggregator = WeightedAggregator()
+    aggregator.accumulate_sparse_layers(
+        [((2,), np.array([0], dtype=np.uint32), np.array([1.0]))], 1
+    )
+
+    # Execute & Assert
+    with pytest.raises(ValueError):
+        aggregator.finalize()
+
+
+def test_weighted_aggregator_sparse_mismatch() -> None:
+    """Test WeightedAggregator rejecting invalid sparse updates unchanged."""
+    # Prepare
+    aggregator = WeightedAggregator()
+    aggregator.accumulate_sparse_layers(
+        [((2,), np.array([0], dtype=np.uint32), np.array([1.0]))], 1
+    )
+    invalid_updates = [
+        [((3,), np.array([0], dtype=np.uint32), np.array([1.0]))],
+        [
+            ((2,), np.array([0], dtype=np.uint32), np.array([1.0])),
+            ((2,), np.array([0], dtype=np.uint32), np.array([1.0])),
+        ],
+        [((2,), np.array([2], dtype=np.uint32), np.array([1.0]))],
+        [((2,), np.array([0, 1], dtype=np.uint32), np.array([1.0]))],
+    ]
+
+    # Execute
+    for layers in invalid_updates:
+        with pytest.raises(ValueError):
+            aggregator.accumulate_sparse_layers(layers, 1)
+    actual = aggregator.finalize([np.zeros(2)])
+
+    # Assert
+    np.testing.assert_equal(actual[0], np.array([1.0, 0.0]))
+
+
+def test_weighted_aggregator_finalize_empty() -> None:
+    """Test WeightedAggregator raising when finalized without results."""
+    with pytest.raises(ValueError):
+        WeightedAggregator().finalize()
+
+
 def test_weighted_loss_avg_single_value() -> None:
     """Test weighted loss averaging."""
     # Prepare
@@ -70,6 +292,72 @@ def test_weighted_loss_avg_multiple_values() -> None:
     assert expected == actual
 
 
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_compute_distances(chunk_size: int) -> None:
+    """Test that the distances match the pairwise norms of the differences."""
+    # Prepare
+    rng = np.random.default_rng(0)
+    weights: list[NDArrays] = [
+        [rng.normal(size=(3, 4)).astype(np.float32), rng.normal(size=7) + 1000]
+        for _ in range(6)
+    ]
+    flat = [np.concatenate([layer.ravel() for layer in w]) for w in weights]
+    expected = np.array([[np.sum((x - y) ** 2) for y in flat] for x in flat])
+
+    # Execute
+    distance_matrix = _compute_distances(weights, chunk_size=chunk_size)
+
+    # Assert
+    np.testing.assert_allclose(distance_matrix, expected, rtol=1e-9, atol=1e-9)
+    assert np.all(np.diag(distance_matrix) == 0)
+
+
+def test_aggregate_krum() -> None:
+    """Test that Krum selects the model closest to the others."""
+    # Prepare
+    weights: list[NDArrays] = [
+        [np.array([0.0, 0.0])],
+        [np.array([1.0, 0.0])],
+        [np.array([0.0, 1.0])],
+        [np.array([0.4, 0.4])],
+        [np.array([100.0, 100.0])],
+    ]
+    results = [(w, 1) for w in weights]
+
+    # Execute
+    krum = aggregate_krum(results, num_malicious=1, to_keep=0)
+    multi_krum = aggregate_krum(results, num_malicious=1, to_keep=2)
+
+    # Assert
+    np.testing.assert_array_equal(krum[0], [0.4, 0.4])
+    np.testing.assert_allclose(multi_krum[0], [0.2, 0.2])
+
+
+def test_aggregate_bulyan() -> None:
+    """Test that Bulyan averages the coordinates closest to the median."""
+    # Prepare
+    weights: list[NDArrays] = [
+        [np.array([value, -value])] for value in (0.2, 0.6, 0.7, 12.0, 0.1, 0.15, 0.3)
+    ]
+    results = [(w, 1) for w in weights]
+
+    # Execute
+    aggregated = aggregate_bulyan(results, 1, aggregate_krum, to_keep=0)
+
+    # Assert
+    # Krum selects 0.15, 0.2, 0.3, 0.6 and 0.7, the median is 0.3
+    expected = (0.15 + 0.2 + 0.3) / 3
+    np.testing.assert_allclose(aggregated[0], [expected, -expected])
+    assert len(results) == 7
+
+
+def test_aggregate_bulyan_multi_krum() -> None:
+    """Test that Bulyan rejects MultiKrum, which doesn't select a single model."""
+    results = [([np.array([float(value)])], 1) for value in range(7)]
+    with pytest.raises(ValueError):
+        aggregate_bulyan(results, 1, aggregate_krum, to_keep=2)
+
+
 def test_check_weights_equality_true() -> None:
     """Check weights equality - the same weights."""
     weights1 = [np.array([1, 2]), np.array([[1, 2], [3, 4]])]
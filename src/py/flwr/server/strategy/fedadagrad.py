@@ -76,6 +76,9 @@ class FedAdagrad(FedOpt):
         Client-side learning rate. Defaults to 1e-1.
     tau : float, optional
         Controls the algorithm's degree of adaptability. Defaults to 1e-9.
+    streaming : bool (default: False)
+        Enable (True) or disable (False) aggregation of model updates as soon as
+        they are received (see `FedAvg.aggregate_fit_partial`).
     """
 
     # pylint: disable=too-many-arguments,too-many-locals,too-many-instance-attributes
@@ -102,6 +105,7 @@ class FedAdagrad(FedOpt):
         eta: float = 1e-1,
         eta_l: float = 1e-1,
         tau: float = 1e-9,
+        streaming: bool = False,
     ) -> None:
         super().__init__(
             fraction_fit=fraction_fit,
@@ -121,6 +125,7 @@ class FedAdagrad(FedOpt):
             beta_1=0.0,
             beta_2=0.0,
             tau=tau,
+            streaming=streaming,
         )
 
     def __repr__(self) -> str:
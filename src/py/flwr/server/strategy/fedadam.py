@@ -80,6 +80,9 @@ class FedAdam(FedOpt):
         Second moment parameter. Defaults to 0.99.
     tau : float, optional
         Controls the algorithm's degree of adaptability. Defaults to 1e-9.
+    streaming : bool (default: False)
+        Enable (True) or disable (False) aggregation of model updates as soon as
+        they are received (see `FedAvg.aggregate_fit_partial`).
     """
 
     # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-locals
@@ -108,6 +111,7 @@ class FedAdam(FedOpt):
         beta_1: float = 0.9,
         beta_2: float = 0.99,
         tau: float = 1e-9,
+        streaming: bool = False,
     ) -> None:
         super().__init__(
             fraction_fit=fraction_fit,
@@ -127,6 +131,7 @@ class FedAdam(FedOpt):
             beta_1=beta_1,
             beta_2=beta_2,
             tau=tau,
+            streaming=streaming,
         )
 
     def __repr__(self) -> str:
@@ -34,10 +34,16 @@ from flwr.common import (
     parameters_to_ndarrays,
 )
 from flwr.common.logger import log
+from flwr.common.update_compression import is_update
 from flwr.server.client_manager import ClientManager
 from flwr.server.client_proxy import ClientProxy
 
-from .aggregate import aggregate, aggregate_inplace, weighted_loss_avg
+from .aggregate import (
+    WeightedAggregator,
+    aggregate,
+    aggregate_inplace,
+    weighted_loss_avg,
+)
 from .strategy import Strategy
 
 WARNING_MIN_AVAILABLE_CLIENTS_TOO_LOW = """
@@ -86,6 +92,11 @@ class FedAvg(Strategy):
         Metrics aggregation function, optional.
     inplace : bool (default: True)
         Enable (True) or disable (False) in-place aggregation of model updates.
+    streaming : bool (default: False)
+        Enable (True) or disable (False) aggregation of model updates as soon as
+        they are received (see `aggregate_fit_partial`). Requires `inplace=True`.
+        Subclasses overriding `aggregate_fit` use the result through
+        `super().aggregate_fit` or `_aggregate_fit_ndarrays`.
     """
 
     # pylint: disable=too-many-arguments,too-many-instance-attributes, line-too-long
@@ -110,6 +121,7 @@ class FedAvg(Strategy):
         fit_metrics_aggregation_fn: Optional[MetricsAggregationFn] = None,
         evaluate_metrics_aggregation_fn: Optional[MetricsAggregationFn] = None,
         inplace: bool = True,
+        streaming: bool = False,
     ) -> None:
         super().__init__()
 
@@ -132,6 +144,11 @@ class FedAvg(Strategy):
         self.fit_metrics_aggregation_fn = fit_metrics_aggregation_fn
         self.evaluate_metrics_aggregation_fn = evaluate_metrics_aggregation_fn
         self.inplace = inplace
+        self.streaming = streaming
+        self._partial_round: Optional[int] = None
+        self._partial_aggregator: Optional[WeightedAggregator] = None
+        # Parameters sent to the clients, compressed updates are relative to them
+        self._fit_parameters: Optional[Parameters] = None
 
     def __repr__(self) -> str:
         """Compute a string representation of the strategy."""
@@ -179,6 +196,17 @@ class FedAvg(Strategy):
             # Custom fit config function provided
             config = self.on_fit_config_fn(server_round)
         fit_ins = FitIns(parameters, config)
+        self._fit_parameters = parameters
+        if self._partial_aggregator is not None:
+            # The previous round was aggregated without the partial aggregate
+            log(
+                WARNING,
+                "Disabling `streaming`, as `aggregate_fit` of %s doesn't use the "
+                "results aggregated as they were received.",
+                type(self).__name__,
+            )
+            self.streaming = False
+            self._partial_aggregator, self._partial_round = None, None
 
         # Sample clients
         sample_size, min_num_clients = self.num_fit_clients(
@@ -224,23 +252,14 @@ class FedAvg(Strategy):
         failures: list[Union[tuple[ClientProxy, FitRes], BaseException]],
     ) -> tuple[Optional[Parameters], dict[str, Scalar]]:
         """Aggregate fit results using weighted average."""
+        partial_aggregator = self._pop_partial_aggregator(server_round)
         if not results:
             return None, {}
         # Do not aggregate if there are failures and failures are not accepted
         if not self.accept_failures and failures:
             return None, {}
 
-        if self.inplace:
-            # Does in-place weighted average of results
-            aggregated_ndarrays = aggregate_inplace(results)
-        else:
-            # Convert results
-            weights_results = [
-                (parameters_to_ndarrays(fit_res.parameters), fit_res.num_examples)
-                for _, fit_res in results
-            ]
-            aggregated_ndarrays = aggregate(weights_results)
-
+        aggregated_ndarrays = self._aggregate_fit_ndarrays(results, partial_aggregator)
         parameters_aggregated = ndarrays_to_parameters(aggregated_ndarrays)
 
         # Aggregate custom metrics if aggregation fn was provided
@@ -253,6 +272,79 @@ class FedAvg(Strategy):
 
         return parameters_aggregated, metrics_aggregated
 
+    def aggregate_fit_partial(
+        self,
+        server_round: int,
+        result: tuple[ClientProxy, FitRes],
+    ) -> None:
+        """Fold a single fit result into the weighted average of this round."""
+        if not (self.streaming and self.inplace):
+            return
+        if self._partial_aggregator is None or self._partial_round != server_round:
+            self._partial_round = server_round
+            self._partial_aggregator = WeightedAggregator()
+        _, fit_res = result
+        try:
+            self._partial_aggregator.accumulate(fit_res)
+        except Exception:
+            # Start over, `aggregate_fit` aggregates all results itself unless all
+            # of them were folded in
+            self._partial_aggregator = None
+            raise
+
+    def _aggregate_fit_ndarrays(
+        self,
+        results: list[tuple[ClientProxy, FitRes]],
+        partial_aggregator: Optional[WeightedAggregator],
+    ) -> NDArrays:
+        """Return the weighted average of the fit results.
+
+        The partial aggregate (see `_pop_partial_aggregator`) is used if all results
+        have been folded into it.
+        """
+        if partial_aggregator is not None and partial_aggregator.num_results == len(
+            results
+        ):
+            # All results have already been folded in as they arrived
+            return partial_aggregator.finalize(
+                self._get_fit_ndarrays() if partial_aggregator.has_updates else None
+            )
+
+        # Compressed model updates are relative to the parameters sent
+        has_updates = any(is_update(res.parameters) for _, res in results)
+        fit_ndarrays = self._get_fit_ndarrays() if has_updates else None
+        if self.inplace or has_updates:
+            # Does in-place weighted average of results, without densifying
+            # compressed model updates
+            return aggregate_inplace(results, fit_ndarrays)
+
+        # Convert results
+        weights_results = [
+            (parameters_to_ndarrays(fit_res.parameters), fit_res.num_examples)
+            for _, fit_res in results
+        ]
+        return aggregate(weights_results)
+
+    def _get_fit_ndarrays(self) -> NDArrays:
+        """Return the parameters sent to the clients in `configure_fit`."""
+        if self._fit_parameters is None:
+            raise ValueError(
+                "Received compressed model updates, but no parameters were sent "
+                "in `configure_fit`."
+            )
+        return parameters_to_ndarrays(self._fit_parameters)
+
+    def _pop_partial_aggregator(
+        self, server_round: int
+    ) -> Optional[WeightedAggregator]:
+        """Return and reset the partial aggregator if it belongs to this round."""
+        aggregator = self._partial_aggregator
+        partial_round = self._partial_round
+        self._partial_aggregator, self._partial_round = None, None
+        if aggregator is None or partial_round != server_round:
+            return None
+        return aggregator
+
     def aggregate_evaluate(
         self,
         server_round: int,
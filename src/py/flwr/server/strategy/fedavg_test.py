@@ -15,17 +15,20 @@
 """FedAvg tests."""
 
 
-from typing import Union
-from unittest.mock import MagicMock
+from typing import Optional, Union
+from unittest.mock import MagicMock, patch
 
 import numpy as np
+import pytest
 from numpy.testing import assert_allclose
 
-from flwr.common import Code, FitRes, Status, parameters_to_ndarrays
+from flwr.common import Code, FitRes, Parameters, Scalar, Status, parameters_to_ndarrays
 from flwr.common.parameter import ndarrays_to_parameters
+from flwr.common.update_compression import compute_update, topk_sparsify
 from flwr.server.client_proxy import ClientProxy
 
 from .fedavg import FedAvg
+from .fedavgm import FedAvgM
 
 
 def test_fedavg_num_fit_clients_20_available() -> None:
@@ -178,3 +181,191 @@ def test_inplace_aggregate_fit_equivalence() -> None:
     # Assert
     for ref, inp in zip(reference_np, inplace_np):
         assert_allclose(ref, inp)
+
+
+def test_streaming_aggregate_fit_equivalence() -> None:
+    """Test aggregate_fit equivalence between FedAvg and its streaming version."""
+    # Prepare
+    results: list[tuple[ClientProxy, FitRes]] = [
+        (
+            MagicMock(),
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=ndarrays_to_parameters(
+                    [np.random.randn(100, 64), np.random.randn(32)]
+                ),
+                num_examples=num_examples,
+                metrics={},
+            ),
+        )
+        for num_examples in [1, 5, 3]
+    ]
+    failures: list[Union[tuple[ClientProxy, FitRes], BaseException]] = []
+
+    fedavg_reference = FedAvg()
+    fedavg_streaming = FedAvg(streaming=True)
+
+    # Execute
+    reference, _ = fedavg_reference.aggregate_fit(1, results, failures)
+    assert reference
+    for result in results:
+        fedavg_streaming.aggregate_fit_partial(1, result)
+    with patch(
+        "flwr.server.strategy.fedavg.aggregate_inplace"
+    ) as mock_aggregate_inplace:
+        streaming, _ = fedavg_streaming.aggregate_fit(1, results, failures)
+    assert streaming
+
+    # Assert
+    mock_aggregate_inplace.assert_not_called()
+    for ref, stream in zip(
+        parameters_to_ndarrays(reference), parameters_to_ndarrays(streaming)
+    ):
+        assert_allclose(ref, stream)
+
+
+def test_aggregate_fit_updates() -> None:
+    """Test FedAvg applying compressed model updates to the parameters sent."""
+    # Prepare
+    received = [np.random.randn(100, 64), np.random.randn(32)]
+    local = [[layer + np.random.randn(*layer.shape) for layer in received]] * 2
+    parameters = [
+        topk_sparsify(compute_update(local[0], received), 1.0)[0],
+        ndarrays_to_parameters(local[1]),
+    ]
+    results: list[tuple[ClientProxy, FitRes]] = [
+        (
+            MagicMock(),
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=params,
+                num_examples=num_examples,
+                metrics={},
+            ),
+        )
+        for params, num_examples in zip(parameters, [1, 5])
+    ]
+    failures: list[Union[tuple[ClientProxy, FitRes], BaseException]] = []
+    client_manager = MagicMock()
+    client_manager.num_available.return_value = 2
+
+    for strategy in [FedAvg(), FedAvg(inplace=False)]:
+        strategy.configure_fit(1, ndarrays_to_parameters(received), client_manager)
+
+        # Execute
+        aggregated, _ = strategy.aggregate_fit(1, results, failures)
+        assert aggregated
+
+        # Assert
+        for expected, actual in zip(local[0], parameters_to_ndarrays(aggregated)):
+            assert_allclose(actual, expected)
+
+
+def test_streaming_aggregate_fit_fallback() -> None:
+    """Test streaming FedAvg falling back if not all results were folded in."""
+    # Prepare
+    results: list[tuple[ClientProxy, FitRes]] = [
+        (
+            MagicMock(),
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=ndarrays_to_parameters([np.array([value])]),
+                num_examples=1,
+                metrics={},
+            ),
+        )
+        for value in [1.0, 3.0]
+    ]
+    fedavg_streaming = FedAvg(streaming=True)
+
+    # Execute
+    fedavg_streaming.aggregate_fit_partial(1, results[0])
+    parameters, _ = fedavg_streaming.aggregate_fit(1, results, [])
+    assert parameters
+
+    # Assert
+    assert_allclose(parameters_to_ndarrays(parameters)[0], [2.0])
+
+
+def test_streaming_aggregate_fit_partial_subclasses() -> None:
+    """Test streaming in subclasses, and disabling it if they don't use it."""
+    # Prepare
+    results: list[tuple[ClientProxy, FitRes]] = [
+        (
+            MagicMock(),
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=ndarrays_to_parameters([np.array([value])]),
+                num_examples=1,
+                metrics={},
+            ),
+        )
+        for value in [1.0, 3.0]
+    ]
+    parameters = ndarrays_to_parameters([np.array([0.0])])
+    client_manager = MagicMock()
+    client_manager.num_available.return_value = 2
+
+    class CustomFedAvg(FedAvg):
+        """FedAvg with a custom aggregation of the fit results."""
+
+        def aggregate_fit(
+            self,
+            server_round: int,
+            results: list[tuple[ClientProxy, FitRes]],
+            failures: list[Union[tuple[ClientProxy, FitRes], BaseException]],
+        ) -> tuple[Optional[Parameters], dict[str, Scalar]]:
+            return None, {}
+
+    fedavgm = FedAvgM(streaming=True)
+    custom = CustomFedAvg(streaming=True)
+
+    # Execute
+    aggregated: list[Optional[Parameters]] = []
+    for strategy in [fedavgm, custom]:
+        strategy.configure_fit(1, parameters, client_manager)
+        for result in results:
+            strategy.aggregate_fit_partial(1, result)
+        with patch(
+            "flwr.server.strategy.fedavg.aggregate_inplace"
+        ) as mock_aggregate_inplace:
+            aggregated.append(strategy.aggregate_fit(1, results, [])[0])
+        strategy.configure_fit(2, parameters, client_manager)
+        mock_aggregate_inplace.assert_not_called()
+
+    # Assert
+    assert aggregated[0] is not None
+    assert_allclose(parameters_to_ndarrays(aggregated[0])[0], [2.0])
+    assert aggregated[1] is None
+    assert fedavgm.streaming
+    assert not custom.streaming
+    assert custom._partial_aggregator is None  # pylint: disable=W0212
+
+
+def test_streaming_aggregate_fit_partial_rejected() -> None:
+    """Test that results rejected while streaming are left out of the average."""
+    # Prepare
+    results: list[tuple[ClientProxy, FitRes]] = [
+        (
+            MagicMock(),
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=ndarrays_to_parameters([np.array(value)]),
+                num_examples=1,
+                metrics={},
+            ),
+        )
+        for value in [[1.0], [2.0, 2.0], [3.0]]
+    ]
+    fedavg_streaming = FedAvg(streaming=True)
+
+    # Execute
+    fedavg_streaming.aggregate_fit_partial(1, results[0])
+    with pytest.raises(ValueError):
+        fedavg_streaming.aggregate_fit_partial(1, results[1])
+    fedavg_streaming.aggregate_fit_partial(1, results[2])
+    parameters, _ = fedavg_streaming.aggregate_fit(1, [results[0], results[2]], [])
+    assert parameters
+
+    # Assert
+    assert_allclose(parameters_to_ndarrays(parameters)[0], [2.0])
@@ -34,7 +34,6 @@ from flwr.common.logger import log
 from flwr.server.client_manager import ClientManager
 from flwr.server.client_proxy import ClientProxy
 
-from .aggregate import aggregate
 from .fedavg import FedAvg
 
 
@@ -71,9 +70,12 @@ class FedAvgM(FedAvg):
         Defaults to 1.0.
     server_momentum: float
         Server-side momentum factor used for FedAvgM. Defaults to 0.0.
+    streaming : bool (default: False)
+        Enable (True) or disable (False) aggregation of model updates as soon as
+        they are received (see `FedAvg.aggregate_fit_partial`).
     """
 
-    # pylint: disable=too-many-arguments,too-many-instance-attributes, line-too-long
+    # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-locals, line-too-long
     def __init__(
         self,
         *,
@@ -96,6 +98,7 @@ class FedAvgM(FedAvg):
         evaluate_metrics_aggregation_fn: Optional[MetricsAggregationFn] = None,
         server_learning_rate: float = 1.0,
         server_momentum: float = 0.0,
+        streaming: bool = False,
     ) -> None:
         super().__init__(
             fraction_fit=fraction_fit,
@@ -110,6 +113,7 @@ class FedAvgM(FedAvg):
             initial_parameters=initial_parameters,
             fit_metrics_aggregation_fn=fit_metrics_aggregation_fn,
             evaluate_metrics_aggregation_fn=evaluate_metrics_aggregation_fn,
+            streaming=streaming,
         )
         self.server_learning_rate = server_learning_rate
         self.server_momentum = server_momentum
@@ -136,18 +140,13 @@ class FedAvgM(FedAvg):
         failures: list[Union[tuple[ClientProxy, FitRes], BaseException]],
     ) -> tuple[Optional[Parameters], dict[str, Scalar]]:
         """Aggregate fit results using weighted average."""
+        partial_aggregator = self._pop_partial_aggregator(server_round)
         if not results:
             return None, {}
         # Do not aggregate if there are failures and failures are not accepted
         if not self.accept_failures and failures:
             return None, {}
-        # Convert results
-        weights_results = [
-            (parameters_to_ndarrays(fit_res.parameters), fit_res.num_examples)
-            for _, fit_res in results
-        ]
-
-        fedavg_result = aggregate(weights_results)
+        fedavg_result = self._aggregate_fit_ndarrays(results, partial_aggregator)
         # following convention described in
         # https://pytorch.org/docs/stable/generated/torch.optim.SGD.html
         if self.server_opt:
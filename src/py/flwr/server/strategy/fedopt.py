@@ -73,6 +73,9 @@ class FedOpt(FedAvg):
         Second moment parameter. Defaults to 0.0.
     tau : float, optional
         Controls the algorithm's degree of adaptability. Defaults to 1e-9.
+    streaming : bool (default: False)
+        Enable (True) or disable (False) aggregation of model updates as soon as
+        they are received (see `FedAvg.aggregate_fit_partial`).
     """
 
     # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-locals, line-too-long
@@ -101,6 +104,7 @@ class FedOpt(FedAvg):
         beta_1: float = 0.0,
         beta_2: float = 0.0,
         tau: float = 1e-9,
+        streaming: bool = False,
     ) -> None:
         super().__init__(
             fraction_fit=fraction_fit,
@@ -115,6 +119,7 @@ class FedOpt(FedAvg):
             initial_parameters=initial_parameters,
             fit_metrics_aggregation_fn=fit_metrics_aggregation_fn,
             evaluate_metrics_aggregation_fn=evaluate_metrics_aggregation_fn,
+            streaming=streaming,
         )
         self.current_weights = parameters_to_ndarrays(initial_parameters)
         self.eta = eta
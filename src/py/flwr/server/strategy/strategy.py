@@ -105,6 +105,29 @@ class Strategy(ABC):
             the global model parameters remain the same.
         """
 
+    def aggregate_fit_partial(
+        self,
+        server_round: int,
+        result: tuple[ClientProxy, FitRes],
+    ) -> None:
+        """Aggregate a single training result as soon as it is received.
+
+        This method is called once for every successful training result, in the
+        order in which the results arrive, while the remaining clients of the round
+        are still training. Once all results have been received (or have failed),
+        `aggregate_fit` is called with the complete `results` and `failures` of the
+        round. Strategies can override this method to move the bulk of the
+        aggregation work out of the critical path at the end of each round. The
+        default implementation does nothing.
+
+        Parameters
+        ----------
+        server_round : int
+            The current round of federated learning.
+        result : Tuple[ClientProxy, FitRes]
+            A successful update from one of the previously selected clients.
+        """
+
     @abstractmethod
     def configure_evaluate(
         self, server_round: int, parameters: Parameters, client_manager: ClientManager
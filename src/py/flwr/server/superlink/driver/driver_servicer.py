@@ -15,13 +15,17 @@
 """Driver API servicer."""
 
 
+import hashlib
+import threading
 import time
+from collections.abc import Iterable
 from logging import DEBUG
 from typing import Optional
 from uuid import UUID
 
 import grpc
 
+from flwr.common.constant import LONG_POLL_MAX_TIMEOUT
 from flwr.common.logger import log
 from flwr.common.serde import (
     fab_from_proto,
@@ -54,6 +58,11 @@ from flwr.server.superlink.ffs.ffs_factory import FfsFactory
 from flwr.server.superlink.state import State, StateFactory
 from flwr.server.utils.validator import validate_task_ins_or_res
 
+from .parameters_refs import ParametersRefs
+
+# Metadata of the ParametersRecords stored in Ffs, to tell them apart from FABs
+PARAMETERS_RECORD_META = {"type": "ParametersRecord"}
+
 
 class DriverServicer(driver_pb2_grpc.DriverServicer):
     """Driver API servicer."""
@@ -61,6 +70,11 @@ class DriverServicer(driver_pb2_grpc.DriverServicer):
     def __init__(self, state_factory: StateFactory, ffs_factory: FfsFactory) -> None:
         self.state_factory = state_factory
         self.ffs_factory = ffs_factory
+        # Content-addressed ParametersRecords in Ffs are deleted once no outstanding
+        # TaskIns references them anymore
+        self.parameters_refs = ParametersRefs()
+        self.parameters_refs_lock = threading.Lock()
+        self._delete_orphaned_parameters()
 
     def GetNodes(
         self, request: GetNodesRequest, context: grpc.ServicerContext
@@ -114,15 +128,40 @@ class DriverServicer(driver_pb2_grpc.DriverServicer):
         for task_ins in request.task_ins_list:
             validation_errors = validate_task_ins_or_res(task_ins)
             _raise_if(bool(validation_errors), ", ".join(validation_errors))
+            for ref in task_ins.task.parameters_refs.values():
+                _raise_if(
+                    ref not in request.parameters_records,
+                    f"ParametersRecord ({ref}) referenced but not provided",
+                )
+        for ref, content in request.parameters_records.items():
+            _raise_if(
+                hashlib.sha256(content).hexdigest() != ref,
+                f"ParametersRecord ({ref}) hash doesn't match contents",
+            )
 
         # Init state
         state: State = self.state_factory.state()
 
-        # Store each TaskIns
-        task_ids: list[Optional[UUID]] = []
-        for task_ins in request.task_ins_list:
-            task_id: Optional[UUID] = state.store_task_ins(task_ins=task_ins)
-            task_ids.append(task_id)
+        with self.parameters_refs_lock:
+            # Store shared ParametersRecords once
+            ffs: Ffs = self.ffs_factory.ffs()
+            unreferenced = self.parameters_refs.release_expired(time.time())
+            for content in request.parameters_records.values():
+                ffs.put(content, PARAMETERS_RECORD_META)
+
+            try:
+                # Store all TaskIns at once
+                task_ids: list[Optional[UUID]] = state.store_task_ins_batch(
+                    request.task_ins_list
+                )
+
+                # Count the stored TaskIns referencing each ParametersRecord
+                for task_id, task_ins in zip(task_ids, request.task_ins_list):
+                    if task_id is not None:
+                        self.parameters_refs.add(str(task_id), task_ins.task)
+            finally:
+                unreferenced += request.parameters_records.keys()
+                self._delete_unreferenced_parameters(ffs, unreferenced)
 
         return PushTaskInsResponse(
             task_ids=[str(task_id) if task_id else "" for task_id in task_ids]
@@ -151,11 +190,22 @@ class DriverServicer(driver_pb2_grpc.DriverServicer):
 
             # Delete delivered TaskIns and TaskRes
             state.delete_tasks(task_ids=task_ids)
+            self._release_parameters(
+                task_res.task.ancestry[0] for task_res in task_res_list
+            )
 
         context.add_callback(on_rpc_done)
 
-        # Read from state
-        task_res_list: list[TaskRes] = state.get_task_res(task_ids=task_ids, limit=None)
+        # Read from state, waiting for results if the Driver asked for it
+        task_res_list: list[TaskRes]
+        if request.timeout > 0:
+            task_res_list = state.wait_for_task_res(
+                task_ids=task_ids,
+                limit=None,
+                timeout=min(request.timeout, LONG_POLL_MAX_TIMEOUT),
+            )
+        else:
+            task_res_list = state.get_task_res(task_ids=task_ids, limit=None)
 
         context.set_code(grpc.StatusCode.OK)
         return PullTaskResResponse(task_res_list=task_res_list)
@@ -198,6 +248,39 @@ class DriverServicer(driver_pb2_grpc.DriverServicer):
 
         raise ValueError(f"Found no FAB with hash: {request.hash_str}")
 
+    def _release_parameters(self, task_ids: Iterable[str]) -> None:
+        """Release the ParametersRecords referenced by replied or expired TaskIns."""
+        with self.parameters_refs_lock:
+            unreferenced = self.parameters_refs.release(task_ids)
+            unreferenced += self.parameters_refs.release_expired(time.time())
+            if unreferenced:
+                self._delete_unreferenced_parameters(
+                    self.ffs_factory.ffs(), unreferenced
+                )
+
+    def _delete_unreferenced_parameters(self, ffs: Ffs, refs: Iterable[str]) -> None:
+        """Delete the given ParametersRecords unless a TaskIns references them."""
+        for ref in set(refs):
+            if ref not in self.parameters_refs:
+                ffs.delete(ref)
+
+    def _delete_orphaned_parameters(self) -> None:
+        """Count the references of stored TaskIns and delete all other records.
+
+        ParametersRecords can be left in Ffs by a previous SuperLink process.
+        """
+        state: State = self.state_factory.state()
+        for task_ins in state.get_task_ins_with_parameters_refs():
+            self.parameters_refs.add(task_ins.task_id, task_ins.task)
+
+        ffs: Ffs = self.ffs_factory.ffs()
+        for key in ffs.list():
+            if key in self.parameters_refs:
+                continue
+            result = ffs.get(key)
+            if result is not None and result[1] == PARAMETERS_RECORD_META:
+                ffs.delete(key)
+
 
 def _raise_if(validation_error: bool, detail: str) -> None:
     if validation_error:
@@ -15,7 +15,32 @@
 """DriverServicer tests."""
 
 
-from flwr.server.superlink.driver.driver_servicer import _raise_if
+import hashlib
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import grpc
+
+from flwr.common import RecordSet
+from flwr.common.constant import PING_MAX_INTERVAL
+from flwr.common.serde import (
+    message_from_taskins,
+    message_to_taskins,
+    message_to_taskres,
+)
+from flwr.proto.driver_pb2 import (  # pylint: disable=E0611
+    PullTaskResRequest,
+    PushTaskInsRequest,
+)
+from flwr.server.driver.inmemory_driver import InMemoryDriver
+from flwr.server.superlink.driver.driver_servicer import (
+    PARAMETERS_RECORD_META,
+    DriverServicer,
+    _raise_if,
+)
+from flwr.server.superlink.ffs.ffs_factory import FfsFactory
+from flwr.server.superlink.state import StateFactory
 
 # pylint: disable=broad-except
 
@@ -54,3 +79,116 @@ def test_raise_if_true() -> None:
         assert str(err) == "Malformed PushTaskInsRequest: test"
     except Exception as err:
         raise AssertionError() from err
+
+
+def test_shared_parameters_records_deleted_once_replied(tmp_path: Path) -> None:
+    """Test that shared ParametersRecords are kept until all TaskIns are replied."""
+    # Prepare
+    state_factory = StateFactory(":flwr-in-memory-state:")
+    state = state_factory.state()
+    servicer = DriverServicer(state_factory, FfsFactory(str(tmp_path)))
+    ffs = servicer.ffs_factory.ffs()
+    driver = InMemoryDriver(state.create_run("", "", "", {}), state_factory)
+    node_ids = [state.create_node(ping_interval=PING_MAX_INTERVAL) for _ in range(2)]
+    content = b"global model"
+    ref = hashlib.sha256(content).hexdigest()
+    task_ins_list = [
+        message_to_taskins(driver.create_message(RecordSet(), "train", node_id, ""))
+        for node_id in node_ids
+    ]
+    for task_ins in task_ins_list:
+        task_ins.task.parameters_refs["global"] = ref
+
+    def reply_and_pull(node_id: int) -> None:
+        for task_ins in state.get_task_ins(node_id=node_id, limit=None):
+            task_res = message_to_taskres(
+                message_from_taskins(task_ins).create_reply(RecordSet())
+            )
+            task_res.task.pushed_at = time.time()
+            state.store_task_res(task_res)
+        context = MagicMock()
+        context.is_active.return_value = False
+        context.code.return_value = grpc.StatusCode.OK
+        servicer.PullTaskRes(PullTaskResRequest(task_ids=task_ids), context)
+        context.add_callback.call_args[0][0]()
+
+    # Execute
+    task_ids = servicer.PushTaskIns(
+        PushTaskInsRequest(
+            task_ins_list=task_ins_list, parameters_records={ref: content}
+        ),
+        MagicMock(),
+    ).task_ids
+    stored = ffs.get(ref)
+    reply_and_pull(node_ids[0])
+    stored_after_first_reply = ffs.get(ref)
+    reply_and_pull(node_ids[1])
+
+    # Assert
+    assert stored is not None and stored[0] == content
+    assert stored_after_first_reply is not None
+    assert ffs.get(ref) is None
+
+
+def test_shared_parameters_records_deleted_once_expired(tmp_path: Path) -> None:
+    """Test that shared ParametersRecords are deleted once their TaskIns expire."""
+    # Prepare
+    state_factory = StateFactory(":flwr-in-memory-state:")
+    state = state_factory.state()
+    servicer = DriverServicer(state_factory, FfsFactory(str(tmp_path)))
+    ffs = servicer.ffs_factory.ffs()
+    driver = InMemoryDriver(state.create_run("", "", "", {}), state_factory)
+    node_id = state.create_node(ping_interval=PING_MAX_INTERVAL)
+    contents = [b"model of round 1", b"model of round 2"]
+    refs = [hashlib.sha256(content).hexdigest() for content in contents]
+
+    def push(ref: str, content: bytes, ttl: float) -> None:
+        task_ins = message_to_taskins(
+            driver.create_message(RecordSet(), "train", node_id, "")
+        )
+        task_ins.task.ttl = ttl
+        task_ins.task.parameters_refs["global"] = ref
+        servicer.PushTaskIns(
+            PushTaskInsRequest(
+                task_ins_list=[task_ins], parameters_records={ref: content}
+            ),
+            MagicMock(),
+        )
+
+    # Execute
+    push(refs[0], contents[0], ttl=0.1)
+    stored = ffs.get(refs[0])
+    time.sleep(0.2)
+    push(refs[1], contents[1], ttl=60)
+
+    # Assert
+    assert stored is not None
+    assert ffs.get(refs[0]) is None
+    assert ffs.get(refs[1]) is not None
+
+
+def test_orphaned_parameters_records_deleted_at_startup(tmp_path: Path) -> None:
+    """Test that only ParametersRecords referenced by stored TaskIns are kept."""
+    # Prepare
+    state_factory = StateFactory(":flwr-in-memory-state:")
+    state = state_factory.state()
+    ffs_factory = FfsFactory(str(tmp_path))
+    ffs = ffs_factory.ffs()
+    driver = InMemoryDriver(state.create_run("", "", "", {}), state_factory)
+    node_id = state.create_node(ping_interval=PING_MAX_INTERVAL)
+    fab_hash = ffs.put(b"fab", {})
+    kept = ffs.put(b"referenced model", PARAMETERS_RECORD_META)
+    orphaned = ffs.put(b"orphaned model", PARAMETERS_RECORD_META)
+    task_ins = message_to_taskins(
+        driver.create_message(RecordSet(), "train", node_id, "")
+    )
+    task_ins.task.parameters_refs["global"] = kept
+    task_ins.task.pushed_at = time.time()
+    state.store_task_ins(task_ins)
+
+    # Execute
+    DriverServicer(state_factory, ffs_factory)
+
+    # Assert
+    assert sorted(ffs.list()) == sorted([fab_hash, kept])
+    assert orphaned not in ffs.list()
@@ -0,0 +1,77 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""References from TaskIns to ParametersRecords stored in Ffs."""
+
+
+import heapq
+from collections.abc import Iterable
+
+from flwr.proto.task_pb2 import Task  # pylint: disable=E0611
+
+
+class ParametersRefs:
+    """Count the outstanding TaskIns referencing each shared ParametersRecord.
+
+    A TaskIns stops referencing its ParametersRecords (see `Task.parameters_refs`)
+    once it is released, either because it has been replied to or because it has
+    expired. Records are no longer needed when their count drops to zero.
+    """
+
+    def __init__(self) -> None:
+        # Number of outstanding TaskIns referencing each ParametersRecord
+        self.counts: dict[str, int] = {}
+        # Map task_id of outstanding TaskIns to the ParametersRecords they reference
+        self.task_refs: dict[str, list[str]] = {}
+        # Heap of (expiration time, task_id) of outstanding TaskIns
+        self.expirations: list[tuple[float, str]] = []
+
+    def __contains__(self, ref: object) -> bool:
+        """Return True if an outstanding TaskIns references the ParametersRecord."""
+        return ref in self.counts
+
+    def add(self, task_id: str, task: Task) -> None:
+        """Count the references of a stored TaskIns."""
+        refs = list(set(task.parameters_refs.values()))
+        if not refs or task_id in self.task_refs:
+            return
+        self.task_refs[task_id] = refs
+        for ref in refs:
+            self.counts[ref] = self.counts.get(ref, 0) + 1
+        heapq.heappush(self.expirations, (task.created_at + task.ttl, task_id))
+
+    def release(self, task_ids: Iterable[str]) -> list[str]:
+        """Release TaskIns and return the ParametersRecords no longer referenced."""
+        unreferenced: list[str] = []
+        for task_id in task_ids:
+            for ref in self.task_refs.pop(task_id, []):
+                self.counts[ref] -= 1
+                if self.counts[ref] == 0:
+                    del self.counts[ref]
+                    unreferenced.append(ref)
+
+        # Drop the expirations of released TaskIns once they make up most of the heap
+        if len(self.expirations) > 2 * len(self.task_refs) + 64:
+            self.expirations = [
+                item for item in self.expirations if item[1] in self.task_refs
+            ]
+            heapq.heapify(self.expirations)
+        return unreferenced
+
+    def release_expired(self, now: float) -> list[str]:
+        """Release TaskIns that expired before `now`, see `release`."""
+        expired: list[str] = []
+        while self.expirations and self.expirations[0][0] <= now:
+            expired.append(heapq.heappop(self.expirations)[1])
+        return self.release(expired)
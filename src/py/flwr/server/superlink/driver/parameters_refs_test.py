@@ -0,0 +1,66 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""ParametersRefs tests."""
+
+
+from flwr.proto.task_pb2 import Task  # pylint: disable=E0611
+
+from .parameters_refs import ParametersRefs
+
+
+def _task(refs: list[str], created_at: float = 100.0, ttl: float = 10.0) -> Task:
+    return Task(
+        created_at=created_at,
+        ttl=ttl,
+        parameters_refs={f"record-{i}": ref for i, ref in enumerate(refs)},
+    )
+
+
+def test_release_counts_references() -> None:
+    """Test that records are unreferenced once all their TaskIns are released."""
+    # Prepare
+    refs = ParametersRefs()
+    refs.add("task-1", _task(["model", "model", "extra"]))
+    refs.add("task-2", _task(["model"]))
+    refs.add("task-3", _task([]))
+
+    # Execute
+    released_1 = refs.release(["task-1", "task-3", "unknown"])
+    released_2 = refs.release(["task-2"])
+
+    # Assert
+    assert released_1 == ["extra"]
+    assert released_2 == ["model"]
+    assert "model" not in refs
+    assert not refs.task_refs
+
+
+def test_release_expired() -> None:
+    """Test that expired TaskIns are released, once."""
+    # Prepare
+    refs = ParametersRefs()
+    refs.add("task-1", _task(["model"], created_at=100.0, ttl=10.0))
+    refs.add("task-2", _task(["model"], created_at=100.0, ttl=20.0))
+
+    # Execute
+    released_1 = refs.release_expired(now=110.0)
+    released_2 = refs.release(["task-1"])
+    released_3 = refs.release_expired(now=120.0)
+
+    # Assert
+    assert not released_1
+    assert not released_2
+    assert released_3 == ["model"]
+    assert not refs.expirations
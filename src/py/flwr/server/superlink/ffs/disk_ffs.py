@@ -102,6 +102,8 @@ class DiskFfs(Ffs):  # pylint: disable=R0904
         List[str]
             A list of all available keys.
         """
+        if not self.base_dir.exists():
+            return []
         return [
             item.name for item in self.base_dir.iterdir() if not item.suffix == ".META"
         ]
@@ -65,6 +65,7 @@ class GrpcAdapterServicer(grpcadapter_pb2_grpc.GrpcAdapterServicer):
     def __init__(self, state_factory: StateFactory, ffs_factory: FfsFactory) -> None:
         self.state_factory = state_factory
         self.ffs_factory = ffs_factory
+        self.pull_task_ins_resources = message_handler.PullTaskInsResources()
 
     def SendReceive(  # pylint: disable=too-many-return-statements
         self, request: MessageContainer, context: grpc.ServicerContext
@@ -117,6 +118,8 @@ class GrpcAdapterServicer(grpcadapter_pb2_grpc.GrpcAdapterServicer):
         return message_handler.pull_task_ins(
             request=request,
             state=self.state_factory.state(),
+            ffs=self.ffs_factory.ffs(),
+            resources=self.pull_task_ins_resources,
         )
 
     def _push_task_res(self, request: PushTaskResRequest) -> PushTaskResResponse:
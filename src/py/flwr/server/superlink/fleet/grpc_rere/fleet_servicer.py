@@ -15,10 +15,12 @@
 """Fleet API gRPC request-response servicer."""
 
 
+from collections.abc import Iterator
 from logging import DEBUG, INFO
 
 import grpc
 
+from flwr.common.chunk import merge_push_task_res_chunks
 from flwr.common.logger import log
 from flwr.proto import fleet_pb2_grpc  # pylint: disable=E0611
 from flwr.proto.fab_pb2 import GetFabRequest, GetFabResponse  # pylint: disable=E0611
@@ -29,8 +31,10 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     DeleteNodeResponse,
     PingRequest,
     PingResponse,
+    PullTaskInsChunk,
     PullTaskInsRequest,
     PullTaskInsResponse,
+    PushTaskResChunk,
     PushTaskResRequest,
     PushTaskResResponse,
 )
@@ -46,6 +50,7 @@ class FleetServicer(fleet_pb2_grpc.FleetServicer):
     def __init__(self, state_factory: StateFactory, ffs_factory: FfsFactory) -> None:
         self.state_factory = state_factory
         self.ffs_factory = ffs_factory
+        self.pull_task_ins_resources = message_handler.PullTaskInsResources()
 
     def CreateNode(
         self, request: CreateNodeRequest, context: grpc.ServicerContext
@@ -89,6 +94,9 @@ class FleetServicer(fleet_pb2_grpc.FleetServicer):
         return message_handler.pull_task_ins(
             request=request,
             state=self.state_factory.state(),
+            ffs=self.ffs_factory.ffs(),
+            resources=self.pull_task_ins_resources,
+            context=context,
         )
 
     def PushTaskRes(
@@ -108,6 +116,32 @@ class FleetServicer(fleet_pb2_grpc.FleetServicer):
             state=self.state_factory.state(),
         )
 
+    def PullTaskInsStream(
+        self, request: PullTaskInsRequest, context: grpc.ServicerContext
+    ) -> Iterator[PullTaskInsChunk]:
+        """Pull TaskIns in chunks."""
+        log(INFO, "[Fleet.PullTaskInsStream] node_id=%s", request.node.node_id)
+        log(DEBUG, "[Fleet.PullTaskInsStream] Request: %s", request)
+        yield from message_handler.pull_task_ins_stream(
+            request=request,
+            state=self.state_factory.state(),
+            ffs=self.ffs_factory.ffs(),
+            resources=self.pull_task_ins_resources,
+            context=context,
+        )
+
+    def PushTaskResStream(
+        self,
+        request_iterator: Iterator[PushTaskResChunk],
+        context: grpc.ServicerContext,
+    ) -> PushTaskResResponse:
+        """Push TaskRes in chunks."""
+        try:
+            request = merge_push_task_res_chunks(request_iterator)
+        except ValueError as ex:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(ex))
+        return self.PushTaskRes(request, context)
+
     def GetRun(
         self, request: GetRunRequest, context: grpc.ServicerContext
     ) -> GetRunResponse:
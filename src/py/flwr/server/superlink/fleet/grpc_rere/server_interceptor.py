@@ -16,12 +16,13 @@
 
 
 import base64
+import hashlib
+import threading
 from collections.abc import Sequence
 from logging import INFO, WARNING
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, Optional, Union, cast
 
 import grpc
-from cryptography.hazmat.primitives.asymmetric import ec
 
 from flwr.common.logger import log
 from flwr.common.secure_aggregation.crypto.symmetric_encryption import (
@@ -48,6 +49,11 @@ from flwr.server.superlink.state import State
 
 _PUBLIC_KEY_HEADER = "public-key"
 _AUTH_TOKEN_HEADER = "auth-token"
+# Version of the auth token: nodes authenticate the SHA-256 digest of the serialized
+# request (version 2) if the SuperLink announces it in the `CreateNode` response,
+# otherwise (and for older nodes) the deterministically serialized request itself
+_AUTH_TOKEN_VERSION_HEADER = "auth-token-version"
+_AUTH_TOKEN_DIGEST_VERSION = "2"
 
 Request = Union[
     CreateNodeRequest,
@@ -97,6 +103,13 @@ class AuthenticateServerInterceptor(grpc.ServerInterceptor):  # type: ignore
         self.server_private_key = bytes_to_private_key(private_key)
         self.encoded_server_public_key = base64.urlsafe_b64encode(public_key)
 
+        # ECDH shared secrets and node IDs of authenticated nodes, keyed by the
+        # node public key, entries are removed when the State deletes the node
+        self.shared_secrets: dict[bytes, bytes] = {}
+        self.node_ids: dict[bytes, int] = {}
+        self._cache_lock = threading.Lock()
+        state.add_node_deletion_listener(self._invalidate_nodes)
+
     def intercept_service(
         self,
         continuation: Callable[[Any], Any],
@@ -111,15 +124,19 @@ class AuthenticateServerInterceptor(grpc.ServerInterceptor):  # type: ignore
         # One of the method handlers in
         # `flwr.server.superlink.fleet.grpc_rere.fleet_server.FleetServicer`
         method_handler: grpc.RpcMethodHandler = continuation(handler_call_details)
+        if method_handler.request_streaming or method_handler.response_streaming:
+            return _unimplemented_streaming_method_handler(method_handler)
         return self._generic_auth_unary_method_handler(method_handler)
 
     def _generic_auth_unary_method_handler(
         self, method_handler: grpc.RpcMethodHandler
     ) -> grpc.RpcMethodHandler:
         def _generic_method_handler(
-            request: Request,
+            digested_request: tuple[Request, bytes],
             context: grpc.ServicerContext,
         ) -> Response:
+            # Digest of the received bytes, computed during deserialization
+            request, request_digest = digested_request
             node_public_key_bytes = base64.urlsafe_b64decode(
                 _get_value_from_tuples(
                     _PUBLIC_KEY_HEADER, context.invocation_metadata()
@@ -145,25 +162,53 @@ class AuthenticateServerInterceptor(grpc.ServerInterceptor):  # type: ignore
                     _AUTH_TOKEN_HEADER, context.invocation_metadata()
                 )
             )
-            public_key = bytes_to_public_key(node_public_key_bytes)
-
-            if not self._verify_hmac(public_key, request, hmac_value):
+            version = _get_value_from_tuples(
+                _AUTH_TOKEN_VERSION_HEADER, context.invocation_metadata()
+            )
+            if version == _AUTH_TOKEN_DIGEST_VERSION.encode():
+                message = request_digest
+            else:
+                message = request.SerializeToString(deterministic=True)
+            if not self._verify_hmac(node_public_key_bytes, message, hmac_value):
                 context.abort(grpc.StatusCode.UNAUTHENTICATED, "Access denied")
 
             # Verify node_id
-            node_id = self.state.get_node_id(node_public_key_bytes)
+            node_id = self._get_node_id(node_public_key_bytes)
 
             if not self._verify_node_id(node_id, request):
                 context.abort(grpc.StatusCode.UNAUTHENTICATED, "Access denied")
 
-            return method_handler.unary_unary(request, context)  # type: ignore
+            return cast(Response, method_handler.unary_unary(request, context))
+
+        def _request_deserializer(request_bytes: bytes) -> tuple[Request, bytes]:
+            # Pass the digest of the received bytes on along with the request
+            request: Request = method_handler.request_deserializer(request_bytes)
+            return request, hashlib.sha256(request_bytes).digest()
 
         return grpc.unary_unary_rpc_method_handler(
             _generic_method_handler,
-            request_deserializer=method_handler.request_deserializer,
+            request_deserializer=_request_deserializer,
             response_serializer=method_handler.response_serializer,
         )
 
+    def _get_node_id(self, public_key_bytes: bytes) -> Optional[int]:
+        node_id = self.node_ids.get(public_key_bytes)
+        if node_id is None:
+            node_id = self.state.get_node_id(public_key_bytes)
+            if node_id is not None:
+                with self._cache_lock:
+                    self.node_ids[public_key_bytes] = node_id
+        return node_id
+
+    def _invalidate_nodes(self, node_ids: list[int]) -> None:
+        """Drop the cached entries of nodes deleted from the State."""
+        deleted = set(node_ids)
+        with self._cache_lock:
+            for public_key_bytes, node_id in list(self.node_ids.items()):
+                if node_id in deleted:
+                    del self.node_ids[public_key_bytes]
+                    self.shared_secrets.pop(public_key_bytes, None)
+
     def _verify_node_id(
         self,
         node_id: Optional[int],
@@ -186,11 +231,15 @@ class AuthenticateServerInterceptor(grpc.ServerInterceptor):  # type: ignore
         return request.node.node_id == node_id
 
     def _verify_hmac(
-        self, public_key: ec.EllipticCurvePublicKey, request: Request, hmac_value: bytes
+        self, public_key_bytes: bytes, message: bytes, hmac_value: bytes
     ) -> bool:
-        shared_secret = generate_shared_key(self.server_private_key, public_key)
-        message_bytes = request.SerializeToString(deterministic=True)
-        return verify_hmac(shared_secret, message_bytes, hmac_value)
+        shared_secret = self.shared_secrets.get(public_key_bytes)
+        if shared_secret is None:
+            public_key = bytes_to_public_key(public_key_bytes)
+            shared_secret = generate_shared_key(self.server_private_key, public_key)
+            with self._cache_lock:
+                self.shared_secrets[public_key_bytes] = shared_secret
+        return verify_hmac(shared_secret, message, hmac_value)
 
     def _create_authenticated_node(
         self,
@@ -204,6 +253,10 @@ class AuthenticateServerInterceptor(grpc.ServerInterceptor):  # type: ignore
                     _PUBLIC_KEY_HEADER,
                     self.encoded_server_public_key,
                 ),
+                (
+                    _AUTH_TOKEN_VERSION_HEADER,
+                    _AUTH_TOKEN_DIGEST_VERSION,
+                ),
             )
         )
 
@@ -213,10 +266,38 @@ class AuthenticateServerInterceptor(grpc.ServerInterceptor):  # type: ignore
         # Return previously assigned `node_id` for the provided `public_key`
         if node_id is not None:
             self.state.acknowledge_ping(node_id, request.ping_interval)
+            with self._cache_lock:
+                self.node_ids[public_key_bytes] = node_id
             return CreateNodeResponse(node=Node(node_id=node_id, anonymous=False))
 
         # No `node_id` exists for the provided `public_key`
         # Handle `CreateNode` here instead of calling the default method handler
         # Note: the innermost `CreateNode` method will never be called
         node_id = self.state.create_node(request.ping_interval, public_key_bytes)
+        with self._cache_lock:
+            self.node_ids[public_key_bytes] = node_id
         return CreateNodeResponse(node=Node(node_id=node_id, anonymous=False))
+
+
+def _unimplemented_streaming_method_handler(
+    method_handler: grpc.RpcMethodHandler,
+) -> grpc.RpcMethodHandler:
+    """Reject streaming calls, nodes use the authenticated unary calls instead."""
+
+    def _abort(_: Any, context: grpc.ServicerContext) -> Any:
+        context.abort(
+            grpc.StatusCode.UNIMPLEMENTED,
+            "Streaming calls are not supported with node authentication",
+        )
+
+    if method_handler.request_streaming:
+        return grpc.stream_unary_rpc_method_handler(
+            _abort,
+            request_deserializer=method_handler.request_deserializer,
+            response_serializer=method_handler.response_serializer,
+        )
+    return grpc.unary_stream_rpc_method_handler(
+        _abort,
+        request_deserializer=method_handler.request_deserializer,
+        response_serializer=method_handler.response_serializer,
+    )
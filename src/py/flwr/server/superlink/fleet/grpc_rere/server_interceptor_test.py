@@ -16,7 +16,10 @@
 
 
 import base64
+import hashlib
 import unittest
+from typing import Any
+from unittest.mock import patch
 
 import grpc
 
@@ -35,6 +38,7 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     DeleteNodeResponse,
     PingRequest,
     PingResponse,
+    PullTaskInsChunk,
     PullTaskInsRequest,
     PullTaskInsResponse,
     PushTaskResRequest,
@@ -48,7 +52,9 @@ from flwr.server.superlink.ffs.ffs_factory import FfsFactory
 from flwr.server.superlink.state.state_factory import StateFactory
 
 from .server_interceptor import (
+    _AUTH_TOKEN_DIGEST_VERSION,
     _AUTH_TOKEN_HEADER,
+    _AUTH_TOKEN_VERSION_HEADER,
     _PUBLIC_KEY_HEADER,
     AuthenticateServerInterceptor,
 )
@@ -139,6 +145,10 @@ class TestServerInterceptor(unittest.TestCase):  # pylint: disable=R0902
 
         # Assert
         assert call.initial_metadata()[0] == expected_metadata
+        assert call.initial_metadata()[1] == (
+            _AUTH_TOKEN_VERSION_HEADER,
+            _AUTH_TOKEN_DIGEST_VERSION,
+        )
         assert isinstance(response, CreateNodeResponse)
 
     def test_unsuccessful_create_node_with_metadata(self) -> None:
@@ -504,3 +514,69 @@ class TestServerInterceptor(unittest.TestCase):  # pylint: disable=R0902
         assert call.initial_metadata()[0] == expected_metadata
         assert isinstance(response, CreateNodeResponse)
         assert response.node.node_id == node_node_id
+
+    def test_cache_shared_secret_and_node_id(self) -> None:
+        """Test that the shared secret and node ID are cached until the node is deleted
+        from the State, with auth tokens over the request digest."""
+        # Prepare
+        node_public_key = public_key_to_bytes(self._node_public_key)
+        node_id = self.state.create_node(ping_interval=30, public_key=node_public_key)
+        shared_secret = generate_shared_key(
+            self._node_private_key, self._server_public_key
+        )
+        public_key_bytes = base64.urlsafe_b64encode(node_public_key)
+
+        def _metadata(request: PingRequest) -> Any:
+            hmac_value = base64.urlsafe_b64encode(
+                compute_hmac(
+                    shared_secret, hashlib.sha256(request.SerializeToString()).digest()
+                )
+            )
+            return (
+                (_PUBLIC_KEY_HEADER, public_key_bytes),
+                (_AUTH_TOKEN_HEADER, hmac_value),
+                (_AUTH_TOKEN_VERSION_HEADER, _AUTH_TOKEN_DIGEST_VERSION),
+            )
+
+        ping_request = PingRequest(node=Node(node_id=node_id), ping_interval=30)
+
+        # Execute
+        with patch(
+            "flwr.server.superlink.fleet.grpc_rere.server_interceptor"
+            ".generate_shared_key",
+            wraps=generate_shared_key,
+        ) as mock_generate_shared_key:
+            for _ in range(3):
+                self._ping.with_call(
+                    request=ping_request, metadata=_metadata(ping_request)
+                )
+
+        # Assert
+        mock_generate_shared_key.assert_called_once()
+        assert self._server_interceptor.shared_secrets == {
+            node_public_key: shared_secret
+        }
+        assert self._server_interceptor.node_ids == {node_public_key: node_id}
+
+        # Execute
+        self.state.delete_node(node_id)
+
+        # Assert
+        assert not self._server_interceptor.shared_secrets
+        assert not self._server_interceptor.node_ids
+
+    def test_unimplemented_streaming_call(self) -> None:
+        """Test that streaming calls are rejected with authentication enabled."""
+        # Prepare
+        pull_task_ins_stream = self._channel.unary_stream(
+            "/flwr.proto.Fleet/PullTaskInsStream",
+            request_serializer=PullTaskInsRequest.SerializeToString,
+            response_deserializer=PullTaskInsChunk.FromString,
+        )
+
+        # Execute
+        with self.assertRaises(grpc.RpcError) as cm:
+            list(pull_task_ins_stream(PullTaskInsRequest()))
+
+        # Assert
+        assert cm.exception.code() == grpc.StatusCode.UNIMPLEMENTED
@@ -15,11 +15,30 @@
 """Fleet API message handlers."""
 
 
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from logging import ERROR
 from typing import Optional
 from uuid import UUID
 
-from flwr.common.serde import fab_to_proto, user_config_to_proto
+import grpc
+
+from flwr.common.chunk import split_pull_task_ins_response
+from flwr.common.constant import (
+    LONG_POLL_MAX_PARKED_REQUESTS,
+    LONG_POLL_MAX_TIMEOUT,
+    ErrorCode,
+)
+from flwr.common.logger import log
+from flwr.common.message import Error
+from flwr.common.serde import (
+    fab_to_proto,
+    message_from_taskins,
+    message_to_taskres,
+    user_config_to_proto,
+)
 from flwr.common.typing import Fab
 from flwr.proto.fab_pb2 import GetFabRequest, GetFabResponse  # pylint: disable=E0611
 from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
@@ -29,6 +48,7 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     DeleteNodeResponse,
     PingRequest,
     PingResponse,
+    PullTaskInsChunk,
     PullTaskInsRequest,
     PullTaskInsResponse,
     PushTaskResRequest,
@@ -36,6 +56,7 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     Reconnect,
 )
 from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
+from flwr.proto.recordset_pb2 import ParametersRecord  # pylint: disable=E0611
 from flwr.proto.run_pb2 import (  # pylint: disable=E0611
     GetRunRequest,
     GetRunResponse,
@@ -45,6 +66,58 @@ from flwr.proto.task_pb2 import TaskIns, TaskRes  # pylint: disable=E0611
 from flwr.server.superlink.ffs.ffs import Ffs
 from flwr.server.superlink.state import State
 
+PARAMETERS_CACHE_SIZE = 4
+
+
+class PullTaskInsResources:
+    """Resources shared by all requests pulling TaskIns from one Fleet API server.
+
+    Parameters
+    ----------
+    max_parked_requests : int (default: LONG_POLL_MAX_PARKED_REQUESTS)
+        The maximum number of requests waiting for TaskIns at once. Each parked
+        request occupies a worker thread, hence their number is limited.
+    parameters_cache_size : int (default: PARAMETERS_CACHE_SIZE)
+        The number of recently used content-addressed ParametersRecords (e.g., the
+        global model of the current round) kept deserialized in memory.
+    """
+
+    def __init__(
+        self,
+        max_parked_requests: int = LONG_POLL_MAX_PARKED_REQUESTS,
+        parameters_cache_size: int = PARAMETERS_CACHE_SIZE,
+    ) -> None:
+        self.long_poll_slots = threading.BoundedSemaphore(max_parked_requests)
+        self.parameters_cache_size = parameters_cache_size
+        self.parameters_cache: OrderedDict[str, ParametersRecord] = OrderedDict()
+        self.parameters_cache_lock = threading.Lock()
+
+    def get_parameters_record(self, ref: str, ffs: Ffs) -> Optional[ParametersRecord]:
+        """Get a ParametersRecord from the cache or, on a miss, from Ffs."""
+        with self.parameters_cache_lock:
+            if (record := self.parameters_cache.get(ref)) is not None:
+                self.parameters_cache.move_to_end(ref)
+                return record
+
+        # Read and deserialize without holding the lock. As records are
+        # content-addressed, concurrent misses store equal records and cached
+        # entries never become stale.
+        if (result := ffs.get(ref)) is None:
+            return None
+        record = ParametersRecord.FromString(result[0])
+        with self.parameters_cache_lock:
+            self.parameters_cache[ref] = record
+            self.parameters_cache.move_to_end(ref)
+            if len(self.parameters_cache) > self.parameters_cache_size:
+                self.parameters_cache.popitem(last=False)
+        return record
+
+
+MESSAGE_UNAVAILABLE_ERROR_REASON = (
+    "Error: Message Unavailable - A ParametersRecord of the message is no longer "
+    "stored on the SuperLink."
+)
+
 
 def create_node(
     request: CreateNodeRequest,  # pylint: disable=unused-argument
@@ -76,20 +149,88 @@ def ping(
     return PingResponse(success=res)
 
 
-def pull_task_ins(request: PullTaskInsRequest, state: State) -> PullTaskInsResponse:
+def pull_task_ins(
+    request: PullTaskInsRequest,
+    state: State,
+    ffs: Ffs,
+    resources: PullTaskInsResources,
+    context: Optional[grpc.ServicerContext] = None,
+) -> PullTaskInsResponse:
     """Pull TaskIns handler."""
+    response, parameters = _pull_task_ins(request, state, ffs, resources, context)
+
+    # Replace references to shared ParametersRecords by their content
+    for task_ins in response.task_ins_list:
+        for name, ref in task_ins.task.parameters_refs.items():
+            task_ins.task.recordset.parameters[name].CopyFrom(parameters[ref])
+        task_ins.task.ClearField("parameters_refs")
+    return response
+
+
+def pull_task_ins_stream(
+    request: PullTaskInsRequest,
+    state: State,
+    ffs: Ffs,
+    resources: PullTaskInsResources,
+    context: Optional[grpc.ServicerContext] = None,
+) -> Iterator[PullTaskInsChunk]:
+    """Pull TaskIns handler streaming the response in chunks.
+
+    Shared ParametersRecords are streamed from the cache without being copied into the
+    response.
+    """
+    response, parameters = _pull_task_ins(request, state, ffs, resources, context)
+    return iter(split_pull_task_ins_response(response, parameters))
+
+
+def _pull_task_ins(
+    request: PullTaskInsRequest,
+    state: State,
+    ffs: Ffs,
+    resources: PullTaskInsResources,
+    context: Optional[grpc.ServicerContext],
+) -> tuple[PullTaskInsResponse, dict[str, ParametersRecord]]:
+    """Pull TaskIns and the shared ParametersRecords they reference.
+
+    While waiting, the RPC `context` (if any) is checked to stop waiting as soon as
+    the Node disconnects, in which case no TaskIns is marked as delivered.
+    """
     # Get node_id if client node is not anonymous
     node = request.node  # pylint: disable=no-member
     node_id: Optional[int] = None if node.anonymous else node.node_id
 
-    # Retrieve TaskIns from State
-    task_ins_list: list[TaskIns] = state.get_task_ins(node_id=node_id, limit=1)
+    # Retrieve TaskIns from State, waiting for them if requested and possible
+    task_ins_list: list[TaskIns]
+    timeout = min(request.timeout, LONG_POLL_MAX_TIMEOUT)
+    # pylint: disable-next=consider-using-with
+    if timeout > 0 and resources.long_poll_slots.acquire(blocking=False):
+        try:
+            task_ins_list = state.wait_for_task_ins(
+                node_id=node_id,
+                limit=1,
+                timeout=timeout,
+                is_active=None if context is None else context.is_active,
+            )
+        finally:
+            resources.long_poll_slots.release()
+    else:
+        task_ins_list = state.get_task_ins(node_id=node_id, limit=1)
 
-    # Build response
+    # Build response, which copies the TaskIns (the State may return the stored
+    # ones, which must keep referencing the shared ParametersRecords)
     response = PullTaskInsResponse(
         task_ins_list=task_ins_list,
     )
-    return response
+
+    # Get the shared ParametersRecords referenced by each TaskIns
+    parameters: dict[str, ParametersRecord] = {}
+    for index in reversed(range(len(response.task_ins_list))):
+        task_ins = response.task_ins_list[index]
+        if not _get_parameters_records(task_ins, ffs, resources, parameters):
+            # The TaskIns is marked as delivered, reply to it on the node's behalf
+            _store_error_reply(task_ins, state)
+            del response.task_ins_list[index]
+    return response, parameters
 
 
 def push_task_res(request: PushTaskResRequest, state: State) -> PushTaskResResponse:
@@ -141,3 +282,45 @@ def get_fab(
         return GetFabResponse(fab=fab_to_proto(fab))
 
     raise ValueError(f"Found no FAB with hash: {request.hash_str}")
+
+
+def _get_parameters_records(
+    task_ins: TaskIns,
+    ffs: Ffs,
+    resources: PullTaskInsResources,
+    parameters: dict[str, ParametersRecord],
+) -> bool:
+    """Add the ParametersRecords referenced by the TaskIns to `parameters`.
+
+    Returns False, leaving `parameters` unchanged, if a referenced ParametersRecord
+    does not exist (anymore).
+    """
+    records: dict[str, ParametersRecord] = {}
+    for ref in task_ins.task.parameters_refs.values():
+        record = parameters.get(ref)
+        if record is None:
+            record = resources.get_parameters_record(ref, ffs)
+        if record is None:
+            log(
+                ERROR,
+                "ParametersRecord %s of TaskIns %s not found",
+                ref,
+                task_ins.task_id,
+            )
+            return False
+        records[ref] = record
+    parameters.update(records)
+    return True
+
+
+def _store_error_reply(task_ins: TaskIns, state: State) -> None:
+    """Store a TaskRes with a message unavailable error replying to the TaskIns."""
+    message = message_from_taskins(task_ins).create_error_reply(
+        Error(
+            code=ErrorCode.MESSAGE_UNAVAILABLE,
+            reason=MESSAGE_UNAVAILABLE_ERROR_REASON,
+        )
+    )
+    task_res = message_to_taskres(message)
+    task_res.task.pushed_at = time.time()
+    state.store_task_res(task_res=task_res)
@@ -15,8 +15,13 @@
 """Fleet API message handler tests."""
 
 
+import hashlib
+import time
 from unittest.mock import MagicMock
 
+from flwr.common import DEFAULT_TTL
+from flwr.common.chunk import merge_pull_task_ins_chunks
+from flwr.common.constant import LONG_POLL_MAX_TIMEOUT, ErrorCode
 from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     CreateNodeRequest,
     DeleteNodeRequest,
@@ -24,9 +29,22 @@ from flwr.proto.fleet_pb2 import (  # pylint: disable=E0611
     PushTaskResRequest,
 )
 from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
-from flwr.proto.task_pb2 import Task, TaskRes  # pylint: disable=E0611
+from flwr.proto.recordset_pb2 import (  # pylint: disable=E0611
+    Array,
+    ParametersRecord,
+    RecordSet,
+)
+from flwr.proto.task_pb2 import Task, TaskIns, TaskRes  # pylint: disable=E0611
+from flwr.server.utils.validator import validate_task_ins_or_res
 
-from .message_handler import create_node, delete_node, pull_task_ins, push_task_res
+from .message_handler import (
+    PullTaskInsResources,
+    create_node,
+    delete_node,
+    pull_task_ins,
+    pull_task_ins_stream,
+    push_task_res,
+)
 
 
 def test_create_node() -> None:
@@ -90,7 +108,9 @@ def test_pull_task_ins() -> None:
     state = MagicMock()
 
     # Execute
-    pull_task_ins(request=request, state=state)
+    pull_task_ins(
+        request=request, state=state, ffs=MagicMock(), resources=PullTaskInsResources()
+    )
 
     # Assert
     state.create_node.assert_not_called()
@@ -101,6 +121,160 @@ def test_pull_task_ins() -> None:
     state.get_task_res.assert_not_called()
 
 
+def test_pull_task_ins_long_polling() -> None:
+    """Test pull_task_ins waiting for TaskIns with a capped timeout."""
+    # Prepare
+    request = PullTaskInsRequest(node=Node(node_id=1, anonymous=False), timeout=1e3)
+    state = MagicMock()
+
+    # Execute
+    pull_task_ins(
+        request=request, state=state, ffs=MagicMock(), resources=PullTaskInsResources()
+    )
+
+    # Assert
+    state.get_task_ins.assert_not_called()
+    state.wait_for_task_ins.assert_called_once_with(
+        node_id=1, limit=1, timeout=LONG_POLL_MAX_TIMEOUT, is_active=None
+    )
+
+
+def test_pull_task_ins_long_polling_checks_context() -> None:
+    """Test pull_task_ins stopping to wait once the RPC is no longer active."""
+    # Prepare
+    request = PullTaskInsRequest(node=Node(node_id=1, anonymous=False), timeout=10)
+    state = MagicMock()
+    context = MagicMock()
+
+    # Execute
+    pull_task_ins(
+        request=request,
+        state=state,
+        ffs=MagicMock(),
+        resources=PullTaskInsResources(),
+        context=context,
+    )
+
+    # Assert
+    state.wait_for_task_ins.assert_called_once_with(
+        node_id=1, limit=1, timeout=10, is_active=context.is_active
+    )
+
+
+def test_pull_task_ins_long_polling_no_slot_available() -> None:
+    """Test pull_task_ins returning immediately if too many requests are parked."""
+    # Prepare
+    request = PullTaskInsRequest(node=Node(node_id=1, anonymous=False), timeout=10)
+    state = MagicMock()
+    resources = PullTaskInsResources(max_parked_requests=1)
+
+    # Execute
+    with resources.long_poll_slots:  # Occupy the only slot
+        pull_task_ins(
+            request=request, state=state, ffs=MagicMock(), resources=resources
+        )
+
+    # Assert
+    state.get_task_ins.assert_called_once()
+    state.wait_for_task_ins.assert_not_called()
+
+
+def test_pull_task_ins_resolves_parameters_refs() -> None:
+    """Test that shared ParametersRecords are resolved and cached."""
+    # Prepare
+    record = ParametersRecord(data_keys=["resolve-test"])
+    content = record.SerializeToString()
+    ref = hashlib.sha256(content).hexdigest()
+    request = PullTaskInsRequest(node=Node(node_id=1, anonymous=False))
+    state = MagicMock()
+    ffs = MagicMock()
+    ffs.get.return_value = (content, {})
+
+    task_ins = TaskIns(task=Task(parameters_refs={"global": ref}))
+    state.get_task_ins.return_value = [task_ins]
+
+    # Execute
+    resources = PullTaskInsResources()
+    responses = [
+        pull_task_ins(request=request, state=state, ffs=ffs, resources=resources)
+        for _ in range(2)
+    ]
+
+    # Assert
+    for response in responses:
+        task = response.task_ins_list[0].task
+        assert task.recordset.parameters["global"] == record
+        assert len(task.parameters_refs) == 0
+    ffs.get.assert_called_once_with(ref)
+    # The TaskIns returned by the State is left unchanged
+    assert dict(task_ins.task.parameters_refs) == {"global": ref}
+    assert len(task_ins.task.recordset.parameters) == 0
+
+
+def test_pull_task_ins_stream() -> None:
+    """Test that the streamed response matches the unary one."""
+    # Prepare
+    record = ParametersRecord(
+        data_keys=["stream-test"], data_values=[Array(dtype="float", data=b"x" * 100)]
+    )
+    content = record.SerializeToString()
+    ref = hashlib.sha256(content).hexdigest()
+    request = PullTaskInsRequest(node=Node(node_id=1, anonymous=False))
+    state = MagicMock()
+    ffs = MagicMock()
+    ffs.get.return_value = (content, {})
+    state.get_task_ins.return_value = [
+        TaskIns(task=Task(parameters_refs={"global": ref}))
+    ]
+
+    # Execute
+    resources = PullTaskInsResources()
+    expected = pull_task_ins(request=request, state=state, ffs=ffs, resources=resources)
+    chunks = list(
+        pull_task_ins_stream(request=request, state=state, ffs=ffs, resources=resources)
+    )
+
+    # Assert
+    assert merge_pull_task_ins_chunks(chunks) == expected
+
+
+def test_pull_task_ins_missing_parameters_record() -> None:
+    """Test that TaskIns referencing a missing ParametersRecord get an error reply."""
+    # Prepare
+    request = PullTaskInsRequest(node=Node(node_id=1, anonymous=False))
+    state = MagicMock()
+    state.get_task_ins.return_value = [
+        TaskIns(
+            task_id="task-id",
+            run_id=1,
+            task=Task(
+                producer=Node(node_id=0, anonymous=True),
+                consumer=Node(node_id=1, anonymous=False),
+                created_at=time.time(),
+                ttl=DEFAULT_TTL,
+                task_type="train",
+                recordset=RecordSet(),
+                parameters_refs={"global": "missing-ref"},
+            ),
+        )
+    ]
+    ffs = MagicMock()
+    ffs.get.return_value = None
+
+    # Execute
+    response = pull_task_ins(
+        request=request, state=state, ffs=ffs, resources=PullTaskInsResources()
+    )
+
+    # Assert
+    assert len(response.task_ins_list) == 0
+    task_res = state.store_task_res.call_args.kwargs["task_res"]
+    assert list(task_res.task.ancestry) == ["task-id"]
+    assert task_res.task.producer.node_id == 1
+    assert task_res.task.error.code == ErrorCode.MESSAGE_UNAVAILABLE
+    assert not validate_task_ins_or_res(task_res)
+
+
 def test_push_task_res() -> None:
     """Test push_task_res."""
     # Prepare
@@ -44,6 +44,7 @@ from flwr.server.superlink.state import State
 
 try:
     from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
     from starlette.datastructures import Headers
     from starlette.exceptions import HTTPException
     from starlette.requests import Request
@@ -111,9 +112,16 @@ async def pull_task_ins(request: PullTaskInsRequest) -> PullTaskInsResponse:
     """Pull TaskIns."""
     # Get state from app
     state: State = app.state.STATE_FACTORY.state()
-
-    # Handle message
-    return message_handler.pull_task_ins(request=request, state=state)
+    ffs: Ffs = app.state.FFS_FACTORY.ffs()
+
+    # Handle message in a worker thread as it may wait for TaskIns (long-polling)
+    return await run_in_threadpool(
+        message_handler.pull_task_ins,
+        request=request,
+        state=state,
+        ffs=ffs,
+        resources=app.state.PULL_TASK_INS_RESOURCES,
+    )
 
 
 # Check if token is needed here
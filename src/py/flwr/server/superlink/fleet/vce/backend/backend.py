@@ -16,7 +16,7 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import Callable, Union
 
 from flwr.client.client_app import ClientApp
 from flwr.common.context import Context
@@ -49,6 +49,11 @@ class Backend(ABC):
         """
         return 0
 
+    @property
+    def batch_size(self) -> int:
+        """Return the maximum number of messages passed to `process_messages`."""
+        return 1
+
     @abstractmethod
     def is_worker_idle(self) -> bool:
         """Report whether a backend worker is idle and can therefore run a ClientApp."""
@@ -64,3 +69,22 @@ class Backend(ABC):
         context: Context,
     ) -> tuple[Message, Context]:
         """Submit a job to the backend."""
+
+    def process_messages(
+        self,
+        messages: list[Message],
+        contexts: list[Context],
+    ) -> list[Union[tuple[Message, Context], Exception]]:
+        """Submit a batch of jobs to the backend.
+
+        The messages are destined to distinct nodes. Return, for each message, the
+        output message and updated context, or the exception raised when processing it.
+        Backends running the batch in a single worker call override this method.
+        """
+        results: list[Union[tuple[Message, Context], Exception]] = []
+        for message, context in zip(messages, contexts):
+            try:
+                results.append(self.process_message(message, context))
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                results.append(ex)
+        return results
@@ -0,0 +1,595 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Process pool backend for the Fleet API using the Simulation Engine."""
+
+
+import atexit
+import gc
+import os
+import pickle
+import threading
+import traceback
+from collections import OrderedDict
+from copy import copy
+from dataclasses import dataclass, replace
+from logging import DEBUG, WARNING
+from multiprocessing import get_all_start_methods, get_context, resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from queue import Queue
+from typing import Any, Callable, Optional, Union
+
+from flwr.client.client_app import ClientApp, ClientAppException, LoadClientAppError
+from flwr.common.context import Context
+from flwr.common.logger import log
+from flwr.common.message import Message
+from flwr.common.record import Array, ParametersRecord, RecordSet
+
+from .backend import Backend, BackendConfig
+
+# Location of the data of an Array in shared memory:
+# (name of the ParametersRecord, key of the Array, segment name, offset, size)
+ArrayRef = tuple[str, str, str, int, int]
+
+# Offsets of the Arrays in shared memory are aligned to cache lines
+_ALIGNMENT = 64
+# Number of unused broadcast segments kept in shared memory
+_MAX_IDLE_SEGMENTS = 2
+
+
+def _layout(sizes: list[int]) -> tuple[list[int], int]:
+    """Return the aligned offsets of buffers and the total size."""
+    offsets: list[int] = []
+    total = 0
+    for size in sizes:
+        offsets.append(total)
+        total += -(-size // _ALIGNMENT) * _ALIGNMENT
+    return offsets, total
+
+
+def _split_arrays(
+    content: RecordSet, threshold: int
+) -> tuple[RecordSet, list[tuple[str, str, Array]]]:
+    """Return a copy of `content` without the data of Arrays of `threshold` bytes or
+    more, and these Arrays.
+
+    The data of the smaller Arrays is converted to `bytes` if needed, so that the copy
+    can be pickled.
+    """
+    parameters_records: dict[str, ParametersRecord] = {}
+    arrays: list[tuple[str, str, Array]] = []
+    for name, record in content.parameters_records.items():
+        copied = ParametersRecord()
+        for key, array in record.items():
+            if len(array.data) >= threshold:
+                arrays.append((name, key, array))
+                array = replace(array, data=b"")
+            elif not isinstance(array.data, bytes):
+                array = replace(array, data=bytes(array.data))
+            copied[key] = array
+        parameters_records[name] = copied
+    return (
+        RecordSet(
+            parameters_records=parameters_records,
+            metrics_records=dict(content.metrics_records),
+            configs_records=dict(content.configs_records),
+        ),
+        arrays,
+    )
+
+
+def _materialize_arrays(recordset: RecordSet) -> None:
+    """Copy the data of Arrays mapped from shared memory to `bytes`."""
+    for record in recordset.parameters_records.values():
+        for key, array in record.items():
+            if not isinstance(array.data, bytes):
+                record[key] = replace(array, data=bytes(array.data))
+
+
+@dataclass
+class _Segment:
+    """Shared memory holding the data of the large Arrays of a ParametersRecord."""
+
+    shm: SharedMemory
+    offsets: list[int]
+    # Segments are looked up by the identity of the data, keep it alive
+    data: list[bytes]
+    users: int = 0
+
+
+class _WorkerTraceback(Exception):
+    """The formatted traceback of an exception raised in a worker process."""
+
+    def __init__(self, formatted: str) -> None:
+        super().__init__(formatted)
+        self.formatted = formatted
+
+    def __str__(self) -> str:
+        return f"\n\n{self.formatted}"
+
+
+class _Worker:
+    """A worker process running a ClientApp, and its end of the Pipe."""
+
+    def __init__(
+        self,
+        mp_context: BaseContext,
+        app_fn: Callable[[], ClientApp],
+        threshold: int,
+    ) -> None:
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(  # type: ignore
+            target=_run_worker, args=(child_conn, app_fn, threshold)
+        )
+        self.process.start()
+        child_conn.close()
+        self.reply_buffer: Optional[SharedMemory] = None
+
+    def run(  # pylint: disable=too-many-locals
+        self,
+        messages: list[Message],
+        contexts: list[Context],
+        refs: list[list[ArrayRef]],
+        live_segments: list[str],
+    ) -> list[Union[tuple[Message, Context], Exception]]:
+        """Process Messages in the worker and return the replies and the Contexts."""
+        self.conn.send((messages, contexts, refs, live_segments))
+        replies, reply_refs, buffer_name = self.conn.recv()
+        results: list[Union[tuple[Message, Context], Exception]] = []
+        for (success, result), message_reply_refs in zip(replies, reply_refs):
+            if not success:
+                is_load_error, reason, worker_traceback = result
+                exception: Exception
+                if is_load_error:
+                    exception = LoadClientAppError(reason)
+                else:
+                    exception = ClientAppException(reason)
+                # Chain the traceback of the worker, which is logged with the error
+                exception.__cause__ = _WorkerTraceback(worker_traceback)
+                results.append(exception)
+                continue
+            out_message, updated_context = result
+            if message_reply_refs:
+                self._read_reply_buffer(out_message, message_reply_refs, buffer_name)
+            results.append((out_message, updated_context))
+        return results
+
+    def _read_reply_buffer(
+        self, message: Message, refs: list[ArrayRef], buffer_name: str
+    ) -> None:
+        """Copy the Arrays of a reply out of the reply buffer the worker reuses."""
+        if self.reply_buffer is None or self.reply_buffer.name != buffer_name:
+            if self.reply_buffer is not None:
+                self.reply_buffer.close()
+            self.reply_buffer = SharedMemory(name=buffer_name)
+        buf = self.reply_buffer.buf
+        for record_name, key, _, offset, size in refs:
+            record = message.content.parameters_records[record_name]
+            record[key] = replace(record[key], data=bytes(buf[offset : offset + size]))
+
+    def stop(self, timeout: float) -> None:
+        """Stop the worker process."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        if self.reply_buffer is not None:
+            self.reply_buffer.close()
+
+
+def _run_worker(
+    conn: Connection, app_fn: Callable[[], ClientApp], threshold: int
+) -> None:
+    """Run the ClientApp on the Messages received from the main process."""
+    worker = _WorkerState(app_fn, threshold)
+    try:
+        while (task := conn.recv()) is not None:
+            conn.send(worker.process_batch(*task))
+            del task
+
+            # Unmap the segments the main process released, unless the ClientApp
+            # still holds views of them
+            worker.release_segments()
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        worker.close()
+
+
+class _WorkerState:
+    """The ClientApp, mapped segments and reply buffer of a worker process."""
+
+    def __init__(self, app_fn: Callable[[], ClientApp], threshold: int) -> None:
+        self.app_fn = app_fn
+        self.threshold = threshold
+        self.app: Optional[ClientApp] = None
+        self.segments: dict[str, SharedMemory] = {}
+        self.live_segments: list[str] = []
+        self.released: list[SharedMemory] = []
+        self.reply_buffer: Optional[SharedMemory] = None
+
+    def process_batch(  # pylint: disable=too-many-locals
+        self,
+        messages: list[Message],
+        contexts: list[Context],
+        refs: list[list[ArrayRef]],
+        live_segments: list[str],
+    ) -> tuple[list[tuple[bool, Any]], list[list[ArrayRef]], str]:
+        """Run the ClientApp on a batch of Messages.
+
+        Return, for each Message, whether it succeeded with the reply and the Context,
+        or the error; the location of the large Arrays of the replies in the reply
+        buffer; and the name of the reply buffer.
+        """
+        self.live_segments = live_segments
+        replies: list[tuple[bool, Any]] = []
+        arrays: list[tuple[str, str, Array]] = []
+        counts: list[int] = []
+        for message, context, message_refs in zip(messages, contexts, refs):
+            try:
+                self._map_arrays(message, message_refs)
+                if self.app is None:
+                    self.app = self.app_fn()
+                out_message = self.app(message=message, context=context)
+            except LoadClientAppError as ex:
+                replies.append((False, (True, str(ex), traceback.format_exc())))
+                counts.append(0)
+                continue
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                replies.append((False, (False, str(ex), traceback.format_exc())))
+                counts.append(0)
+                continue
+
+            if out_message.has_content():
+                out_message = copy(out_message)
+                out_message.content, message_arrays = _split_arrays(
+                    out_message.content, self.threshold
+                )
+                arrays.extend(message_arrays)
+                counts.append(len(message_arrays))
+            else:
+                counts.append(0)
+            _materialize_arrays(context.state)
+            replies.append((True, (out_message, context)))
+
+        self.reply_buffer, flat_refs = _write_reply_buffer(self.reply_buffer, arrays)
+        reply_refs: list[list[ArrayRef]] = []
+        for count in counts:
+            reply_refs.append(flat_refs[:count])
+            flat_refs = flat_refs[count:]
+        return (
+            replies,
+            reply_refs,
+            self.reply_buffer.name if self.reply_buffer else "",
+        )
+
+    def _map_arrays(self, message: Message, refs: list[ArrayRef]) -> None:
+        """Map the large Arrays of a Message read-only from shared memory."""
+        for record_name, key, segment_name, offset, size in refs:
+            if segment_name not in self.segments:
+                self.segments[segment_name] = SharedMemory(name=segment_name)
+            buf = self.segments[segment_name].buf.toreadonly()
+            record = message.content.parameters_records[record_name]
+            record[key] = replace(record[key], data=buf[offset : offset + size])
+
+    def release_segments(self) -> None:
+        """Unmap the segments that aren't live anymore and have no views."""
+        for name in set(self.segments) - set(self.live_segments):
+            self.released.append(self.segments.pop(name))
+        self.released = [shm for shm in self.released if not _try_close(shm)]
+
+    def close(self) -> None:
+        """Unmap all segments and free the reply buffer."""
+        # Free the views of the segments held in reference cycles before unmapping
+        gc.collect()
+        for shm in [*self.segments.values(), *self.released]:
+            _try_close(shm)
+        if self.reply_buffer is not None:
+            self.reply_buffer.close()
+            self.reply_buffer.unlink()
+
+
+def _write_reply_buffer(
+    reply_buffer: Optional[SharedMemory], arrays: list[tuple[str, str, Array]]
+) -> tuple[Optional[SharedMemory], list[ArrayRef]]:
+    """Write the data of Arrays to the reply buffer, growing it if needed."""
+    if not arrays:
+        return reply_buffer, []
+    offsets, total = _layout([len(array.data) for _, _, array in arrays])
+    if reply_buffer is None or reply_buffer.size < total:
+        size = total
+        if reply_buffer is not None:
+            size = max(total, 2 * reply_buffer.size)
+            reply_buffer.close()
+            reply_buffer.unlink()
+        reply_buffer = SharedMemory(create=True, size=size)
+    refs: list[ArrayRef] = []
+    for (record_name, key, array), offset in zip(arrays, offsets):
+        size = len(array.data)
+        reply_buffer.buf[offset : offset + size] = memoryview(array.data).cast("B")
+        refs.append((record_name, key, reply_buffer.name, offset, size))
+    return reply_buffer, refs
+
+
+def _try_close(shm: SharedMemory) -> bool:
+    """Close a shared memory segment if no views of it exist anymore."""
+    try:
+        shm.close()
+    except BufferError:
+        return False
+    return True
+
+
+class ProcessBackend(Backend):  # pylint: disable=too-many-instance-attributes
+    """A backend that runs ClientApps in a pool of local worker processes.
+
+    Each worker process loads the `ClientApp` once and keeps it for all the
+    messages it processes. The data of large Arrays in the messages sent to the
+    workers is placed in shared memory once and mapped read-only by all workers,
+    so that broadcasting the global model to many nodes doesn't copy it. The
+    workers return the large Arrays in their replies through a shared memory
+    buffer. The Context of the nodes is passed through a Pipe.
+
+    The backend config is read from the following keys:
+
+    - `client_resources`: `num_cpus` (default: 1), the number of CPUs per worker.
+      Unless set explicitly, the number of workers is the number of CPUs divided
+      by `num_cpus`.
+    - `process`: `num_workers`, the number of workers; `start_method`, the
+      multiprocessing start method (default: `forkserver` if available, else
+      `spawn`);
+      `shared_memory_threshold`, the minimum size in bytes of the Arrays passed
+      through shared memory (default: 65536); `batch_size`, the maximum number of
+      messages sent to a worker at once (default: 1).
+
+    With start methods other than `fork`, the function loading the ClientApp
+    passed to `build()` must be picklable. Unless `start_method` is set, the `fork`
+    start method is used if it isn't.
+    """
+
+    def __init__(self, backend_config: BackendConfig) -> None:
+        """Prepare ProcessBackend."""
+        log(DEBUG, "Initialising: %s", self.__class__.__name__)
+        log(DEBUG, "Backend config: %s", backend_config)
+
+        process_config = backend_config.get("process", {})
+        num_cpus = float(
+            backend_config.get("client_resources", {}).get(  # type: ignore
+                "num_cpus", 1
+            )
+        )
+        self._num_workers = int(
+            process_config.get(  # type: ignore
+                "num_workers", max(1, int((os.cpu_count() or 1) / max(num_cpus, 1e-3)))
+            )
+        )
+        # Forking the main process, which runs several threads, can deadlock the
+        # workers, so they are forked from a server process instead by default
+        self.start_method = str(
+            process_config.get(
+                "start_method",
+                "forkserver" if "forkserver" in get_all_start_methods() else "spawn",
+            )
+        )
+        self._fork_if_unpicklable = "start_method" not in process_config
+        self.threshold = int(
+            process_config.get("shared_memory_threshold", 1 << 16)  # type: ignore
+        )
+        self._batch_size = max(1, int(process_config.get("batch_size", 1)))  # type: ignore
+        if backend_config.get("client_resources", {}).get("num_gpus"):
+            log(WARNING, "%s ignores `num_gpus`.", self.__class__.__name__)
+
+        self._mp_context: Optional[BaseContext] = None
+        self._app_fn: Optional[Callable[[], ClientApp]] = None
+        self._workers: list[_Worker] = []
+        self._idle: Queue[int] = Queue()
+        self._segments: OrderedDict[tuple[int, ...], _Segment] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def num_workers(self) -> int:
+        """Return number of worker processes."""
+        return len(self._workers)
+
+    @property
+    def batch_size(self) -> int:
+        """Return the maximum number of messages processed by a worker per call."""
+        return self._batch_size
+
+    def is_worker_idle(self) -> bool:
+        """Report whether a worker process is idle."""
+        return not self._idle.empty()
+
+    def build(self, app_fn: Callable[[], ClientApp]) -> None:
+        """Start the worker processes."""
+        # Share the resource tracker of this process with the workers, so that
+        # shared memory is only tracked once
+        resource_tracker.ensure_running()
+        if self.start_method != "fork":
+            try:
+                pickle.dumps(app_fn)
+            except (pickle.PicklingError, AttributeError, TypeError) as ex:
+                if not (
+                    self._fork_if_unpicklable and "fork" in get_all_start_methods()
+                ):
+                    raise ValueError(
+                        f"The `{self.start_method}` start method requires a "
+                        "picklable function loading the ClientApp. Use the `fork` "
+                        "start method instead."
+                    ) from ex
+                log(
+                    WARNING,
+                    "The function loading the ClientApp can't be pickled, using the "
+                    "`fork` start method instead of `%s`.",
+                    self.start_method,
+                )
+                self.start_method = "fork"
+        self._mp_context = get_context(self.start_method)
+        self._app_fn = app_fn
+        atexit.register(self.terminate)
+        for idx in range(self._num_workers):
+            self._workers.append(_Worker(self._mp_context, app_fn, self.threshold))
+            self._idle.put(idx)
+        log(
+            DEBUG,
+            "Started %i worker processes (start method: %s)",
+            self._num_workers,
+            self.start_method,
+        )
+
+    def process_message(
+        self,
+        message: Message,
+        context: Context,
+    ) -> tuple[Message, Context]:
+        """Run ClientApp that process a given message.
+
+        Return output message and updated context.
+        """
+        (result,) = self.process_messages([message], [context])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def process_messages(
+        self,
+        messages: list[Message],
+        contexts: list[Context],
+    ) -> list[Union[tuple[Message, Context], Exception]]:
+        """Run ClientApp on a batch of messages in a single worker process.
+
+        Return, for each message, the output message and updated context, or the
+        exception raised when processing it.
+        """
+        if not self._workers:
+            raise ValueError(
+                "No worker processes are running. "
+                "Call the backend's `build()` method before processing messages."
+            )
+
+        requests: list[Message] = []
+        refs: list[list[ArrayRef]] = []
+        # Keys of the segments acquired so far, released even if sharing fails
+        keys: list[tuple[int, ...]] = []
+        try:
+            for message in messages:
+                request, message_refs = self._share_arrays(message, keys)
+                requests.append(request)
+                refs.append(message_refs)
+            return self._run_batch(requests, contexts, refs)
+        finally:
+            self._release_segments(keys)
+
+    def _run_batch(
+        self,
+        requests: list[Message],
+        contexts: list[Context],
+        refs: list[list[ArrayRef]],
+    ) -> list[Union[tuple[Message, Context], Exception]]:
+        """Process a batch of Messages in the next idle worker process."""
+        idx = self._idle.get()
+        try:
+            with self._lock:
+                live_segments = [
+                    segment.shm.name for segment in self._segments.values()
+                ]
+            return self._workers[idx].run(requests, contexts, refs, live_segments)
+        except (EOFError, OSError) as ex:
+            # The worker process died, replace it
+            self._workers[idx].stop(timeout=0)
+            self._workers[idx] = _Worker(
+                self._mp_context, self._app_fn, self.threshold  # type: ignore
+            )
+            raise RuntimeError("The worker process running the ClientApp died.") from ex
+        finally:
+            self._idle.put(idx)
+
+    def _share_arrays(
+        self, message: Message, keys: list[tuple[int, ...]]
+    ) -> tuple[Message, list[ArrayRef]]:
+        """Place the data of the large Arrays of a Message in shared memory.
+
+        The keys of the acquired segments are appended to `keys`.
+        """
+        if not message.has_content():
+            return message, []
+        content, arrays = _split_arrays(message.content, self.threshold)
+        if not arrays:
+            return message, []
+
+        by_record: dict[str, list[tuple[str, Array]]] = {}
+        for record_name, array_key, array in arrays:
+            by_record.setdefault(record_name, []).append((array_key, array))
+        refs: list[ArrayRef] = []
+        for record_name, items in by_record.items():
+            data = [array.data for _, array in items]
+            key = tuple(id(buffer) for buffer in data)
+            segment = self._acquire_segment(key, data)
+            keys.append(key)
+            refs.extend(
+                (record_name, array_key, segment.shm.name, offset, len(buffer))
+                for (array_key, _), buffer, offset in zip(items, data, segment.offsets)
+            )
+
+        request = copy(message)
+        request.content = content
+        return request, refs
+
+    def _acquire_segment(self, key: tuple[int, ...], data: list[bytes]) -> _Segment:
+        """Return the segment holding `data`, creating it if needed."""
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is None:
+                offsets, total = _layout([len(buffer) for buffer in data])
+                segment = _Segment(SharedMemory(create=True, size=total), offsets, data)
+                for buffer, offset in zip(data, offsets):
+                    size = len(buffer)
+                    segment.shm.buf[offset : offset + size] = memoryview(buffer).cast(
+                        "B"
+                    )
+                self._segments[key] = segment
+            self._segments.move_to_end(key)
+            segment.users += 1
+            return segment
+
+    def _release_segments(self, keys: list[tuple[int, ...]]) -> None:
+        """Release segments, unlinking the least recently used idle ones."""
+        with self._lock:
+            for key in keys:
+                self._segments[key].users -= 1
+            idle = [key for key, segment in self._segments.items() if not segment.users]
+            for key in idle[: max(0, len(idle) - _MAX_IDLE_SEGMENTS)]:
+                segment = self._segments.pop(key)
+                segment.shm.close()
+                segment.shm.unlink()
+
+    def terminate(self) -> None:
+        """Stop the worker processes and free the shared memory."""
+        atexit.unregister(self.terminate)
+        for worker in self._workers:
+            worker.stop(timeout=5)
+        self._workers = []
+        with self._lock:
+            for segment in self._segments.values():
+                segment.shm.close()
+                segment.shm.unlink()
+            self._segments.clear()
+        log(DEBUG, "Terminated %s", self.__class__.__name__)
@@ -0,0 +1,313 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test for process pool backend for the Fleet API using the Simulation Engine."""
+
+
+from math import pi
+from typing import Any
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from flwr.client import Client, NumPyClient
+from flwr.client.client_app import ClientApp, ClientAppException, LoadClientAppError
+from flwr.client.node_state import NodeState
+from flwr.common import (
+    DEFAULT_TTL,
+    Config,
+    ConfigsRecord,
+    Context,
+    FitIns,
+    GetPropertiesIns,
+    Message,
+    MessageType,
+    MessageTypeLegacy,
+    Metadata,
+    NDArrays,
+    RecordSet,
+    Scalar,
+    ndarrays_to_parameters,
+    parameters_to_ndarrays,
+)
+from flwr.common.constant import PARTITION_ID_KEY
+from flwr.common.recordset_compat import (
+    fitins_to_recordset,
+    getpropertiesins_to_recordset,
+    recordset_to_fitres,
+)
+from flwr.server.superlink.fleet.vce.backend.processbackend import ProcessBackend
+
+
+class DummyClient(NumPyClient):
+    """A dummy NumPyClient for tests."""
+
+    def __init__(self, state: RecordSet) -> None:
+        self.client_state = state
+
+    def get_properties(self, config: Config) -> dict[str, Scalar]:
+        """Return properties by doing a simple calculation."""
+        result = float(config["factor"]) * pi
+
+        # store something in context
+        self.client_state.configs_records["result"] = ConfigsRecord({"result": result})
+
+        return {"result": result}
+
+    def fit(
+        self, parameters: NDArrays, config: Config
+    ) -> tuple[NDArrays, int, dict[str, Scalar]]:
+        """Return the parameters plus one."""
+        return [layer + 1 for layer in parameters], 1, {}
+
+
+def get_dummy_client(context: Context) -> Client:
+    """Return a DummyClient converted to Client type."""
+    return DummyClient(state=context.state).to_client()
+
+
+def _load_app() -> ClientApp:
+    return ClientApp(client_fn=get_dummy_client)
+
+
+def _load_failing_app() -> ClientApp:
+    raise LoadClientAppError()
+
+
+def _create_message(content: RecordSet, message_type: str) -> Message:
+    return Message(
+        content=content,
+        metadata=Metadata(
+            run_id=0,
+            message_id="",
+            group_id="",
+            src_node_id=0,
+            dst_node_id=0,
+            reply_to_message="",
+            ttl=DEFAULT_TTL,
+            message_type=message_type,
+        ),
+    )
+
+
+def _create_context() -> Context:
+    node_state = NodeState(node_id=0, node_config={PARTITION_ID_KEY: str(0)})
+    node_state.register_context(run_id=0)
+    return node_state.retrieve_context(run_id=0)
+
+
+def _create_fit_message(parameters: NDArrays) -> Message:
+    fit_ins = FitIns(parameters=ndarrays_to_parameters(parameters), config={})
+    return _create_message(
+        fitins_to_recordset(fit_ins, keep_input=True), MessageType.TRAIN
+    )
+
+
+class TestProcessBackend(TestCase):
+    """Tests for ProcessBackend."""
+
+    def test_backend_creation_and_termination(self) -> None:
+        """Test creation of ProcessBackend and its termination."""
+        # Prepare
+        backend = ProcessBackend(backend_config={"process": {"num_workers": 2}})
+
+        # Execute
+        backend.build(_load_app)
+        num_workers, is_idle = backend.num_workers, backend.is_worker_idle()
+        backend.terminate()
+
+        # Assert
+        assert num_workers == 2
+        assert is_idle
+
+    def test_backend_creation_submit_and_termination(self) -> None:
+        """Test submitting a message to a given ClientApp."""
+        # Prepare
+        backend = ProcessBackend(backend_config={"process": {"num_workers": 1}})
+        content = getpropertiesins_to_recordset(GetPropertiesIns(config={"factor": 2}))
+        message = _create_message(content, MessageTypeLegacy.GET_PROPERTIES)
+        backend.build(_load_app)
+
+        # Execute
+        try:
+            out_message, context = backend.process_message(message, _create_context())
+        finally:
+            backend.terminate()
+
+        # Assert
+        properties = out_message.content.configs_records["getpropertiesres.properties"]
+        assert properties["result"] == 2 * pi
+        assert context.state.configs_records["result"]["result"] == 2 * pi
+
+    def test_process_message_through_shared_memory(self) -> None:
+        """Test that large Arrays are passed to and from the workers."""
+        # Prepare
+        backend = ProcessBackend(
+            backend_config={
+                "process": {"num_workers": 2, "shared_memory_threshold": 64}
+            }
+        )
+        parameters: NDArrays = [np.arange(1000, dtype=np.float32), np.ones(3)]
+        message = _create_fit_message(parameters)
+        backend.build(_load_app)
+
+        # Execute
+        try:
+            replies = [
+                backend.process_message(message, _create_context())[0] for _ in range(3)
+            ]
+            next_message = _create_fit_message([parameters[0] * 2, parameters[1]])
+            replies.append(backend.process_message(next_message, _create_context())[0])
+        finally:
+            backend.terminate()
+
+        # Assert
+        for reply, factor in zip(replies, [1, 1, 1, 2]):
+            fit_res = recordset_to_fitres(reply.content, keep_input=True)
+            assert all(
+                isinstance(tensor, bytes) for tensor in fit_res.parameters.tensors
+            )
+            reply_parameters = parameters_to_ndarrays(fit_res.parameters)
+            np.testing.assert_array_equal(
+                reply_parameters[0], parameters[0] * factor + 1
+            )
+            np.testing.assert_array_equal(reply_parameters[1], parameters[1] + 1)
+        # The message passed to the backend is left unchanged
+        assert all(
+            len(array.data) > 0
+            for record in message.content.parameters_records.values()
+            for array in record.values()
+        )
+
+    def test_process_message_errors(self) -> None:
+        """Test that errors raised by the ClientApp are re-raised."""
+        # Prepare
+        message = _create_message(RecordSet(), "unknown")
+        backend = ProcessBackend(backend_config={"process": {"num_workers": 1}})
+        failing_backend = ProcessBackend(backend_config={"process": {"num_workers": 1}})
+        backend.build(_load_app)
+        failing_backend.build(_load_failing_app)
+
+        # Execute & Assert
+        try:
+            with self.assertRaises(ClientAppException):
+                backend.process_message(message, _create_context())
+            with self.assertRaises(LoadClientAppError) as cm:
+                failing_backend.process_message(message, _create_context())
+            # The traceback of the worker process is chained
+            self.assertIn("_load_failing_app", str(cm.exception.__cause__))
+        finally:
+            backend.terminate()
+            failing_backend.terminate()
+
+    def test_process_messages_in_batch(self) -> None:
+        """Test that a batch of messages is processed by a single worker."""
+        # Prepare
+        backend = ProcessBackend(
+            backend_config={
+                "process": {
+                    "num_workers": 1,
+                    "shared_memory_threshold": 64,
+                    "batch_size": 3,
+                }
+            }
+        )
+        parameters: NDArrays = [np.arange(100, dtype=np.float32)]
+        messages = [
+            _create_fit_message(parameters),
+            _create_message(RecordSet(), "unknown"),
+            _create_fit_message([parameters[0] * 2]),
+        ]
+        backend.build(_load_app)
+
+        # Execute
+        try:
+            results = backend.process_messages(
+                messages, [_create_context() for _ in messages]
+            )
+        finally:
+            backend.terminate()
+
+        # Assert
+        assert backend.batch_size == 3
+        assert isinstance(results[1], ClientAppException)
+        for result, factor in [(results[0], 1), (results[2], 2)]:
+            assert not isinstance(result, Exception)
+            fit_res = recordset_to_fitres(result[0].content, keep_input=True)
+            np.testing.assert_array_equal(
+                parameters_to_ndarrays(fit_res.parameters)[0],
+                parameters[0] * factor + 1,
+            )
+
+    def test_fork_if_app_fn_unpicklable(self) -> None:
+        """Test that `fork` is used for unpicklable functions unless configured."""
+        # Prepare
+        backend = ProcessBackend(backend_config={"process": {"num_workers": 1}})
+        spawn_backend = ProcessBackend(
+            backend_config={"process": {"num_workers": 1, "start_method": "spawn"}}
+        )
+        start_method = backend.start_method
+
+        def _load_local_app() -> ClientApp:
+            return _load_app()
+
+        # Execute
+        backend.build(_load_local_app)
+        backend.terminate()
+
+        # Assert
+        assert start_method != "fork"
+        assert backend.start_method == "fork"
+        with self.assertRaises(ValueError):
+            spawn_backend.build(_load_local_app)
+
+    def test_release_segments_if_sharing_fails(self) -> None:
+        """Test that segments are released if sharing a later message fails."""
+        # Prepare
+        backend = ProcessBackend(
+            backend_config={
+                "process": {"num_workers": 1, "shared_memory_threshold": 64}
+            }
+        )
+        messages = [
+            _create_fit_message([np.arange(100, dtype=np.float32)]),
+            _create_fit_message([np.arange(200, dtype=np.float32)]),
+        ]
+        acquire_segment = backend._acquire_segment  # pylint: disable=W0212
+        calls: list[int] = []
+
+        def _acquire_once(*args: Any) -> Any:
+            calls.append(1)
+            if len(calls) > 1:
+                raise OSError("No space left on device")
+            return acquire_segment(*args)
+
+        backend.build(_load_app)
+
+        # Execute
+        try:
+            with patch.object(backend, "_acquire_segment", _acquire_once):
+                with self.assertRaises(OSError):
+                    backend.process_messages(
+                        messages, [_create_context() for _ in messages]
+                    )
+            segments = list(backend._segments.values())  # pylint: disable=W0212
+        finally:
+            backend.terminate()
+
+        # Assert
+        assert len(segments) == 1
+        assert segments[0].users == 0
+        assert backend.is_worker_idle()
@@ -15,8 +15,11 @@
 """Ray backend for the Fleet API using the Simulation Engine."""
 
 import sys
+import threading
+import weakref
+from collections import OrderedDict
 from logging import DEBUG, ERROR
-from typing import Callable, Optional, Union
+from typing import Any, Callable, Optional, Union
 
 import ray
 
@@ -26,7 +29,12 @@ from flwr.common.context import Context
 from flwr.common.logger import log
 from flwr.common.message import Message
 from flwr.common.typing import ConfigsRecordValues
-from flwr.simulation.ray_transport.ray_actor import BasicActorPool, ClientAppActor
+from flwr.simulation.ray_transport.ray_actor import (
+    BasicActorPool,
+    ClientAppActor,
+    VirtualClientEngineActor,
+    apply_state_update,
+)
 from flwr.simulation.ray_transport.utils import enable_tf_gpu_growth
 
 from .backend import Backend, BackendConfig
@@ -34,8 +42,11 @@ from .backend import Backend, BackendConfig
 ClientResourcesDict = dict[str, Union[int, float]]
 ActorArgsDict = dict[str, Union[int, float, Callable[[], None]]]
 
+# Default number of node Contexts cached by each actor
+DEFAULT_CONTEXT_CACHE_SIZE = 128
 
-class RayBackend(Backend):
+
+class RayBackend(Backend):  # pylint: disable=too-many-instance-attributes
     """A backend that submits jobs to a `BasicActorPool`."""
 
     def __init__(
@@ -60,6 +71,25 @@ class RayBackend(Backend):
 
         self.app_fn: Optional[Callable[[], ClientApp]] = None
 
+        # Actors cache the Context of the nodes they run messages for. Track the
+        # actor holding the latest Context of each node, and the nodes whose Context
+        # each actor caches (least recently used first)
+        actor_config = backend_config.get("actor") or {}
+        self.context_cache_size = int(
+            actor_config.get(  # type: ignore
+                "context_cache_size", DEFAULT_CONTEXT_CACHE_SIZE
+            )
+        )
+        # Number of messages each actor processes per call
+        self._batch_size = max(1, int(actor_config.get("batch_size", 1)))  # type: ignore
+        self._context_owners: dict[
+            int, tuple[VirtualClientEngineActor, weakref.ref[Context]]
+        ] = {}
+        self._actor_contexts: dict[VirtualClientEngineActor, OrderedDict[int, None]] = (
+            {}
+        )
+        self._lock = threading.Lock()
+
     def _validate_client_resources(self, config: BackendConfig) -> ClientResourcesDict:
         client_resources_config = config.get(self.client_resources_key)
         client_resources: ClientResourcesDict = {}
@@ -119,24 +149,29 @@ class RayBackend(Backend):
         """Return number of actors in pool."""
         return self.pool.num_actors if self.pool else 0
 
+    @property
+    def batch_size(self) -> int:
+        """Return the maximum number of messages processed by an actor per call."""
+        return self._batch_size
+
     def is_worker_idle(self) -> bool:
         """Report whether the pool has idle actors."""
         return self.pool.is_actor_available() if self.pool else False
 
     def build(self, app_fn: Callable[[], ClientApp]) -> None:
         """Build pool of Ray actors that this backend will submit jobs to."""
-        # Create Actor Pool
+        # Create Actor Pool. The actors receive the ClientApp callable once
         try:
             self.pool = BasicActorPool(
                 actor_type=ClientAppActor,
                 client_resources=self.client_resources,
-                actor_kwargs=self.actor_kwargs,
+                actor_kwargs={**self.actor_kwargs, "client_app_fn": app_fn},
             )
         except Exception as ex:
             raise ex
 
         self.pool.add_actors_to_pool(self.pool.actors_capacity)
-        # Set ClientApp callable that ray actors will use
+        # Set ClientApp callable that ray actors use
         self.app_fn = app_fn
         log(DEBUG, "Constructed ActorPool with: %i actors", self.pool.num_actors)
 
@@ -149,7 +184,23 @@ class RayBackend(Backend):
 
         Return output message and updated context.
         """
-        partition_id = context.node_config[PARTITION_ID_KEY]
+        (result,) = self.process_messages([message], [context])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def process_messages(  # pylint: disable=too-many-locals
+        self,
+        messages: list[Message],
+        contexts: list[Context],
+    ) -> list[Union[tuple[Message, Context], Exception]]:
+        """Run ClientApp on a batch of messages in a single actor.
+
+        Return, for each message, the output message and updated context, or the
+        exception raised when processing it.
+        """
+        partition_ids = [str(ctxt.node_config[PARTITION_ID_KEY]) for ctxt in contexts]
+        node_ids = [message.metadata.dst_node_id for message in messages]
 
         if self.pool is None:
             raise ValueError("The actor pool is empty, unfit to process messages.")
@@ -160,20 +211,33 @@ class RayBackend(Backend):
                 "Call the backend's `build()` method before processing messages."
             )
 
+        # Prefer the actor caching the latest Context of the first node
+        with self._lock:
+            owner = self._context_owners.get(node_ids[0])
+        preferred_actor = owner[0] if owner and owner[1]() is contexts[0] else None
+
+        def _submit(
+            actor: Any,
+            _: None,
+            mssgs: list[Message],
+            cids: list[str],
+            ctxts: list[Context],
+        ) -> Any:
+            cached_contexts, evict = self._sync_contexts(actor, node_ids, ctxts)
+            return actor.run_cached.remote(mssgs, cids, cached_contexts, evict)
+
         try:
             # Submit a task to the pool
             future = self.pool.submit(
-                lambda a, a_fn, mssg, cid, state: a.run.remote(a_fn, mssg, cid, state),
-                (self.app_fn, message, str(partition_id), context),
+                _submit,
+                (None, messages, partition_ids, contexts),
+                preferred_actor=preferred_actor,
             )
 
-            # Fetch result
-            (
-                out_mssg,
-                updated_context,
-            ) = self.pool.fetch_result_and_return_actor_to_pool(future)
-
-            return out_mssg, updated_context
+            # Fetch results
+            cached_results = self.pool.fetch_cached_results_and_return_actor_to_pool(
+                future
+            )
 
         except Exception as ex:
             log(
@@ -181,13 +245,74 @@ class RayBackend(Backend):
                 "An exception was raised when processing a message by %s",
                 self.__class__.__name__,
             )
+            with self._lock:
+                for node_id in node_ids:
+                    self._context_owners.pop(node_id, None)
             # add actor back into pool
             self.pool.add_actor_back_to_pool(future)
             raise ex
 
+        results: list[Union[tuple[Message, Context], Exception]] = []
+        for node_id, context, (_, result) in zip(node_ids, contexts, cached_results):
+            if isinstance(result[0], Message):
+                # Update the Context with the records that changed
+                out_mssg, state_update = result
+                apply_state_update(context, state_update)
+                results.append((out_mssg, context))
+                continue
+            # The actor dropped its copy of the Context
+            with self._lock:
+                self._context_owners.pop(node_id, None)
+            exception_type, reason = result
+            results.append(exception_type(reason))
+        return results
+
+    def _sync_contexts(
+        self,
+        actor: VirtualClientEngineActor,
+        node_ids: list[int],
+        contexts: list[Context],
+    ) -> tuple[list[Optional[Context]], list[int]]:
+        """Return the Contexts to send to an actor, and the Contexts it should evict.
+
+        No Context is sent for the nodes whose latest Context the actor caches.
+        """
+        with self._lock:
+            cached = self._actor_contexts.setdefault(actor, OrderedDict())
+            cached_contexts: list[Optional[Context]] = []
+            evict: list[int] = []
+            for node_id, context in zip(node_ids, contexts):
+                owner = self._context_owners.get(node_id)
+                if (
+                    owner is not None
+                    and owner[0] == actor
+                    and owner[1]() is context
+                    and node_id in cached
+                ):
+                    cached.move_to_end(node_id)
+                    cached_contexts.append(None)
+                    continue
+
+                cached[node_id] = None
+                cached.move_to_end(node_id)
+                self._context_owners[node_id] = (actor, weakref.ref(context))
+                cached_contexts.append(context)
+                while len(cached) > self.context_cache_size:
+                    evicted_node_id, _ = cached.popitem(last=False)
+                    evict.append(evicted_node_id)
+                    evicted_owner = self._context_owners.get(evicted_node_id)
+                    if evicted_owner is not None and evicted_owner[0] == actor:
+                        del self._context_owners[evicted_node_id]
+            # The actor evicts Contexts after processing the batch
+            return cached_contexts, [
+                node_id for node_id in evict if node_id not in cached
+            ]
+
     def terminate(self) -> None:
         """Terminate all actors in actor pool."""
         if self.pool:
             self.pool.terminate_all_actors()
+        self._context_owners.clear()
+        self._actor_contexts.clear()
         ray.shutdown()
         log(DEBUG, "Terminated %s", self.__class__.__name__)
@@ -14,14 +14,16 @@
 # ==============================================================================
 """Test for Ray backend for the Fleet API using the Simulation Engine."""
 
+from collections import OrderedDict
 from math import pi
 from typing import Callable, Optional, Union
 from unittest import TestCase
 
+import numpy as np
 import ray
 
 from flwr.client import Client, NumPyClient
-from flwr.client.client_app import ClientApp
+from flwr.client.client_app import ClientApp, ClientAppException
 from flwr.client.node_state import NodeState
 from flwr.common import (
     DEFAULT_TTL,
@@ -32,8 +34,10 @@ from flwr.common import (
     Message,
     MessageTypeLegacy,
     Metadata,
+    ParametersRecord,
     RecordSet,
     Scalar,
+    array_from_numpy,
 )
 from flwr.common.constant import PARTITION_ID_KEY
 from flwr.common.recordset_compat import getpropertiesins_to_recordset
@@ -195,3 +199,67 @@ class TestRayBackend(TestCase):
         nodes = ray.nodes()
 
         assert nodes[0]["Resources"]["CPU"] == backend_config_2["init_args"]["num_cpus"]
+
+    def test_backend_caches_context_in_actors(self) -> None:
+        """Test that Contexts cached by the actors are kept up to date."""
+        # Prepare
+        backend = RayBackend(
+            backend_config={
+                "client_resources": {"num_cpus": 1},
+                "actor": {"context_cache_size": 1},
+            }
+        )
+        message, context, expected_output = _create_message_and_context()
+        other_message, other_context, _ = _create_message_and_context()
+        other_message.metadata.dst_node_id = 1
+        context.state.parameters_records["layers"] = ParametersRecord(
+            OrderedDict({"w": array_from_numpy(np.ones(3))})
+        )
+        backend.build(_load_app)
+
+        # Execute
+        results = []
+        for mssg, ctxt in [
+            (message, context),
+            (message, context),
+            (other_message, other_context),
+            (message, context),
+        ]:
+            results.append(backend.process_message(mssg, ctxt)[1])
+        backend.terminate()
+
+        # Assert
+        assert results[1] is context and results[3] is context
+        assert context.state.configs_records["result"]["result"] == expected_output
+        np.testing.assert_array_equal(
+            context.state.parameters_records["layers"]["w"].numpy(), np.ones(3)
+        )
+        assert "layers" not in other_context.state.parameters_records
+
+    def test_backend_processes_messages_in_batch(self) -> None:
+        """Test that errors in a batch are returned per message."""
+        # Prepare
+        backend = RayBackend(
+            backend_config={
+                "client_resources": {"num_cpus": 1},
+                "actor": {"batch_size": 2},
+            }
+        )
+        message, context, expected_output = _create_message_and_context()
+        failing_message, failing_context, _ = _create_message_and_context()
+        failing_message.metadata.dst_node_id = 1
+        failing_message.metadata.message_type = "unknown"
+        backend.build(_load_app)
+
+        # Execute
+        results = backend.process_messages(
+            [message, failing_message], [context, failing_context]
+        )
+        backend.terminate()
+
+        # Assert
+        assert backend.batch_size == 2
+        assert not isinstance(results[0], Exception)
+        assert results[0][1] is context
+        assert context.state.configs_records["result"]["result"] == expected_output
+        assert isinstance(results[1], ClientAppException)
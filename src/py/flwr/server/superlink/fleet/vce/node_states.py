@@ -0,0 +1,178 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""NodeStates of the nodes simulated by the Simulation Engine."""
+
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, NoReturn, Optional
+
+from flwr.client.node_state import NodeState, load_run_config
+from flwr.common.constant import NUM_PARTITIONS_KEY, PARTITION_ID_KEY
+from flwr.common.serde import recordset_from_proto, recordset_to_proto
+from flwr.common.typing import Run, UserConfig
+
+# pylint: disable=E0611
+from flwr.proto.recordset_pb2 import RecordSet as ProtoRecordSet
+
+
+class ReadOnlyConfig(dict):  # type: ignore
+    """A run config shared by the Contexts of all nodes, which can't be modified."""
+
+    def _read_only(self, *_: Any, **__: Any) -> NoReturn:
+        raise TypeError("The `run_config` field of the `Context` cannot be modified.")
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only  # type: ignore
+    clear = _read_only
+    pop = _read_only  # type: ignore
+    popitem = _read_only
+    setdefault = _read_only  # type: ignore
+    update = _read_only  # type: ignore
+
+    def __reduce__(self) -> tuple[type["ReadOnlyConfig"], tuple[dict[str, Any]]]:
+        """Pickle without setting items one by one."""
+        return ReadOnlyConfig, (dict(self),)
+
+
+class NodeStates(Mapping[int, NodeState]):  # pylint: disable=R0902
+    """NodeStates of the simulated nodes, created when a node gets its first message.
+
+    The run config is loaded once and shared by the Contexts of all nodes. If
+    `max_in_memory` is set, at most this number of NodeStates are kept in memory,
+    evicting the least recently used ones: NodeStates whose `Context.state` is empty
+    are dropped and created again when needed; the others are saved to `spill_dir`
+    and loaded back when needed, or kept in memory if `spill_dir` isn't set.
+
+    Parameters
+    ----------
+    nodes_mapping : dict[int, int]
+        The partition ID of each node.
+    run : Run
+        The run the nodes participate in.
+    app_dir : Optional[str] (default: None)
+        The directory of the app, to load the run config from.
+    max_in_memory : Optional[int] (default: None)
+        The number of NodeStates kept in memory. All are kept if None.
+    spill_dir : Optional[str] (default: None)
+        A directory to save the `Context.state` of evicted NodeStates to.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        nodes_mapping: dict[int, int],
+        run: Run,
+        app_dir: Optional[str] = None,
+        max_in_memory: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        self.nodes_mapping = nodes_mapping
+        self.run_id = run.run_id
+        self.num_partitions = len(set(nodes_mapping.values()))
+        self.run_config: UserConfig = ReadOnlyConfig(
+            load_run_config(run, app_dir=app_dir)
+        )
+        self.max_in_memory = max_in_memory
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        # Least recently used first
+        self._node_states: OrderedDict[int, NodeState] = OrderedDict()
+        # NodeStates with a `Context.state` that can't be spilled
+        self._pinned: dict[int, NodeState] = {}
+        self._spilled: set[int] = set()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, node_id: int) -> NodeState:
+        """Return the NodeState of a node, creating it if needed."""
+        with self._lock:
+            if node_id in self._pinned:
+                return self._pinned[node_id]
+            node_state = self._node_states.get(node_id)
+            if node_state is not None:
+                self._node_states.move_to_end(node_id)
+                return node_state
+            if node_id not in self.nodes_mapping:
+                raise KeyError(node_id)
+
+            node_state = self._create_node_state(node_id)
+            self._node_states[node_id] = node_state
+            self._evict()
+            return node_state
+
+    def __iter__(self) -> Iterator[int]:
+        """Yield the IDs of the nodes."""
+        return iter(self.nodes_mapping)
+
+    def __len__(self) -> int:
+        """Return the number of nodes."""
+        return len(self.nodes_mapping)
+
+    def _spill_path(self, node_id: int) -> Path:
+        return self.spill_dir / f"{self.run_id}-{node_id}.pb"  # type: ignore
+
+    def _create_node_state(self, node_id: int) -> NodeState:
+        """Create the NodeState of a node, loading its spilled `Context.state`."""
+        node_state = NodeState(
+            node_id=node_id,
+            node_config={
+                PARTITION_ID_KEY: self.nodes_mapping[node_id],
+                NUM_PARTITIONS_KEY: self.num_partitions,
+            },
+        )
+        node_state.register_context(run_id=self.run_id, run_config=self.run_config)
+        if node_id in self._spilled:
+            path = self._spill_path(node_id)
+            recordset_proto = ProtoRecordSet()
+            recordset_proto.ParseFromString(path.read_bytes())
+            node_state.retrieve_context(self.run_id).state = recordset_from_proto(
+                recordset_proto
+            )
+            path.unlink()
+            self._spilled.remove(node_id)
+        return node_state
+
+    def _evict(self) -> None:
+        """Evict the least recently used NodeStates beyond `max_in_memory`."""
+        if self.max_in_memory is None:
+            return
+        while len(self._node_states) > self.max_in_memory:
+            node_id, node_state = self._node_states.popitem(last=False)
+            state = node_state.retrieve_context(self.run_id).state
+            if not (
+                state.parameters_records
+                or state.metrics_records
+                or state.configs_records
+            ):
+                continue
+            if self.spill_dir is None:
+                self._pinned[node_id] = node_state
+                continue
+            self._spill_path(node_id).write_bytes(
+                recordset_to_proto(state).SerializeToString()
+            )
+            self._spilled.add(node_id)
+
+    def close(self) -> None:
+        """Remove the spilled `Context.state` of all nodes."""
+        with self._lock:
+            for node_id in self._spilled:
+                self._spill_path(node_id).unlink(missing_ok=True)
+            self._spilled.clear()
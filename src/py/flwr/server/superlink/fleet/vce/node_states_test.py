@@ -0,0 +1,136 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test NodeStates of the Simulation Engine."""
+
+
+import pickle
+from copy import deepcopy
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from flwr.common import ConfigsRecord
+from flwr.common.constant import NUM_PARTITIONS_KEY, PARTITION_ID_KEY
+from flwr.common.typing import Run
+
+from .node_states import NodeStates, ReadOnlyConfig
+
+
+def _create_node_states(
+    num_nodes: int, max_in_memory: int, spill_dir: str = ""
+) -> NodeStates:
+    return NodeStates(
+        nodes_mapping={node_id: node_id for node_id in range(num_nodes)},
+        run=Run(run_id=7, fab_id="", fab_version="", fab_hash="", override_config={}),
+        max_in_memory=max_in_memory,
+        spill_dir=spill_dir,
+    )
+
+
+def _set_state(node_states: NodeStates, node_id: int) -> None:
+    context = node_states[node_id].retrieve_context(run_id=7)
+    context.state.configs_records["state"] = ConfigsRecord({"node_id": node_id})
+
+
+def _get_state(node_states: NodeStates, node_id: int) -> ConfigsRecord:
+    context = node_states[node_id].retrieve_context(run_id=7)
+    return context.state.configs_records["state"]
+
+
+class TestNodeStates(TestCase):
+    """Tests for NodeStates."""
+
+    def test_read_only_config(self) -> None:
+        """Test that the shared run config can't be modified."""
+        # Prepare
+        config = ReadOnlyConfig({"lr": 0.1})
+
+        # Execute & Assert
+        with self.assertRaises(TypeError):
+            config["lr"] = 0.2
+        with self.assertRaises(TypeError):
+            config.clear()
+        with self.assertRaises(TypeError):
+            del config["lr"]
+        for copied in [pickle.loads(pickle.dumps(config)), deepcopy(config)]:
+            assert isinstance(copied, ReadOnlyConfig)
+            assert copied == {"lr": 0.1}
+
+    def test_create_node_states_lazily(self) -> None:
+        """Test that NodeStates are created on access and share the run config."""
+        # Prepare
+        node_states = _create_node_states(num_nodes=4, max_in_memory=4)
+
+        # Execute
+        context_0 = node_states[0].retrieve_context(run_id=7)
+        context_3 = node_states[3].retrieve_context(run_id=7)
+
+        # Assert
+        assert len(node_states) == 4
+        assert list(node_states) == [0, 1, 2, 3]
+        assert len(node_states._node_states) == 2  # pylint: disable=W0212
+        assert context_0.node_config == {PARTITION_ID_KEY: 0, NUM_PARTITIONS_KEY: 4}
+        assert context_3.node_config == {PARTITION_ID_KEY: 3, NUM_PARTITIONS_KEY: 4}
+        assert context_0.run_config is context_3.run_config
+        assert node_states[0] is node_states[0]
+        with self.assertRaises(KeyError):
+            _ = node_states[4]
+
+    def test_evict_node_states_without_state(self) -> None:
+        """Test that NodeStates with an empty `Context.state` are dropped."""
+        # Prepare
+        node_states = _create_node_states(num_nodes=10, max_in_memory=2)
+
+        # Execute
+        for node_id in range(10):
+            _ = node_states[node_id]
+
+        # Assert
+        assert len(node_states._node_states) == 2  # pylint: disable=W0212
+        assert not node_states._pinned  # pylint: disable=W0212
+
+    def test_keep_node_states_with_state(self) -> None:
+        """Test that NodeStates with a `Context.state` are kept without spill_dir."""
+        # Prepare
+        node_states = _create_node_states(num_nodes=4, max_in_memory=1)
+
+        # Execute
+        for node_id in range(4):
+            _set_state(node_states, node_id)
+
+        # Assert
+        for node_id in range(4):
+            assert _get_state(node_states, node_id)["node_id"] == node_id
+
+    def test_spill_and_restore_node_states(self) -> None:
+        """Test that the `Context.state` of evicted NodeStates is restored."""
+        with TemporaryDirectory() as spill_dir:
+            # Prepare
+            node_states = _create_node_states(
+                num_nodes=4, max_in_memory=1, spill_dir=spill_dir
+            )
+
+            # Execute
+            for node_id in range(4):
+                _set_state(node_states, node_id)
+            num_spilled = len(list(Path(spill_dir).iterdir()))
+            states = [_get_state(node_states, node_id) for node_id in range(4)]
+            node_states.close()
+
+            # Assert
+            assert num_spilled == 3
+            assert [state["node_id"] for state in states] == [0, 1, 2, 3]
+            assert not node_states._pinned  # pylint: disable=W0212
+            assert not list(Path(spill_dir).iterdir())
@@ -19,30 +19,27 @@ import json
 import threading
 import time
 import traceback
+from collections.abc import Mapping
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from logging import DEBUG, ERROR, INFO, WARN
 from pathlib import Path
 from queue import Empty, Queue
-from time import sleep
-from typing import Callable, Optional
+from typing import Callable, Optional, Union, cast
 
 from flwr.client.client_app import ClientApp, ClientAppException, LoadClientAppError
 from flwr.client.clientapp.utils import get_load_client_app_fn
 from flwr.client.node_state import NodeState
-from flwr.common.constant import (
-    NUM_PARTITIONS_KEY,
-    PARTITION_ID_KEY,
-    PING_MAX_INTERVAL,
-    ErrorCode,
-)
+from flwr.common.constant import PING_MAX_INTERVAL, ErrorCode
+from flwr.common.context import Context
 from flwr.common.logger import log
-from flwr.common.message import Error
+from flwr.common.message import Error, Message
 from flwr.common.serde import message_from_taskins, message_to_taskres
 from flwr.common.typing import Run
-from flwr.proto.task_pb2 import TaskIns, TaskRes  # pylint: disable=E0611
-from flwr.server.superlink.state import State, StateFactory
+from flwr.server.superlink.state import InMemoryState, State, StateFactory
 
 from .backend import Backend, error_messages_backends, supported_backends
+from .node_states import NodeStates
 
 NodeToPartitionMapping = dict[int, int]
 
@@ -60,116 +57,210 @@ def _register_nodes(
     return nodes_mapping
 
 
-def _register_node_states(
-    nodes_mapping: NodeToPartitionMapping,
-    run: Run,
-    app_dir: Optional[str] = None,
-) -> dict[int, NodeState]:
-    """Create NodeState objects and pre-register the context for the run."""
-    node_states: dict[int, NodeState] = {}
-    num_partitions = len(set(nodes_mapping.values()))
-    for node_id, partition_id in nodes_mapping.items():
-        node_states[node_id] = NodeState(
-            node_id=node_id,
-            node_config={
-                PARTITION_ID_KEY: partition_id,
-                NUM_PARTITIONS_KEY: num_partitions,
-            },
-        )
-
-        # Pre-register Context objects
-        node_states[node_id].register_context(
-            run_id=run.run_id, run=run, app_dir=app_dir
-        )
+def _load_client_app(
+    client_app_attr: str,
+    app_dir: str,
+    flwr_dir: Optional[str],
+    fab_id: str,
+    fab_version: str,
+) -> ClientApp:
+    """Load the ClientApp referenced by `client_app_attr`."""
+    return get_load_client_app_fn(
+        default_app_ref=client_app_attr,
+        app_path=app_dir,
+        flwr_dir=flwr_dir,
+        multi_app=False,
+    )(fab_id, fab_version)
+
+
+def _error_reply(message: Message, ex: Exception) -> Message:
+    """Report an exception raised when processing a message as an error reply."""
+    log(ERROR, ex)
+    log(ERROR, "".join(traceback.format_exception(type(ex), ex, ex.__traceback__)))
+
+    if isinstance(ex, ClientAppException):
+        e_code = ErrorCode.CLIENT_APP_RAISED_EXCEPTION
+    elif isinstance(ex, LoadClientAppError):
+        e_code = ErrorCode.LOAD_CLIENT_APP_EXCEPTION
+    else:
+        e_code = ErrorCode.UNKNOWN
+
+    reason = str(type(ex)) + ":<'" + str(ex) + "'>"
+    return message.create_error_reply(error=Error(code=e_code, reason=reason))
+
+
+def _get_batch(
+    taskins_queue: "Queue[Message]",
+    deferred: list[Message],
+    batch_size: int,
+    num_workers: int,
+) -> list[Message]:
+    """Get a batch of Messages destined to distinct nodes.
+
+    Messages to nodes already in the batch are deferred to a later batch. The size of
+    the batch is limited so that the queued Messages are spread over all workers.
+    """
+    candidates = deferred[:]
+    deferred.clear()
+    if not candidates:
+        # Fetch from queue with timeout. We use a timeout so
+        # the stopping event can be evaluated even when the queue is empty.
+        candidates.append(taskins_queue.get(timeout=1.0))
+    limit = min(
+        batch_size,
+        max(1, -(-(taskins_queue.qsize() + len(candidates)) // max(num_workers, 1))),
+    )
+    while len(candidates) < limit:
+        try:
+            candidates.append(taskins_queue.get_nowait())
+        except Empty:
+            break
 
-    return node_states
+    batch: list[Message] = []
+    node_ids: set[int] = set()
+    for message in candidates:
+        node_id = message.metadata.dst_node_id
+        if node_id in node_ids or len(batch) == limit:
+            deferred.append(message)
+        else:
+            node_ids.add(node_id)
+            batch.append(message)
+    return batch
 
 
 # pylint: disable=too-many-arguments,too-many-locals
 def worker(
-    taskins_queue: "Queue[TaskIns]",
-    taskres_queue: "Queue[TaskRes]",
-    node_states: dict[int, NodeState],
+    taskins_queue: "Queue[Message]",
+    taskres_queue: "Queue[Message]",
+    node_states: Mapping[int, NodeState],
     backend: Backend,
     f_stop: threading.Event,
 ) -> None:
-    """Get TaskIns from queue and pass it to an actor in the pool to execute it."""
+    """Get Messages from queue and pass them to an actor in the pool to execute.
+
+    Up to `backend.batch_size` Messages are passed to the backend at once.
+    """
+    deferred: list[Message] = []
     while not f_stop.is_set():
-        out_mssg = None
+        messages: list[Message] = []
+        out_messages: list[Message] = []
         try:
-            # Fetch from queue with timeout. We use a timeout so
-            # the stopping event can be evaluated even when the queue is empty.
-            task_ins: TaskIns = taskins_queue.get(timeout=1.0)
-            node_id = task_ins.task.consumer.node_id
-
-            # Retrieve context
-            context = node_states[node_id].retrieve_context(run_id=task_ins.run_id)
-
-            # Convert TaskIns to Message
-            message = message_from_taskins(task_ins)
+            messages = _get_batch(
+                taskins_queue, deferred, backend.batch_size, backend.num_workers
+            )
 
-            # Let backend process message
-            out_mssg, updated_context = backend.process_message(message, context)
+            # Retrieve contexts
+            contexts = [
+                node_states[message.metadata.dst_node_id].retrieve_context(
+                    run_id=message.metadata.run_id
+                )
+                for message in messages
+            ]
 
-            # Update Context
-            node_states[node_id].update_context(
-                task_ins.run_id, context=updated_context
-            )
+            # Let backend process messages
+            results: list[Union[tuple[Message, Context], Exception]]
+            if len(messages) == 1:
+                results = [backend.process_message(messages[0], contexts[0])]
+            else:
+                results = backend.process_messages(messages, contexts)
+
+            for message, result in zip(messages, results):
+                if isinstance(result, Exception):
+                    # Exceptions aren't raised but reported as an error message
+                    out_messages.append(_error_reply(message, result))
+                    continue
+                out_mssg, updated_context = result
+                # Update Context
+                node_states[message.metadata.dst_node_id].update_context(
+                    message.metadata.run_id, context=updated_context
+                )
+                out_messages.append(out_mssg)
         except Empty:
             # An exception raised if queue.get times out
             pass
-        # Exceptions aren't raised but reported as an error message
+        # Exceptions aren't raised but reported as error messages
         except Exception as ex:  # pylint: disable=broad-exception-caught
-            log(ERROR, ex)
-            log(ERROR, traceback.format_exc())
-
-            if isinstance(ex, ClientAppException):
-                e_code = ErrorCode.CLIENT_APP_RAISED_EXCEPTION
-            elif isinstance(ex, LoadClientAppError):
-                e_code = ErrorCode.LOAD_CLIENT_APP_EXCEPTION
-            else:
-                e_code = ErrorCode.UNKNOWN
-
-            reason = str(type(ex)) + ":<'" + str(ex) + "'>"
-            out_mssg = message.create_error_reply(
-                error=Error(code=e_code, reason=reason)
-            )
+            out_messages = [_error_reply(message, ex) for message in messages]
 
         finally:
-            if out_mssg:
-                # Convert to TaskRes
-                task_res = message_to_taskres(out_mssg)
-                # Store TaskRes in state
-                task_res.task.pushed_at = time.time()
-                taskres_queue.put(task_res)
+            for out_mssg in out_messages:
+                taskres_queue.put(out_mssg)
+
+
+def _get_messages(state: State, node_id: int) -> list[Message]:
+    """Get the TaskIns of a node as Messages."""
+    if isinstance(state, InMemoryState):
+        # The content of Messages stored by the InMemoryDriver isn't serialized
+        return state.get_message_ins(node_id=node_id, limit=None)
+    return [
+        message_from_taskins(task_ins)
+        for task_ins in state.get_task_ins(node_id=node_id, limit=None)
+    ]
+
+
+def _store_messages(state: State, messages: list[Message]) -> None:
+    """Store reply Messages as TaskRes."""
+    if isinstance(state, InMemoryState):
+        # Only serialize the content when it leaves the process
+        state.store_message_res_batch(messages)
+        return
+    task_res_list = [message_to_taskres(message) for message in messages]
+    pushed_at = time.time()
+    for task_res in task_res_list:
+        task_res.task.pushed_at = pushed_at
+    state.store_task_res_batch(task_res_list)
 
 
 def add_taskins_to_queue(
     state: State,
-    queue: "Queue[TaskIns]",
+    queue: "Queue[Message]",
     nodes_mapping: NodeToPartitionMapping,
     f_stop: threading.Event,
 ) -> None:
-    """Put TaskIns in a queue from State."""
-    while not f_stop.is_set():
-        for node_id in nodes_mapping.keys():
-            task_ins_list = state.get_task_ins(node_id=node_id, limit=1)
-            for task_ins in task_ins_list:
-                queue.put(task_ins)
-        sleep(0.1)
+    """Put TaskIns as Messages in a queue from State as soon as they are stored."""
+    # Get notified about the nodes TaskIns are stored for
+    notified_node_ids: "Queue[list[int]]" = Queue()
+    state.add_task_ins_listener(notified_node_ids.put)
+
+    try:
+        # Nodes may have received TaskIns before subscribing
+        node_ids: set[int] = set(nodes_mapping)
+        while not f_stop.is_set():
+            for node_id in node_ids:
+                for message in _get_messages(state, node_id):
+                    queue.put(message)
+
+            # Wait for new TaskIns. We use a timeout so the stopping event can
+            # be evaluated even when no TaskIns arrive.
+            node_ids = set()
+            try:
+                node_ids.update(notified_node_ids.get(timeout=1.0))
+                while True:
+                    node_ids.update(notified_node_ids.get_nowait())
+            except Empty:
+                pass
+            node_ids.intersection_update(nodes_mapping)
+    finally:
+        state.remove_task_ins_listener(notified_node_ids.put)
 
 
 def put_taskres_into_state(
-    state: State, queue: "Queue[TaskRes]", f_stop: threading.Event
+    state: State, queue: "Queue[Message]", f_stop: threading.Event
 ) -> None:
-    """Put TaskRes into State from a queue."""
+    """Put reply Messages as TaskRes into State from a queue."""
     while not f_stop.is_set():
         try:
-            taskres = queue.get(timeout=1.0)
-            state.store_task_res(taskres)
+            messages = [queue.get(timeout=1.0)]
         except Empty:
             # queue is empty when timeout was triggered
+            continue
+        # Store all TaskRes available by now at once
+        try:
+            while True:
+                messages.append(queue.get_nowait())
+        except Empty:
             pass
+        _store_messages(state, messages)
 
 
 def run_api(
@@ -177,12 +268,12 @@ def run_api(
     backend_fn: Callable[[], Backend],
     nodes_mapping: NodeToPartitionMapping,
     state_factory: StateFactory,
-    node_states: dict[int, NodeState],
+    node_states: Mapping[int, NodeState],
     f_stop: threading.Event,
 ) -> None:
     """Run the VCE."""
-    taskins_queue: "Queue[TaskIns]" = Queue()
-    taskres_queue: "Queue[TaskRes]" = Queue()
+    taskins_queue: "Queue[Message]" = Queue()
+    taskres_queue: "Queue[Message]" = Queue()
 
     try:
 
@@ -309,15 +400,20 @@ def start_vce(
             num_nodes=num_supernodes, state_factory=state_factory
         )
 
-    # Construct mapping of NodeStates
-    node_states = _register_node_states(
-        nodes_mapping=nodes_mapping, run=run, app_dir=app_dir if is_app else None
-    )
-
     # Load backend config
     log(DEBUG, "Supported backends: %s", list(supported_backends.keys()))
     backend_config = json.loads(backend_config_json_stream)
 
+    # Construct mapping of NodeStates, created when nodes get their first message
+    node_states_config = backend_config.get("node_states", {})
+    node_states = NodeStates(
+        nodes_mapping=nodes_mapping,
+        run=run,
+        app_dir=app_dir if is_app else None,
+        max_in_memory=node_states_config.get("max_in_memory"),
+        spill_dir=node_states_config.get("spill_dir"),
+    )
+
     try:
         backend_type = supported_backends[backend_name]
     except KeyError as ex:
@@ -339,33 +435,24 @@ def start_vce(
 
     # Load ClientApp if needed
     def _load() -> ClientApp:
-
-        if client_app_attr:
-            app = get_load_client_app_fn(
-                default_app_ref=client_app_attr,
-                app_path=app_dir,
-                flwr_dir=flwr_dir,
-                multi_app=False,
-            )(run.fab_id, run.fab_version)
-
-        if client_app:
-            app = client_app
-        return app
-
-    app_fn = _load
+        return cast(ClientApp, client_app)
+
+    app_fn: Callable[[], ClientApp] = _load
+    if client_app_attr:
+        # Backend workers started in new processes load the ClientApp themselves,
+        # which requires a picklable function
+        app_fn = partial(
+            _load_client_app,
+            client_app_attr,
+            app_dir,
+            flwr_dir,
+            run.fab_id,
+            run.fab_version,
+        )
 
     try:
         # Test if ClientApp can be loaded
-        client_app = app_fn()
-
-        # Cache `ClientApp`
-        if client_app_attr:
-            # Now wrap the loaded ClientApp in a dummy function
-            # this prevent unnecesary low-level loading of ClientApp
-            def _load_client_app() -> ClientApp:
-                return client_app
-
-            app_fn = _load_client_app
+        app_fn()
 
         # Run main simulation loop
         run_api(
@@ -388,3 +475,5 @@ def start_vce(
         raise loadapp_ex
     except Exception as ex:
         raise ex
+    finally:
+        node_states.close()
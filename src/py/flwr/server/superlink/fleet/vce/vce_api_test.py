@@ -21,6 +21,7 @@ from itertools import cycle
 from json import JSONDecodeError
 from math import pi
 from pathlib import Path
+from queue import Queue
 from time import sleep
 from typing import Optional
 from unittest import TestCase
@@ -45,7 +46,9 @@ from flwr.common.serde import message_from_taskres, message_to_taskins
 from flwr.common.typing import Run
 from flwr.server.superlink.fleet.vce.vce_api import (
     NodeToPartitionMapping,
+    _get_batch,
     _register_nodes,
+    add_taskins_to_queue,
     start_vce,
 )
 from flwr.server.superlink.state import InMemoryState, StateFactory
@@ -221,6 +224,75 @@ def start_and_shutdown(
         termination_th.join()
 
 
+def test_add_taskins_to_queue_dispatches_on_arrival() -> None:
+    """Test that TaskIns are queued as soon as they are stored."""
+    # Prepare: TaskIns stored before and after the extractor started
+    state_factory, nodes_mapping, expected_results = init_state_factory_nodes_mapping(
+        num_nodes=100, num_messages=10
+    )
+    queue: "Queue[Message]" = Queue()
+    f_stop = threading.Event()
+    extractor_th = threading.Thread(
+        target=add_taskins_to_queue,
+        args=(state_factory.state(), queue, nodes_mapping, f_stop),
+    )
+
+    # Execute
+    extractor_th.start()
+    task_ids = {queue.get(timeout=1).metadata.message_id for _ in range(10)}
+    expected_results.update(
+        register_messages_into_state(
+            state_factory=state_factory,
+            nodes_mapping=nodes_mapping,
+            run_id=1234,
+            num_messages=5,
+        )
+    )
+    start_time = time.monotonic()
+    task_ids.update(queue.get(timeout=1).metadata.message_id for _ in range(5))
+    elapsed = time.monotonic() - start_time
+    f_stop.set()
+    extractor_th.join()
+
+    # Assert
+    assert task_ids == {str(task_id) for task_id in expected_results}
+    assert queue.empty()
+    assert elapsed < 0.5
+
+
+def test_get_batch_of_distinct_nodes() -> None:
+    """Test that batches hold Messages to distinct nodes, in order."""
+    # Prepare
+    queue: "Queue[Message]" = Queue()
+    node_ids = [1, 2, 1, 3, 4, 5, 6]
+    for idx, node_id in enumerate(node_ids):
+        message = Message(
+            content=RecordSet(),
+            metadata=Metadata(
+                run_id=0,
+                message_id=str(idx),
+                group_id="",
+                src_node_id=0,
+                dst_node_id=node_id,
+                reply_to_message="",
+                ttl=DEFAULT_TTL,
+                message_type=MessageTypeLegacy.GET_PROPERTIES,
+            ),
+        )
+        queue.put(message)
+    deferred: list[Message] = []
+
+    # Execute
+    batches = [
+        [message.metadata.message_id for message in _get_batch(queue, deferred, 4, 1)]
+        for _ in range(2)
+    ]
+
+    # Assert
+    assert batches == [["0", "1", "3"], ["2", "4", "5", "6"]]
+    assert queue.empty() and not deferred
+
+
 class TestFleetSimulationEngineRayBackend(TestCase):
     """A basic class that enables testing functionalities."""
 
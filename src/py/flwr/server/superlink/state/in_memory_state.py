@@ -17,18 +17,37 @@
 
 import threading
 import time
+from collections import deque
+from collections.abc import Sequence
+from copy import copy
+from itertools import count
 from logging import ERROR
-from typing import Optional
+from typing import Callable, Optional, TypeVar, Union
 from uuid import UUID, uuid4
 
-from flwr.common import log, now
+from flwr.common import Message, RecordSet, log, now
 from flwr.common.constant import NODE_ID_NUM_BYTES, RUN_ID_NUM_BYTES
+from flwr.common.record.codec import get_array_codecs
+from flwr.common.serde import (
+    message_from_taskins,
+    message_from_taskres,
+    message_to_taskins,
+    message_to_taskres,
+    recordset_to_proto,
+)
 from flwr.common.typing import Run, UserConfig
 from flwr.proto.task_pb2 import TaskIns, TaskRes  # pylint: disable=E0611
 from flwr.server.superlink.state.state import State
 from flwr.server.utils import validate_task_ins_or_res
 
-from .utils import generate_rand_int_from_bytes, make_node_unavailable_taskres
+from .notifier import Notifier
+from .utils import (
+    copy_recordset,
+    generate_rand_int_from_bytes,
+    make_node_unavailable_taskres,
+)
+
+TaskT = TypeVar("TaskT", TaskIns, TaskRes)
 
 
 class InMemoryState(State):  # pylint: disable=R0902,R0904
@@ -45,61 +64,131 @@ class InMemoryState(State):  # pylint: disable=R0902,R0904
         self.task_ins_store: dict[UUID, TaskIns] = {}
         self.task_res_store: dict[UUID, TaskRes] = {}
 
+        # Indexes to avoid scanning the stores
+        # Map node_id (0 if anonymous) to the IDs of undelivered TaskIns
+        self.node_id_to_task_ins_ids: dict[int, deque[UUID]] = {}
+        # Map TaskIns ID (i.e., `ancestry[0]`) to the IDs of TaskRes replying to it,
+        # each prefixed with a sequence number to preserve the order of insertion
+        self.task_ins_id_to_task_res_ids: dict[str, list[tuple[int, UUID]]] = {}
+        self.task_res_counter = count()
+
+        # Map task_id to the content of a TaskIns/TaskRes stored as a Message (see
+        # `store_message_ins_batch`), serialized only if the task is read as such
+        self.task_contents: dict[UUID, RecordSet] = {}
+
         self.node_public_keys: set[bytes] = set()
         self.server_public_key: Optional[bytes] = None
         self.server_private_key: Optional[bytes] = None
 
         self.lock = threading.Lock()
+        self.task_ins_notifier = Notifier()
+        self.task_res_notifier = Notifier()
+        self.node_notifier = Notifier()
+
+    def _assign_task_ids(
+        self, tasks: Sequence[Union[TaskIns, TaskRes]]
+    ) -> list[Optional[UUID]]:
+        """Validate the tasks and set a new `task_id` for each valid one."""
+        task_ids: list[Optional[UUID]] = []
+        for task in tasks:
+            # Validate task
+            errors = validate_task_ins_or_res(task)
+            if any(errors):
+                log(ERROR, errors)
+                task_ids.append(None)
+                continue
+            # Validate run_id
+            if task.run_id not in self.run_ids:
+                log(ERROR, "`run_id` is invalid")
+                task_ids.append(None)
+                continue
+
+            # Create task_id
+            task_id = uuid4()
+            task.task_id = str(task_id)
+            task_ids.append(task_id)
+        return task_ids
 
     def store_task_ins(self, task_ins: TaskIns) -> Optional[UUID]:
         """Store one TaskIns."""
-        # Validate task
-        errors = validate_task_ins_or_res(task_ins)
-        if any(errors):
-            log(ERROR, errors)
-            return None
-        # Validate run_id
-        if task_ins.run_id not in self.run_ids:
-            log(ERROR, "`run_id` is invalid")
-            return None
-
-        # Create task_id
-        task_id = uuid4()
+        return self.store_task_ins_batch([task_ins])[0]
+
+    def store_task_ins_batch(
+        self, task_ins_list: Sequence[TaskIns]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskIns."""
+        return self._store_task_ins_batch(task_ins_list, {})
+
+    def store_message_ins_batch(
+        self, messages: Sequence[Message]
+    ) -> list[Optional[UUID]]:
+        """Store multiple Messages as TaskIns without serializing their content.
+
+        A copy of the content is kept by reference and returned as is by
+        `get_message_ins`, which avoids serializing it when the Messages don't
+        leave the process (e.g., in simulation).
+        """
+        tasks, contents = _split_messages(messages, message_to_taskins)
+        return self._store_task_ins_batch(tasks, contents)
+
+    def _store_task_ins_batch(
+        self, task_ins_list: Sequence[TaskIns], contents: dict[int, RecordSet]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskIns, with the content of some kept by reference."""
+        task_ids = self._assign_task_ids(task_ins_list)
 
         # Store TaskIns
-        task_ins.task_id = str(task_id)
+        stored: list[TaskIns] = []
         with self.lock:
-            self.task_ins_store[task_id] = task_ins
+            for idx, (task_id, task_ins) in enumerate(zip(task_ids, task_ins_list)):
+                if task_id is None:
+                    continue
+                node_id = task_ins.task.consumer.node_id
+                self.task_ins_store[task_id] = task_ins
+                if idx in contents:
+                    self.task_contents[task_id] = contents[idx]
+                self.node_id_to_task_ins_ids.setdefault(node_id, deque()).append(
+                    task_id
+                )
+                stored.append(task_ins)
+        self.task_ins_notifier.notify(t.task.consumer.node_id for t in stored)
 
-        # Return the new task_id
-        return task_id
+        # Return the new task_ids
+        return task_ids
 
     def get_task_ins(
         self, node_id: Optional[int], limit: Optional[int]
     ) -> list[TaskIns]:
         """Get all TaskIns that have not been delivered yet."""
+        task_ins_list = self._get_task_ins(node_id, limit)
+        self._serialize_contents(task_ins_list)
+        return task_ins_list
+
+    def get_message_ins(
+        self, node_id: Optional[int], limit: Optional[int]
+    ) -> list[Message]:
+        """Get all TaskIns that have not been delivered yet as Messages."""
+        return [
+            self._to_message(task_ins, message_from_taskins)
+            for task_ins in self._get_task_ins(node_id, limit)
+        ]
+
+    def _get_task_ins(
+        self, node_id: Optional[int], limit: Optional[int]
+    ) -> list[TaskIns]:
+        """Get all TaskIns that have not been delivered yet, without contents."""
         if limit is not None and limit < 1:
             raise AssertionError("`limit` must be >= 1")
 
         # Find TaskIns for node_id that were not delivered yet
         task_ins_list: list[TaskIns] = []
         with self.lock:
-            for _, task_ins in self.task_ins_store.items():
-                # pylint: disable=too-many-boolean-expressions
-                if (
-                    node_id is not None  # Not anonymous
-                    and task_ins.task.consumer.anonymous is False
-                    and task_ins.task.consumer.node_id == node_id
-                    and task_ins.task.delivered_at == ""
-                ) or (
-                    node_id is None  # Anonymous
-                    and task_ins.task.consumer.anonymous is True
-                    and task_ins.task.consumer.node_id == 0
-                    and task_ins.task.delivered_at == ""
-                ):
+            # Anonymous TaskIns are addressed to node_id 0
+            task_ins_ids = self.node_id_to_task_ins_ids.get(node_id or 0, deque())
+            while task_ins_ids and not (limit and len(task_ins_list) == limit):
+                task_ins = self.task_ins_store.get(task_ins_ids.popleft())
+                if task_ins is not None and task_ins.task.delivered_at == "":
                     task_ins_list.append(task_ins)
-                if limit and len(task_ins_list) == limit:
-                    break
 
         # Mark all of them as delivered
         delivered_at = now().isoformat()
@@ -109,46 +198,114 @@ class InMemoryState(State):  # pylint: disable=R0902,R0904
         # Return TaskIns
         return task_ins_list
 
+    def wait_for_task_ins(
+        self,
+        node_id: Optional[int],
+        limit: Optional[int],
+        timeout: float,
+        is_active: Optional[Callable[[], bool]] = None,
+    ) -> list[TaskIns]:
+        """Get TaskIns for one node, waiting for them if none are available yet."""
+        # Anonymous TaskIns are addressed to node_id 0
+        return self.task_ins_notifier.wait_for(
+            [node_id or 0],
+            lambda: self.get_task_ins(node_id, limit),
+            timeout,
+            is_active,
+        )
+
+    def add_task_ins_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Register a function to be called whenever TaskIns are stored."""
+        self.task_ins_notifier.add_listener(listener)
+
+    def remove_task_ins_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Unregister a function registered with `add_task_ins_listener`."""
+        self.task_ins_notifier.remove_listener(listener)
+
     def store_task_res(self, task_res: TaskRes) -> Optional[UUID]:
         """Store one TaskRes."""
-        # Validate task
-        errors = validate_task_ins_or_res(task_res)
-        if any(errors):
-            log(ERROR, errors)
-            return None
+        return self.store_task_res_batch([task_res])[0]
+
+    def store_task_res_batch(
+        self, task_res_list: Sequence[TaskRes]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskRes."""
+        return self._store_task_res_batch(task_res_list, {})
 
-        # Validate run_id
-        if task_res.run_id not in self.run_ids:
-            log(ERROR, "`run_id` is invalid")
-            return None
+    def store_message_res_batch(
+        self, messages: Sequence[Message]
+    ) -> list[Optional[UUID]]:
+        """Store multiple Messages as TaskRes without serializing their content.
 
-        # Create task_id
-        task_id = uuid4()
+        A copy of the content is kept by reference and returned as is by
+        `get_message_res`.
+        """
+        tasks, contents = _split_messages(messages, message_to_taskres)
+        return self._store_task_res_batch(tasks, contents)
+
+    def _store_task_res_batch(
+        self, task_res_list: Sequence[TaskRes], contents: dict[int, RecordSet]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskRes, with the content of some kept by reference."""
+        task_ids = self._assign_task_ids(task_res_list)
 
         # Store TaskRes
-        task_res.task_id = str(task_id)
+        stored: list[TaskRes] = []
         with self.lock:
-            self.task_res_store[task_id] = task_res
+            for idx, (task_id, task_res) in enumerate(zip(task_ids, task_res_list)):
+                if task_id is None:
+                    continue
+                reply_to = task_res.task.ancestry[0]
+                self.task_res_store[task_id] = task_res
+                if idx in contents:
+                    self.task_contents[task_id] = contents[idx]
+                self.task_ins_id_to_task_res_ids.setdefault(reply_to, []).append(
+                    (next(self.task_res_counter), task_id)
+                )
+                stored.append(task_res)
+        self.task_res_notifier.notify(t.task.ancestry[0] for t in stored)
 
-        # Return the new task_id
-        return task_id
+        # Return the new task_ids
+        return task_ids
 
     def get_task_res(self, task_ids: set[UUID], limit: Optional[int]) -> list[TaskRes]:
         """Get all TaskRes that have not been delivered yet."""
+        task_res_list = self._get_task_res(task_ids, limit)
+        self._serialize_contents(task_res_list)
+        return task_res_list
+
+    def get_message_res(
+        self, task_ids: set[UUID], limit: Optional[int]
+    ) -> list[Message]:
+        """Get all TaskRes that have not been delivered yet as Messages."""
+        return [
+            self._to_message(task_res, message_from_taskres)
+            for task_res in self._get_task_res(task_ids, limit)
+        ]
+
+    # pylint: disable-next=R0914
+    def _get_task_res(self, task_ids: set[UUID], limit: Optional[int]) -> list[TaskRes]:
+        """Get all TaskRes that have not been delivered yet, without contents."""
         if limit is not None and limit < 1:
             raise AssertionError("`limit` must be >= 1")
 
         with self.lock:
             # Find TaskRes that were not delivered yet
-            task_res_list: list[TaskRes] = []
-            replied_task_ids: set[UUID] = set()
-            for _, task_res in self.task_res_store.items():
-                reply_to = UUID(task_res.task.ancestry[0])
-                if reply_to in task_ids and task_res.task.delivered_at == "":
-                    task_res_list.append(task_res)
-                    replied_task_ids.add(reply_to)
-                if limit and len(task_res_list) == limit:
-                    break
+            found: list[tuple[int, UUID, TaskRes]] = []
+            for task_id in task_ids:
+                for seq, task_res_id in self.task_ins_id_to_task_res_ids.get(
+                    str(task_id), []
+                ):
+                    task_res = self.task_res_store[task_res_id]
+                    if task_res.task.delivered_at == "":
+                        found.append((seq, task_id, task_res))
+
+            # Return the oldest TaskRes first
+            found.sort(key=lambda item: item[0])
+            if limit:
+                del found[limit:]
+            task_res_list: list[TaskRes] = [task_res for _, _, task_res in found]
+            replied_task_ids: set[UUID] = {task_id for _, task_id, _ in found}
 
             # Check if the node is offline
             for task_id in task_ids - replied_task_ids:
@@ -164,7 +321,11 @@ class InMemoryState(State):  # pylint: disable=R0902,R0904
                     err_taskres = make_node_unavailable_taskres(
                         ref_taskins=task_ins,
                     )
-                    self.task_res_store[UUID(err_taskres.task_id)] = err_taskres
+                    err_task_res_id = UUID(err_taskres.task_id)
+                    self.task_res_store[err_task_res_id] = err_taskres
+                    self.task_ins_id_to_task_res_ids.setdefault(
+                        str(task_id), []
+                    ).append((next(self.task_res_counter), err_task_res_id))
                     task_res_list.append(err_taskres)
 
             # Mark all of them as delivered
@@ -175,27 +336,77 @@ class InMemoryState(State):  # pylint: disable=R0902,R0904
             # Return TaskRes
             return task_res_list
 
+    def wait_for_task_res(
+        self, task_ids: set[UUID], limit: Optional[int], timeout: float
+    ) -> list[TaskRes]:
+        """Get TaskRes for task_ids, waiting for them if none are available yet."""
+        return self.task_res_notifier.wait_for(
+            [str(task_id) for task_id in task_ids],
+            lambda: self.get_task_res(task_ids, limit),
+            timeout,
+        )
+
+    def wait_for_message_res(
+        self, task_ids: set[UUID], limit: Optional[int], timeout: float
+    ) -> list[Message]:
+        """Get TaskRes as Messages, waiting for them if none are available yet."""
+        return self.task_res_notifier.wait_for(
+            [str(task_id) for task_id in task_ids],
+            lambda: self.get_message_res(task_ids, limit),
+            timeout,
+        )
+
+    def _serialize_contents(self, tasks: Sequence[Union[TaskIns, TaskRes]]) -> None:
+        """Serialize the contents kept by reference into the tasks."""
+        for task in tasks:
+            content = self.task_contents.pop(UUID(task.task_id), None)
+            if content is not None:
+                task.task.recordset.CopyFrom(
+                    recordset_to_proto(content, get_array_codecs(content))
+                )
+
+    def _to_message(
+        self, task: TaskT, from_task: Callable[[TaskT], Message]
+    ) -> Message:
+        """Convert a task to a Message, using the content kept by reference."""
+        message = from_task(task)
+        content = self.task_contents.pop(UUID(task.task_id), None)
+        if content is not None:
+            message.content = content
+        return message
+
     def delete_tasks(self, task_ids: set[UUID]) -> None:
         """Delete all delivered TaskIns/TaskRes pairs."""
-        task_ins_to_be_deleted: set[UUID] = set()
-        task_res_to_be_deleted: set[UUID] = set()
-
         with self.lock:
             for task_ins_id in task_ids:
-                # Find the task_id of the matching task_res
-                for task_res_id, task_res in self.task_res_store.items():
-                    if UUID(task_res.task.ancestry[0]) != task_ins_id:
-                        continue
-                    if task_res.task.delivered_at == "":
-                        continue
-
-                    task_ins_to_be_deleted.add(task_ins_id)
-                    task_res_to_be_deleted.add(task_res_id)
+                # Find the task_ids of the matching task_res
+                reply_to = str(task_ins_id)
+                task_res_ids = self.task_ins_id_to_task_res_ids.get(reply_to, [])
+                delivered = [
+                    item
+                    for item in task_res_ids
+                    if self.task_res_store[item[1]].task.delivered_at != ""
+                ]
+                if not delivered:
+                    continue
 
-            for task_id in task_ins_to_be_deleted:
-                del self.task_ins_store[task_id]
-            for task_id in task_res_to_be_deleted:
-                del self.task_res_store[task_id]
+                self.task_ins_store.pop(task_ins_id, None)
+                self.task_contents.pop(task_ins_id, None)
+                for item in delivered:
+                    del self.task_res_store[item[1]]
+                    self.task_contents.pop(item[1], None)
+                    task_res_ids.remove(item)
+                if not task_res_ids:
+                    del self.task_ins_id_to_task_res_ids[reply_to]
+
+    def get_task_ins_with_parameters_refs(self) -> list[TaskIns]:
+        """Get all stored TaskIns referencing ParametersRecords stored elsewhere."""
+        with self.lock:
+            return [
+                task_ins
+                for task_ins in self.task_ins_store.values()
+                if task_ins.task.parameters_refs
+            ]
 
     def num_task_ins(self) -> int:
         """Calculate the number of task_ins in store.
@@ -252,6 +463,17 @@ class InMemoryState(State):  # pylint: disable=R0902,R0904
                 del self.public_key_to_node_id[public_key]
 
             del self.node_ids[node_id]
+        self.node_notifier.notify([node_id])
+
+    def add_node_deletion_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Register a function to be called whenever nodes are deleted."""
+        self.node_notifier.add_listener(listener)
+
+    def remove_node_deletion_listener(
+        self, listener: Callable[[list[int]], None]
+    ) -> None:
+        """Unregister a function registered with `add_node_deletion_listener`."""
+        self.node_notifier.remove_listener(listener)
 
     def get_nodes(self, run_id: int) -> set[int]:
         """Return all available nodes.
@@ -347,3 +569,23 @@ class InMemoryState(State):  # pylint: disable=R0902,R0904
                 self.node_ids[node_id] = (time.time() + ping_interval, ping_interval)
                 return True
         return False
+
+
+def _split_messages(
+    messages: Sequence[Message], to_task: Callable[[Message], TaskT]
+) -> tuple[list[TaskT], dict[int, RecordSet]]:
+    """Convert Messages to tasks without content and copy their contents."""
+    tasks: list[TaskT] = []
+    contents: dict[int, RecordSet] = {}
+    pushed_at = time.time()
+    for idx, message in enumerate(messages):
+        if message.has_content():
+            contents[idx] = copy_recordset(message.content)
+            # Only the metadata is serialized, the content is kept by reference
+            created_at = message.metadata.created_at
+            message = Message(metadata=copy(message.metadata), content=RecordSet())
+            message.metadata.created_at = created_at
+        task = to_task(message)
+        task.task.pushed_at = pushed_at
+        tasks.append(task)
+    return tasks, contents
@@ -0,0 +1,142 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Notifier used to wake up threads waiting for tasks in the State."""
+
+
+import threading
+import time
+from collections.abc import Hashable, Iterable
+from typing import Any, Callable, Optional, TypeVar
+
+from flwr.common.constant import LONG_POLL_RECHECK_INTERVAL
+
+T = TypeVar("T")
+
+
+class Notifier:
+    """Wake up threads waiting for tasks associated with one or more keys.
+
+    A key identifies what a waiting thread is interested in, for example a node ID
+    (i.e., TaskIns to be delivered to this node) or a task ID (i.e., TaskRes replying to
+    this TaskIns). Instead of polling the State in fixed intervals, waiting threads only
+    query the State again once a task for one of their keys has been stored.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._events: dict[Hashable, set[threading.Event]] = {}
+        self._listeners: list[Callable[[list[Any]], None]] = []
+
+    def notify(self, keys: Iterable[Hashable]) -> None:
+        """Wake up all threads waiting for any of the given keys."""
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                for event in self._events.get(key, ()):
+                    event.set()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(keys)
+
+    def add_listener(self, listener: Callable[[list[Any]], None]) -> None:
+        """Register a function that is called with the keys of every notification.
+
+        Listeners are called by the thread storing tasks, hence they should return
+        quickly (e.g., by putting the keys into a queue).
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[list[Any]], None]) -> None:
+        """Unregister a function previously registered with `add_listener`."""
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def wait_for(
+        self,
+        keys: Iterable[Hashable],
+        fetch: Callable[[], list[T]],
+        timeout: float,
+        is_active: Optional[Callable[[], bool]] = None,
+    ) -> list[T]:
+        """Call `fetch` until it returns a non-empty list or `timeout` expires.
+
+        `fetch` is called once immediately and then again whenever one of the `keys`
+        is notified. To account for changes that are not notified (e.g., nodes going
+        offline), `fetch` is also called at least every `LONG_POLL_RECHECK_INTERVAL`
+        seconds.
+
+        Parameters
+        ----------
+        keys : Iterable[Hashable]
+            The keys to wait for.
+        fetch : Callable[[], List[T]]
+            The function retrieving the available tasks from the State.
+        timeout : float
+            The maximum time (in seconds) to wait for.
+        is_active : Optional[Callable[[], bool]] (default: None)
+            A function telling whether the waiting request is still alive (e.g., the
+            client has not disconnected). It is checked before each call to `fetch`;
+            once it returns False, an empty list is returned without calling `fetch`.
+
+        Returns
+        -------
+        result : List[T]
+            The last result returned by `fetch`, which is empty if the timeout expired.
+        """
+        event = threading.Event()
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                self._events.setdefault(key, set()).add(event)
+
+        try:
+            end_time = time.monotonic() + timeout
+            while True:
+                # Don't fetch (and deliver) anything once the request is gone
+                if is_active is not None and not is_active():
+                    return []
+                # Subscribed before fetching, hence no notification can be missed
+                result = fetch()
+                remaining = end_time - time.monotonic()
+                if result or remaining <= 0:
+                    return result
+                event.wait(min(remaining, LONG_POLL_RECHECK_INTERVAL))
+                event.clear()
+        finally:
+            with self._lock:
+                for key in keys:
+                    events = self._events.get(key)
+                    if events is None:
+                        continue
+                    events.discard(event)
+                    if not events:
+                        del self._events[key]
+
+
+_shared_notifiers: dict[Hashable, Notifier] = {}
+_shared_notifiers_lock = threading.Lock()
+
+
+def get_shared_notifier(key: Hashable) -> Notifier:
+    """Return the notifier registered under `key`, creating it if necessary.
+
+    This allows State instances backed by the same storage (e.g., the same SQLite
+    database) to wake up each other's waiting threads.
+    """
+    with _shared_notifiers_lock:
+        if key not in _shared_notifiers:
+            _shared_notifiers[key] = Notifier()
+        return _shared_notifiers[key]
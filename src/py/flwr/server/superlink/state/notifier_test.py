@@ -0,0 +1,121 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for Notifier."""
+
+
+import threading
+import time
+import unittest
+
+from .notifier import Notifier
+
+
+class NotifierTest(unittest.TestCase):
+    """Test Notifier."""
+
+    def test_wait_for_notified_key(self) -> None:
+        """Test that waiting threads re-fetch once their key is notified."""
+        # Prepare
+        notifier = Notifier()
+        store: list[str] = []
+
+        def store_and_notify() -> None:
+            time.sleep(0.1)
+            store.append("task")
+            notifier.notify(["key"])
+
+        thread = threading.Thread(target=store_and_notify)
+
+        # Execute
+        thread.start()
+        start_time = time.monotonic()
+        result = notifier.wait_for(["key"], lambda: list(store), timeout=10)
+        thread.join()
+
+        # Assert
+        self.assertEqual(result, ["task"])
+        self.assertLess(time.monotonic() - start_time, 1)
+
+    def test_wait_for_ignores_other_keys(self) -> None:
+        """Test that notifications for other keys do not trigger a re-fetch."""
+        # Prepare
+        notifier = Notifier()
+        num_fetches = 0
+
+        def fetch() -> list[str]:
+            nonlocal num_fetches
+            num_fetches += 1
+            return []
+
+        timer = threading.Timer(0.05, notifier.notify, args=(["other-key"],))
+
+        # Execute
+        timer.start()
+        result = notifier.wait_for(["key"], fetch, timeout=0.2)
+        timer.join()
+
+        # Assert
+        self.assertEqual(result, [])
+        self.assertEqual(num_fetches, 2)
+
+    def test_wait_for_stops_if_inactive(self) -> None:
+        """Test that no fetch happens once the waiting request is inactive."""
+        # Prepare
+        notifier = Notifier()
+        active = True
+        num_fetches = 0
+
+        def fetch() -> list[str]:
+            nonlocal active, num_fetches
+            num_fetches += 1
+            active = False
+            notifier.notify(["key"])
+            return []
+
+        # Execute
+        start_time = time.monotonic()
+        result = notifier.wait_for(["key"], fetch, timeout=10, is_active=lambda: active)
+
+        # Assert
+        self.assertEqual(result, [])
+        self.assertEqual(num_fetches, 1)
+        self.assertLess(time.monotonic() - start_time, 1)
+
+    def test_listener_called_with_notified_keys(self) -> None:
+        """Test that listeners receive the keys of all notifications."""
+        # Prepare
+        notifier = Notifier()
+        received: list[list[str]] = []
+        notifier.add_listener(received.append)
+
+        # Execute
+        notifier.notify(iter(["key1", "key2"]))
+        notifier.remove_listener(received.append)
+        notifier.notify(["key3"])
+
+        # Assert
+        self.assertEqual(received, [["key1", "key2"]])
+
+    def test_wait_for_unsubscribes(self) -> None:
+        """Test that no waiters are left behind after returning."""
+        # Prepare
+        notifier = Notifier()
+
+        # Execute
+        notifier.wait_for(["key"], lambda: ["task"], timeout=1)
+
+        # Assert
+        # pylint: disable-next=protected-access
+        self.assertEqual(notifier._events, {})
@@ -13,15 +13,20 @@
 # limitations under the License.
 # ==============================================================================
 """SQLite based implemenation of server state."""
+# pylint: disable=C0302
 
 
 import json
 import re
 import sqlite3
+import threading
 import time
-from collections.abc import Sequence
-from logging import DEBUG, ERROR
-from typing import Any, Optional, Union, cast
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import compress
+from logging import DEBUG, ERROR, INFO
+from typing import Any, Callable, Optional, Union, cast
 from uuid import UUID, uuid4
 
 from flwr.common import log, now
@@ -32,6 +37,7 @@ from flwr.proto.recordset_pb2 import RecordSet  # pylint: disable=E0611
 from flwr.proto.task_pb2 import Task, TaskIns, TaskRes  # pylint: disable=E0611
 from flwr.server.utils.validator import validate_task_ins_or_res
 
+from .notifier import get_shared_notifier
 from .state import State
 from .utils import (
     convert_sint64_to_uint64,
@@ -93,11 +99,20 @@ CREATE TABLE IF NOT EXISTS task_ins(
     ttl                     REAL,
     ancestry                TEXT,
     task_type               TEXT,
-    recordset               BLOB,
+    parameters_refs         TEXT,
     FOREIGN KEY(run_id) REFERENCES run(run_id)
 );
 """
 
+# RecordSets are stored separately so that scanning tasks does not read them
+SQL_CREATE_TABLE_TASK_INS_RECORDSET = """
+CREATE TABLE IF NOT EXISTS task_ins_recordset(
+    task_id                 TEXT PRIMARY KEY,
+    recordset               BLOB,
+    FOREIGN KEY(task_id) REFERENCES task_ins(task_id) ON DELETE CASCADE
+);
+"""
+
 SQL_CREATE_TABLE_TASK_RES = """
 CREATE TABLE IF NOT EXISTS task_res(
     task_id                 TEXT UNIQUE,
@@ -113,15 +128,36 @@ CREATE TABLE IF NOT EXISTS task_res(
     ttl                     REAL,
     ancestry                TEXT,
     task_type               TEXT,
-    recordset               BLOB,
+    parameters_refs         TEXT,
     FOREIGN KEY(run_id) REFERENCES run(run_id)
 );
 """
 
+SQL_CREATE_TABLE_TASK_RES_RECORDSET = """
+CREATE TABLE IF NOT EXISTS task_res_recordset(
+    task_id                 TEXT PRIMARY KEY,
+    recordset               BLOB,
+    FOREIGN KEY(task_id) REFERENCES task_res(task_id) ON DELETE CASCADE
+);
+"""
+
+SQL_CREATE_INDEX_TASK_INS_CONSUMER = """
+CREATE INDEX IF NOT EXISTS idx_task_ins_consumer
+ON task_ins (consumer_anonymous, consumer_node_id, delivered_at);
+"""
+
+SQL_CREATE_INDEX_TASK_RES_ANCESTRY = """
+CREATE INDEX IF NOT EXISTS idx_task_res_ancestry ON task_res (ancestry, delivered_at);
+"""
+
 DictOrTuple = Union[tuple[Any, ...], dict[str, Any]]
 
+# Databases which are private to the connection that opened them
+# (see https://sqlite.org/inmemorydb.html)
+PRIVATE_DATABASES = ("", ":memory:")
+
 
-class SqliteState(State):  # pylint: disable=R0904
+class SqliteState(State):  # pylint: disable=R0902,R0904
     """SQLite-based state implementation."""
 
     def __init__(
@@ -137,7 +173,17 @@ class SqliteState(State):  # pylint: disable=R0904
             a connection to a database that is in RAM, instead of on disk.
         """
         self.database_path = database_path
-        self.conn: Optional[sqlite3.Connection] = None
+        self.log_queries = False
+        self.initialized = False
+        # Private databases can only be shared via a single connection, all other
+        # databases are accessed via one (reused) connection per thread
+        self.shared_conn: Optional[sqlite3.Connection] = None
+        self.shared_conn_lock = threading.Lock()
+        self.thread_local = threading.local()
+        # Notifiers are shared by all states using the same database
+        self.task_ins_notifier = get_shared_notifier((database_path, "task_ins"))
+        self.task_res_notifier = get_shared_notifier((database_path, "task_res"))
+        self.node_notifier = get_shared_notifier((database_path, "node"))
 
     def initialize(self, log_queries: bool = False) -> list[tuple[str]]:
         """Create tables if they don't exist yet.
@@ -147,50 +193,102 @@ class SqliteState(State):  # pylint: disable=R0904
         log_queries : bool
             Log each query which is executed.
         """
-        self.conn = sqlite3.connect(self.database_path)
-        self.conn.execute("PRAGMA foreign_keys = ON;")
-        self.conn.row_factory = dict_factory
-        if log_queries:
-            self.conn.set_trace_callback(lambda query: log(DEBUG, query))
-        cur = self.conn.cursor()
+        self.log_queries = log_queries
+        if self.database_path in PRIVATE_DATABASES:
+            self.shared_conn = self._connect(check_same_thread=False)
+        self.initialized = True
+        conn = cast(sqlite3.Connection, self.conn)
+        # Readers do not block writers and vice versa (no effect on private databases)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        # Migrate databases created by older versions
+        _migrate_task_table(
+            conn,
+            "task_ins",
+            SQL_CREATE_TABLE_TASK_INS,
+            SQL_CREATE_TABLE_TASK_INS_RECORDSET,
+        )
+        _migrate_task_table(
+            conn,
+            "task_res",
+            SQL_CREATE_TABLE_TASK_RES,
+            SQL_CREATE_TABLE_TASK_RES_RECORDSET,
+        )
+        cur = conn.cursor()
 
         # Create each table if not exists queries
         cur.execute(SQL_CREATE_TABLE_RUN)
         cur.execute(SQL_CREATE_TABLE_TASK_INS)
+        cur.execute(SQL_CREATE_TABLE_TASK_INS_RECORDSET)
         cur.execute(SQL_CREATE_TABLE_TASK_RES)
+        cur.execute(SQL_CREATE_TABLE_TASK_RES_RECORDSET)
         cur.execute(SQL_CREATE_TABLE_NODE)
         cur.execute(SQL_CREATE_TABLE_CREDENTIAL)
         cur.execute(SQL_CREATE_TABLE_PUBLIC_KEY)
         cur.execute(SQL_CREATE_INDEX_ONLINE_UNTIL)
+        cur.execute(SQL_CREATE_INDEX_TASK_INS_CONSUMER)
+        cur.execute(SQL_CREATE_INDEX_TASK_RES_ANCESTRY)
         res = cur.execute("SELECT name FROM sqlite_schema;")
 
         return res.fetchall()
 
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open and configure a new connection to the database."""
+        conn = sqlite3.connect(self.database_path, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        # Safe in WAL mode, only the durability of the last commits is traded off
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.row_factory = dict_factory
+        if self.log_queries:
+            conn.set_trace_callback(lambda query: log(DEBUG, query))
+        return conn
+
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        """The connection used by the current thread, `None` if not initialized."""
+        if self.shared_conn is not None or not self.initialized:
+            return self.shared_conn
+        conn: Optional[sqlite3.Connection] = getattr(self.thread_local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self.thread_local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the statements executed on the yielded connection in a transaction."""
+        conn = self.conn
+        if conn is None:
+            raise AttributeError("State is not initialized.")
+
+        if self.shared_conn is None:
+            with conn:
+                yield conn
+        else:
+            with self.shared_conn_lock, conn:
+                yield conn
+
     def query(
         self,
         query: str,
         data: Optional[Union[Sequence[DictOrTuple], DictOrTuple]] = None,
     ) -> list[dict[str, Any]]:
         """Execute a SQL query."""
-        if self.conn is None:
-            raise AttributeError("State is not initialized.")
-
         if data is None:
             data = []
 
         # Clean up whitespace to make the logs nicer
-        query = re.sub(r"\s+", " ", query)
+        query = _normalize_query(query)
 
         try:
-            with self.conn:
+            with self.transaction() as conn:
                 if (
                     len(data) > 0
                     and isinstance(data, (tuple, list))
                     and isinstance(data[0], (tuple, dict))
                 ):
-                    rows = self.conn.executemany(query, data)
+                    rows = conn.executemany(query, data)
                 else:
-                    rows = self.conn.execute(query, data)
+                    rows = conn.execute(query, data)
 
                 # Extract results before committing to support
                 #   INSERT/UPDATE ... RETURNING
@@ -201,6 +299,61 @@ class SqliteState(State):  # pylint: disable=R0904
 
         return result
 
+    # pylint: disable-next=R0914
+    def _insert_tasks(
+        self, table: str, tasks: Sequence[Union[TaskIns, TaskRes]]
+    ) -> list[Optional[UUID]]:
+        """Insert valid tasks and their RecordSets into `table` in one transaction.
+
+        Returns the new `task_id` of each task, or `None` if it was not inserted.
+        """
+        task_ids: list[Optional[UUID]] = []
+        task_dicts: list[dict[str, Any]] = []
+        for task in tasks:
+            # Validate task
+            errors = validate_task_ins_or_res(task)
+            if any(errors):
+                log(ERROR, errors)
+                task_ids.append(None)
+                continue
+
+            # Create task_id
+            task_id = uuid4()
+            task.task_id = str(task_id)
+            task_ids.append(task_id)
+            task_dict = task_to_dict(task)
+
+            # Convert values from uint64 to sint64 for SQLite
+            convert_uint64_values_in_dict_to_sint64(
+                task_dict, ["run_id", "producer_node_id", "consumer_node_id"]
+            )
+            task_dicts.append(task_dict)
+
+        if not task_dicts:
+            return task_ids
+
+        recordsets = [(d["task_id"], d.pop("recordset")) for d in task_dicts]
+        columns = ", ".join([f":{key}" for key in task_dicts[0]])
+        run_ids = list({d["run_id"] for d in task_dicts})
+        placeholders = ",".join(["?"] * len(run_ids))
+
+        with self.transaction() as conn:
+            # Skip tasks with an invalid run_id
+            query = f"SELECT run_id FROM run WHERE run_id IN ({placeholders});"
+            valid_run_ids = {row["run_id"] for row in conn.execute(query, run_ids)}
+            if len(valid_run_ids) < len(run_ids):
+                log(ERROR, "`run` is invalid")
+                valid = [d["run_id"] in valid_run_ids for d in task_dicts]
+                task_dicts = list(compress(task_dicts, valid))
+                recordsets = list(compress(recordsets, valid))
+                valid_ids = {d["task_id"] for d in task_dicts}
+                task_ids = [t if str(t) in valid_ids else None for t in task_ids]
+
+            conn.executemany(f"INSERT INTO {table} VALUES({columns});", task_dicts)
+            conn.executemany(f"INSERT INTO {table}_recordset VALUES(?, ?);", recordsets)
+
+        return task_ids
+
     def store_task_ins(self, task_ins: TaskIns) -> Optional[UUID]:
         """Store one TaskIns.
 
@@ -218,36 +371,19 @@ class SqliteState(State):  # pylint: disable=R0904
         If `task_ins.task.consumer.anonymous` is `False`, then
         `task_ins.task.consumer.node_id` MUST be set (not 0)
         """
-        # Validate task
-        errors = validate_task_ins_or_res(task_ins)
-        if any(errors):
-            log(ERROR, errors)
-            return None
-
-        # Create task_id
-        task_id = uuid4()
-
-        # Store TaskIns
-        task_ins.task_id = str(task_id)
-        data = (task_ins_to_dict(task_ins),)
-
-        # Convert values from uint64 to sint64 for SQLite
-        convert_uint64_values_in_dict_to_sint64(
-            data[0], ["run_id", "producer_node_id", "consumer_node_id"]
+        return self.store_task_ins_batch([task_ins])[0]
+
+    def store_task_ins_batch(
+        self, task_ins_list: Sequence[TaskIns]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskIns in a single transaction."""
+        task_ids = self._insert_tasks("task_ins", task_ins_list)
+        self.task_ins_notifier.notify(
+            task_ins.task.consumer.node_id
+            for task_id, task_ins in zip(task_ids, task_ins_list)
+            if task_id is not None
         )
-
-        columns = ", ".join([f":{key}" for key in data[0]])
-        query = f"INSERT INTO task_ins VALUES({columns});"
-
-        # Only invalid run_id can trigger IntegrityError.
-        # This may need to be changed in the future version with more integrity checks.
-        try:
-            self.query(query, data)
-        except sqlite3.IntegrityError:
-            log(ERROR, "`run` is invalid")
-            return None
-
-        return task_id
+        return task_ids
 
     def get_task_ins(
         self, node_id: Optional[int], limit: Optional[int]
@@ -290,8 +426,8 @@ class SqliteState(State):  # pylint: disable=R0904
         if node_id is None:
             # Retrieve all anonymous Tasks
             query = """
-                SELECT task_id
-                FROM task_ins
+                SELECT task_ins.*, recordset
+                FROM task_ins JOIN task_ins_recordset USING (task_id)
                 WHERE consumer_anonymous == 1
                 AND   consumer_node_id == 0
                 AND   delivered_at = ""
@@ -302,8 +438,8 @@ class SqliteState(State):  # pylint: disable=R0904
 
             # Retrieve all TaskIns for node_id
             query = """
-                SELECT task_id
-                FROM task_ins
+                SELECT task_ins.*, recordset
+                FROM task_ins JOIN task_ins_recordset USING (task_id)
                 WHERE consumer_anonymous == 0
                 AND   consumer_node_id == :node_id
                 AND   delivered_at = ""
@@ -324,8 +460,7 @@ class SqliteState(State):  # pylint: disable=R0904
             query = f"""
                 UPDATE task_ins
                 SET delivered_at = :delivered_at
-                WHERE task_id IN ({placeholders})
-                RETURNING *;
+                WHERE task_id IN ({placeholders});
             """
 
             # Prepare data for query
@@ -335,7 +470,9 @@ class SqliteState(State):  # pylint: disable=R0904
                 data[f"id_{index}"] = str(task_id)
 
             # Run query
-            rows = self.query(query, data)
+            self.query(query, data)
+            for row in rows:
+                row["delivered_at"] = delivered_at
 
         for row in rows:
             # Convert values from sint64 to uint64
@@ -347,6 +484,30 @@ class SqliteState(State):  # pylint: disable=R0904
 
         return result
 
+    def wait_for_task_ins(
+        self,
+        node_id: Optional[int],
+        limit: Optional[int],
+        timeout: float,
+        is_active: Optional[Callable[[], bool]] = None,
+    ) -> list[TaskIns]:
+        """Get TaskIns for one node, waiting for them if none are available yet."""
+        # Anonymous TaskIns are addressed to node_id 0
+        return self.task_ins_notifier.wait_for(
+            [node_id or 0],
+            lambda: self.get_task_ins(node_id, limit),
+            timeout,
+            is_active,
+        )
+
+    def add_task_ins_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Register a function to be called whenever TaskIns are stored."""
+        self.task_ins_notifier.add_listener(listener)
+
+    def remove_task_ins_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Unregister a function registered with `add_task_ins_listener`."""
+        self.task_ins_notifier.remove_listener(listener)
+
     def store_task_res(self, task_res: TaskRes) -> Optional[UUID]:
         """Store one TaskRes.
 
@@ -363,38 +524,20 @@ class SqliteState(State):  # pylint: disable=R0904
         If `task_res.task.consumer.anonymous` is `False`, then
         `task_res.task.consumer.node_id` MUST be set (not 0)
         """
-        # Validate task
-        errors = validate_task_ins_or_res(task_res)
-        if any(errors):
-            log(ERROR, errors)
-            return None
-
-        # Create task_id
-        task_id = uuid4()
-
-        # Store TaskIns
-        task_res.task_id = str(task_id)
-        data = (task_res_to_dict(task_res),)
-
-        # Convert values from uint64 to sint64 for SQLite
-        convert_uint64_values_in_dict_to_sint64(
-            data[0], ["run_id", "producer_node_id", "consumer_node_id"]
+        return self.store_task_res_batch([task_res])[0]
+
+    def store_task_res_batch(
+        self, task_res_list: Sequence[TaskRes]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskRes in a single transaction."""
+        task_ids = self._insert_tasks("task_res", task_res_list)
+        self.task_res_notifier.notify(
+            task_res.task.ancestry[0]
+            for task_id, task_res in zip(task_ids, task_res_list)
+            if task_id is not None
         )
+        return task_ids
 
-        columns = ", ".join([f":{key}" for key in data[0]])
-        query = f"INSERT INTO task_res VALUES({columns});"
-
-        # Only invalid run_id can trigger IntegrityError.
-        # This may need to be changed in the future version with more integrity checks.
-        try:
-            self.query(query, data)
-        except sqlite3.IntegrityError:
-            log(ERROR, "`run` is invalid")
-            return None
-
-        return task_id
-
-    # pylint: disable-next=R0914
     def get_task_res(self, task_ids: set[UUID], limit: Optional[int]) -> list[TaskRes]:
         """Get TaskRes for task_ids.
 
@@ -417,15 +560,29 @@ class SqliteState(State):  # pylint: disable=R0904
         if len(task_ids) == 0:
             return []
 
+        # Retrieve undelivered TaskRes and, for TaskIns without one whose node is
+        # offline, the TaskIns to reply to with an error (oldest TaskRes first)
         placeholders = ",".join([f":id_{i}" for i in range(len(task_ids))])
         query = f"""
-            SELECT *
-            FROM task_res
+            SELECT task_res.*, recordset, 0 AS node_offline, task_res.rowid AS pos
+            FROM task_res JOIN task_res_recordset USING (task_id)
             WHERE ancestry IN ({placeholders})
             AND delivered_at = ""
+            UNION ALL
+            SELECT task_ins.*, recordset, 1 AS node_offline, task_ins.rowid AS pos
+            FROM task_ins JOIN task_ins_recordset USING (task_id)
+            JOIN node ON node.node_id = task_ins.consumer_node_id
+            WHERE task_ins.task_id IN ({placeholders})
+            AND node.online_until < :time
+            AND NOT EXISTS (
+                SELECT 1 FROM task_res
+                WHERE task_res.ancestry = task_ins.task_id
+                AND task_res.delivered_at = ""
+            )
+            ORDER BY node_offline, pos
         """
 
-        data: dict[str, Union[str, float, int]] = {}
+        data: dict[str, Union[str, float, int]] = {"time": time.time()}
 
         if limit is not None:
             query += " LIMIT :limit"
@@ -437,91 +594,53 @@ class SqliteState(State):  # pylint: disable=R0904
             data[f"id_{index}"] = str(task_id)
 
         rows = self.query(query, data)
+        task_res_rows = [row for row in rows if not row["node_offline"]]
 
-        if rows:
+        if task_res_rows:
             # Prepare query
-            found_task_ids = [row["task_id"] for row in rows]
-            placeholders = ",".join([f":id_{i}" for i in range(len(found_task_ids))])
+            placeholders = ",".join([f":id_{i}" for i in range(len(task_res_rows))])
             query = f"""
                 UPDATE task_res
                 SET delivered_at = :delivered_at
-                WHERE task_id IN ({placeholders})
-                RETURNING *;
+                WHERE task_id IN ({placeholders});
             """
 
             # Prepare data for query
             delivered_at = now().isoformat()
             data = {"delivered_at": delivered_at}
-            for index, task_id in enumerate(found_task_ids):
-                data[f"id_{index}"] = str(task_id)
+            for index, row in enumerate(task_res_rows):
+                data[f"id_{index}"] = row["task_id"]
+                row["delivered_at"] = delivered_at
 
             # Run query
-            rows = self.query(query, data)
-
-            for row in rows:
-                # Convert values from sint64 to uint64
-                convert_sint64_values_in_dict_to_uint64(
-                    row, ["run_id", "producer_node_id", "consumer_node_id"]
-                )
-
-        result = [dict_to_task_res(row) for row in rows]
-
-        # 1. Query: Fetch consumer_node_id of remaining task_ids
-        # Assume the ancestry field only contains one element
-        data.clear()
-        replied_task_ids: set[UUID] = {UUID(str(row["ancestry"])) for row in rows}
-        remaining_task_ids = task_ids - replied_task_ids
-        placeholders = ",".join([f":id_{i}" for i in range(len(remaining_task_ids))])
-        query = f"""
-            SELECT consumer_node_id
-            FROM task_ins
-            WHERE task_id IN ({placeholders});
-        """
-        for index, task_id in enumerate(remaining_task_ids):
-            data[f"id_{index}"] = str(task_id)
-        node_ids = [int(row["consumer_node_id"]) for row in self.query(query, data)]
-
-        # 2. Query: Select offline nodes
-        placeholders = ",".join([f":id_{i}" for i in range(len(node_ids))])
-        query = f"""
-            SELECT node_id
-            FROM node
-            WHERE node_id IN ({placeholders})
-            AND online_until < :time;
-        """
-        data = {f"id_{i}": str(node_id) for i, node_id in enumerate(node_ids)}
-        data["time"] = time.time()
-        offline_node_ids = [int(row["node_id"]) for row in self.query(query, data)]
-
-        # 3. Query: Select TaskIns for offline nodes
-        placeholders = ",".join([f":id_{i}" for i in range(len(offline_node_ids))])
-        query = f"""
-            SELECT *
-            FROM task_ins
-            WHERE consumer_node_id IN ({placeholders});
-        """
-        data = {f"id_{i}": str(node_id) for i, node_id in enumerate(offline_node_ids)}
-        task_ins_rows = self.query(query, data)
-
-        # Make TaskRes containing node unavailabe error
-        for row in task_ins_rows:
-            if limit and len(result) == limit:
-                break
-
-            for row in rows:
-                # Convert values from sint64 to uint64
-                convert_sint64_values_in_dict_to_uint64(
-                    row, ["run_id", "producer_node_id", "consumer_node_id"]
-                )
+            self.query(query, data)
 
-            task_ins = dict_to_task_ins(row)
-            err_taskres = make_node_unavailable_taskres(
-                ref_taskins=task_ins,
+        result: list[TaskRes] = []
+        for row in rows:
+            # Convert values from sint64 to uint64
+            convert_sint64_values_in_dict_to_uint64(
+                row, ["run_id", "producer_node_id", "consumer_node_id"]
             )
-            result.append(err_taskres)
+
+            if row["node_offline"]:
+                # Make TaskRes containing node unavailabe error
+                task_ins = dict_to_task_ins(row)
+                result.append(make_node_unavailable_taskres(ref_taskins=task_ins))
+            else:
+                result.append(dict_to_task_res(row))
 
         return result
 
+    def wait_for_task_res(
+        self, task_ids: set[UUID], limit: Optional[int], timeout: float
+    ) -> list[TaskRes]:
+        """Get TaskRes for task_ids, waiting for them if none are available yet."""
+        return self.task_res_notifier.wait_for(
+            [str(task_id) for task_id in task_ids],
+            lambda: self.get_task_res(task_ids, limit),
+            timeout,
+        )
+
     def num_task_ins(self) -> int:
         """Calculate the number of task_ins in store.
 
@@ -571,15 +690,27 @@ class SqliteState(State):  # pylint: disable=R0904
             AND delivered_at != '';
         """
 
-        if self.conn is None:
-            raise AttributeError("State not intitialized")
-
-        with self.conn:
-            self.conn.execute(query_1, data)
-            self.conn.execute(query_2, data)
+        with self.transaction() as conn:
+            conn.execute(query_1, data)
+            conn.execute(query_2, data)
 
         return None
 
+    def get_task_ins_with_parameters_refs(self) -> list[TaskIns]:
+        """Get all stored TaskIns referencing ParametersRecords stored elsewhere.
+
+        The `task.recordset` of the returned TaskIns is not set.
+        """
+        query = "SELECT * FROM task_ins WHERE parameters_refs != '{}';"
+        rows = self.query(query)
+        for row in rows:
+            # Convert values from sint64 to uint64
+            convert_sint64_values_in_dict_to_uint64(
+                row, ["run_id", "producer_node_id", "consumer_node_id"]
+            )
+            row["recordset"] = b""
+        return [dict_to_task_ins(row) for row in rows]
+
     def create_node(
         self, ping_interval: float, public_key: Optional[bytes] = None
     ) -> int:
@@ -632,16 +763,25 @@ class SqliteState(State):  # pylint: disable=R0904
             query += " AND public_key = ?"
             params += (public_key,)  # type: ignore
 
-        if self.conn is None:
-            raise AttributeError("State is not initialized.")
-
         try:
-            with self.conn:
-                rows = self.conn.execute(query, params)
+            with self.transaction() as conn:
+                rows = conn.execute(query, params)
                 if rows.rowcount < 1:
                     raise ValueError("Public key or node_id not found")
         except KeyError as exc:
             log(ERROR, {"query": query, "data": params, "exception": exc})
+            return
+        self.node_notifier.notify([node_id])
+
+    def add_node_deletion_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Register a function to be called whenever nodes are deleted."""
+        self.node_notifier.add_listener(listener)
+
+    def remove_node_deletion_listener(
+        self, listener: Callable[[list[int]], None]
+    ) -> None:
+        """Unregister a function registered with `add_node_deletion_listener`."""
+        self.node_notifier.remove_listener(listener)
 
     def get_nodes(self, run_id: int) -> set[int]:
         """Retrieve all currently stored node IDs as a set.
@@ -811,6 +951,56 @@ class SqliteState(State):  # pylint: disable=R0904
             return False
 
 
+@lru_cache(maxsize=256)
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace in the query (cached as queries are mostly constant)."""
+    return re.sub(r"\s+", " ", query)
+
+
+def _migrate_task_table(
+    conn: sqlite3.Connection, table: str, create_table: str, create_recordset: str
+) -> None:
+    """Migrate a `task_ins` or `task_res` table created by an older version.
+
+    Older versions stored the RecordSet of each task in a `recordset` column of the
+    table itself and had no `parameters_refs` column.
+    """
+    columns = [row["name"] for row in conn.execute(f"PRAGMA table_info({table});")]
+    if "recordset" not in columns:
+        if columns and "parameters_refs" not in columns:
+            with conn:
+                conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN parameters_refs TEXT "
+                    "DEFAULT '{}';"
+                )
+        return
+
+    log(INFO, "Migrating table `%s` to the current schema", table)
+    # Rebuild the table (see https://sqlite.org/lang_altertable.html), with foreign
+    # keys disabled so that dropping the old table doesn't cascade
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        with conn:
+            conn.execute("BEGIN;")
+            conn.execute(create_table.replace(f" {table}(", f" {table}_new("))
+            new_columns = [
+                row["name"] for row in conn.execute(f"PRAGMA table_info({table}_new);")
+            ]
+            values = [col if col in columns else "'{}'" for col in new_columns]
+            conn.execute(
+                f"INSERT INTO {table}_new ({', '.join(new_columns)}) "
+                f"SELECT {', '.join(values)} FROM {table};"
+            )
+            conn.execute(create_recordset)
+            conn.execute(
+                f"INSERT INTO {table}_recordset SELECT task_id, recordset FROM {table};"
+            )
+            conn.execute(f"DROP TABLE {table};")
+            conn.execute(f"ALTER TABLE {table}_new RENAME TO {table};")
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+
 def dict_factory(
     cursor: sqlite3.Cursor,
     row: sqlite3.Row,
@@ -823,8 +1013,8 @@ def dict_factory(
     return dict(zip(fields, row))
 
 
-def task_ins_to_dict(task_msg: TaskIns) -> dict[str, Any]:
-    """Transform TaskIns to dict."""
+def task_to_dict(task_msg: Union[TaskIns, TaskRes]) -> dict[str, Any]:
+    """Transform TaskIns or TaskRes to dict."""
     result = {
         "task_id": task_msg.task_id,
         "group_id": task_msg.group_id,
@@ -839,30 +1029,15 @@ def task_ins_to_dict(task_msg: TaskIns) -> dict[str, Any]:
         "ttl": task_msg.task.ttl,
         "ancestry": ",".join(task_msg.task.ancestry),
         "task_type": task_msg.task.task_type,
+        "parameters_refs": json.dumps(dict(task_msg.task.parameters_refs)),
         "recordset": task_msg.task.recordset.SerializeToString(),
     }
     return result
 
 
-def task_res_to_dict(task_msg: TaskRes) -> dict[str, Any]:
-    """Transform TaskRes to dict."""
-    result = {
-        "task_id": task_msg.task_id,
-        "group_id": task_msg.group_id,
-        "run_id": task_msg.run_id,
-        "producer_anonymous": task_msg.task.producer.anonymous,
-        "producer_node_id": task_msg.task.producer.node_id,
-        "consumer_anonymous": task_msg.task.consumer.anonymous,
-        "consumer_node_id": task_msg.task.consumer.node_id,
-        "created_at": task_msg.task.created_at,
-        "delivered_at": task_msg.task.delivered_at,
-        "pushed_at": task_msg.task.pushed_at,
-        "ttl": task_msg.task.ttl,
-        "ancestry": ",".join(task_msg.task.ancestry),
-        "task_type": task_msg.task.task_type,
-        "recordset": task_msg.task.recordset.SerializeToString(),
-    }
-    return result
+# Both messages share the same fields
+task_ins_to_dict = task_to_dict
+task_res_to_dict = task_to_dict
 
 
 def dict_to_task_ins(task_dict: dict[str, Any]) -> TaskIns:
@@ -890,6 +1065,7 @@ def dict_to_task_ins(task_dict: dict[str, Any]) -> TaskIns:
             ancestry=task_dict["ancestry"].split(","),
             task_type=task_dict["task_type"],
             recordset=recordset,
+            parameters_refs=json.loads(task_dict["parameters_refs"]),
         ),
     )
     return result
@@ -897,29 +1073,11 @@ def dict_to_task_ins(task_dict: dict[str, Any]) -> TaskIns:
 
 def dict_to_task_res(task_dict: dict[str, Any]) -> TaskRes:
     """Turn task_dict into protobuf message."""
-    recordset = RecordSet()
-    recordset.ParseFromString(task_dict["recordset"])
-
-    result = TaskRes(
-        task_id=task_dict["task_id"],
-        group_id=task_dict["group_id"],
-        run_id=task_dict["run_id"],
-        task=Task(
-            producer=Node(
-                node_id=task_dict["producer_node_id"],
-                anonymous=task_dict["producer_anonymous"],
-            ),
-            consumer=Node(
-                node_id=task_dict["consumer_node_id"],
-                anonymous=task_dict["consumer_anonymous"],
-            ),
-            created_at=task_dict["created_at"],
-            delivered_at=task_dict["delivered_at"],
-            pushed_at=task_dict["pushed_at"],
-            ttl=task_dict["ttl"],
-            ancestry=task_dict["ancestry"].split(","),
-            task_type=task_dict["task_type"],
-            recordset=recordset,
-        ),
+    # Both messages share the same fields
+    task_ins = dict_to_task_ins(task_dict)
+    return TaskRes(
+        task_id=task_ins.task_id,
+        group_id=task_ins.group_id,
+        run_id=task_ins.run_id,
+        task=task_ins.task,
     )
-    return result
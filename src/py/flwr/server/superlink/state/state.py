@@ -16,7 +16,8 @@
 
 
 import abc
-from typing import Optional
+from collections.abc import Sequence
+from typing import Callable, Optional
 from uuid import UUID
 
 from flwr.common.typing import Run, UserConfig
@@ -48,6 +49,18 @@ class State(abc.ABC):  # pylint: disable=R0904
         storing the `task_ins` MUST fail.
         """
 
+    @abc.abstractmethod
+    def store_task_ins_batch(
+        self, task_ins_list: Sequence[TaskIns]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskIns at once.
+
+        Behaves like calling `store_task_ins` for each TaskIns, but allows
+        implementations to store all of them in a single operation. Returns the
+        `task_id` of each TaskIns in the same order, or `None` for each TaskIns that
+        could not be stored.
+        """
+
     @abc.abstractmethod
     def get_task_ins(
         self, node_id: Optional[int], limit: Optional[int]
@@ -76,6 +89,41 @@ class State(abc.ABC):  # pylint: disable=R0904
         `limit` is set, it has to be greater zero.
         """
 
+    @abc.abstractmethod
+    def wait_for_task_ins(
+        self,
+        node_id: Optional[int],
+        limit: Optional[int],
+        timeout: float,
+        is_active: Optional[Callable[[], bool]] = None,
+    ) -> list[TaskIns]:
+        """Get TaskIns for one node, waiting for them if none are available yet.
+
+        Usually, the Fleet API calls this for Nodes long-polling for instructions
+        instead of repeatedly asking for them in fixed intervals.
+
+        Behaves like `get_task_ins`, except that it blocks for up to `timeout` seconds
+        until at least one TaskIns for the given `node_id` is available. Returns an
+        empty list if none became available before the timeout expired.
+
+        If given, `is_active` is checked before each lookup. Once it returns False
+        (e.g., because the Node disconnected), waiting stops and an empty list is
+        returned, so that no TaskIns is marked as delivered to a gone Node.
+        """
+
+    @abc.abstractmethod
+    def add_task_ins_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Register a function to be called whenever TaskIns are stored.
+
+        The function is called with the IDs of the nodes for which TaskIns have been
+        stored (`0` for anonymous TaskIns). This allows, for example, the Simulation
+        Engine to dispatch TaskIns as they arrive instead of polling for them.
+        """
+
+    @abc.abstractmethod
+    def remove_task_ins_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Unregister a function registered with `add_task_ins_listener`."""
+
     @abc.abstractmethod
     def store_task_res(self, task_res: TaskRes) -> Optional[UUID]:
         """Store one TaskRes.
@@ -97,6 +145,18 @@ class State(abc.ABC):  # pylint: disable=R0904
         storing the `task_res` MUST fail.
         """
 
+    @abc.abstractmethod
+    def store_task_res_batch(
+        self, task_res_list: Sequence[TaskRes]
+    ) -> list[Optional[UUID]]:
+        """Store multiple TaskRes at once.
+
+        Behaves like calling `store_task_res` for each TaskRes, but allows
+        implementations to store all of them in a single operation. Returns the
+        `task_id` of each TaskRes in the same order, or `None` for each TaskRes that
+        could not be stored.
+        """
+
     @abc.abstractmethod
     def get_task_res(self, task_ids: set[UUID], limit: Optional[int]) -> list[TaskRes]:
         """Get TaskRes for task_ids.
@@ -114,6 +174,24 @@ class State(abc.ABC):  # pylint: disable=R0904
         available. If `limit` is set, it has to be greater zero.
         """
 
+    @abc.abstractmethod
+    def wait_for_task_res(
+        self, task_ids: set[UUID], limit: Optional[int], timeout: float
+    ) -> list[TaskRes]:
+        """Get TaskRes for task_ids, waiting for them if none are available yet.
+
+        Usually, the Driver API calls this method to wait for results for instructions
+        it has previously scheduled without having to poll the State.
+
+        Behaves like `get_task_res`, except that it blocks for up to `timeout` seconds
+        until at least one TaskRes for the given `task_ids` is available. Returns an
+        empty list if none became available before the timeout expired.
+
+        If given, `is_active` is checked before each lookup. Once it returns False
+        (e.g., because the Node disconnected), waiting stops and an empty list is
+        returned, so that no TaskIns is marked as delivered to a gone Node.
+        """
+
     @abc.abstractmethod
     def num_task_ins(self) -> int:
         """Calculate the number of task_ins in store.
@@ -132,6 +210,15 @@ class State(abc.ABC):  # pylint: disable=R0904
     def delete_tasks(self, task_ids: set[UUID]) -> None:
         """Delete all delivered TaskIns/TaskRes pairs."""
 
+    @abc.abstractmethod
+    def get_task_ins_with_parameters_refs(self) -> list[TaskIns]:
+        """Get all stored TaskIns referencing ParametersRecords stored elsewhere.
+
+        These are the TaskIns with a non-empty `task.parameters_refs`, whether they
+        have been delivered or not. The `task.recordset` of the returned TaskIns is
+        not necessarily set.
+        """
+
     @abc.abstractmethod
     def create_node(
         self, ping_interval: float, public_key: Optional[bytes] = None
@@ -142,6 +229,20 @@ class State(abc.ABC):  # pylint: disable=R0904
     def delete_node(self, node_id: int, public_key: Optional[bytes] = None) -> None:
         """Remove `node_id` from state."""
 
+    @abc.abstractmethod
+    def add_node_deletion_listener(self, listener: Callable[[list[int]], None]) -> None:
+        """Register a function to be called whenever nodes are deleted.
+
+        The function is called with the IDs of the deleted nodes. This allows, for
+        example, to invalidate data cached for these nodes.
+        """
+
+    @abc.abstractmethod
+    def remove_node_deletion_listener(
+        self, listener: Callable[[list[int]], None]
+    ) -> None:
+        """Unregister a function registered with `add_node_deletion_listener`."""
+
     @abc.abstractmethod
     def get_nodes(self, run_id: int) -> set[int]:
         """Retrieve all currently stored node IDs as a set.
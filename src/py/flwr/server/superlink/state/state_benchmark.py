@@ -0,0 +1,176 @@
+# Copyright 2024 Flower Labs GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmark the task round-trip of State implementations.
+
+Simulates the message flow of a Flower run: in every round, the Driver API stores
+one TaskIns per node, each node pulls its TaskIns and stores a TaskRes, and the
+Driver API pulls all TaskRes before deleting the tasks.
+
+Usage::
+
+    python -m flwr.server.superlink.state.state_benchmark --num-nodes 1000
+    python -m flwr.server.superlink.state.state_benchmark --database state.db
+"""
+
+
+import argparse
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from uuid import UUID
+
+from flwr.common import DEFAULT_TTL, Array, ParametersRecord, RecordSet
+from flwr.common.serde import recordset_to_proto
+from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
+
+# pylint: disable-next=E0611
+from flwr.proto.recordset_pb2 import RecordSet as ProtoRecordSet
+from flwr.proto.task_pb2 import Task, TaskIns, TaskRes  # pylint: disable=E0611
+
+from .state import State
+from .state_factory import StateFactory
+
+
+def _create_recordset(num_bytes: int) -> ProtoRecordSet:
+    """Create a RecordSet holding a model of `num_bytes` bytes."""
+    if num_bytes == 0:
+        return ProtoRecordSet()
+    array = Array("float32", [num_bytes // 4], "numpy.ndarray", bytes(num_bytes))
+    parameters_record = ParametersRecord(OrderedDict({"0": array}))
+    return recordset_to_proto(
+        RecordSet(parameters_records={"model": parameters_record})
+    )
+
+
+def _create_task_ins(run_id: int, node_id: int, recordset: ProtoRecordSet) -> TaskIns:
+    return TaskIns(
+        run_id=run_id,
+        task=Task(
+            producer=Node(node_id=0, anonymous=True),
+            consumer=Node(node_id=node_id, anonymous=False),
+            task_type="train",
+            recordset=recordset,
+            ttl=DEFAULT_TTL,
+            created_at=time.time(),
+            pushed_at=time.time(),
+        ),
+    )
+
+
+def _create_task_res(task_ins: TaskIns, recordset: ProtoRecordSet) -> TaskRes:
+    return TaskRes(
+        run_id=task_ins.run_id,
+        task=Task(
+            producer=task_ins.task.consumer,
+            consumer=task_ins.task.producer,
+            ancestry=[task_ins.task_id],
+            task_type=task_ins.task.task_type,
+            recordset=recordset,
+            ttl=DEFAULT_TTL,
+            created_at=time.time(),
+            pushed_at=time.time(),
+        ),
+    )
+
+
+class _Timer:
+    """Accumulate the time spent per operation."""
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, operation: str) -> Iterator[None]:
+        """Add the time spent in the context to the given operation."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.totals[operation] = self.totals.get(operation, 0.0) + elapsed
+
+
+def run_benchmark(
+    state: State, num_nodes: int, num_rounds: int, recordset_size: int = 0
+) -> dict[str, float]:
+    """Run `num_rounds` rounds with `num_nodes` nodes and return the time spent per
+    State operation (in seconds)."""
+    timer = _Timer()
+    recordset = _create_recordset(recordset_size)
+    run_id = state.create_run(None, None, None, {})
+    node_ids = [state.create_node(ping_interval=1e6) for _ in range(num_nodes)]
+
+    for _ in range(num_rounds):
+        # Driver API: push one TaskIns per node
+        with timer.measure("store_task_ins"):
+            task_ids: set[UUID] = set()
+            for node_id in node_ids:
+                task_id = state.store_task_ins(
+                    _create_task_ins(run_id, node_id, recordset)
+                )
+                assert task_id is not None
+                task_ids.add(task_id)
+
+        # Fleet API: each node pulls its TaskIns and replies
+        for node_id in node_ids:
+            with timer.measure("get_task_ins"):
+                task_ins_list = state.get_task_ins(node_id=node_id, limit=1)
+            with timer.measure("store_task_res"):
+                state.store_task_res(_create_task_res(task_ins_list[0], recordset))
+
+        # Driver API: pull all TaskRes and delete the tasks
+        with timer.measure("get_task_res"):
+            task_res_list = state.get_task_res(task_ids, limit=None)
+        assert len(task_res_list) == num_nodes
+        with timer.measure("delete_tasks"):
+            state.delete_tasks(task_ids)
+
+    assert state.num_task_ins() == 0 and state.num_task_res() == 0
+    return timer.totals
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--num-nodes", type=int, default=1000)
+    parser.add_argument("--num-rounds", type=int, default=10)
+    parser.add_argument(
+        "--recordset-size",
+        type=int,
+        default=0,
+        help="Size (in bytes) of the model sent in each TaskIns and TaskRes",
+    )
+    parser.add_argument(
+        "--database",
+        default=":flwr-in-memory-state:",
+        help="Database passed to `StateFactory` (default: in-memory state)",
+    )
+    args = parser.parse_args()
+
+    state = StateFactory(args.database).state()
+    totals = run_benchmark(state, args.num_nodes, args.num_rounds, args.recordset_size)
+
+    print(
+        f"{type(state).__name__}: {args.num_nodes} nodes, {args.num_rounds} rounds, "
+        f"{args.recordset_size} bytes per RecordSet"
+    )
+    for operation, total in totals.items():
+        print(f"  {operation:<16}{total:10.3f}s")
+    print(f"  {'total':<16}{sum(totals.values()):10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@
 """Factory class that creates State instances."""
 
 
+import threading
 from logging import DEBUG
 from typing import Optional
 
@@ -40,18 +41,22 @@ class StateFactory:
     def __init__(self, database: str) -> None:
         self.database = database
         self.state_instance: Optional[State] = None
+        self.lock = threading.Lock()
 
     def state(self) -> State:
         """Return a State instance and create it, if necessary."""
-        # InMemoryState
-        if self.database == ":flwr-in-memory-state:":
+        with self.lock:
+            # InMemoryState
+            if self.database == ":flwr-in-memory-state:":
+                if self.state_instance is None:
+                    self.state_instance = InMemoryState()
+                log(DEBUG, "Using InMemoryState")
+                return self.state_instance
+
+            # SqliteState, initialized once and reusing its connections across calls
             if self.state_instance is None:
-                self.state_instance = InMemoryState()
-            log(DEBUG, "Using InMemoryState")
+                state = SqliteState(self.database)
+                state.initialize()
+                self.state_instance = state
+            log(DEBUG, "Using SqliteState")
             return self.state_instance
-
-        # SqliteState
-        state = SqliteState(self.database)
-        state.initialize()
-        log(DEBUG, "Using SqliteState")
-        return state
@@ -13,23 +13,31 @@
 # limitations under the License.
 # ==============================================================================
 """Tests all state implemenations have to conform to."""
-# pylint: disable=invalid-name, disable=R0904
+# pylint: disable=invalid-name, disable=R0904, disable=C0302
 
+import sqlite3
 import tempfile
+import threading
 import time
 import unittest
 from abc import abstractmethod
+from collections import OrderedDict
 from datetime import datetime, timezone
 from unittest.mock import patch
 from uuid import uuid4
 
-from flwr.common import DEFAULT_TTL
+import numpy as np
+
+from flwr.common import DEFAULT_TTL, ConfigsRecord, Message, Metadata, ParametersRecord
+from flwr.common import RecordSet as MessageContent
+from flwr.common import array_from_numpy
 from flwr.common.constant import ErrorCode
 from flwr.common.secure_aggregation.crypto.symmetric_encryption import (
     generate_key_pairs,
     private_key_to_bytes,
     public_key_to_bytes,
 )
+from flwr.common.serde import recordset_from_proto, recordset_to_proto
 from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
 from flwr.proto.recordset_pb2 import RecordSet  # pylint: disable=E0611
 from flwr.proto.task_pb2 import Task, TaskIns, TaskRes  # pylint: disable=E0611
@@ -296,6 +304,97 @@ class StateTest(unittest.TestCase):
         # Assert
         assert task_id is None
 
+    def test_store_task_ins_with_parameters_refs(self) -> None:
+        """Test that references to shared ParametersRecords are stored."""
+        # Prepare
+        state = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        task_ins = create_task_ins(consumer_node_id=1, anonymous=False, run_id=run_id)
+        task_ins.task.parameters_refs["global"] = "9f86d08"
+
+        # Execute
+        state.store_task_ins(task_ins=task_ins)
+        task_ins_list = state.get_task_ins(node_id=1, limit=None)
+
+        # Assert
+        assert dict(task_ins_list[0].task.parameters_refs) == {"global": "9f86d08"}
+
+    def test_get_task_ins_with_parameters_refs(self) -> None:
+        """Test that only TaskIns with references are returned, delivered or not."""
+        # Prepare
+        state = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        task_ins_list = [
+            create_task_ins(consumer_node_id=1, anonymous=False, run_id=run_id)
+            for _ in range(3)
+        ]
+        task_ins_list[0].task.parameters_refs["global"] = "9f86d08"
+        task_ins_list[2].task.parameters_refs["global"] = "60303ae"
+        task_ids = state.store_task_ins_batch(task_ins_list)
+        state.get_task_ins(node_id=1, limit=1)
+
+        # Execute
+        result = state.get_task_ins_with_parameters_refs()
+
+        # Assert
+        assert {
+            task_ins.task_id: dict(task_ins.task.parameters_refs) for task_ins in result
+        } == {
+            str(task_ids[0]): {"global": "9f86d08"},
+            str(task_ids[2]): {"global": "60303ae"},
+        }
+
+    def test_store_task_ins_batch(self) -> None:
+        """Store a batch of TaskIns, skipping the invalid ones."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        task_ins_list = [
+            create_task_ins(consumer_node_id=node_id, anonymous=False, run_id=run_id),
+            create_task_ins(consumer_node_id=node_id, anonymous=False, run_id=61016),
+            create_task_ins(consumer_node_id=0, anonymous=False, run_id=run_id),
+            create_task_ins(consumer_node_id=node_id, anonymous=False, run_id=run_id),
+        ]
+
+        # Execute
+        task_ids = state.store_task_ins_batch(task_ins_list)
+        retrieved = state.get_task_ins(node_id=node_id, limit=None)
+
+        # Assert
+        assert len(task_ids) == 4
+        assert task_ids[1] is None and task_ids[2] is None
+        assert {task_ins.task_id for task_ins in retrieved} == {
+            str(task_ids[0]),
+            str(task_ids[3]),
+        }
+
+    def test_store_task_res_batch(self) -> None:
+        """Store a batch of TaskRes and retrieve them."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        task_ins_ids = [uuid4() for _ in range(3)]
+        task_res_list = [
+            create_task_res(
+                producer_node_id=0,
+                anonymous=True,
+                ancestry=[str(task_ins_id)],
+                run_id=run_id,
+            )
+            for task_ins_id in task_ins_ids
+        ]
+
+        # Execute
+        task_ids = state.store_task_res_batch(task_res_list)
+        retrieved = state.get_task_res(set(task_ins_ids), limit=None)
+
+        # Assert
+        assert None not in task_ids
+        assert [task_res.task_id for task_res in retrieved] == [
+            str(task_id) for task_id in task_ids
+        ]
+
     # TaskRes tests
     def test_task_res_store_and_retrieve_by_task_ins_id(self) -> None:
         """Store TaskRes retrieve it by task_ins_id."""
@@ -318,6 +417,182 @@ class StateTest(unittest.TestCase):
         retrieved_task_res = task_res_list[0]
         assert retrieved_task_res.task_id == str(task_res_uuid)
 
+    def test_get_task_res_in_order_of_insertion(self) -> None:
+        """Test get_task_res returning the oldest TaskRes first."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        task_ins_ids = [uuid4() for _ in range(5)]
+        task_res_uuids = [
+            state.store_task_res(
+                create_task_res(
+                    producer_node_id=0,
+                    anonymous=True,
+                    ancestry=[str(task_ins_id)],
+                    run_id=run_id,
+                )
+            )
+            for task_ins_id in task_ins_ids
+        ]
+
+        # Execute
+        first = state.get_task_res(task_ids=set(task_ins_ids), limit=2)
+        rest = state.get_task_res(task_ids=set(task_ins_ids), limit=None)
+
+        # Assert
+        assert [task_res.task_id for task_res in first + rest] == [
+            str(task_res_uuid) for task_res_uuid in task_res_uuids
+        ]
+
+    def test_wait_for_task_res_available(self) -> None:
+        """Test wait_for_task_res returning available TaskRes immediately."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        task_ins_id = uuid4()
+        task_res = create_task_res(
+            producer_node_id=0,
+            anonymous=True,
+            ancestry=[str(task_ins_id)],
+            run_id=run_id,
+        )
+        task_res_uuid = state.store_task_res(task_res)
+
+        # Execute
+        start_time = time.monotonic()
+        task_res_list = state.wait_for_task_res(
+            task_ids={task_ins_id}, limit=None, timeout=10
+        )
+
+        # Assert
+        assert time.monotonic() - start_time < 1
+        assert len(task_res_list) == 1
+        assert task_res_list[0].task_id == str(task_res_uuid)
+
+    def test_wait_for_task_res_timeout(self) -> None:
+        """Test wait_for_task_res returning an empty list after the timeout."""
+        # Prepare
+        state: State = self.state_factory()
+        state.create_run(None, None, "9f86d08", {})
+
+        # Execute
+        start_time = time.monotonic()
+        task_res_list = state.wait_for_task_res(
+            task_ids={uuid4()}, limit=None, timeout=0.1
+        )
+
+        # Assert
+        assert time.monotonic() - start_time >= 0.1
+        assert len(task_res_list) == 0
+
+    def test_task_ins_listener(self) -> None:
+        """Test that listeners are notified about the nodes of stored TaskIns."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_ids = [state.create_node(ping_interval=10) for _ in range(2)]
+        received: list[list[int]] = []
+        state.add_task_ins_listener(received.append)
+
+        # Execute
+        state.store_task_ins_batch(
+            [
+                create_task_ins(
+                    consumer_node_id=node_id, anonymous=False, run_id=run_id
+                )
+                for node_id in node_ids
+            ]
+        )
+        state.remove_task_ins_listener(received.append)
+        state.store_task_ins(
+            create_task_ins(
+                consumer_node_id=node_ids[0], anonymous=False, run_id=run_id
+            )
+        )
+
+        # Assert
+        assert received == [node_ids]
+
+    def test_node_deletion_listener(self) -> None:
+        """Test that listeners are notified about deleted nodes."""
+        # Prepare
+        state: State = self.state_factory()
+        node_ids = [state.create_node(ping_interval=10) for _ in range(2)]
+        received: list[list[int]] = []
+        state.add_node_deletion_listener(received.append)
+
+        # Execute
+        state.delete_node(node_ids[0])
+        state.remove_node_deletion_listener(received.append)
+        state.delete_node(node_ids[1])
+
+        # Assert
+        assert received == [[node_ids[0]]]
+
+    def test_wait_for_task_ins_available(self) -> None:
+        """Test wait_for_task_ins returning available TaskIns immediately."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        task_ins = create_task_ins(
+            consumer_node_id=node_id, anonymous=False, run_id=run_id
+        )
+        task_ins_uuid = state.store_task_ins(task_ins)
+
+        # Execute
+        start_time = time.monotonic()
+        task_ins_list = state.wait_for_task_ins(node_id=node_id, limit=1, timeout=10)
+
+        # Assert
+        assert time.monotonic() - start_time < 1
+        assert len(task_ins_list) == 1
+        assert task_ins_list[0].task_id == str(task_ins_uuid)
+
+    def test_wait_for_task_ins_timeout(self) -> None:
+        """Test wait_for_task_ins returning an empty list after the timeout."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        other_node_id = state.create_node(ping_interval=10)
+        task_ins = create_task_ins(
+            consumer_node_id=other_node_id, anonymous=False, run_id=run_id
+        )
+        _ = state.store_task_ins(task_ins)
+
+        # Execute
+        start_time = time.monotonic()
+        task_ins_list = state.wait_for_task_ins(node_id=node_id, limit=1, timeout=0.1)
+
+        # Assert
+        assert time.monotonic() - start_time >= 0.1
+        assert len(task_ins_list) == 0
+
+    def test_wait_for_task_ins_inactive(self) -> None:
+        """Test wait_for_task_ins not delivering TaskIns to an inactive request."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        task_ins = create_task_ins(
+            consumer_node_id=node_id, anonymous=False, run_id=run_id
+        )
+        task_ins_uuid = state.store_task_ins(task_ins)
+
+        # Execute
+        start_time = time.monotonic()
+        inactive_list = state.wait_for_task_ins(
+            node_id=node_id, limit=1, timeout=10, is_active=lambda: False
+        )
+        task_ins_list = state.get_task_ins(node_id=node_id, limit=1)
+
+        # Assert
+        assert time.monotonic() - start_time < 1
+        assert len(inactive_list) == 0
+        assert len(task_ins_list) == 1
+        assert task_ins_list[0].task_id == str(task_ins_uuid)
+
     def test_node_ids_initial_state(self) -> None:
         """Test retrieving all node_ids and empty initial state."""
         # Prepare
@@ -664,6 +939,32 @@ class StateTest(unittest.TestCase):
         assert err_taskres.task.HasField("error")
         assert err_taskres.task.error.code == ErrorCode.NODE_UNAVAILABLE
 
+    def test_node_unavailable_error_only_for_requested_task_ins(self) -> None:
+        """Test that get_task_res only returns errors for the given task_ids."""
+        # Prepare
+        state: State = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=30)
+        task_ids = [
+            state.store_task_ins(
+                create_task_ins(
+                    consumer_node_id=node_id, anonymous=False, run_id=run_id
+                )
+            )
+            for _ in range(2)
+        ]
+        assert task_ids[0] is not None
+
+        # Execute
+        current_time = time.time()
+        with patch("time.time", side_effect=lambda: current_time + 50):
+            task_res_list = state.get_task_res({task_ids[0]}, limit=None)
+
+        # Assert
+        assert len(task_res_list) == 1
+        assert task_res_list[0].task.ancestry == [str(task_ids[0])]
+        assert task_res_list[0].task.error.code == ErrorCode.NODE_UNAVAILABLE
+
 
 def create_task_ins(
     consumer_node_id: int,
@@ -694,6 +995,32 @@ def create_task_ins(
     return task
 
 
+def create_message(
+    run_id: int, src_node_id: int, dst_node_id: int, reply_to_message: str = ""
+) -> Message:
+    """Create a Message with some content for testing."""
+    return Message(
+        metadata=Metadata(
+            run_id=run_id,
+            message_id="",
+            src_node_id=src_node_id,
+            dst_node_id=dst_node_id,
+            reply_to_message=reply_to_message,
+            group_id="",
+            ttl=DEFAULT_TTL,
+            message_type="mock",
+        ),
+        content=MessageContent(
+            parameters_records={
+                "params": ParametersRecord(
+                    OrderedDict({"0": array_from_numpy(np.ones(3))})
+                )
+            },
+            configs_records={"config": ConfigsRecord({"key": "value"})},
+        ),
+    )
+
+
 def create_task_res(
     producer_node_id: int,
     anonymous: bool,
@@ -728,6 +1055,80 @@ class InMemoryStateTest(StateTest):
         """Return InMemoryState."""
         return InMemoryState()
 
+    def test_wait_for_task_ins_notified(self) -> None:
+        """Test wait_for_task_ins waking up when a TaskIns is stored."""
+        # Prepare
+        state = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        task_ins = create_task_ins(
+            consumer_node_id=node_id, anonymous=False, run_id=run_id
+        )
+        timer = threading.Timer(0.1, state.store_task_ins, args=(task_ins,))
+
+        # Execute
+        timer.start()
+        start_time = time.monotonic()
+        task_ins_list = state.wait_for_task_ins(node_id=node_id, limit=1, timeout=10)
+        timer.join()
+
+        # Assert
+        assert time.monotonic() - start_time < 1
+        assert len(task_ins_list) == 1
+
+    def test_store_message_ins_by_reference(self) -> None:
+        """Test that Messages are delivered as copies sharing the Array data."""
+        # Prepare
+        state = InMemoryState()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        message = create_message(run_id=run_id, src_node_id=0, dst_node_id=node_id)
+        array = message.content.parameters_records["params"]["0"]
+
+        # Execute
+        task_id = state.store_message_ins_batch([message])[0]
+        message.content.configs_records["config"]["key"] = "changed"
+        received = state.get_message_ins(node_id=node_id, limit=None)[0]
+
+        # Assert
+        assert received.metadata.message_id == str(task_id)
+        assert received.metadata.dst_node_id == node_id
+        assert received.content.configs_records["config"]["key"] == "value"
+        received_array = received.content.parameters_records["params"]["0"]
+        assert received_array is not array
+        assert received_array.data is array.data
+        assert not state.task_contents
+
+    def test_get_task_ins_serializes_message_content(self) -> None:
+        """Test that Messages stored by reference can be read as TaskIns/TaskRes."""
+        # Prepare
+        state = InMemoryState()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        node_id = state.create_node(ping_interval=10)
+        message = create_message(run_id=run_id, src_node_id=0, dst_node_id=node_id)
+        task_id = state.store_message_ins_batch([message])[0]
+        assert task_id is not None
+
+        # Execute
+        task_ins = state.get_task_ins(node_id=node_id, limit=None)[0]
+        reply = create_message(
+            run_id=run_id,
+            src_node_id=node_id,
+            dst_node_id=0,
+            reply_to_message=str(task_id),
+        )
+        state.store_message_res_batch([reply])
+        task_res = state.get_task_res({task_id}, limit=None)[0]
+        state.delete_tasks({task_id})
+
+        # Assert
+        assert task_ins.task_id == str(task_id)
+        assert recordset_from_proto(task_ins.task.recordset) == message.content
+        assert list(task_res.task.ancestry) == [str(task_id)]
+        assert recordset_from_proto(task_res.task.recordset) == reply.content
+        assert state.num_task_ins() == 0 and state.num_task_res() == 0
+        assert not state.task_contents
+
 
 class SqliteInMemoryStateTest(StateTest, unittest.TestCase):
     """Test SqliteState implemenation with in-memory database."""
@@ -749,7 +1150,22 @@ class SqliteInMemoryStateTest(StateTest, unittest.TestCase):
         result = state.query("SELECT name FROM sqlite_schema;")
 
         # Assert
-        assert len(result) == 13
+        assert len(result) == 19
+
+    def test_connection_shared_across_threads(self) -> None:
+        """Test that all threads access the same in-memory database."""
+        # Prepare
+        state = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        runs = []
+
+        # Execute
+        thread = threading.Thread(target=lambda: runs.append(state.get_run(run_id)))
+        thread.start()
+        thread.join()
+
+        # Assert
+        assert runs[0] is not None and runs[0].run_id == run_id
 
 
 class SqliteFileBasedTest(StateTest, unittest.TestCase):
@@ -774,7 +1190,68 @@ class SqliteFileBasedTest(StateTest, unittest.TestCase):
         result = state.query("SELECT name FROM sqlite_schema;")
 
         # Assert
-        assert len(result) == 13
+        assert len(result) == 19
+
+    def test_connection_per_thread(self) -> None:
+        """Test that each thread reuses its own connection."""
+        # Prepare
+        state = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        other_conns = []
+        runs = []
+
+        def other_thread() -> None:
+            other_conns.append(state.conn)
+            runs.append(state.get_run(run_id))
+
+        # Execute
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+
+        # Assert
+        assert state.conn is state.conn
+        assert other_conns[0] is not state.conn
+        assert runs[0] is not None and runs[0].run_id == run_id
+        assert state.query("PRAGMA journal_mode;")[0]["journal_mode"] == "wal"
+
+    def test_migrate_task_tables(self) -> None:
+        """Test that task tables created by older versions are migrated."""
+        # Prepare
+        state = self.state_factory()
+        run_id = state.create_run(None, None, "9f86d08", {})
+        task_ins = create_task_ins(consumer_node_id=0, anonymous=True, run_id=run_id)
+        task_ins.task.recordset.CopyFrom(
+            recordset_to_proto(
+                MessageContent(configs_records={"config": ConfigsRecord({"lr": 0.1})})
+            )
+        )
+        task_id = state.store_task_ins(task_ins)
+        # Restore the schema of older versions
+        conn = sqlite3.connect(self.tmp_file.name)
+        with conn:
+            conn.execute("ALTER TABLE task_ins ADD COLUMN recordset BLOB;")
+            conn.execute(
+                "UPDATE task_ins SET recordset = (SELECT recordset "
+                "FROM task_ins_recordset WHERE task_id = task_ins.task_id);"
+            )
+            conn.execute("DROP TABLE task_ins_recordset;")
+            conn.execute("ALTER TABLE task_ins DROP COLUMN parameters_refs;")
+            conn.execute("ALTER TABLE task_res DROP COLUMN parameters_refs;")
+        conn.close()
+
+        # Execute
+        migrated_state = SqliteState(database_path=self.tmp_file.name)
+        migrated_state.initialize()
+        task_ins_list = migrated_state.get_task_ins(node_id=None, limit=None)
+        task_res_columns = migrated_state.query("PRAGMA table_info(task_res);")
+
+        # Assert
+        assert len(migrated_state.query("SELECT name FROM sqlite_schema;")) == 19
+        assert len(task_ins_list) == 1
+        assert task_ins_list[0].task_id == str(task_id)
+        assert task_ins_list[0].task.recordset == task_ins.task.recordset
+        assert "parameters_refs" in [column["name"] for column in task_res_columns]
 
 
 if __name__ == "__main__":
@@ -16,11 +16,14 @@
 
 
 import time
+from collections import OrderedDict
+from copy import copy
+from dataclasses import replace
 from logging import ERROR
 from os import urandom
 from uuid import uuid4
 
-from flwr.common import log
+from flwr.common import ConfigsRecord, MetricsRecord, ParametersRecord, RecordSet, log
 from flwr.common.constant import ErrorCode
 from flwr.proto.error_pb2 import Error  # pylint: disable=E0611
 from flwr.proto.node_pb2 import Node  # pylint: disable=E0611
@@ -156,3 +159,41 @@ def make_node_unavailable_taskres(ref_taskins: TaskIns) -> TaskRes:
             ),
         ),
     )
+
+
+def copy_recordset(recordset: RecordSet) -> RecordSet:
+    """Copy a RecordSet without copying the data of its Arrays.
+
+    The data of an Array is immutable `bytes`, so sharing it between the copies is
+    safe. Everything else is copied, so that changes to one copy never affect the
+    other, as if the RecordSet had been serialized.
+    """
+    return RecordSet(
+        parameters_records={
+            name: ParametersRecord(
+                OrderedDict(
+                    (key, replace(array, shape=list(array.shape)))
+                    for key, array in record.items()
+                )
+            )
+            for name, record in recordset.parameters_records.items()
+        },
+        metrics_records={
+            name: MetricsRecord(
+                {
+                    key: copy(value) if isinstance(value, list) else value
+                    for key, value in record.items()
+                }
+            )
+            for name, record in recordset.metrics_records.items()
+        },
+        configs_records={
+            name: ConfigsRecord(
+                {
+                    key: copy(value) if isinstance(value, list) else value
+                    for key, value in record.items()
+                }
+            )
+            for name, record in recordset.configs_records.items()
+        },
+    )
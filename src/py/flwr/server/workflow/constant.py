@@ -19,6 +19,7 @@ from __future__ import annotations
 
 MAIN_CONFIGS_RECORD = "config"
 MAIN_PARAMS_RECORD = "parameters"
+NODES_CONFIGS_RECORD = "nodes"
 
 
 class Key:
@@ -26,6 +27,9 @@ class Key:
 
     CURRENT_ROUND = "current_round"
     START_TIME = "start_time"
+    ARRAY_CODECS = "array_codecs"
+    DELTA_SYNC_HISTORY = "delta_sync_history"
+    MODEL_VERSION = "model_version"
 
     def __new__(cls) -> Key:
         """Prevent instantiation."""
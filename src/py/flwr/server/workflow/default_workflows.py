@@ -17,7 +17,8 @@
 
 import io
 import timeit
-from logging import INFO, WARN
+from collections.abc import Iterable, Sequence
+from logging import ERROR, INFO, WARN
 from typing import Optional, Union, cast
 
 import flwr.common.recordset_compat as compat
@@ -25,20 +26,32 @@ from flwr.common import (
     Code,
     ConfigsRecord,
     Context,
+    EvaluateIns,
     EvaluateRes,
+    FitIns,
     FitRes,
     GetParametersIns,
+    Message,
+    Parameters,
     ParametersRecord,
+    RecordSet,
     log,
 )
 from flwr.common.constant import MessageType, MessageTypeLegacy
+from flwr.common.delta_sync import DELTA_SYNC_CONFIGS_KEY, encode_delta
+from flwr.common.record.codec import (
+    ARRAY_CODECS_CONFIGS_KEY,
+    get_array_codecs,
+    get_available_codecs,
+    is_lossy_codec,
+)
 
 from ..client_proxy import ClientProxy
 from ..compat.app_utils import start_update_client_manager_thread
 from ..compat.legacy_context import LegacyContext
 from ..driver import Driver
 from ..typing import Workflow
-from .constant import MAIN_CONFIGS_RECORD, MAIN_PARAMS_RECORD, Key
+from .constant import MAIN_CONFIGS_RECORD, MAIN_PARAMS_RECORD, NODES_CONFIGS_RECORD, Key
 
 
 class DefaultWorkflow:
@@ -76,7 +89,13 @@ class DefaultWorkflow:
         start_time = timeit.default_timer()
         cfg = ConfigsRecord()
         cfg[Key.START_TIME] = start_time
+        cfg[Key.ARRAY_CODECS] = _get_requested_array_codecs(context)
+        cfg[Key.DELTA_SYNC_HISTORY] = int(
+            context.run_config.get(f"{DELTA_SYNC_CONFIGS_KEY}-history", 0)
+        )
         context.state.configs_records[MAIN_CONFIGS_RECORD] = cfg
+        # What each node announced (e.g., its model version), keyed by node ID
+        context.state.configs_records[NODES_CONFIGS_RECORD] = ConfigsRecord()
 
         for current_round in range(1, context.config.num_rounds + 1):
             log(INFO, "")
@@ -249,46 +268,65 @@ def default_fit_workflow(  # pylint: disable=R0914
 
     # Build dictionary mapping node_id to ClientProxy
     node_id_to_proxy = {proxy.node_id: proxy for proxy, _ in client_instructions}
+    nodes_cfg = _prune_nodes_configs(context)
 
     # Build out messages
     out_messages = [
         driver.create_message(
-            content=compat.fitins_to_recordset(fitins, True),
+            content=content,
             message_type=MessageType.TRAIN,
             dst_node_id=proxy.node_id,
             group_id=str(current_round),
         )
-        for proxy, fitins in client_instructions
+        for (proxy, _), content in zip(
+            client_instructions,
+            _instructions_to_recordsets(
+                client_instructions, cfg, context, parameters, nodes_cfg
+            ),
+        )
     ]
 
-    # Send instructions to clients and
-    # collect `fit` results from all clients participating in this round
-    messages = list(driver.send_and_receive(out_messages))
+    # Send instructions to clients
+    message_ids = driver.push_messages(out_messages)
     del out_messages
-    num_failures = len([msg for msg in messages if msg.has_error()])
-
-    # No exception/failure handling currently
-    log(
-        INFO,
-        "aggregate_fit: received %s results and %s failures",
-        len(messages) - num_failures,
-        num_failures,
-    )
 
-    # Aggregate training results
+    # Collect `fit` results from all clients participating in this round and
+    # hand each successful result to the strategy as soon as it is received
     results: list[tuple[ClientProxy, FitRes]] = []
     failures: list[Union[tuple[ClientProxy, FitRes], BaseException]] = []
-    for msg in messages:
+    num_errors = 0
+    for msg in driver.iter_messages(message_ids):
+        _update_supported_array_codecs(nodes_cfg, [msg])
+        _update_model_versions(nodes_cfg, [msg])
         if msg.has_content():
             proxy = node_id_to_proxy[msg.metadata.src_node_id]
             fitres = compat.recordset_to_fitres(msg.content, False)
             if fitres.status.code == Code.OK:
-                results.append((proxy, fitres))
+                try:
+                    context.strategy.aggregate_fit_partial(
+                        current_round, (proxy, fitres)
+                    )
+                except Exception as ex:  # pylint: disable=broad-exception-caught
+                    # Count the rejected result as a failure, not aborting the round
+                    log(ERROR, "Failed to process the result of a client: %s", ex)
+                    failures.append((proxy, fitres))
+                else:
+                    results.append((proxy, fitres))
             else:
                 failures.append((proxy, fitres))
         else:
+            num_errors += 1
             failures.append(Exception(msg.error))
 
+    # No exception/failure handling currently
+    log(
+        INFO,
+        "aggregate_fit: received %s results and %s failures",
+        len(results) + len(failures) - num_errors,
+        num_errors,
+    )
+
+    # Aggregate training results
     aggregated_result = context.strategy.aggregate_fit(current_round, results, failures)
     parameters_aggregated, metrics_aggregated = aggregated_result
 
@@ -335,16 +373,22 @@ def default_evaluate_workflow(driver: Driver, context: Context) -> None:
 
     # Build dictionary mapping node_id to ClientProxy
     node_id_to_proxy = {proxy.node_id: proxy for proxy, _ in client_instructions}
+    nodes_cfg = _prune_nodes_configs(context)
 
     # Build out messages
     out_messages = [
         driver.create_message(
-            content=compat.evaluateins_to_recordset(evalins, True),
+            content=content,
             message_type=MessageType.EVALUATE,
             dst_node_id=proxy.node_id,
             group_id=str(current_round),
         )
-        for proxy, evalins in client_instructions
+        for (proxy, _), content in zip(
+            client_instructions,
+            _instructions_to_recordsets(
+                client_instructions, cfg, context, parameters, nodes_cfg
+            ),
+        )
     ]
 
     # Send instructions to clients and
@@ -352,6 +396,8 @@ def default_evaluate_workflow(driver: Driver, context: Context) -> None:
     messages = list(driver.send_and_receive(out_messages))
     del out_messages
     num_failures = len([msg for msg in messages if msg.has_error()])
+    _update_supported_array_codecs(nodes_cfg, messages)
+    _update_model_versions(nodes_cfg, messages)
 
     # No exception/failure handling currently
     log(
@@ -389,3 +435,187 @@ def default_evaluate_workflow(driver: Driver, context: Context) -> None:
         context.history.add_metrics_distributed(
             server_round=current_round, metrics=metrics_aggregated
         )
+
+
+def _get_requested_array_codecs(context: Context) -> list[str]:
+    """Return the available Array codecs listed in the run config."""
+    value = context.run_config.get(ARRAY_CODECS_CONFIGS_KEY, "")
+    codecs = [name.strip() for name in str(value).split(",") if name.strip()]
+    available = get_available_codecs()
+    unavailable = [name for name in codecs if name not in available]
+    if unavailable:
+        log(WARN, "Ignoring unavailable Array codecs: %s", ", ".join(unavailable))
+    return [name for name in codecs if name in available]
+
+
+def _prune_nodes_configs(context: LegacyContext) -> ConfigsRecord:
+    """Return the record of what nodes announced, forgetting what is obsolete.
+
+    Entries of nodes that are no longer available are removed, as are the model versions
+    which are no longer in the history (these nodes are sent the model in full anyway).
+    """
+    cfg = context.state.configs_records[MAIN_CONFIGS_RECORD]
+    nodes_cfg = context.state.configs_records[NODES_CONFIGS_RECORD]
+    available = {str(proxy.node_id) for proxy in context.client_manager.all().values()}
+    oldest_version = cast(int, cfg.get(Key.MODEL_VERSION, 0)) - cast(
+        int, cfg.get(Key.DELTA_SYNC_HISTORY, 0)
+    )
+    for key in list(nodes_cfg.keys()):
+        name, node_id = key.rsplit(":", 1)
+        if node_id not in available or (
+            name == Key.MODEL_VERSION and cast(int, nodes_cfg[key]) < oldest_version
+        ):
+            del nodes_cfg[key]
+    return nodes_cfg
+
+
+def _update_supported_array_codecs(
+    nodes_cfg: ConfigsRecord, messages: Iterable[Message]
+) -> None:
+    """Remember the Array codecs each node announced in its reply."""
+    for msg in messages:
+        if (
+            msg.has_content()
+            and ARRAY_CODECS_CONFIGS_KEY in msg.content.configs_records
+        ):
+            key = f"{Key.ARRAY_CODECS}:{msg.metadata.src_node_id}"
+            nodes_cfg[key] = get_array_codecs(msg.content, "supported")
+
+
+def _update_model_versions(
+    nodes_cfg: ConfigsRecord, messages: Iterable[Message]
+) -> None:
+    """Remember the model version each node announced in its reply."""
+    for msg in messages:
+        key = f"{Key.MODEL_VERSION}:{msg.metadata.src_node_id}"
+        if msg.has_content() and DELTA_SYNC_CONFIGS_KEY in msg.content.configs_records:
+            sync = msg.content.configs_records[DELTA_SYNC_CONFIGS_KEY]
+            nodes_cfg[key] = sync["version"]
+        elif key in nodes_cfg:
+            # The node may have failed to restore the model, send it in full
+            del nodes_cfg[key]
+
+
+def _register_model_version(context: Context, cfg: ConfigsRecord) -> int:
+    """Return the version of the global model, adding new versions to the history.
+
+    The history keeps the ParametersRecords of the current global model and of the
+    `Key.DELTA_SYNC_HISTORY` versions preceding it, so that nodes caching any of
+    these previous versions are sent a delta.
+    """
+    records = context.state.parameters_records
+    model = records[MAIN_PARAMS_RECORD]
+    version = cast(int, cfg.get(Key.MODEL_VERSION, 0))
+    if records.get(f"{DELTA_SYNC_CONFIGS_KEY}.{version}") is not model:
+        version += 1
+        records[f"{DELTA_SYNC_CONFIGS_KEY}.{version}"] = model
+        cfg[Key.MODEL_VERSION] = version
+        expired = version - cast(int, cfg[Key.DELTA_SYNC_HISTORY]) - 1
+        records.pop(f"{DELTA_SYNC_CONFIGS_KEY}.{expired}", None)
+    return version
+
+
+def _get_model_delta(context: Context, base: int) -> Optional[ParametersRecord]:
+    """Return the delta from version `base` to the global model, if available."""
+    records = context.state.parameters_records
+    base_model = records.get(f"{DELTA_SYNC_CONFIGS_KEY}.{base}")
+    if base_model is None:
+        return None
+    return encode_delta(records[MAIN_PARAMS_RECORD], base_model)
+
+
+def _apply_delta_sync(
+    client_instructions: Sequence[tuple[ClientProxy, Union[FitIns, EvaluateIns]]],
+    recordsets: list[RecordSet],
+    cfg: ConfigsRecord,
+    context: Context,
+    parameters: Parameters,
+    nodes_cfg: ConfigsRecord,
+) -> None:
+    """Replace the global model by the delta to the version cached by each node.
+
+    Only instructions carrying the global model `parameters` are considered. The
+    model is sent in full to nodes whose cached version isn't in the history or
+    if the RecordSet is encoded with a lossy Array codec.
+    """
+    version = _register_model_version(context, cfg)
+    # Compute each delta once, so that nodes share its ParametersRecord
+    deltas: dict[int, Optional[ParametersRecord]] = {}
+    for (proxy, ins), recordset in zip(client_instructions, recordsets):
+        codecs = get_array_codecs(recordset)
+        if ins.parameters is not parameters or any(map(is_lossy_codec, codecs)):
+            continue
+        name = f"{'fitins' if isinstance(ins, FitIns) else 'evaluateins'}.parameters"
+        sync = ConfigsRecord({"record": name, "version": version})
+        base = cast(
+            Optional[int], nodes_cfg.get(f"{Key.MODEL_VERSION}:{proxy.node_id}")
+        )
+        if base is not None:
+            if base not in deltas:
+                deltas[base] = _get_model_delta(context, base)
+            delta = deltas[base]
+            if delta is not None:
+                recordset.parameters_records[name] = delta
+                sync["base"] = base
+        recordset.configs_records[DELTA_SYNC_CONFIGS_KEY] = sync
+
+
+def _instructions_to_recordsets(
+    client_instructions: Sequence[tuple[ClientProxy, Union[FitIns, EvaluateIns]]],
+    cfg: Optional[ConfigsRecord] = None,
+    context: Optional[Context] = None,
+    parameters: Optional[Parameters] = None,
+    nodes_cfg: Optional[ConfigsRecord] = None,
+) -> list[RecordSet]:
+    """Convert instructions to RecordSets, converting each distinct one once.
+
+    Strategies usually send the same instructions to all sampled clients. The
+    resulting RecordSets then share a single ParametersRecord holding the global
+    model, which the `Driver` only needs to transmit once.
+
+    If Array codecs are configured in `cfg`, each RecordSet requests them for the
+    reply and is encoded with those the destination node announced to support (as
+    recorded in `nodes_cfg`).
+    If delta sync is enabled in `cfg`, the global model `parameters` is replaced
+    by the delta to the version cached by each node (see `_apply_delta_sync`).
+    """
+    codecs = cast(list[str], cfg.get(Key.ARRAY_CODECS, [])) if cfg else []
+    if nodes_cfg is None:
+        nodes_cfg = ConfigsRecord()
+    converted: dict[int, RecordSet] = {}
+    recordsets: list[RecordSet] = []
+    for proxy, ins in client_instructions:
+        if id(ins) not in converted:
+            converted[id(ins)] = (
+                compat.fitins_to_recordset(ins, True)
+                if isinstance(ins, FitIns)
+                else compat.evaluateins_to_recordset(ins, True)
+            )
+        shared = converted[id(ins)]
+        recordsets.append(
+            RecordSet(
+                parameters_records=dict(shared.parameters_records),
+                metrics_records=dict(shared.metrics_records),
+                configs_records=dict(shared.configs_records),
+            )
+        )
+        if codecs:
+            supported = cast(
+                list[str], nodes_cfg.get(f"{Key.ARRAY_CODECS}:{proxy.node_id}", [])
+            )
+            recordsets[-1].configs_records[ARRAY_CODECS_CONFIGS_KEY] = ConfigsRecord(
+                {
+                    "request": codecs,
+                    "encode": [name for name in codecs if name in supported],
+                }
+            )
+    if (
+        cfg is not None
+        and context is not None
+        and parameters is not None
+        and cast(int, cfg.get(Key.DELTA_SYNC_HISTORY, 0)) > 0
+    ):
+        _apply_delta_sync(
+            client_instructions, recordsets, cfg, context, parameters, nodes_cfg
+        )
+    return recordsets
@@ -24,15 +24,88 @@ from ray import ObjectRef
 from ray.util.actor_pool import ActorPool
 
 from flwr.client.client_app import ClientApp, ClientAppException, LoadClientAppError
-from flwr.common import Context, Message
+from flwr.common import Array, Context, Message, ParametersRecord, RecordSet
 from flwr.common.logger import log
 
 ClientAppFn = Callable[[], ClientApp]
+# The records of `Context.state` updated by a ClientApp, and the names of all its
+# ParametersRecords
+StateUpdate = tuple[RecordSet, list[str]]
+# The reply to a message and the StateUpdate, or the type and message of the
+# exception raised by the ClientApp
+CachedRunResult = Union[tuple[Message, StateUpdate], tuple[type[Exception], str]]
+
+
+def _snapshot_parameters_records(
+    state: RecordSet,
+) -> dict[str, list[tuple[str, Array, bytes]]]:
+    """Return the Arrays of the ParametersRecords of `state`, and their data."""
+    return {
+        name: [(key, array, array.data) for key, array in record.items()]
+        for name, record in state.parameters_records.items()
+    }
+
+
+def _is_unchanged(
+    record: ParametersRecord, snapshot: list[tuple[str, Array, bytes]]
+) -> bool:
+    """Return True if a ParametersRecord holds the Arrays of the snapshot."""
+    return len(record) == len(snapshot) and all(
+        key == snapshot_key and array is snapshot_array and array.data is data
+        for (key, array), (snapshot_key, snapshot_array, data) in zip(
+            record.items(), snapshot
+        )
+    )
+
+
+def get_state_update(
+    state: RecordSet, snapshot: dict[str, list[tuple[str, Array, bytes]]]
+) -> StateUpdate:
+    """Return the ParametersRecords of `state` that changed since the snapshot.
+
+    MetricsRecords and ConfigsRecords are small and always part of the update.
+    """
+    return (
+        RecordSet(
+            parameters_records={
+                name: record
+                for name, record in state.parameters_records.items()
+                if name not in snapshot or not _is_unchanged(record, snapshot[name])
+            },
+            metrics_records=dict(state.metrics_records),
+            configs_records=dict(state.configs_records),
+        ),
+        list(state.parameters_records),
+    )
+
+
+def apply_state_update(context: Context, update: StateUpdate) -> None:
+    """Apply the update of `Context.state` returned by an actor."""
+    records, names = update
+    parameters_records = context.state.parameters_records
+    context.state = RecordSet(
+        parameters_records={
+            name: (
+                records.parameters_records[name]
+                if name in records.parameters_records
+                else parameters_records[name]
+            )
+            for name in names
+        },
+        metrics_records=dict(records.metrics_records),
+        configs_records=dict(records.configs_records),
+    )
 
 
 class VirtualClientEngineActor(ABC):
     """Abstract base class for VirtualClientEngine Actors."""
 
+    def __init__(self, client_app_fn: Optional[ClientAppFn] = None) -> None:
+        self.client_app_fn = client_app_fn
+        self.app: Optional[ClientApp] = None
+        # Copies of the Context of the nodes this actor ran messages for
+        self.contexts: dict[int, Context] = {}
+
     def terminate(self) -> None:
         """Manually terminate Actor object."""
         log(WARNING, "Manually terminating %s", self.__class__.__name__)
@@ -64,6 +137,60 @@ class VirtualClientEngineActor(ABC):
 
         return cid, out_message, context
 
+    def run_cached(
+        self,
+        messages: list[Message],
+        cids: list[str],
+        contexts: list[Optional[Context]],
+        evict: list[int],
+    ) -> list[tuple[str, CachedRunResult]]:
+        """Run the ClientApp this actor was created with on a batch of messages.
+
+        The ClientApp is loaded once. The Context of the destination node of a
+        message is taken from the cache if its entry in `contexts` is None, else it
+        replaces the cached one. For each message, the reply and the records of
+        `Context.state` that changed are returned, or the type of the exception
+        raised and its message. The Contexts of the nodes in `evict` are removed
+        from the cache once the batch is processed.
+        """
+        results = [
+            (cid, self._run_cached(message, context))
+            for message, cid, context in zip(messages, cids, contexts)
+        ]
+        for node_id in evict:
+            self.contexts.pop(node_id, None)
+        return results
+
+    def _run_cached(
+        self, message: Message, context: Optional[Context]
+    ) -> CachedRunResult:
+        """Run the ClientApp on a message and the cached Context of its node."""
+        node_id = message.metadata.dst_node_id
+        try:
+            if context is None:
+                context = self.contexts[node_id]
+            else:
+                self.contexts[node_id] = context
+            snapshot = _snapshot_parameters_records(context.state)
+
+            if self.app is None:
+                if self.client_app_fn is None:
+                    raise LoadClientAppError("The actor has no ClientApp to load.")
+                self.app = self.client_app_fn()
+
+            out_message = self.app(message=message, context=context)
+
+        except LoadClientAppError as load_ex:
+            self.contexts.pop(node_id, None)
+            return LoadClientAppError, str(load_ex)
+
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # The Context may have been partially updated, drop it
+            self.contexts.pop(node_id, None)
+            return ClientAppException, str(ex)
+
+        return out_message, get_state_update(context.state, snapshot)
+
 
 @ray.remote
 class ClientAppActor(VirtualClientEngineActor):
@@ -73,10 +200,16 @@ class ClientAppActor(VirtualClientEngineActor):
     ----------
     on_actor_init_fn: Optional[Callable[[], None]] (default: None)
         A function to execute upon actor initialization.
+    client_app_fn: Optional[ClientAppFn] (default: None)
+        A function loading the ClientApp run by `run_cached`.
     """
 
-    def __init__(self, on_actor_init_fn: Optional[Callable[[], None]] = None) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        on_actor_init_fn: Optional[Callable[[], None]] = None,
+        client_app_fn: Optional[ClientAppFn] = None,
+    ) -> None:
+        super().__init__(client_app_fn)
         if on_actor_init_fn:
             on_actor_init_fn()
 
@@ -450,11 +583,26 @@ class BasicActorPool:
         log(DEBUG, "Terminated %i actors", num_terminated)
 
     def submit(
-        self, actor_fn: Any, job: tuple[ClientAppFn, Message, str, Context]
+        self,
+        actor_fn: Any,
+        job: tuple[
+            Optional[ClientAppFn],
+            Union[Message, list[Message]],
+            Union[str, list[str]],
+            Union[Optional[Context], list[Context]],
+        ],
+        preferred_actor: Optional[VirtualClientEngineActor] = None,
     ) -> Any:
-        """On idle actor, submit job and return future."""
+        """On idle actor, submit job and return future.
+
+        The job is submitted to `preferred_actor` if it is idle.
+        """
         # Remove idle actor from pool
-        actor = self.pool.pop()
+        if preferred_actor is not None and preferred_actor in self.pool:
+            self.pool.remove(preferred_actor)
+            actor = preferred_actor
+        else:
+            actor = self.pool.pop()
         # Submit job to actor
         app_fn, mssg, cid, context = job
         future = actor_fn(actor, app_fn, mssg, cid, context)
@@ -478,3 +626,11 @@ class BasicActorPool:
         # Get actor that ran job
         self.add_actor_back_to_pool(future)
         return out_mssg, updated_context
+
+    def fetch_cached_results_and_return_actor_to_pool(
+        self, future: Any
+    ) -> list[tuple[str, CachedRunResult]]:
+        """Pull the results of a `run_cached` job and add actor back to pool."""
+        results: list[tuple[str, CachedRunResult]] = ray.get(future)
+        self.add_actor_back_to_pool(future)
+        return results
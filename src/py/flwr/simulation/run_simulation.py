@@ -252,14 +252,19 @@ def run_simulation(
         ServerApp and receive a Message describing what the ClientApp should perform.
 
     backend_name : str (default: ray)
-        A simulation backend that runs `ClientApp`s.
+        A simulation backend that runs `ClientApp`s. Either `ray`, or `process` to
+        run them in a pool of local processes.
 
     backend_config : Optional[BackendConfig]
         'A dictionary to configure a backend. Separate dictionaries to configure
         different elements of backend. Supported top-level keys are `init_args`
         for values parsed to initialisation of backend, `client_resources`
-        to define the resources for clients, and `actor` to define the actor
-        parameters. Values supported in <value> are those included by
+        to define the resources for clients, `actor` to define the actor
+        parameters (e.g., `batch_size`, the number of messages an actor processes
+        per call), `process` to configure the `process` backend and `node_states`
+        to limit the number of node `Context`s kept in memory (`max_in_memory`),
+        optionally saving their `state` to a directory (`spill_dir`). Values
+        supported in <value> are those included by
         `flwr.common.typing.ConfigsRecordValues`.
 
     enable_tf_gpu_growth : bool (default: False)
@@ -595,7 +600,7 @@ def _parse_args_run_simulation() -> argparse.ArgumentParser:
         "--backend",
         default="ray",
         type=str,
-        help="Simulation backend that executes the ClientApp.",
+        help="Simulation backend that executes the ClientApp (`ray` or `process`).",
     )
     parser.add_argument(
         "--backend-config",